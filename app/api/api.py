@@ -3,7 +3,7 @@ Main API router - combines all endpoint routers
 """
 from fastapi import APIRouter
 
-from app.api.endpoints import auth, projects, reports, contracts, leveranciers, projectfase_endpoints, historie, proces_templates, users, vestigingen, taken
+from app.api.endpoints import auth, projects, reports, contracts, leveranciers, projectfase_endpoints, historie, proces_templates, users, vestigingen, taken, zoeken, imports, facturen, live, jobs
 
 # Create main API router
 api_router = APIRouter()
@@ -57,4 +57,24 @@ api_router.include_router(
 api_router.include_router(
     taken.router,
     tags=["taken"]
-)
\ No newline at end of file
+)
+api_router.include_router(
+    zoeken.router,
+    tags=["zoeken"]
+)
+api_router.include_router(
+    imports.router,
+    tags=["imports"]
+)
+api_router.include_router(
+    facturen.router,
+    tags=["facturen"]
+)
+api_router.include_router(
+    live.router,
+    tags=["live"]
+)
+api_router.include_router(
+    jobs.router,
+    tags=["jobs"]
+)
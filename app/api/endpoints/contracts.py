@@ -1,131 +1,124 @@
 """
 Contracts endpoints - Complete CRUD
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from typing import Optional
 import uuid
-from datetime import datetime
-from decimal import Decimal
 
 from app.db.session import get_db
 from app.core.deps import get_current_user
+from app.core.versie import controleer_versie, verwachte_versie, versie_conflict
+from app.core.cache import response_cache, query_versie, object_versie
 from app.models.user import User
-from app.models.contract import Contract, ContractStatus, ContractType
-from app.models.leverancier import Leverancier  
+from app.models.contract import Contract, peildatum
+from app.models.leverancier import Leverancier
+from app.models.project import Project
 from app.models.historie_setup import HistorieContext
+from app.services.lijst_filters import filter_contracts
+from app.services.exporteren import controleer_formaat, export_response, stream_rijen
+from app.schemas.bulk import BulkDeleteRequest, BulkRequest, BulkResponse
+from app.services.bulk import BulkEntiteit, bulk_aanmaken, bulk_bijwerken, bulk_verwijderen
+from app.services.facturen import contracten_met_facturen
+from app.schemas.common import Pagination
+from app.schemas.contract import (
+    ContractCreate, ContractDetail, ContractDetailResponse, ContractListResponse,
+    ContractMutatieResponse, ContractResponse, ContractSamenvatting, ContractUpdate,
+)
 
 router = APIRouter(tags=["Contracts"])
 
+CONTRACT_BULK = BulkEntiteit(
+    model=Contract,
+    create_schema=ContractCreate,
+    update_schema=ContractUpdate,
+    id_prefix="ctr",
+    uniek_veld="contract_nummer",
+    verwijzingen={
+        "leverancier_id": Leverancier,
+        "project_id": Project,
+        "verantwoordelijke_id": User,
+    },
+    controleer_verwijderen=contracten_met_facturen,
+)
 
-@router.get("/contracts")
+
+@router.get("/contracts", response_model=ContractListResponse)
 def list_contracts(
+    request: Request,
     page: int = 1,
     limit: int = 25,
     search: Optional[str] = None,
     status: Optional[str] = None,
     type: Optional[str] = None,
     project_id: Optional[str] = None,
+    actief: Optional[bool] = None,
+    min_percentage: Optional[float] = None,
+    max_percentage: Optional[float] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     List contracts with pagination and filters
+    
+    Eén query voor pagina én totaal: leverancier via een outer join (contracten
+    zonder leverancier vallen niet weg) en het totaal via COUNT(*) OVER ().
+    
+    actief, min_percentage en max_percentage filteren in de database,
+    bijv. ?actief=true&min_percentage=80
     """
     try:
-        # Base query
-        query = db.query(Contract)
+        # Base query - leverancier komt uit dezelfde join als het zoekfilter
+        query = db.query(Contract).outerjoin(Contract.leverancier)
         
         # Apply filters
-        if search:
-            search_term = f"%{search}%"
-            query = query.join(Contract.leverancier).filter(  # ← JOIN!
-                (Contract.naam.ilike(search_term)) |
-                (Contract.contract_nummer.ilike(search_term)) |
-                (Leverancier.naam.ilike(search_term))  # ← USE LEVERANCIER TABLE
-            )
-        
-        if status:
-            try:
-                query = query.filter(Contract.status == ContractStatus(status))
-            except ValueError:
-                pass
-        
-        if type:
-            try:
-                query = query.filter(Contract.type == ContractType(type))
-            except ValueError:
-                pass
-        
-        if project_id:
-            query = query.filter(Contract.project_id == project_id)
+        query = filter_contracts(
+            query, search, status, type, project_id, actief, min_percentage, max_percentage
+        )
         
-        # Count total
-        total = query.count()
+        # Conditional GET / response cache (is_actief hangt van de datum af)
+        cache = response_cache.lookup(
+            request, current_user, (*query_versie(query, Contract), peildatum()),
+            tabellen=["leveranciers", "projects", "users"],
+        )
+        if cache.response is not None:
+            return cache.response
         
-        # Pagination
+        # Pagination - totaal telt mee in dezelfde query
         offset = (page - 1) * limit
-        contracts = query.offset(offset).limit(limit).all()
+        rows = query.add_columns(
+            func.count().over().label("totaal")
+        ).options(
+            contains_eager(Contract.leverancier),
+            joinedload(Contract.project),
+            joinedload(Contract.verantwoordelijke),
+        ).offset(offset).limit(limit).all()
+        
+        contracts = [row[0] for row in rows]
+        if rows:
+            total = rows[0].totaal
+        elif offset > 0:
+            # Pagina voorbij het einde: totaal apart tellen
+            total = query.count()
+        else:
+            total = 0
         
         # Format response
         contract_list = []
         for c in contracts:
             try:
-                contract_data = {
-                    "id": c.id,
-                    "contract_nummer": c.contract_nummer,
-                    "naam": c.naam,
-                    "beschrijving": c.beschrijving,
-                    "type": c.type.value if c.type else None,
-                    "status": c.status.value if c.status else "concept",
-                    "leverancier": {
-                        "id": c.leverancier.id,
-                        "naam": c.leverancier.naam,
-                        "kvk_nummer": c.leverancier.kvk_nummer,
-                        "contactpersoon": c.leverancier.contactpersoon,
-                        "email": c.leverancier.email,
-                        "telefoon": c.leverancier.telefoon
-                    } if c.leverancier else None,
-                    "bedragen": {
-                        "contract": float(c.contract_bedrag or 0),
-                        "gefactureerd": float(c.gefactureerd_bedrag or 0),
-                        "restant": c.restant_bedrag,
-                        "percentage": c.gefactureerd_percentage
-                    },
-                    "start_datum": c.start_datum.isoformat() if c.start_datum else None,
-                    "eind_datum": c.eind_datum.isoformat() if c.eind_datum else None,
-                    "getekend_datum": c.getekend_datum.isoformat() if c.getekend_datum else None,
-                    "is_actief": c.is_actief,
-                    "project": {
-                        "id": c.project.id,
-                        "naam": c.project.naam,
-                        "project_nummer": c.project.project_nummer
-                    } if c.project else None,
-                    "verantwoordelijke": {
-                        "id": c.verantwoordelijke.id,
-                        "name": c.verantwoordelijke.name,
-                        "email": c.verantwoordelijke.email
-                    } if c.verantwoordelijke else None,
-                    "created_at": c.created_at.isoformat() if c.created_at else None,
-                    "updated_at": c.updated_at.isoformat() if c.updated_at else None
-                }
-                contract_list.append(contract_data)
+                contract_list.append(ContractResponse.van_model(c))
             except Exception as e:
                 print(f"Error formatting contract {c.id}: {e}")
                 continue
         
-        return {
-            "success": True,
-            "data": contract_list,
-            "pagination": {
-                "current_page": page,
-                "per_page": limit,
-                "total": total,
-                "total_pages": max(1, (total + limit - 1) // limit),
-                "has_next": page * limit < total,
-                "has_prev": page > 1
-            }
-        }
+        return cache.opslaan(ContractListResponse(
+            data=contract_list,
+            pagination=Pagination.maak(page, limit, total),
+        ))
     except Exception as e:
         print(f"Error in list_contracts: {e}")
         import traceback
@@ -136,8 +129,140 @@ def list_contracts(
         )
 
 
-@router.get("/contracts/{contract_id}")
+@router.get("/contracts/export")
+def export_contracts(
+    formaat: str = "csv",
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    type: Optional[str] = None,
+    project_id: Optional[str] = None,
+    actief: Optional[bool] = None,
+    min_percentage: Optional[float] = None,
+    max_percentage: Optional[float] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export contracts (CSV of XLSX) met bedragen, restant en percentage
+
+    Zelfde filters als GET /contracts; de rijen worden gestreamd.
+    """
+    formaat = controleer_formaat(formaat)
+    verantwoordelijke = aliased(User)
+
+    stmt = filter_contracts(
+        select(
+            Contract.contract_nummer,
+            Contract.naam,
+            Contract.type,
+            Contract.status,
+            Leverancier.naam,
+            Leverancier.kvk_nummer,
+            Project.project_nummer,
+            Project.naam,
+            verantwoordelijke.name,
+            Contract.start_datum,
+            Contract.eind_datum,
+            Contract.contract_bedrag,
+            Contract.gefactureerd_bedrag,
+            Contract.restant_bedrag,
+            Contract.gefactureerd_percentage,
+        )
+        .outerjoin(Contract.leverancier)
+        .outerjoin(Contract.project)
+        .outerjoin(verantwoordelijke, Contract.verantwoordelijke_id == verantwoordelijke.id)
+        .order_by(Contract.contract_nummer),
+        search, status, type, project_id, actief, min_percentage, max_percentage,
+    )
+
+    return export_response(
+        formaat, "contracten",
+        [
+            "contract_nummer", "naam", "type", "status", "leverancier", "leverancier_kvk_nummer",
+            "project_nummer", "project", "verantwoordelijke", "start_datum", "eind_datum",
+            "contract_bedrag", "gefactureerd_bedrag", "restant_bedrag", "gefactureerd_percentage",
+        ],
+        stream_rijen(stmt),
+    )
+
+
+@router.post("/contracts/bulk", response_model=BulkResponse)
+def bulk_create_contracts(
+    data: BulkRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create multiple contracts in one transaction
+
+    Items worden vooraf gevalideerd; het resultaat staat per item in de
+    response. Met alles_of_niets=true wordt niets opgeslagen als één item fout is.
+    """
+    try:
+        return bulk_aanmaken(db, CONTRACT_BULK, data.items, current_user, alles_of_niets)
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_create_contracts: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create contracts: {str(e)}"
+        )
+
+
+@router.patch("/contracts/bulk", response_model=BulkResponse)
+def bulk_update_contracts(
+    data: BulkRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update multiple contracts in one transaction (elk item met 'id')
+    """
+    try:
+        return bulk_bijwerken(db, CONTRACT_BULK, data.items, current_user, alles_of_niets)
+    except StaleDataError:
+        db.rollback()
+        raise versie_conflict()
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_update_contracts: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update contracts: {str(e)}"
+        )
+
+
+@router.delete("/contracts/bulk", response_model=BulkResponse)
+def bulk_delete_contracts(
+    data: BulkDeleteRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete multiple contracts in one transaction
+    """
+    try:
+        return bulk_verwijderen(db, CONTRACT_BULK, data.ids, current_user, alles_of_niets)
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_delete_contracts: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete contracts: {str(e)}"
+        )
+
+
+@router.get("/contracts/{contract_id}", response_model=ContractDetailResponse)
 def get_contract(
+    request: Request,
     contract_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -154,52 +279,15 @@ def get_contract(
                 detail="Contract not found"
             )
         
-        return {
-            "success": True,
-            "data": {
-                "id": contract.id,
-                "contract_nummer": contract.contract_nummer,
-                "naam": contract.naam,
-                "beschrijving": contract.beschrijving,
-                "type": contract.type.value if contract.type else None,
-                "status": contract.status.value if contract.status else "concept",
-                "leverancier": {
-                    "leverancier_id": contract.leverancier_id,
-                },
-                "bedragen": {
-                    "contract": float(contract.contract_bedrag or 0),
-                    "gefactureerd": float(contract.gefactureerd_bedrag or 0),
-                    "restant": contract.restant_bedrag,
-                    "percentage": contract.gefactureerd_percentage
-                },
-                "start_datum": contract.start_datum.isoformat() if contract.start_datum else None,
-                "eind_datum": contract.eind_datum.isoformat() if contract.eind_datum else None,
-                "getekend_datum": contract.getekend_datum.isoformat() if contract.getekend_datum else None,
-                #"document_pad": contract.document_pad,
-                "is_actief": contract.is_actief,
-                "goedkeuring": {
-                    "goedgekeurd_door": {
-                        "id": contract.goedgekeurd_door.id,
-                        "name": contract.goedgekeurd_door.name
-                    } if contract.goedgekeurd_door else None,
-                    "datum": contract.goedkeurings_datum.isoformat() if contract.goedkeurings_datum else None,
-                    #"opmerkingen": contract.goedkeurings_opmerkingen
-                },
-                "project": {
-                    "id": contract.project.id,
-                    "naam": contract.project.naam,
-                    "project_nummer": contract.project.project_nummer
-                } if contract.project else None,
-                "verantwoordelijke": {
-                    "id": contract.verantwoordelijke.id,
-                    "name": contract.verantwoordelijke.name,
-                    "email": contract.verantwoordelijke.email,
-                    "role": contract.verantwoordelijke.role.value
-                } if contract.verantwoordelijke else None,
-                "created_at": contract.created_at.isoformat() if contract.created_at else None,
-                "updated_at": contract.updated_at.isoformat() if contract.updated_at else None
-            }
-        }
+        # Conditional GET / response cache
+        cache = response_cache.lookup(
+            request, current_user, (*object_versie(contract), peildatum()),
+            tabellen=["leveranciers", "projects", "users", "vestigingen"],
+        )
+        if cache.response is not None:
+            return cache.response
+        
+        return cache.opslaan(ContractDetailResponse(data=ContractDetail.van_model(contract)))
     except HTTPException:
         raise
     except Exception as e:
@@ -212,9 +300,9 @@ def get_contract(
         )
 
 
-@router.post("/contracts")
+@router.post("/contracts", response_model=ContractMutatieResponse)
 def create_contract(
-    contract_data: dict,
+    contract_data: ContractCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -222,18 +310,9 @@ def create_contract(
     Create new contract
     """
     try:
-        # Validate required fields
-        required_fields = ["contract_nummer", "naam", "type", "leverancier_id", "contract_bedrag", "verantwoordelijke_id"]
-        for field in required_fields:
-            if field not in contract_data or not contract_data[field]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Missing required field: {field}"
-                )
-        
         # Check if contract_nummer already exists
         existing = db.query(Contract).filter(
-            Contract.contract_nummer == contract_data.get("contract_nummer")
+            Contract.contract_nummer == contract_data.contract_nummer
         ).first()
         
         if existing:
@@ -242,24 +321,9 @@ def create_contract(
                 detail="Contract nummer already exists"
             )
         
-        # Parse dates
-        start_datum = None
-        if contract_data.get("start_datum"):
-            try:
-                start_datum = datetime.fromisoformat(contract_data["start_datum"].replace('Z', '+00:00'))
-            except:
-                pass
-        
-        eind_datum = None
-        if contract_data.get("eind_datum"):
-            try:
-                eind_datum = datetime.fromisoformat(contract_data["eind_datum"].replace('Z', '+00:00'))
-            except:
-                pass
-        
         # Verify leverancier exists
         leverancier = db.query(Leverancier).filter(
-            Leverancier.id == contract_data["leverancier_id"]
+            Leverancier.id == contract_data.leverancier_id
         ).first()
 
         if not leverancier:
@@ -271,34 +335,17 @@ def create_contract(
         # Create contract
         contract = Contract(
             id=f"ctr_{uuid.uuid4().hex[:8]}",
-            contract_nummer=contract_data["contract_nummer"],
-            naam=contract_data["naam"],
-            beschrijving=contract_data.get("beschrijving"),
-            type=ContractType(contract_data["type"]),
-            status=ContractStatus(contract_data.get("status", "concept")),
-            leverancier_id=contract_data["leverancier_id"],
-            contract_bedrag=Decimal(str(contract_data["contract_bedrag"])),
-            gefactureerd_bedrag=Decimal(str(contract_data.get("gefactureerd_bedrag", 0))),
-            start_datum=start_datum,
-            eind_datum=eind_datum,
-            project_id=contract_data.get("project_id"),
-            verantwoordelijke_id=contract_data["verantwoordelijke_id"]
+            **contract_data.model_dump()
         )
         
         db.add(contract)
         db.commit()
         db.refresh(contract)
         
-        return {
-            "success": True,
-            "data": {
-                "id": contract.id,
-                "contract_nummer": contract.contract_nummer,
-                "naam": contract.naam,
-                "status": contract.status.value
-            },
-            "message": "Contract created successfully"
-        }
+        return ContractMutatieResponse(
+            data=ContractSamenvatting.model_validate(contract),
+            message="Contract created successfully",
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -312,15 +359,19 @@ def create_contract(
         )
 
 
-@router.patch("/contracts/{contract_id}")
+@router.patch("/contracts/{contract_id}", response_model=ContractMutatieResponse)
 def update_contract(
     contract_id: str,
-    contract_data: dict,
+    contract_data: ContractUpdate,
+    verwacht: Optional[set] = Depends(verwachte_versie),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update contract
+
+    Met If-Match: "<versie>" of ?versie= alleen als het contract die versie
+    nog heeft, anders 409 (ook bij een gelijktijdige wijziging).
     """
     try:
         HistorieContext.set_user_id(current_user.id)
@@ -333,42 +384,27 @@ def update_contract(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Contract not found"
             )
+        controleer_versie(contract, verwacht)
         
-        # Update fields
-        for key, value in contract_data.items():
-            if hasattr(contract, key) and value is not None:
-                if key == "status":
-                    setattr(contract, key, ContractStatus(value))
-                elif key == "type":
-                    setattr(contract, key, ContractType(value))
-                elif key in ["start_datum", "eind_datum", "getekend_datum", "goedkeurings_datum"]:
-                    try:
-                        setattr(contract, key, datetime.fromisoformat(value.replace('Z', '+00:00')))
-                    except:
-                        pass
-                elif key in ["contract_bedrag", "gefactureerd_bedrag"]:
-                    setattr(contract, key, Decimal(str(value)))
-                else:
-                    setattr(contract, key, value)
+        # Update fields (alleen meegestuurde, null wordt genegeerd)
+        for key, value in contract_data.model_dump(exclude_unset=True, exclude_none=True).items():
+            setattr(contract, key, value)
         
         db.commit()
         db.refresh(contract)
         
         HistorieContext.clear()
 
-        return {
-            "success": True,
-            "data": {
-                "id": contract.id,
-                "contract_nummer": contract.contract_nummer,
-                "naam": contract.naam,
-                "status": contract.status.value
-            },
-            "message": "Contract updated successfully",
-            "versie": contract.versie_nummer
-        }
+        return ContractMutatieResponse(
+            data=ContractSamenvatting.model_validate(contract),
+            message="Contract updated successfully",
+            versie=contract.versie_nummer,
+        )
     except HTTPException:
         raise
+    except StaleDataError:
+        db.rollback()
+        raise versie_conflict()
     except Exception as e:
         db.rollback()
         print(f"Error in update_contract: {e}")
@@ -380,7 +416,7 @@ def update_contract(
         )
 
 
-@router.delete("/contracts/{contract_id}")
+@router.delete("/contracts/{contract_id}", response_model=ContractMutatieResponse)
 def delete_contract(
     contract_id: str,
     db: Session = Depends(get_db),
@@ -398,22 +434,22 @@ def delete_contract(
                 detail="Contract not found"
             )
         
+        # Facturen zijn append-only; een contract met boekingen blijft bestaan
+        fout = contracten_met_facturen(db, [contract.id]).get(contract.id)
+        if fout:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=fout)
+        
         # Store info for response
-        contract_info = {
-            "id": contract.id,
-            "contract_nummer": contract.contract_nummer,
-            "naam": contract.naam
-        }
+        contract_info = ContractSamenvatting.model_validate(contract)
         
         # Delete
         db.delete(contract)
         db.commit()
         
-        return {
-            "success": True,
-            "data": contract_info,
-            "message": "Contract deleted successfully"
-        }
+        return ContractMutatieResponse(
+            data=contract_info,
+            message="Contract deleted successfully",
+        )
     except HTTPException:
         raise
     except Exception as e:
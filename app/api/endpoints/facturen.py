@@ -0,0 +1,207 @@
+"""
+Factuur endpoints - boeken (ook in bulk) en totalen per periode
+"""
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.core.authorization import vereis_rol
+from app.core.deps import get_current_user
+from app.core.cache import response_cache, object_versie
+from app.models.contract import Contract
+from app.models.factuur import Factuur
+from app.models.user import User, UserRole
+from app.schemas.bulk import BulkRequest, BulkResponse
+from app.schemas.common import Pagination
+from app.schemas.factuur import (
+    FactuurCreate, FactuurListResponse, FactuurMutatieResponse, FactuurPeriodenResponse,
+    FactuurResponse, Periode, PeriodeTotaal,
+)
+from app.services.facturen import boek_factuur, boek_facturen, factuur_perioden
+
+router = APIRouter(tags=["facturen"])
+
+BOEK_ROLLEN = [UserRole.BEHEERDER, UserRole.PROJECTLEIDER, UserRole.ADMINISTRATIEF_MEDEWERKER]
+
+
+def _mag_boeken(user: User) -> None:
+    vereis_rol(user, BOEK_ROLLEN, "Geen rechten om facturen te boeken")
+
+
+@router.get("/contracts/{contract_id}/facturen", response_model=FactuurListResponse)
+def list_facturen(
+    request: Request,
+    contract_id: str,
+    page: int = 1,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Geboekte facturen van een contract (nieuwste factuurdatum eerst)
+    """
+    try:
+        contract = db.query(Contract).filter(Contract.id == contract_id).first()
+        if not contract:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Contract not found"
+            )
+
+        query = db.query(Factuur).filter(Factuur.contract_id == contract_id)
+
+        # Elke boeking hoogt de versie van het contract op
+        cache = response_cache.lookup(
+            request, current_user, object_versie(contract), tabellen=["facturen"],
+        )
+        if cache.response is not None:
+            return cache.response
+
+        offset = (page - 1) * limit
+        rows = query.add_columns(
+            func.count().over().label("totaal")
+        ).order_by(
+            Factuur.factuur_datum.desc(), Factuur.geboekt_op.desc()
+        ).offset(offset).limit(limit).all()
+
+        if rows:
+            total = rows[0].totaal
+        elif offset > 0:
+            total = query.count()
+        else:
+            total = 0
+
+        return cache.opslaan(FactuurListResponse(
+            data=[FactuurResponse.model_validate(row[0]) for row in rows],
+            gefactureerd_bedrag=float(contract.gefactureerd_bedrag or 0),
+            pagination=Pagination.maak(page, limit, total),
+        ))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in list_facturen: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch facturen: {str(e)}"
+        )
+
+
+@router.post(
+    "/contracts/{contract_id}/facturen",
+    response_model=FactuurMutatieResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_factuur(
+    contract_id: str,
+    factuur_data: FactuurCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Boek een factuur op een contract
+
+    Het gefactureerde bedrag van het contract wordt in de database opgehoogd
+    (gelijktijdige boekingen gaan niet verloren). Een negatief bedrag is een
+    creditfactuur; facturen worden nooit gewijzigd of verwijderd.
+    """
+    _mag_boeken(current_user)
+    try:
+        boeking, gefactureerd = boek_factuur(db, contract_id, factuur_data.model_dump(), current_user)
+        if boeking.fouten:
+            niet_gevonden = any("niet gevonden" in fout for fout in boeking.fouten)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND if niet_gevonden else status.HTTP_409_CONFLICT,
+                detail="Contract not found" if niet_gevonden else boeking.fouten[0],
+            )
+
+        return FactuurMutatieResponse(
+            message="Factuur geboekt",
+            data=FactuurResponse.model_validate(db.get(Factuur, boeking.id)),
+            gefactureerd_bedrag=float(gefactureerd or 0),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        print(f"Error in create_factuur: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to book factuur: {str(e)}"
+        )
+
+
+@router.post("/facturen/bulk", response_model=BulkResponse)
+def bulk_create_facturen(
+    data: BulkRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Boek meerdere facturen (elk item met contract_id) in één transactie
+
+    Per contract één atomaire ophoging van het gefactureerde bedrag. Een
+    factuurnummer dat al op het contract geboekt is wordt geweigerd, zodat
+    een herhaalde batch niet dubbel telt.
+    """
+    _mag_boeken(current_user)
+    try:
+        return boek_facturen(db, data.items, current_user, alles_of_niets)
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_create_facturen: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to book facturen: {str(e)}"
+        )
+
+
+@router.get("/facturen/perioden", response_model=FactuurPeriodenResponse)
+def get_factuur_perioden(
+    request: Request,
+    periode: Periode = "maand",
+    van: Optional[date] = None,
+    tot: Optional[date] = None,
+    contract_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    leverancier_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Gefactureerd per maand, kwartaal of jaar
+
+    Opgeteld in de database (GROUP BY op de factuurdatum), bijv.
+    ?periode=kwartaal&van=2024-01-01&project_id=...
+    """
+    try:
+        # Append-only: aantal en laatste boeking bepalen de versie
+        versie = tuple(db.execute(select(func.count(Factuur.id), func.max(Factuur.geboekt_op))).one())
+        cache = response_cache.lookup(request, current_user, versie, tabellen=["facturen", "contracts"])
+        if cache.response is not None:
+            return cache.response
+
+        rijen = factuur_perioden(db, periode, van, tot, contract_id, project_id, leverancier_id)
+        return cache.opslaan(FactuurPeriodenResponse(
+            periode=periode,
+            data=[PeriodeTotaal(**rij) for rij in rijen],
+            totaal=round(sum(rij["totaal"] for rij in rijen), 2),
+        ))
+    except Exception as e:
+        print(f"Error in get_factuur_perioden: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch factuur perioden: {str(e)}"
+        )
@@ -4,7 +4,10 @@ Historie API Endpoints
 
 Endpoints om historie/versiebeheer op te vragen
 """
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -17,10 +20,13 @@ from app.models.historie import (
     compare_versies,
     get_user_activiteit,
     get_tabel_activiteit,
-    get_recent_changes
 )
 # from app.api.deps import get_current_user
-from app.models.user import User
+from app.core.authorization import vereis_rol
+from app.core.deps import get_current_user
+from app.models.user import User, UserRole
+from app.services.exporteren import controleer_formaat, export_response, stream_rijen
+from app.services.lijst_filters import filter_historie
 
 router = APIRouter()
 
@@ -203,15 +209,10 @@ def get_recente_wijzigingen(
     """
     # TODO: Check rechten - alleen beheerders
     
-    changes = get_recent_changes(db, hours)
-    
-    # Filter op tabel_naam indien opgegeven
-    if tabel_naam:
-        changes = [c for c in changes if c.tabel_naam == tabel_naam]
-    
-    # Filter op actie indien opgegeven
-    if actie:
-        changes = [c for c in changes if c.actie == actie]
+    # Filters in de query i.p.v. achteraf in Python
+    changes = filter_historie(
+        db.query(HistorieRecord), tabel_naam, actie, hours=hours
+    ).order_by(HistorieRecord.gewijzigd_op.desc()).all()
     
     return [
         {
@@ -228,6 +229,54 @@ def get_recente_wijzigingen(
     ]
 
 
+@router.get("/historie/export")
+def export_historie(
+    formaat: str = "csv",
+    tabel_naam: Optional[str] = Query(None, description="Filter op specifieke tabel"),
+    actie: Optional[str] = Query(None, description="Filter op actie (create/update/delete)"),
+    user_id: Optional[str] = Query(None, description="Filter op gebruiker"),
+    hours: Optional[int] = Query(None, description="Alleen de laatste X uren"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export audit historie (CSV of XLSX), nieuwste eerst
+
+    Bijvoorbeeld:
+    - GET /historie/export?formaat=xlsx&tabel_naam=contracts&hours=720
+    """
+    vereis_rol(current_user, [UserRole.BEHEERDER], "Alleen beheerders kunnen de historie exporteren")
+
+    formaat = controleer_formaat(formaat)
+    stmt = filter_historie(
+        select(
+            HistorieRecord.gewijzigd_op,
+            HistorieRecord.tabel_naam,
+            HistorieRecord.record_id,
+            HistorieRecord.versie_nummer,
+            HistorieRecord.actie,
+            User.email,
+            HistorieRecord.opmerking,
+            HistorieRecord.data_diff,
+        )
+        .outerjoin(User, HistorieRecord.gewijzigd_door_id == User.id)
+        .order_by(HistorieRecord.gewijzigd_op.desc()),
+        tabel_naam, actie, user_id, hours,
+    )
+
+    def rij(r):
+        diff = r.data_diff
+        if diff is not None and not isinstance(diff, str):
+            diff = json.dumps(diff, default=str)
+        return (*r[:7], diff)
+
+    return export_response(
+        formaat, "historie",
+        ["gewijzigd_op", "tabel_naam", "record_id", "versie_nummer", "actie",
+         "gewijzigd_door", "opmerking", "wijzigingen"],
+        stream_rijen(stmt, rij),
+    )
+
+
 # ============================================================================
 # STATISTIEKEN
 # ============================================================================
@@ -0,0 +1,101 @@
+"""
+Import endpoints - leveranciers en contracten uit CSV/XLSX
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.authorization import vereis_rol
+from app.core.deps import get_current_user
+from app.db.session import get_db
+from app.models.job import Job
+from app.models.user import User, UserRole
+from app.schemas.importeren import ImportJobResponse
+from app.services.importeren import (
+    BESTANDSTYPES, ImportSoort, heeft_openpyxl, import_status, start_import,
+)
+
+router = APIRouter()
+
+IMPORT_ROLLEN = [UserRole.BEHEERDER, UserRole.PROJECTLEIDER, UserRole.ADMINISTRATIEF_MEDEWERKER]
+KOPIEER_BLOK = 1024 * 1024
+
+
+def _bewaar_upload(file: UploadFile, extensie: str) -> str:
+    """Kopieer de upload in blokken naar IMPORT_DIR (met maximum)"""
+    max_bytes = settings.IMPORT_MAX_BESTAND_MB * 1024 * 1024
+    os.makedirs(settings.IMPORT_DIR, exist_ok=True)
+    fd, pad = tempfile.mkstemp(prefix="import_", suffix=f".{extensie}", dir=settings.IMPORT_DIR)
+    try:
+        geschreven = 0
+        with os.fdopen(fd, "wb") as doel:
+            for blok in iter(lambda: file.file.read(KOPIEER_BLOK), b""):
+                geschreven += len(blok)
+                if geschreven > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Bestand te groot. Maximum {settings.IMPORT_MAX_BESTAND_MB}MB",
+                    )
+                doel.write(blok)
+        if geschreven == 0:
+            raise HTTPException(status_code=400, detail="Bestand is leeg")
+    except BaseException:
+        os.remove(pad)
+        raise
+    return pad
+
+
+@router.post("/imports/{soort}", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def start_bestand_import(
+    soort: ImportSoort,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Importeer leveranciers of contracten uit een CSV of XLSX bestand
+
+    De eerste rij bevat de kolomnamen (zelfde velden als bij aanmaken).
+    Bestaande leveranciers (kvk_nummer) en contracten (contract_nummer)
+    worden bijgewerkt. Contracten verwijzen via leverancier_kvk_nummer,
+    project_nummer en verantwoordelijke_email.
+
+    De import draait als achtergrond job; volg de voortgang via
+    GET /imports/{job_id}.
+    """
+    vereis_rol(current_user, IMPORT_ROLLEN, "Geen rechten om te importeren")
+
+    extensie = Path(file.filename or "").suffix.lower().lstrip(".")
+    if extensie not in BESTANDSTYPES:
+        raise HTTPException(status_code=400, detail="Alleen .csv en .xlsx bestanden")
+    if extensie == "xlsx" and not heeft_openpyxl():
+        raise HTTPException(status_code=400, detail="XLSX import is niet beschikbaar, gebruik CSV")
+
+    pad = _bewaar_upload(file, extensie)
+    try:
+        job = start_import(db, soort, pad, extensie, file.filename, current_user.id)
+    except BaseException:
+        os.remove(pad)
+        raise
+    return ImportJobResponse.model_validate(import_status(job))
+
+
+@router.get("/imports/{job_id}", response_model=ImportJobResponse)
+def get_import_status(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Voortgang van een import"""
+    job = db.get(Job, job_id)
+    if (
+        not job or not job.soort.startswith("import.")
+        or (job.aangemaakt_door_id != current_user.id and current_user.role != UserRole.BEHEERDER)
+    ):
+        raise HTTPException(status_code=404, detail="Import niet gevonden")
+    return ImportJobResponse.model_validate(import_status(job))
@@ -0,0 +1,168 @@
+"""
+Job endpoints - achtergrondtaken inplannen en volgen (alleen beheerders)
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.core.authorization import vereis_rol
+from app.core.deps import get_current_user
+from app.models.job import JOB_MISLUKT, Job, JobSchema
+from app.models.user import User, UserRole
+from app.schemas.common import Pagination
+from app.schemas.job import (
+    JobCreate, JobListResponse, JobResponse, JobSchemaResponse, JobSchemaUpdate, TaakResponse,
+)
+from app.services.jobs import get_taken, herplan_job, plan_job, zet_schema
+
+router = APIRouter(tags=["jobs"])
+
+
+def _alleen_beheerder(user: User) -> None:
+    vereis_rol(user, [UserRole.BEHEERDER], "Alleen beheerders kunnen jobs beheren")
+
+
+@router.get("/jobs", response_model=JobListResponse)
+def list_jobs(
+    status_filter: Optional[str] = Query(default=None, alias="status"),
+    soort: Optional[str] = None,
+    page: int = 1,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Jobs, nieuwste eerst (?status=mislukt, ?soort=opruimen.uploads)
+    """
+    _alleen_beheerder(current_user)
+    query = db.query(Job)
+    if status_filter:
+        query = query.filter(Job.status == status_filter)
+    if soort:
+        query = query.filter(Job.soort == soort)
+
+    offset = (page - 1) * limit
+    rows = query.add_columns(
+        func.count().over().label("totaal")
+    ).order_by(Job.aangemaakt_op.desc(), Job.id).offset(offset).limit(limit).all()
+
+    if rows:
+        total = rows[0].totaal
+    elif offset > 0:
+        total = query.count()
+    else:
+        total = 0
+
+    return JobListResponse(
+        data=[JobResponse.model_validate(row[0]) for row in rows],
+        pagination=Pagination.maak(page, limit, total),
+    )
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    job_data: JobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Plan een taak in (zie GET /jobs/taken voor de beschikbare taken)
+    """
+    _alleen_beheerder(current_user)
+    try:
+        job = plan_job(db, job_data.soort, job_data.parameters, current_user.id, job_data.uitvoeren_op)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    db.commit()
+    db.refresh(job)
+    return JobResponse.model_validate(job)
+
+
+@router.get("/jobs/taken", response_model=List[TaakResponse])
+def list_taken(current_user: User = Depends(get_current_user)):
+    """
+    Geregistreerde taken
+    """
+    _alleen_beheerder(current_user)
+    return [
+        TaakResponse(naam=taak.naam, omschrijving=taak.omschrijving, max_pogingen=taak.max_pogingen, cron=taak.cron)
+        for taak in get_taken()
+    ]
+
+
+@router.get("/jobs/schemas", response_model=List[JobSchemaResponse])
+def list_job_schemas(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Terugkerende taken (cron, UTC)
+    """
+    _alleen_beheerder(current_user)
+    return [JobSchemaResponse.model_validate(schema) for schema in db.query(JobSchema).order_by(JobSchema.naam)]
+
+
+@router.patch("/jobs/schemas/{naam}", response_model=JobSchemaResponse)
+def update_job_schema(
+    naam: str,
+    schema_data: JobSchemaUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Pas de cron expressie aan of zet een schema aan/uit
+    """
+    _alleen_beheerder(current_user)
+    schema = db.get(JobSchema, naam)
+    if not schema:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schema niet gevonden")
+    try:
+        zet_schema(db, schema, cron=schema_data.cron, actief=schema_data.actief)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    db.commit()
+    db.refresh(schema)
+    return JobSchemaResponse.model_validate(schema)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Status, pogingen en resultaat van een job
+    """
+    _alleen_beheerder(current_user)
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job niet gevonden")
+    return JobResponse.model_validate(job)
+
+
+@router.post("/jobs/{job_id}/opnieuw", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def retry_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Zet een mislukte job opnieuw in de wachtrij
+    """
+    _alleen_beheerder(current_user)
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job niet gevonden")
+    if job.status != JOB_MISLUKT:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Alleen mislukte jobs kunnen opnieuw; deze job is {job.status}"
+        )
+    herplan_job(db, job)
+    db.commit()
+    db.refresh(job)
+    return JobResponse.model_validate(job)
@@ -1,22 +1,42 @@
 """
 Leveranciers endpoints - Complete CRUD
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.orm import Session
 from typing import Optional
 import uuid
 
 from app.db.session import get_db
 from app.core.deps import get_current_user
+from app.core.versie import controleer_versie, verwachte_versie, versie_conflict
+from app.core.cache import response_cache, query_versie, object_versie
 from app.models.user import User
 from app.models.leverancier import Leverancier, LeverancierStatus, LeverancierType
 from app.models.historie_setup import HistorieContext
+from app.services.zoek_filters import tekst_filter
+from app.schemas.bulk import BulkDeleteRequest, BulkRequest, BulkResponse
+from app.services.bulk import BulkEntiteit, bulk_aanmaken, bulk_bijwerken, bulk_verwijderen
+from app.schemas.common import Pagination
+from app.schemas.leverancier import (
+    LeverancierCreate, LeverancierDetail, LeverancierDetailResponse, LeverancierListResponse,
+    LeverancierMutatieResponse, LeverancierResponse, LeverancierSamenvatting, LeverancierUpdate,
+)
 
 router = APIRouter(tags=["Leveranciers"])
 
+LEVERANCIER_BULK = BulkEntiteit(
+    model=Leverancier,
+    create_schema=LeverancierCreate,
+    update_schema=LeverancierUpdate,
+    id_prefix="lev",
+    uniek_veld="kvk_nummer",
+)
 
-@router.get("/leveranciers")
+
+@router.get("/leveranciers", response_model=LeverancierListResponse)
 def list_leveranciers(
+    request: Request,
     page: int = 1,
     limit: int = 25,
     search: Optional[str] = None,
@@ -34,13 +54,7 @@ def list_leveranciers(
         
         # Apply filters
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                (Leverancier.naam.ilike(search_term)) |
-                (Leverancier.kvk_nummer.ilike(search_term)) |
-                (Leverancier.contactpersoon.ilike(search_term)) |
-                (Leverancier.email.ilike(search_term))
-            )
+            query = query.filter(tekst_filter(Leverancier, search))
         
         if status:
             try:
@@ -54,6 +68,13 @@ def list_leveranciers(
             except ValueError:
                 pass
         
+        # Conditional GET / response cache
+        cache = response_cache.lookup(
+            request, current_user, query_versie(query, Leverancier),
+        )
+        if cache.response is not None:
+            return cache.response
+        
         # Count total
         total = query.count()
         
@@ -65,51 +86,15 @@ def list_leveranciers(
         leverancier_list = []
         for l in leveranciers:
             try:
-                leverancier_data = {
-                    "id": l.id,
-                    "naam": l.naam,
-                    "kvk_nummer": l.kvk_nummer,
-                    "btw_nummer": l.btw_nummer,
-                    "type": l.type.value if l.type else None,
-                    "status": l.status.value if l.status else "actief",
-                    "contactpersoon": l.contactpersoon,
-                    "email": l.email,
-                    "telefoon": l.telefoon,
-                    "mobiel": l.mobiel,
-                    "website": l.website,
-                    "adres": {
-                        "straat": l.adres_straat,
-                        "huisnummer": l.adres_huisnummer,
-                        "postcode": l.adres_postcode,
-                        "plaats": l.adres_plaats,
-                        "land": l.adres_land,
-                        "volledig": l.volledig_adres
-                    },
-                    "bank": {
-                        "iban": l.iban,
-                        "naam": l.bank_naam
-                    },
-                    "is_actief": l.is_actief,
-                    "created_at": l.created_at.isoformat() if l.created_at else None,
-                    "updated_at": l.updated_at.isoformat() if l.updated_at else None
-                }
-                leverancier_list.append(leverancier_data)
+                leverancier_list.append(LeverancierResponse.van_model(l))
             except Exception as e:
                 print(f"Error formatting leverancier {l.id}: {e}")
                 continue
         
-        return {
-            "success": True,
-            "data": leverancier_list,
-            "pagination": {
-                "current_page": page,
-                "per_page": limit,
-                "total": total,
-                "total_pages": max(1, (total + limit - 1) // limit),
-                "has_next": page * limit < total,
-                "has_prev": page > 1
-            }
-        }
+        return cache.opslaan(LeverancierListResponse(
+            data=leverancier_list,
+            pagination=Pagination.maak(page, limit, total),
+        ))
     except Exception as e:
         print(f"Error in list_leveranciers: {e}")
         import traceback
@@ -120,8 +105,84 @@ def list_leveranciers(
         )
 
 
-@router.get("/leveranciers/{leverancier_id}")
+@router.post("/leveranciers/bulk", response_model=BulkResponse)
+def bulk_create_leveranciers(
+    data: BulkRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create multiple leveranciers in one transaction
+
+    Items worden vooraf gevalideerd; het resultaat staat per item in de
+    response. Met alles_of_niets=true wordt niets opgeslagen als één item fout is.
+    """
+    try:
+        return bulk_aanmaken(db, LEVERANCIER_BULK, data.items, current_user, alles_of_niets)
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_create_leveranciers: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create leveranciers: {str(e)}"
+        )
+
+
+@router.patch("/leveranciers/bulk", response_model=BulkResponse)
+def bulk_update_leveranciers(
+    data: BulkRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update multiple leveranciers in one transaction (elk item met 'id')
+    """
+    try:
+        return bulk_bijwerken(db, LEVERANCIER_BULK, data.items, current_user, alles_of_niets)
+    except StaleDataError:
+        db.rollback()
+        raise versie_conflict()
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_update_leveranciers: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update leveranciers: {str(e)}"
+        )
+
+
+@router.delete("/leveranciers/bulk", response_model=BulkResponse)
+def bulk_delete_leveranciers(
+    data: BulkDeleteRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete multiple leveranciers in one transaction
+    """
+    try:
+        return bulk_verwijderen(db, LEVERANCIER_BULK, data.ids, current_user, alles_of_niets)
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_delete_leveranciers: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete leveranciers: {str(e)}"
+        )
+
+
+@router.get("/leveranciers/{leverancier_id}", response_model=LeverancierDetailResponse)
 def get_leverancier(
+    request: Request,
     leverancier_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -138,38 +199,14 @@ def get_leverancier(
                 detail="Leverancier not found"
             )
         
-        return {
-            "success": True,
-            "data": {
-                "id": leverancier.id,
-                "naam": leverancier.naam,
-                "kvk_nummer": leverancier.kvk_nummer,
-                "btw_nummer": leverancier.btw_nummer,
-                "type": leverancier.type.value if leverancier.type else None,
-                "status": leverancier.status.value if leverancier.status else "actief",
-                "contactpersoon": leverancier.contactpersoon,
-                "email": leverancier.email,
-                "telefoon": leverancier.telefoon,
-                "mobiel": leverancier.mobiel,
-                "website": leverancier.website,
-                "adres": {
-                    "straat": leverancier.adres_straat,
-                    "huisnummer": leverancier.adres_huisnummer,
-                    "postcode": leverancier.adres_postcode,
-                    "plaats": leverancier.adres_plaats,
-                    "land": leverancier.adres_land,
-                    "volledig": leverancier.volledig_adres
-                },
-                "bank": {
-                    "iban": leverancier.iban,
-                    "naam": leverancier.bank_naam
-                },
-                "notities": leverancier.notities,
-                "is_actief": leverancier.is_actief,
-                "created_at": leverancier.created_at.isoformat() if leverancier.created_at else None,
-                "updated_at": leverancier.updated_at.isoformat() if leverancier.updated_at else None
-            }
-        }
+        # Conditional GET / response cache
+        cache = response_cache.lookup(
+            request, current_user, object_versie(leverancier),
+        )
+        if cache.response is not None:
+            return cache.response
+        
+        return cache.opslaan(LeverancierDetailResponse(data=LeverancierDetail.van_model(leverancier)))
     except HTTPException:
         raise
     except Exception as e:
@@ -182,9 +219,9 @@ def get_leverancier(
         )
 
 
-@router.post("/leveranciers")
+@router.post("/leveranciers", response_model=LeverancierMutatieResponse)
 def create_leverancier(
-    leverancier_data: dict,
+    leverancier_data: LeverancierCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -192,19 +229,10 @@ def create_leverancier(
     Create new leverancier
     """
     try:
-        # Validate required fields
-        required_fields = ["naam", "type"]
-        for field in required_fields:
-            if field not in leverancier_data or not leverancier_data[field]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Missing required field: {field}"
-                )
-        
         # Check if KVK nummer already exists (if provided)
-        if leverancier_data.get("kvk_nummer"):
+        if leverancier_data.kvk_nummer:
             existing = db.query(Leverancier).filter(
-                Leverancier.kvk_nummer == leverancier_data.get("kvk_nummer")
+                Leverancier.kvk_nummer == leverancier_data.kvk_nummer
             ).first()
             
             if existing:
@@ -216,39 +244,17 @@ def create_leverancier(
         # Create leverancier
         leverancier = Leverancier(
             id=f"lev_{uuid.uuid4().hex[:8]}",
-            naam=leverancier_data["naam"],
-            kvk_nummer=leverancier_data.get("kvk_nummer"),
-            btw_nummer=leverancier_data.get("btw_nummer"),
-            type=LeverancierType(leverancier_data["type"]),
-            status=LeverancierStatus(leverancier_data.get("status", "actief")),
-            contactpersoon=leverancier_data.get("contactpersoon"),
-            email=leverancier_data.get("email"),
-            telefoon=leverancier_data.get("telefoon"),
-            mobiel=leverancier_data.get("mobiel"),
-            website=leverancier_data.get("website"),
-            adres_straat=leverancier_data.get("adres_straat"),
-            adres_huisnummer=leverancier_data.get("adres_huisnummer"),
-            adres_postcode=leverancier_data.get("adres_postcode"),
-            adres_plaats=leverancier_data.get("adres_plaats"),
-            adres_land=leverancier_data.get("adres_land", "Nederland"),
-            iban=leverancier_data.get("iban"),
-            bank_naam=leverancier_data.get("bank_naam"),
-            notities=leverancier_data.get("notities")
+            **leverancier_data.model_dump()
         )
         
         db.add(leverancier)
         db.commit()
         db.refresh(leverancier)
         
-        return {
-            "success": True,
-            "data": {
-                "id": leverancier.id,
-                "naam": leverancier.naam,
-                "status": leverancier.status.value
-            },
-            "message": "Leverancier created successfully"
-        }
+        return LeverancierMutatieResponse(
+            data=LeverancierSamenvatting.model_validate(leverancier),
+            message="Leverancier created successfully",
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -262,15 +268,19 @@ def create_leverancier(
         )
 
 
-@router.patch("/leveranciers/{leverancier_id}")
+@router.patch("/leveranciers/{leverancier_id}", response_model=LeverancierMutatieResponse)
 def update_leverancier(
     leverancier_id: str,
-    leverancier_data: dict,
+    leverancier_data: LeverancierUpdate,
+    verwacht: Optional[set] = Depends(verwachte_versie),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update leverancier
+
+    Met If-Match: "<versie>" of ?versie= alleen als de leverancier die versie
+    nog heeft, anders 409 (ook bij een gelijktijdige wijziging).
     """
     try:
         # SET CONTEXT
@@ -284,16 +294,11 @@ def update_leverancier(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Leverancier not found"
             )
+        controleer_versie(leverancier, verwacht)
         
-        # Update fields
-        for key, value in leverancier_data.items():
-            if hasattr(leverancier, key) and value is not None:
-                if key == "status":
-                    setattr(leverancier, key, LeverancierStatus(value))
-                elif key == "type":
-                    setattr(leverancier, key, LeverancierType(value))
-                else:
-                    setattr(leverancier, key, value)
+        # Update fields (alleen meegestuurde, null wordt genegeerd)
+        for key, value in leverancier_data.model_dump(exclude_unset=True, exclude_none=True).items():
+            setattr(leverancier, key, value)
         
         db.commit()
         db.refresh(leverancier)
@@ -301,18 +306,16 @@ def update_leverancier(
         # Clear context
         HistorieContext.clear()
         
-        return {
-            "success": True,
-            "data": {
-                "id": leverancier.id,
-                "naam": leverancier.naam,
-                "status": leverancier.status.value
-            },
-            "message": "Leverancier updated successfully",
-            "versie": leverancier.versie_nummer
-        }
+        return LeverancierMutatieResponse(
+            data=LeverancierSamenvatting.model_validate(leverancier),
+            message="Leverancier updated successfully",
+            versie=leverancier.versie_nummer,
+        )
     except HTTPException:
         raise
+    except StaleDataError:
+        db.rollback()
+        raise versie_conflict()
     except Exception as e:
         db.rollback()
         print(f"Error in update_leverancier: {e}")
@@ -324,7 +327,7 @@ def update_leverancier(
         )
 
 
-@router.delete("/leveranciers/{leverancier_id}")
+@router.delete("/leveranciers/{leverancier_id}", response_model=LeverancierMutatieResponse)
 def delete_leverancier(
     leverancier_id: str,
     db: Session = Depends(get_db),
@@ -343,20 +346,16 @@ def delete_leverancier(
             )
         
         # Store info for response
-        leverancier_info = {
-            "id": leverancier.id,
-            "naam": leverancier.naam
-        }
+        leverancier_info = LeverancierSamenvatting.model_validate(leverancier)
         
         # Delete
         db.delete(leverancier)
         db.commit()
         
-        return {
-            "success": True,
-            "data": leverancier_info,
-            "message": "Leverancier deleted successfully"
-        }
+        return LeverancierMutatieResponse(
+            data=leverancier_info,
+            message="Leverancier deleted successfully",
+        )
     except HTTPException:
         raise
     except Exception as e:
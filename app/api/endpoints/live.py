@@ -0,0 +1,142 @@
+"""
+Live updates - Server-Sent Events met wijzigingen in fases, documenten,
+commentaren en taken (zie app/services/live.py)
+"""
+import asyncio
+from types import SimpleNamespace
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import get_db
+from app.core.config import settings
+from app.core.deps import get_current_user_stream
+from app.models.project import Project
+from app.models.projectfase import ProjectFase
+from app.models.user import User
+from app.core.authorization import check_document_toegang, check_fase_toegang, check_review_toegang
+from app.services.live import LiveBericht, Luisteraar, gemiste_berichten, live_hub, sse
+
+router = APIRouter(tags=["live"])
+
+
+def _maak_filter(user: SimpleNamespace, project_id: Optional[str], fase_id: Optional[str]):
+    """Welke SSE events deze client krijgt voor een bericht (dezelfde rechten als de endpoints)"""
+
+    def filter(bericht: LiveBericht) -> List[str]:
+        if not check_fase_toegang(bericht.fase, user):
+            return []
+        namen = []
+
+        binnen_filter = (
+            (project_id is None or bericht.fase.project_id == project_id)
+            and (fase_id is None or bericht.fase.id == fase_id)
+        )
+        if binnen_filter and (
+            bericht.soort != "document"
+            or check_document_toegang(SimpleNamespace(zichtbaar_voor_leverancier=bericht.zichtbaar_voor_leverancier), user)
+        ):
+            namen.append(bericht.soort)
+
+        # /me/taken hangt niet van project of fase af
+        if user.id in bericht.taken_voor or (
+            bericht.review and check_review_toegang(user, bericht.fase.projectleider_id)
+        ):
+            namen.append("taken")
+        return namen
+
+    return filter
+
+
+@router.get("/live")
+def live_updates(
+    request: Request,
+    project_id: Optional[str] = None,
+    fase_id: Optional[str] = None,
+    laatste_event_id: Optional[int] = None,
+    last_event_id: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_stream)
+):
+    """
+    Stream van wijzigingen (text/event-stream)
+
+    Events:
+    - fase, document, commentaar: {actie, id, fase_id, project_id, versie, velden}
+      (bij een fase ook de nieuwe status); alleen voor fases en documenten
+      die de user mag zien, eventueel beperkt met ?project_id= of ?fase_id=
+    - taken: /me/taken van deze user is veranderd
+    - resync: er zijn meldingen gemist; haal alles opnieuw op
+    - verbonden: eerste bericht van de stream
+
+    Authenticatie met de Authorization header of ?token= (EventSource).
+    De browser stuurt bij herverbinden zelf Last-Event-ID mee; gemiste
+    wijzigingen worden dan alsnog gestuurd.
+    """
+    if fase_id:
+        fase = db.query(ProjectFase).filter(ProjectFase.id == fase_id).first()
+        if not fase:
+            raise HTTPException(status_code=404, detail="Fase niet gevonden")
+        if not check_fase_toegang(fase, current_user):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Geen toegang tot deze fase"
+            )
+    if project_id and not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Project niet gevonden")
+
+    if laatste_event_id is None and last_event_id and last_event_id.isdigit():
+        laatste_event_id = int(last_event_id)
+
+    # Los van de database sessie, die is na deze functie gesloten
+    user = SimpleNamespace(id=current_user.id, role=current_user.role, leverancier_id=current_user.leverancier_id)
+    filter = _maak_filter(user, project_id, fase_id)
+
+    async def stroom():
+        luisteraar = Luisteraar(filter)
+        live_hub.aanmelden(luisteraar)
+        try:
+            yield "retry: 3000\n\n"
+            yield sse("verbonden", {"user_id": user.id, "project_id": project_id, "fase_id": fase_id})
+
+            tot_id = laatste_event_id or 0
+            if laatste_event_id is not None:
+                gemist = await run_in_threadpool(gemiste_berichten, laatste_event_id)
+                if gemist is None:
+                    yield sse("resync", {"reden": "te veel gemiste wijzigingen"})
+                else:
+                    for bericht in gemist:
+                        for naam in filter(bericht):
+                            yield sse(naam, bericht.data, bericht.event_id)
+                        tot_id = max(tot_id, bericht.event_id)
+
+            while True:
+                if luisteraar.overgelopen:
+                    while not luisteraar.queue.empty():
+                        luisteraar.queue.get_nowait()
+                    luisteraar.overgelopen = False
+                    yield sse("resync", {"reden": "client kon de meldingen niet bijhouden"})
+                    continue
+                try:
+                    event_id, tekst = await asyncio.wait_for(
+                        luisteraar.queue.get(), timeout=settings.LIVE_HEARTBEAT_SECONDEN
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if event_id <= tot_id:
+                    continue  # al gestuurd bij het inhalen
+                yield tekst
+        finally:
+            live_hub.afmelden(luisteraar)
+
+    return StreamingResponse(
+        stroom(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
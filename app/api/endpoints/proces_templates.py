@@ -9,7 +9,7 @@ CRUD operaties voor:
 
 Met rechten checks voor beheerders
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from pydantic import BaseModel
@@ -22,7 +22,10 @@ from app.models.proces_template import (
     ProcesCategorie, TemplateStapStatus
 )
 from app.models.user import User, UserRole
+from app.core.authorization import vereis_rol
 from app.core.deps import get_current_user
+from app.core.versie import controleer_versie, verwachte_versie
+from app.core.cache import response_cache, query_versie, object_versie
 from app.models.historie_setup import HistorieContext
 
 router = APIRouter()
@@ -122,11 +125,10 @@ def check_admin_rights(user: User):
     """
     Check of user admin rechten heeft (beheerder of admin medewerker)
     """
-    if user.role not in [UserRole.BEHEERDER, UserRole.ADMINISTRATIEF_MEDEWERKER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Je hebt geen rechten om templates te beheren"
-        )
+    vereis_rol(
+        user, [UserRole.BEHEERDER, UserRole.ADMINISTRATIEF_MEDEWERKER],
+        "Je hebt geen rechten om templates te beheren"
+    )
 
 
 # ============================================================================
@@ -135,6 +137,7 @@ def check_admin_rights(user: User):
 
 @router.get("/proces-templates", response_model=List[ProcesTemplateListItem])
 def get_proces_templates(
+    request: Request,
     categorie: Optional[ProcesCategorie] = None,
     is_actief: Optional[bool] = None,
     db: Session = Depends(get_db),
@@ -145,9 +148,7 @@ def get_proces_templates(
 
     Iedereen mag templates bekijken
     """
-    query = db.query(ProcesTemplate).options(
-        joinedload(ProcesTemplate.stappen)
-    )
+    query = db.query(ProcesTemplate)
 
     if categorie:
         query = query.filter(ProcesTemplate.categorie == categorie)
@@ -155,7 +156,17 @@ def get_proces_templates(
     if is_actief is not None:
         query = query.filter(ProcesTemplate.is_actief == is_actief)
 
-    templates = query.order_by(
+    # Conditional GET / response cache
+    cache = response_cache.lookup(
+        request, current_user, query_versie(query, ProcesTemplate),
+        tabellen=["template_stappen"],
+    )
+    if cache.response is not None:
+        return cache.response
+
+    templates = query.options(
+        joinedload(ProcesTemplate.stappen)
+    ).order_by(
         ProcesTemplate.is_standaard.desc(),
         ProcesTemplate.naam
     ).all()
@@ -175,11 +186,12 @@ def get_proces_templates(
             created_at=template.created_at
         ))
 
-    return result
+    return cache.opslaan(result)
 
 
 @router.get("/proces-templates/{template_id}", response_model=ProcesTemplateResponse)
 def get_proces_template(
+    request: Request,
     template_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -199,7 +211,15 @@ def get_proces_template(
             detail="Template niet gevonden"
         )
 
-    return template
+    # Conditional GET / response cache
+    cache = response_cache.lookup(
+        request, current_user, object_versie(template),
+        tabellen=["template_stappen", "template_document_sjablonen"],
+    )
+    if cache.response is not None:
+        return cache.response
+
+    return cache.opslaan(ProcesTemplateResponse.model_validate(template))
 
 
 @router.post("/proces-templates", response_model=ProcesTemplateResponse, status_code=status.HTTP_201_CREATED)
@@ -286,6 +306,7 @@ def create_proces_template(
 def update_proces_template(
     template_id: str,
     template_data: ProcesTemplateUpdate,
+    verwacht: Optional[set] = Depends(verwachte_versie),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -305,6 +326,7 @@ def update_proces_template(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Template niet gevonden"
         )
+    controleer_versie(template, verwacht)
 
     with HistorieContext(db, current_user.id, "Proces template aangepast"):
         # Update velden
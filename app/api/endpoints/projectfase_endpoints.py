@@ -9,25 +9,41 @@ CRUD operaties voor:
 
 Met ingebouwde rechten checks!
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 import uuid
-from datetime import datetime, timezone
-import os
-import shutil
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from app.db.session import get_db
+from app.core.config import settings
+from app.core.authorization import (
+    check_document_toegang, check_fase_toegang, document_filter, fase_filter, vereis_rol,
+)
+from app.core.security import create_download_token, decode_token
+from app.services.storage import get_storage
+from app.services.downloads import build_download_response, build_offload_response, content_disposition
+from app.services.commentaren import laad_threads, tel_reacties
+from app.services.previews import PREVIEW_KLAAR, PREVIEW_WACHTRIJ, kan_preview_maken, plan_preview
+from app.services.zip_export import ZipItem, stream_zip, veilige_naam, unieke_pad
+from app.models.project import Project
 from app.models.projectfase import (
     ProjectFase, ProjectFaseDocument, ProjectFaseCommentaar,
     ProjectFaseStatus, DocumentType, CommentaarType, CommentaarStatus
 )
 from app.models.user import User, UserRole
+from app.schemas.common import Pagination
+from app.schemas.projectfase import (
+    CommentaarCreate, CommentaarResponse, CommentaarThread, CommentaarThreadListResponse, CommentaarUpdate,
+    ProjectFaseCreate, ProjectFaseResponse, ProjectFaseUpdate,
+)
 
 #ten behoeve van authenticatie
 from app.core.deps import get_current_user
+from app.core.versie import controleer_versie, verwachte_versie
 from app.models.historie_setup import HistorieContext
 
 router = APIRouter()
@@ -36,56 +52,82 @@ router = APIRouter()
 # CONFIGURATIE
 # ============================================================================
 
-UPLOAD_DIR = Path("./uploads/documenten")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Mogen fases aanmaken en wijzigen
+FASE_BEHEER_ROLLEN = [UserRole.BEHEERDER, UserRole.PROJECTLEIDER]
+
+# Een preview verandert nooit (nieuwe inhoud = nieuwe hash), dus mag lang
+# in de browser cache blijven
+PREVIEW_CACHE_CONTROL = "private, max-age=86400"
+
 
 # ============================================================================
 # HELPER FUNCTIONS - RECHTEN CHECKS
 # ============================================================================
 
-def check_fase_toegang(fase: ProjectFase, user: User) -> bool:
+def maak_download_url(request: Request, document: ProjectFaseDocument) -> dict:
     """
-    Check of user toegang heeft tot deze fase
-    
-    - Beheerders: altijd toegang
-    - Projectleiders: toegang tot hun projecten
-    - Medewerkers: toegang tot hun projecten
-    - Leveranciers: ALLEEN toegang als leverancier_id = hun leverancier
+    Geef een ondertekende, tijdelijk geldige download URL uit
+
+    Alleen aanroepen NADAT de rechten checks geslaagd zijn: de download
+    route controleert alleen nog of het document (met deze inhoud) bestaat.
+    De token is leesbaar voor wie de URL heeft en bevat daarom alleen het
+    document id en de content hash. Documenten van vóór de content hash
+    krijgen in plaats daarvan het versienummer mee.
     """
-    if user.role == UserRole.BEHEERDER:
-        return True
-    
-    if user.role == UserRole.LEVERANCIER:
-        # Leverancier mag alleen fases zien waar hij aan gekoppeld is
-        if not user.leverancier_id:
-            # User heeft LEVERANCIER role maar geen leverancier_id → geen toegang
-            return False
-        
-        # Check of fase aan deze leverancier is toegewezen
-        return fase.leverancier_id == user.leverancier_id
-    
-    # Medewerkers en projectleiders hebben toegang
-    return True
+    verloopt_op = datetime.utcnow() + timedelta(minutes=settings.DOWNLOAD_URL_EXPIRE_MINUTES)
+    claims = {"sub": document.id}
+    if document.content_hash:
+        claims["h"] = document.content_hash
+    else:
+        claims["v"] = document.versie_nummer
+    token = create_download_token(claims)
+    return {
+        "document_id": document.id,
+        "url": str(request.url_for("download_via_token", token=token)),
+        "verloopt_op": verloopt_op,
+    }
 
 
-def check_document_toegang(document: ProjectFaseDocument, user: User) -> bool:
+def maak_zip_items(fases: List[ProjectFase], documenten: List[ProjectFaseDocument]) -> List[ZipItem]:
     """
-    Check of user dit document mag zien
-    
-    - Beheerders: altijd
-    - Medewerkers: altijd
-    - Leveranciers: alleen als zichtbaar_voor_leverancier = True
+    Bouw de inhoud van een ZIP export: één map per fase
+
+    Documenten moeten al gefilterd zijn op rechten. Dubbele namen binnen
+    een map krijgen een volgnummer.
     """
-    if user.role == UserRole.BEHEERDER:
-        return True
-    
-    if user.role != UserRole.LEVERANCIER:
-        return True
-    
-    # Leverancier: check zichtbaarheid flag
-    return document.zichtbaar_voor_leverancier
+    mappen = {
+        f.id: veilige_naam(f"{f.fase_nummer:02d} - {f.naam}")
+        for f in fases
+    }
+    gebruikt = set()
+    items = []
+    for d in documenten:
+        naam = veilige_naam(d.naam)
+        if d.bestandstype and not naam.lower().endswith(f".{d.bestandstype.lower()}"):
+            naam = f"{naam}.{d.bestandstype}"
+        items.append(ZipItem(
+            pad_in_zip=unieke_pad(f"{mappen[d.fase_id]}/{naam}", gebruikt),
+            opslag_type=d.opslag_type,
+            opslag_pad=d.opslag_pad,
+            bestandstype=d.bestandstype,
+            bestandsgrootte=d.bestandsgrootte,
+            datum=d.upload_datum,
+        ))
+    return items
+
+
+def zip_response(items: List[ZipItem], bestandsnaam: str) -> StreamingResponse:
+    """Streaming response voor een ZIP export"""
+    return StreamingResponse(
+        stream_zip(items),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": content_disposition(f"{veilige_naam(bestandsnaam)}.zip"),
+            "Cache-Control": "private, no-store",
+        },
+    )
 
 
 def check_commentaar_edit_rechten(commentaar: ProjectFaseCommentaar, user: User) -> bool:
@@ -106,47 +148,51 @@ def check_commentaar_edit_rechten(commentaar: ProjectFaseCommentaar, user: User)
 # PROJECTFASE ENDPOINTS
 # ============================================================================
 
-@router.get("/projects/{project_id}/fases", response_model=List[dict])
+@router.get("/projects/{project_id}/fases", response_model=List[ProjectFaseResponse])
 def get_project_fases(
     project_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # Authenticatie
 ):
     """
-    Haal alle fases van een project op
+    Haal alle fases van een project op (leveranciers: alleen hun eigen fases)
     """
-    fases = db.query(ProjectFase).filter(
-        ProjectFase.project_id == project_id
+    aantal_documenten = select(func.count(ProjectFaseDocument.id)).where(
+        ProjectFaseDocument.fase_id == ProjectFase.id, document_filter(current_user)
+    ).correlate(ProjectFase).scalar_subquery()
+    aantal_commentaren = select(func.count(ProjectFaseCommentaar.id)).where(
+        ProjectFaseCommentaar.fase_id == ProjectFase.id
+    ).correlate(ProjectFase).scalar_subquery()
+
+    rows = db.query(ProjectFase, aantal_documenten, aantal_commentaren).filter(
+        ProjectFase.project_id == project_id,
+        fase_filter(current_user),
     ).order_by(ProjectFase.fase_nummer).all()
     
-    # Filter op basis van user rechten
-    if current_user.role == UserRole.LEVERANCIER:
-        fases = [f for f in fases if check_fase_toegang(f, current_user)]
-    
     return [
-        {
-            "id": f.id,
-            "fase_nummer": f.fase_nummer,
-            "naam": f.naam,
-            "beschrijving": f.beschrijving,
-            "status": f.status,
-            "verantwoordelijke_id": f.verantwoordelijke_id,
-            "leverancier_id": f.leverancier_id,
-            "geplande_start_datum": f.geplande_start_datum,
-            "geplande_eind_datum": f.geplande_eind_datum,
-            "werkelijke_start_datum": f.werkelijke_start_datum,
-            "werkelijke_eind_datum": f.werkelijke_eind_datum,
-            "aantal_documenten": len(f.documenten),
-            "aantal_commentaren": len(f.commentaren),
-        }
-        for f in fases
+        ProjectFaseResponse(
+            id=f.id,
+            fase_nummer=f.fase_nummer,
+            naam=f.naam,
+            beschrijving=f.beschrijving,
+            status=f.status,
+            verantwoordelijke_id=f.verantwoordelijke_id,
+            leverancier_id=f.leverancier_id,
+            geplande_start_datum=f.geplande_start_datum,
+            geplande_eind_datum=f.geplande_eind_datum,
+            werkelijke_start_datum=f.werkelijke_start_datum,
+            werkelijke_eind_datum=f.werkelijke_eind_datum,
+            aantal_documenten=aantal_docs,
+            aantal_commentaren=aantal_comm,
+        )
+        for f, aantal_docs, aantal_comm in rows
     ]
 
 
 @router.post("/projects/{project_id}/fases", status_code=status.HTTP_201_CREATED)
 def create_project_fase(
     project_id: str,
-    fase_data: dict,
+    fase_data: ProjectFaseCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -154,11 +200,10 @@ def create_project_fase(
     Maak nieuwe projectfase aan
     """
     # Check rechten (alleen beheerder/projectleider)
-    if current_user.role not in [UserRole.BEHEERDER, UserRole.PROJECTLEIDER]:
-        raise HTTPException(
-            status_code=403, 
-            detail="Alleen beheerders en projectleiders mogen fases aanmaken"
-        )
+    vereis_rol(
+        current_user, FASE_BEHEER_ROLLEN,
+        "Alleen beheerders en projectleiders mogen fases aanmaken"
+    )
     
     # SET CONTEXT
     HistorieContext.set_user_id(current_user.id)
@@ -167,14 +212,7 @@ def create_project_fase(
     fase = ProjectFase(
         id=str(uuid.uuid4()),
         project_id=project_id,
-        fase_nummer=fase_data.get("fase_nummer"),
-        naam=fase_data.get("naam"),
-        beschrijving=fase_data.get("beschrijving"),
-        status=fase_data.get("status", ProjectFaseStatus.NIET_GESTART),
-        verantwoordelijke_id=fase_data.get("verantwoordelijke_id"),
-        leverancier_id=fase_data.get("leverancier_id"),
-        geplande_start_datum=fase_data.get("geplande_start_datum"),
-        geplande_eind_datum=fase_data.get("geplande_eind_datum"),
+        **fase_data.model_dump(),
     )
     
     db.add(fase)
@@ -189,12 +227,16 @@ def create_project_fase(
 @router.put("/fases/{fase_id}")
 def update_project_fase(
     fase_id: str,
-    fase_data: dict,
+    fase_data: ProjectFaseUpdate,
+    verwacht: Optional[set] = Depends(verwachte_versie),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update projectfase
+
+    Met If-Match: "<versie>" of ?versie= alleen als de fase die versie nog
+    heeft, anders 409
     """
     fase = db.query(ProjectFase).filter(ProjectFase.id == fase_id).first()
     if not fase:
@@ -205,20 +247,19 @@ def update_project_fase(
         raise HTTPException(status_code=403, detail="Geen toegang tot deze fase")
 
     # Alleen beheerder en projectleider mogen wijzigen
-    if current_user.role not in [UserRole.BEHEERDER, UserRole.PROJECTLEIDER]:
-        raise HTTPException(
-            status_code=403,
-            detail="Alleen beheerders en projectleiders mogen fases wijzigen"
-        )
+    vereis_rol(
+        current_user, FASE_BEHEER_ROLLEN,
+        "Alleen beheerders en projectleiders mogen fases wijzigen"
+    )
+    controleer_versie(fase, verwacht)
     
     # SET CONTEXT 
     HistorieContext.set_user_id(current_user.id)
     HistorieContext.set_opmerking("Fase bijgewerkt via API")
     
-    # Update fields
-    for key, value in fase_data.items():
-        if hasattr(fase, key):
-            setattr(fase, key, value)
+    # Update fields (alleen meegestuurde)
+    for key, value in fase_data.model_dump(exclude_unset=True).items():
+        setattr(fase, key, value)
     
     db.commit()
     HistorieContext.clear()
@@ -251,11 +292,11 @@ def get_fase_documenten(
     if not check_fase_toegang(fase, current_user):
         raise HTTPException(status_code=403, detail="Geen toegang tot deze fase")
     
-    documenten = fase.documenten
-    
-    # Filter op basis van user rechten (leveranciers zien niet alle documenten)
-    if current_user.role == UserRole.LEVERANCIER:
-        documenten = [d for d in documenten if check_document_toegang(d, current_user)]
+    # Leveranciers zien niet alle documenten
+    documenten = db.query(ProjectFaseDocument).filter(
+        ProjectFaseDocument.fase_id == fase_id,
+        document_filter(current_user),
+    ).all()
     
     return [
         {
@@ -271,6 +312,7 @@ def get_fase_documenten(
             "geupload_door_id": d.geupload_door_id,
             "upload_datum": d.upload_datum,
             "zichtbaar_voor_leverancier": d.zichtbaar_voor_leverancier,
+            "preview_status": d.preview_status,
         }
         for d in documenten
     ]
@@ -313,13 +355,12 @@ async def upload_fase_document(
     unique_filename = f"{fase_id}_{timestamp}_{naam[:50]}{file_extension}"
     safe_filename = "".join(c for c in unique_filename if c.isalnum() or c in "._-")
     
-    # Opslag pad
-    file_path = UPLOAD_DIR / safe_filename
+    storage = get_storage()
+    opgeslagen = None
     
     try:
-        # Sla bestand op
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Sla bestand streamend op via de storage backend
+        opgeslagen = storage.save(file.file, safe_filename)
         
         # Maak database record
         document = ProjectFaseDocument(
@@ -330,9 +371,11 @@ async def upload_fase_document(
             type=type,
             bestandsnaam=safe_filename,
             bestandstype=file_extension.lstrip('.'),
-            bestandsgrootte=file_size,
-            opslag_type="local",
-            opslag_pad=str(file_path),
+            bestandsgrootte=opgeslagen.bestandsgrootte,
+            opslag_type=storage.opslag_type,
+            opslag_pad=opgeslagen.opslag_pad,
+            content_hash=opgeslagen.content_hash,
+            preview_status=PREVIEW_WACHTRIJ if kan_preview_maken(file_extension.lstrip('.')) else None,
             versie=versie,
             is_definitief=is_definitief,
             geupload_door_id=current_user.id,
@@ -343,6 +386,10 @@ async def upload_fase_document(
         db.commit()
         db.refresh(document)
         
+        # Preview pas na de commit maken, de worker leest het document zelf in
+        if document.preview_status == PREVIEW_WACHTRIJ:
+            plan_preview(document.id)
+        
         return {
             "id": document.id,
             "naam": document.naam,
@@ -353,23 +400,30 @@ async def upload_fase_document(
         
     except Exception as e:
         # Cleanup bij fout
-        if file_path.exists():
-            file_path.unlink()
+        if opgeslagen is not None:
+            storage.delete(opgeslagen.opslag_pad)
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 @router.get("/documenten/{document_id}/download")
 async def download_document(
     document_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Download een document
     
-    Retourneert het fysieke bestand voor download
+    Retourneert het fysieke bestand voor download, met:
+    - Range support (206) voor hervatbare downloads
+    - ETag op basis van de content hash en If-None-Match → 304
+    - Media type op basis van bestandstype
     """
-    document = db.query(ProjectFaseDocument).filter(
+    # Document en fase in één query
+    document = db.query(ProjectFaseDocument).options(
+        joinedload(ProjectFaseDocument.fase)
+    ).filter(
         ProjectFaseDocument.id == document_id
     ).first()
     
@@ -381,22 +435,251 @@ async def download_document(
         raise HTTPException(status_code=403, detail="Geen toegang tot dit document")
 
     # Check fase toegang
-    fase = db.query(ProjectFase).filter(ProjectFase.id == document.fase_id).first()
-    if fase and not check_fase_toegang(fase, current_user):
+    if document.fase and not check_fase_toegang(document.fase, current_user):
         raise HTTPException(status_code=403, detail="Geen toegang tot deze fase")
 
-    # Check opslag_pad ipv bestandspad
-    file_path = Path(document.opslag_pad)
-    if not file_path.exists():
+    storage = get_storage(document.opslag_type)
+    if not storage.exists(document.opslag_pad):
         raise HTTPException(status_code=404, detail="Bestand niet gevonden op server")
     
-    return FileResponse(
-        path=str(file_path),
-        filename=document.bestandsnaam,
-        media_type="application/octet-stream"
+    return build_download_response(
+        request,
+        storage,
+        opslag_pad=document.opslag_pad,
+        bestandsnaam=document.bestandsnaam,
+        bestandstype=document.bestandstype,
+        content_hash=document.content_hash,
+    )
+
+
+@router.get("/documenten/{document_id}/preview")
+async def get_document_preview(
+    document_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Haal de preview (thumbnail / eerste pagina) van een document op
+
+    404 zolang er (nog) geen preview is; zie preview_status in de
+    documentenlijst.
+    """
+    document = db.query(ProjectFaseDocument).options(
+        joinedload(ProjectFaseDocument.fase)
+    ).filter(
+        ProjectFaseDocument.id == document_id
+    ).first()
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document niet gevonden")
+    
+    if not check_document_toegang(document, current_user):
+        raise HTTPException(status_code=403, detail="Geen toegang tot dit document")
+
+    if document.fase and not check_fase_toegang(document.fase, current_user):
+        raise HTTPException(status_code=403, detail="Geen toegang tot deze fase")
+
+    if document.preview_status != PREVIEW_KLAAR:
+        raise HTTPException(status_code=404, detail="Geen preview beschikbaar")
+
+    storage = get_storage(document.opslag_type)
+    return build_download_response(
+        request,
+        storage,
+        opslag_pad=document.preview_opslag_pad,
+        bestandsnaam=f"preview_{document.id}.{document.preview_bestandstype}",
+        bestandstype=document.preview_bestandstype,
+        content_hash=document.preview_content_hash,
+        disposition="inline",
+        cache_control=PREVIEW_CACHE_CONTROL,
     )
 
 
+@router.post("/documenten/{document_id}/download-url")
+def create_document_download_url(
+    document_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Vraag een ondertekende download URL aan voor een document
+
+    De URL is DOWNLOAD_URL_EXPIRE_MINUTES geldig en werkt zonder
+    Authorization header (bruikbaar in <img src> en <a href>).
+    """
+    document = db.query(ProjectFaseDocument).options(
+        joinedload(ProjectFaseDocument.fase)
+    ).filter(
+        ProjectFaseDocument.id == document_id
+    ).first()
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document niet gevonden")
+    
+    if not check_document_toegang(document, current_user):
+        raise HTTPException(status_code=403, detail="Geen toegang tot dit document")
+
+    if document.fase and not check_fase_toegang(document.fase, current_user):
+        raise HTTPException(status_code=403, detail="Geen toegang tot deze fase")
+
+    return maak_download_url(request, document)
+
+
+@router.post("/fases/{fase_id}/documenten/download-urls")
+def create_fase_download_urls(
+    fase_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Vraag download URLs aan voor alle zichtbare documenten van een fase
+
+    Bedoeld voor bijv. een fotogalerij: één request en één query in plaats
+    van een geautoriseerde download per foto.
+    """
+    fase = db.query(ProjectFase).filter(ProjectFase.id == fase_id).first()
+    if not fase:
+        raise HTTPException(status_code=404, detail="Fase niet gevonden")
+    
+    if not check_fase_toegang(fase, current_user):
+        raise HTTPException(status_code=403, detail="Geen toegang tot deze fase")
+    
+    documenten = db.query(ProjectFaseDocument).filter(
+        ProjectFaseDocument.fase_id == fase_id,
+        document_filter(current_user),
+    ).all()
+    
+    return [maak_download_url(request, d) for d in documenten]
+
+
+def _token_past_bij(payload: dict, document) -> bool:
+    """Is dit nog het document (met dezelfde inhoud) waarvoor de token is uitgegeven?"""
+    if payload.get("h"):
+        return document.content_hash == payload["h"]
+    if "v" in payload:
+        return document.content_hash is None and document.versie_nummer == payload["v"]
+    return False
+
+
+@router.get("/downloads/{token}", name="download_via_token")
+def download_via_token(token: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Download een document via een ondertekende URL
+
+    Geen authenticatie: de handtekening en de vervaltijd van de token worden
+    gecontroleerd, daarna haalt één primary key lookup het opslagpad op.
+    Is het document intussen verwijderd of vervangen door andere inhoud
+    (of, zonder content hash, gewijzigd), dan 404. Het bestand wordt
+    gestreamd, of - als DOWNLOAD_OFFLOAD aan staat - door de webserver
+    geserveerd via X-Accel-Redirect / X-Sendfile.
+    """
+    payload = decode_token(token)
+    if not payload or payload.get("type") != "download" or not payload.get("sub"):
+        raise HTTPException(status_code=403, detail="Ongeldige of verlopen download link")
+
+    document = db.query(
+        ProjectFaseDocument.opslag_type,
+        ProjectFaseDocument.opslag_pad,
+        ProjectFaseDocument.bestandsnaam,
+        ProjectFaseDocument.bestandstype,
+        ProjectFaseDocument.content_hash,
+        ProjectFaseDocument.versie_nummer,
+    ).filter(ProjectFaseDocument.id == payload["sub"]).first()
+    if not document or not _token_past_bij(payload, document):
+        raise HTTPException(status_code=404, detail="Document niet gevonden")
+
+    storage = get_storage(document.opslag_type)
+    opslag_pad = document.opslag_pad
+    if not storage.exists(opslag_pad):
+        raise HTTPException(status_code=404, detail="Bestand niet gevonden op server")
+
+    local_path = storage.local_path(opslag_pad)
+    if local_path is not None:
+        response = build_offload_response(
+            local_path,
+            bestandsnaam=document.bestandsnaam,
+            bestandstype=document.bestandstype,
+            content_hash=document.content_hash,
+        )
+        if response is not None:
+            return response
+
+    return build_download_response(
+        request,
+        storage,
+        opslag_pad=opslag_pad,
+        bestandsnaam=document.bestandsnaam,
+        bestandstype=document.bestandstype,
+        content_hash=document.content_hash,
+    )
+
+
+@router.get("/fases/{fase_id}/documenten/zip")
+def download_fase_zip(
+    fase_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download alle (zichtbare) documenten van een fase als ZIP
+
+    Het archief wordt tijdens het downloaden opgebouwd.
+    """
+    fase = db.query(ProjectFase).filter(ProjectFase.id == fase_id).first()
+    if not fase:
+        raise HTTPException(status_code=404, detail="Fase niet gevonden")
+    
+    if not check_fase_toegang(fase, current_user):
+        raise HTTPException(status_code=403, detail="Geen toegang tot deze fase")
+    
+    documenten = db.query(ProjectFaseDocument).filter(
+        ProjectFaseDocument.fase_id == fase_id,
+        document_filter(current_user),
+    ).order_by(ProjectFaseDocument.upload_datum).all()
+    
+    items = maak_zip_items([fase], documenten)
+    return zip_response(items, f"{fase.fase_nummer:02d} - {fase.naam}")
+
+
+@router.get("/projects/{project_id}/documenten/zip")
+def download_project_zip(
+    project_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download het volledige projectdossier als ZIP
+
+    Bevat alle documenten van de fases waar de user toegang toe heeft,
+    met één map per fase. Leveranciers krijgen alleen hun eigen fases en
+    documenten met zichtbaar_voor_leverancier.
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project niet gevonden")
+    
+    fases = db.query(ProjectFase).filter(
+        ProjectFase.project_id == project_id,
+        fase_filter(current_user),
+    ).order_by(ProjectFase.fase_nummer).all()
+    
+    if current_user.role == UserRole.LEVERANCIER and not fases:
+        raise HTTPException(status_code=403, detail="Geen toegang tot dit project")
+    
+    fase_volgorde = {f.id: i for i, f in enumerate(fases)}
+    documenten = db.query(ProjectFaseDocument).filter(
+        ProjectFaseDocument.fase_id.in_(fase_volgorde.keys()),
+        document_filter(current_user),
+    ).order_by(ProjectFaseDocument.upload_datum).all()
+    documenten.sort(key=lambda d: fase_volgorde[d.fase_id])
+    
+    items = maak_zip_items(fases, documenten)
+    return zip_response(items, f"{project.project_nummer} - {project.naam}")
+
+
 @router.delete("/documenten/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     document_id: str,
@@ -428,15 +711,20 @@ async def delete_document(
         raise HTTPException(status_code=403, detail="Geen toegang tot deze fase")
 
     try:
-        # Check opslag_pad ipv bestandspad
-        file_path = Path(document.opslag_pad)
-        if file_path.exists():
-            file_path.unlink()
+        storage = get_storage(document.opslag_type)
+        opslag_pad = document.opslag_pad
+        preview_opslag_pad = document.preview_opslag_pad
         
         # Verwijder database record
         db.delete(document)
         db.commit()
         
+        # Verwijder bestand pas na een geslaagde commit
+        # (bij content-addressed opslag alleen als dit de laatste referentie was)
+        storage.delete(opslag_pad)
+        if preview_opslag_pad:
+            storage.delete(preview_opslag_pad)
+        
         return None
         
     except Exception as e:
@@ -447,46 +735,82 @@ async def delete_document(
 # COMMENTAAR ENDPOINTS
 # ============================================================================
 
-@router.get("/fases/{fase_id}/commentaren")
+def _fase_voor_commentaren(db: Session, fase_id: str, user: User) -> ProjectFase:
+    fase = db.query(ProjectFase).filter(ProjectFase.id == fase_id).first()
+    if not fase:
+        raise HTTPException(status_code=404, detail="Fase niet gevonden")
+    if not check_fase_toegang(fase, user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Geen toegang tot deze fase"
+        )
+    return fase
+
+
+@router.get("/fases/{fase_id}/commentaren", response_model=List[CommentaarResponse])
 def get_fase_commentaren(
     fase_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Haal alle commentaren van een fase op
+    Haal alle commentaren van een fase op (plat, oudste eerst)
     
-    Beide types (medewerker & comaker) zijn zichtbaar voor iedereen
+    Beide types (medewerker & comaker) zijn zichtbaar voor iedereen met
+    toegang tot de fase. Voor de boom met reacties: /commentaren/threads
     """
-    fase = db.query(ProjectFase).filter(ProjectFase.id == fase_id).first()
-    if not fase:
-        raise HTTPException(status_code=404, detail="Fase niet gevonden")
-    
+    _fase_voor_commentaren(db, fase_id, current_user)
+
     # Filter alleen gepubliceerde commentaren
-    commentaren = [c for c in fase.commentaren if c.is_gepubliceerd]
-    
+    commentaren = db.query(ProjectFaseCommentaar).filter(
+        ProjectFaseCommentaar.fase_id == fase_id,
+        ProjectFaseCommentaar.status == CommentaarStatus.GEPUBLICEERD,
+    ).order_by(ProjectFaseCommentaar.gepubliceerd_op, ProjectFaseCommentaar.created_at).all()
+    aantallen = tel_reacties(db, [c.id for c in commentaren])
+
     return [
-        {
-            "id": c.id,
-            "type": c.type,
-            "status": c.status,
-            "onderwerp": c.onderwerp,
-            "bericht": c.bericht,
-            "auteur_id": c.auteur_id,
-            "leverancier_id": c.leverancier_id,
-            "parent_commentaar_id": c.parent_commentaar_id,
-            "gepubliceerd_op": c.gepubliceerd_op,
-            "bewerkt_op": c.bewerkt_op,
-            "aantal_reacties": len(c.reacties) if hasattr(c, 'reacties') else 0,
-        }
+        CommentaarResponse(
+            id=c.id,
+            type=c.type,
+            status=c.status,
+            onderwerp=c.onderwerp,
+            bericht=c.bericht,
+            auteur_id=c.auteur_id,
+            leverancier_id=c.leverancier_id,
+            parent_commentaar_id=c.parent_commentaar_id,
+            gepubliceerd_op=c.gepubliceerd_op,
+            bewerkt_op=c.bewerkt_op,
+            versie_nummer=c.versie_nummer,
+            aantal_reacties=aantallen.get(c.id, 0),
+        )
         for c in commentaren
     ]
 
 
+@router.get("/fases/{fase_id}/commentaren/threads", response_model=CommentaarThreadListResponse)
+def get_fase_commentaar_threads(
+    fase_id: str,
+    page: int = 1,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Commentaren als threads: root commentaren (nieuwste eerst, gepagineerd)
+    met hun volledige boom aan reacties (oudste eerst)
+    """
+    _fase_voor_commentaren(db, fase_id, current_user)
+    threads, total = laad_threads(db, fase_id, page, limit)
+    return CommentaarThreadListResponse(
+        data=[CommentaarThread.model_validate(thread) for thread in threads],
+        pagination=Pagination.maak(page, limit, total),
+    )
+
+
 @router.post("/fases/{fase_id}/commentaren", status_code=status.HTTP_201_CREATED)
 def create_fase_commentaar(
     fase_id: str,
-    commentaar_data: dict,
+    commentaar_data: CommentaarCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -497,16 +821,26 @@ def create_fase_commentaar(
     - UserRole.LEVERANCIER → CommentaarType.COMAKER
     - Andere roles → CommentaarType.MEDEWERKER
     """
-    fase = db.query(ProjectFase).filter(ProjectFase.id == fase_id).first()
-    if not fase:
-        raise HTTPException(status_code=404, detail="Fase niet gevonden")
-    
+    # Alleen met toegang tot de fase (ook voor reacties)
+    _fase_voor_commentaren(db, fase_id, current_user)
+
     # Bepaal type op basis van user role
     commentaar_type = (
         CommentaarType.COMAKER 
         if current_user.role == UserRole.LEVERANCIER 
         else CommentaarType.MEDEWERKER
     )
+
+    # Een reactie hoort bij dezelfde fase (de thread wordt per fase opgebouwd)
+    if commentaar_data.parent_commentaar_id:
+        parent = db.query(ProjectFaseCommentaar.fase_id).filter(
+            ProjectFaseCommentaar.id == commentaar_data.parent_commentaar_id
+        ).first()
+        if not parent or parent.fase_id != fase_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Commentaar om op te reageren niet gevonden in deze fase"
+            )
     
     # SET CONTEXT
     HistorieContext.set_user_id(current_user.id)
@@ -517,11 +851,8 @@ def create_fase_commentaar(
         fase_id=fase_id,
         type=commentaar_type,
         status=CommentaarStatus.GEPUBLICEERD,
-        onderwerp=commentaar_data.get("onderwerp"),
-        bericht=commentaar_data.get("bericht"),
         auteur_id=current_user.id,
-        leverancier_id=commentaar_data.get("leverancier_id"),  # alleen voor comakers
-        parent_commentaar_id=commentaar_data.get("parent_commentaar_id"),
+        **commentaar_data.model_dump(),
         gepubliceerd_op=datetime.now(timezone.utc),
     )
     
@@ -536,7 +867,8 @@ def create_fase_commentaar(
 @router.put("/commentaren/{commentaar_id}")
 def update_commentaar(
     commentaar_id: str,
-    commentaar_data: dict,
+    commentaar_data: CommentaarUpdate,
+    verwacht: Optional[set] = Depends(verwachte_versie),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -555,16 +887,15 @@ def update_commentaar(
     # Check rechten
     if not check_commentaar_edit_rechten(commentaar, current_user):
         raise HTTPException(status_code=403, detail="Geen rechten om dit commentaar te bewerken")
+    controleer_versie(commentaar, verwacht)
 
     # SET CONTEXT 
     HistorieContext.set_user_id(current_user.id)
     HistorieContext.set_opmerking("Commentaar bijgewerkt via API")
     
     # Update fields
-    if "bericht" in commentaar_data:
-        commentaar.bericht = commentaar_data["bericht"]
-    if "onderwerp" in commentaar_data:
-        commentaar.onderwerp = commentaar_data["onderwerp"]
+    for key, value in commentaar_data.model_dump(exclude_unset=True).items():
+        setattr(commentaar, key, value)
     
     commentaar.bewerkt_op = datetime.now(timezone.utc)
     
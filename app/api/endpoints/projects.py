@@ -1,27 +1,60 @@
 """
 Projects endpoints - Complete CRUD with error handling
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi import status as http_status
+from sqlalchemy import select
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.orm import Session
 from typing import Optional
 import uuid
-from datetime import datetime
 
 from app.db.session import get_db
 from app.core.deps import get_current_user
+from app.core.versie import controleer_versie, verwachte_versie, versie_conflict
+from app.core.cache import response_cache, query_versie, object_versie
 from app.models.user import User
-from app.models.project import Project, ProjectStatus
+from app.models.project import Project
+from app.models.vestiging import Vestiging
+from app.models.financien import ProjectFinancien
 from app.models.projectfase import ProjectFase, ProjectFaseStatus
 from app.models.proces_template import ProcesTemplate, TemplateStap
 from app.models.historie_setup import HistorieContext
+from app.services.lijst_filters import filter_projects
+from app.services.exporteren import controleer_formaat, export_response, stream_rijen
+from app.schemas.bulk import BulkDeleteRequest, BulkRequest, BulkResponse
+from app.services.bulk import BulkEntiteit, bulk_aanmaken, bulk_bijwerken, bulk_verwijderen
+from app.schemas.common import Pagination
+from app.schemas.project import (
+    ProjectCreate, ProjectDetail, ProjectDetailResponse, ProjectListResponse, ProjectMutatieResponse,
+    ProjectResponse, ProjectSamenvatting, ProjectUpdate,
+)
 from sqlalchemy.orm import joinedload
 
 router = APIRouter(tags=["Projects"])
 
 
-@router.get("/projects")
+def _geen_template(project: ProjectCreate) -> Optional[str]:
+    """Bulk aanmaken maakt geen fases aan; templates alleen via POST /projects"""
+    if project.template_id:
+        return "template_id: templates worden bij bulk aanmaken niet toegepast, gebruik POST /projects"
+    return None
+
+
+PROJECT_BULK = BulkEntiteit(
+    model=Project,
+    create_schema=ProjectCreate,
+    update_schema=ProjectUpdate,
+    id_prefix="prj",
+    uniek_veld="project_nummer",
+    verwijzingen={"projectleider_id": User, "vestiging_id": Vestiging},
+    controleer_nieuw=_geen_template,
+)
+
+
+@router.get("/projects", response_model=ProjectListResponse)
 def list_projects(
+    request: Request,
     page: int = 1,
     limit: int = 25,
     search: Optional[str] = None,
@@ -38,21 +71,15 @@ def list_projects(
         query = db.query(Project)
 
         # Apply filters
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                (Project.naam.ilike(search_term)) |
-                (Project.project_nummer.ilike(search_term))
-            )
-
-        if status:
-            try:
-                query = query.filter(Project.status == ProjectStatus(status))
-            except ValueError:
-                pass  # Invalid status, ignore filter
-
-        if vestiging_id:
-            query = query.filter(Project.vestiging_id == vestiging_id)
+        query = filter_projects(query, search, status, vestiging_id)
+        
+        # Conditional GET / response cache
+        cache = response_cache.lookup(
+            request, current_user, query_versie(query, Project),
+            tabellen=["users", "vestigingen"],
+        )
+        if cache.response is not None:
+            return cache.response
         
         # Count total
         total = query.count()
@@ -65,51 +92,15 @@ def list_projects(
         project_list = []
         for p in projects:
             try:
-                project_data = {
-                    "id": p.id,
-                    "project_nummer": p.project_nummer,
-                    "naam": p.naam,
-                    "beschrijving": p.beschrijving,
-                    "status": p.status.value if p.status else "concept",
-                    "budget": {
-                        "totaal": p.budget_totaal or 0,
-                        "besteed": p.budget_besteed or 0,
-                        "percentage": p.budget_percentage
-                    },
-                    "start_datum": p.start_datum.isoformat() if p.start_datum else None,
-                    "eind_datum": p.eind_datum.isoformat() if p.eind_datum else None,
-                    "projectleider": {
-                        "id": p.projectleider.id,
-                        "name": p.projectleider.name,
-                        "email": p.projectleider.email,
-                        "role": p.projectleider.role.value
-                    } if p.projectleider else None,
-                    "vestiging": {
-                        "id": p.vestiging.id,
-                        "naam": p.vestiging.naam,
-                        "code": p.vestiging.code,
-                        "plaats": p.vestiging.adres_plaats
-                    } if p.vestiging else None,
-                    "created_at": p.created_at.isoformat() if p.created_at else None,
-                    "updated_at": p.updated_at.isoformat() if p.updated_at else None
-                }
-                project_list.append(project_data)
+                project_list.append(ProjectResponse.van_model(p))
             except Exception as e:
                 print(f"Error formatting project {p.id}: {e}")
                 continue
         
-        return {
-            "success": True,
-            "data": project_list,
-            "pagination": {
-                "current_page": page,
-                "per_page": limit,
-                "total": total,
-                "total_pages": max(1, (total + limit - 1) // limit),
-                "has_next": page * limit < total,
-                "has_prev": page > 1
-            }
-        }
+        return cache.opslaan(ProjectListResponse(
+            data=project_list,
+            pagination=Pagination.maak(page, limit, total),
+        ))
     except Exception as e:
         print(f"Error in list_projects: {e}")
         import traceback
@@ -120,8 +111,133 @@ def list_projects(
         )
 
 
-@router.get("/projects/{project_id}")
+@router.get("/projects/export")
+def export_projects(
+    formaat: str = "csv",
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    vestiging_id: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export projects (CSV of XLSX) met budgetten
+
+    Zelfde filters als GET /projects; de rijen worden gestreamd.
+    """
+    formaat = controleer_formaat(formaat)
+
+    stmt = filter_projects(
+        select(
+            Project.project_nummer,
+            Project.naam,
+            Project.status,
+            Vestiging.naam,
+            User.name,
+            Project.start_datum,
+            Project.eind_datum,
+            Project.budget_totaal,
+            Project.budget_besteed,
+        )
+        .outerjoin(Project.vestiging)
+        .outerjoin(Project.projectleider)
+        .order_by(Project.project_nummer),
+        search, status, vestiging_id,
+    )
+
+    def rij(r):
+        totaal = r.budget_totaal or 0
+        besteed = r.budget_besteed or 0
+        percentage = min(int(besteed / totaal * 100), 100) if totaal else 0
+        return (*r[:7], totaal, besteed, totaal - besteed, percentage)
+
+    return export_response(
+        formaat, "projecten",
+        [
+            "project_nummer", "naam", "status", "vestiging", "projectleider", "start_datum",
+            "eind_datum", "budget_totaal", "budget_besteed", "budget_restant", "budget_percentage",
+        ],
+        stream_rijen(stmt, rij),
+    )
+
+
+@router.post("/projects/bulk", response_model=BulkResponse)
+def bulk_create_projects(
+    data: BulkRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create multiple projects in one transaction
+
+    Items worden vooraf gevalideerd; het resultaat staat per item in de
+    response. Met alles_of_niets=true wordt niets opgeslagen als één item fout is.
+    """
+    try:
+        return bulk_aanmaken(db, PROJECT_BULK, data.items, current_user, alles_of_niets)
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_create_projects: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create projects: {str(e)}"
+        )
+
+
+@router.patch("/projects/bulk", response_model=BulkResponse)
+def bulk_update_projects(
+    data: BulkRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update multiple projects in one transaction (elk item met 'id')
+    """
+    try:
+        return bulk_bijwerken(db, PROJECT_BULK, data.items, current_user, alles_of_niets)
+    except StaleDataError:
+        db.rollback()
+        raise versie_conflict()
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_update_projects: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update projects: {str(e)}"
+        )
+
+
+@router.delete("/projects/bulk", response_model=BulkResponse)
+def bulk_delete_projects(
+    data: BulkDeleteRequest,
+    alles_of_niets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete multiple projects in one transaction
+    """
+    try:
+        return bulk_verwijderen(db, PROJECT_BULK, data.ids, current_user, alles_of_niets)
+    except Exception as e:
+        db.rollback()
+        print(f"Error in bulk_delete_projects: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete projects: {str(e)}"
+        )
+
+
+@router.get("/projects/{project_id}", response_model=ProjectDetailResponse)
 def get_project(
+    request: Request,
     project_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -130,45 +246,30 @@ def get_project(
     Get project details
     """
     try:
-        project = db.query(Project).filter(Project.id == project_id).first()
+        # Totalen uit project_financien (bijgehouden bij elke contract wijziging)
+        row = db.query(Project, ProjectFinancien).outerjoin(
+            ProjectFinancien, ProjectFinancien.project_id == Project.id
+        ).filter(Project.id == project_id).first()
 
-        if not project:
+        if not row:
             raise HTTPException(
                 status_code=http_status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
+        project, financien = row
 
-        return {
-            "success": True,
-            "data": {
-                "id": project.id,
-                "project_nummer": project.project_nummer,
-                "naam": project.naam,
-                "beschrijving": project.beschrijving,
-                "status": project.status.value if project.status else "concept",
-                "budget": {
-                    "totaal": project.budget_totaal or 0,
-                    "besteed": project.budget_besteed or 0,
-                    "percentage": project.budget_percentage
-                },
-                "start_datum": project.start_datum.isoformat() if project.start_datum else None,
-                "eind_datum": project.eind_datum.isoformat() if project.eind_datum else None,
-                "projectleider": {
-                    "id": project.projectleider.id,
-                    "name": project.projectleider.name,
-                    "email": project.projectleider.email,
-                    "role": project.projectleider.role.value
-                } if project.projectleider else None,
-                "vestiging": {
-                    "id": project.vestiging.id,
-                    "naam": project.vestiging.naam,
-                    "code": project.vestiging.code,
-                    "plaats": project.vestiging.adres_plaats
-                } if project.vestiging else None,
-                "created_at": project.created_at.isoformat() if project.created_at else None,
-                "updated_at": project.updated_at.isoformat() if project.updated_at else None
-            }
-        }
+        # Conditional GET / response cache
+        financien_versie = (
+            financien.aantal_contracten, financien.contract_totaal, financien.gefactureerd_totaal
+        ) if financien else ()
+        cache = response_cache.lookup(
+            request, current_user, (*object_versie(project), *financien_versie),
+            tabellen=["users", "vestigingen", "project_financien"],
+        )
+        if cache.response is not None:
+            return cache.response
+        
+        return cache.opslaan(ProjectDetailResponse(data=ProjectDetail.van_model(project, financien)))
     except HTTPException:
         raise
     except Exception as e:
@@ -181,9 +282,9 @@ def get_project(
         )
 
 
-@router.post("/projects")
+@router.post("/projects", response_model=ProjectMutatieResponse)
 def create_project(
-    project_data: dict,
+    project_data: ProjectCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -191,18 +292,9 @@ def create_project(
     Create new project
     """
     try:
-        # Validate required fields
-        required_fields = ["project_nummer", "naam", "budget_totaal", "projectleider_id"]
-        for field in required_fields:
-            if field not in project_data or not project_data[field]:
-                raise HTTPException(
-                    status_code=http_status.HTTP_400_BAD_REQUEST,
-                    detail=f"Missing required field: {field}"
-                )
-        
         # Check if project_nummer already exists
         existing = db.query(Project).filter(
-            Project.project_nummer == project_data.get("project_nummer")
+            Project.project_nummer == project_data.project_nummer
         ).first()
         
         if existing:
@@ -211,45 +303,20 @@ def create_project(
                 detail="Project nummer already exists"
             )
         
-        # Parse dates if provided
-        start_datum = None
-        if project_data.get("start_datum"):
-            try:
-                start_datum = datetime.fromisoformat(project_data["start_datum"].replace('Z', '+00:00'))
-            except:
-                pass
-        
-        eind_datum = None
-        if project_data.get("eind_datum"):
-            try:
-                eind_datum = datetime.fromisoformat(project_data["eind_datum"].replace('Z', '+00:00'))
-            except:
-                pass
-        
         # Create project
         project = Project(
             id=f"prj_{uuid.uuid4().hex[:8]}",
-            project_nummer=project_data["project_nummer"],
-            naam=project_data["naam"],
-            beschrijving=project_data.get("beschrijving"),
-            status=ProjectStatus(project_data.get("status", "concept")),
-            budget_totaal=int(project_data["budget_totaal"]),
-            budget_besteed=int(project_data.get("budget_besteed", 0)),
-            start_datum=start_datum,
-            eind_datum=eind_datum,
-            projectleider_id=project_data["projectleider_id"],
-            template_id=project_data.get("template_id"),
-            vestiging_id=project_data.get("vestiging_id")
+            **project_data.model_dump()
         )
 
         db.add(project)
         db.flush()  # Get project ID
 
         # If template_id is provided, create projectfases from template
-        if project_data.get("template_id"):
+        if project_data.template_id:
             template = db.query(ProcesTemplate).options(
                 joinedload(ProcesTemplate.stappen)
-            ).filter(ProcesTemplate.id == project_data["template_id"]).first()
+            ).filter(ProcesTemplate.id == project_data.template_id).first()
 
             if template:
                 print(f"Applying template '{template.naam}' with {len(template.stappen)} steps to project {project.id}")
@@ -274,16 +341,10 @@ def create_project(
         db.commit()
         db.refresh(project)
         
-        return {
-            "success": True,
-            "data": {
-                "id": project.id,
-                "project_nummer": project.project_nummer,
-                "naam": project.naam,
-                "status": project.status.value
-            },
-            "message": "Project created successfully"
-        }
+        return ProjectMutatieResponse(
+            data=ProjectSamenvatting.model_validate(project),
+            message="Project created successfully",
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -297,15 +358,19 @@ def create_project(
         )
 
 
-@router.patch("/projects/{project_id}")
+@router.patch("/projects/{project_id}", response_model=ProjectMutatieResponse)
 def update_project(
     project_id: str,
-    project_data: dict,
+    project_data: ProjectUpdate,
+    verwacht: Optional[set] = Depends(verwachte_versie),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update project
+
+    Met If-Match: "<versie>" of ?versie= alleen als het project die versie
+    nog heeft, anders 409 (ook bij een gelijktijdige wijziging).
     """
     try:
         HistorieContext.set_user_id(current_user.id)
@@ -318,38 +383,27 @@ def update_project(
                 status_code=http_status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
+        controleer_versie(project, verwacht)
 
-        # Update fields
-        for key, value in project_data.items():
-            if hasattr(project, key) and value is not None:
-                if key == "status":
-                    setattr(project, key, ProjectStatus(value))
-                elif key in ["start_datum", "eind_datum"]:
-                    try:
-                        setattr(project, key, datetime.fromisoformat(value.replace('Z', '+00:00')))
-                    except:
-                        pass
-                else:
-                    setattr(project, key, value)
+        # Update fields (alleen meegestuurde, null wordt genegeerd)
+        for key, value in project_data.model_dump(exclude_unset=True, exclude_none=True).items():
+            setattr(project, key, value)
         
         db.commit()
         db.refresh(project)
 
         HistorieContext.clear()
         
-        return {
-            "success": True,
-            "data": {
-                "id": project.id,
-                "project_nummer": project.project_nummer,
-                "naam": project.naam,
-                "status": project.status.value
-            },
-            "message": "Project updated successfully",
-            "versie": project.versie_nummer
-        }
+        return ProjectMutatieResponse(
+            data=ProjectSamenvatting.model_validate(project),
+            message="Project updated successfully",
+            versie=project.versie_nummer,
+        )
     except HTTPException:
         raise
+    except StaleDataError:
+        db.rollback()
+        raise versie_conflict()
     except Exception as e:
         db.rollback()
         print(f"Error in update_project: {e}")
@@ -361,7 +415,7 @@ def update_project(
         )
 
 
-@router.delete("/projects/{project_id}")
+@router.delete("/projects/{project_id}", response_model=ProjectMutatieResponse)
 def delete_project(
     project_id: str,
     db: Session = Depends(get_db),
@@ -380,21 +434,16 @@ def delete_project(
             )
 
         # Store project info for response
-        project_info = {
-            "id": project.id,
-            "project_nummer": project.project_nummer,
-            "naam": project.naam
-        }
+        project_info = ProjectSamenvatting.model_validate(project)
         
         # Delete
         db.delete(project)
         db.commit()
         
-        return {
-            "success": True,
-            "data": project_info,
-            "message": "Project deleted successfully"
-        }
+        return ProjectMutatieResponse(
+            data=project_info,
+            message="Project deleted successfully",
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -1,12 +1,21 @@
 """
 Reports and dashboard endpoints
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from typing import Optional
 
 from app.db.session import get_db
 from app.core.deps import get_current_user
+from app.core.cache import response_cache
 from app.models.user import User
+from app.models.financien import LosseContractFinancien, ProjectFinancien, VestigingFinancien
+from app.models.project import Project
+from app.models.vestiging import Vestiging
+from app.schemas.financien import (
+    Financien, Portfolio, PortfolioResponse, PortfolioTotaal, ProjectPortfolio, VestigingPortfolio,
+)
 
 router = APIRouter(tags=["Reports"])
 
@@ -41,3 +50,109 @@ def get_dashboard_kpis(
             }
         }
     }
+
+
+@router.get("/portfolio", response_model=PortfolioResponse)
+def get_portfolio(
+    request: Request,
+    vestiging_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Portfolio: gecontracteerd, gefactureerd en budget per vestiging
+
+    Leest de bijgehouden totalen (vestiging_financien, project_financien en
+    losse_contract_financien voor de contracten zonder project), er worden
+    geen contracten opgeteld. Met vestiging_id ook de projecten van die
+    vestiging.
+    """
+    los = db.execute(
+        select(
+            LosseContractFinancien.aantal_contracten,
+            LosseContractFinancien.contract_totaal,
+            LosseContractFinancien.gefactureerd_totaal,
+        )
+    ).first() or (0, 0, 0)
+    laatst_bijgewerkt = (
+        db.scalar(select(func.max(VestigingFinancien.bijgewerkt_op))),
+        db.scalar(select(func.max(ProjectFinancien.bijgewerkt_op))),
+        tuple(los),
+    )
+    cache = response_cache.lookup(
+        request, current_user, laatst_bijgewerkt,
+        tabellen=[
+            "vestiging_financien", "project_financien", "losse_contract_financien",
+            "projects", "vestigingen",
+        ],
+    )
+    if cache.response is not None:
+        return cache.response
+
+    vestigingen = [
+        VestigingPortfolio(
+            vestiging_id=v.id,
+            naam=v.naam,
+            code=v.code,
+            aantal_projecten=f.aantal_projecten if f else 0,
+            **Financien.velden(
+                f.budget_totaal if f else 0,
+                f.aantal_contracten if f else 0,
+                f.contract_totaal if f else 0,
+                f.gefactureerd_totaal if f else 0,
+            ),
+        )
+        for v, f in db.execute(
+            select(Vestiging, VestigingFinancien)
+            .outerjoin(VestigingFinancien, VestigingFinancien.vestiging_id == Vestiging.id)
+            .where(Vestiging.is_actief == True)
+            .order_by(Vestiging.naam)
+        )
+    ]
+
+    # Totaal over alle projecten (ook zonder vestiging) + contracten zonder project (los)
+    projecten_totaal = db.execute(
+        select(
+            func.count(Project.id),
+            func.coalesce(func.sum(Project.budget_totaal), 0),
+            func.coalesce(func.sum(ProjectFinancien.aantal_contracten), 0),
+            func.coalesce(func.sum(ProjectFinancien.contract_totaal), 0),
+            func.coalesce(func.sum(ProjectFinancien.gefactureerd_totaal), 0),
+        ).outerjoin(ProjectFinancien, ProjectFinancien.project_id == Project.id)
+    ).one()
+    totaal = PortfolioTotaal(
+        aantal_projecten=projecten_totaal[0],
+        **Financien.velden(
+            projecten_totaal[1],
+            projecten_totaal[2] + los[0],
+            float(projecten_totaal[3]) + float(los[1]),
+            float(projecten_totaal[4]) + float(los[2]),
+        ),
+    )
+
+    projecten = None
+    if vestiging_id:
+        projecten = [
+            ProjectPortfolio(
+                project_id=p.id,
+                project_nummer=p.project_nummer,
+                naam=p.naam,
+                status=p.status,
+                **Financien.velden(
+                    p.budget_totaal,
+                    f.aantal_contracten if f else 0,
+                    f.contract_totaal if f else 0,
+                    f.gefactureerd_totaal if f else 0,
+                ),
+            )
+            for p, f in db.execute(
+                select(Project, ProjectFinancien)
+                .outerjoin(ProjectFinancien, ProjectFinancien.project_id == Project.id)
+                .where(Project.vestiging_id == vestiging_id)
+                .order_by(Project.project_nummer)
+            )
+        ]
+
+    return cache.opslaan(PortfolioResponse(
+        data=Portfolio(totaal=totaal, vestigingen=vestigingen, projecten=projecten)
+    ))
@@ -12,32 +12,13 @@ from app.models.user import User
 from app.models.projectfase import ProjectFase, ProjectFaseStatus, ProjectFaseDocument
 from app.models.project import Project
 from app.schemas.taken import MijnTakenResponse, TaakItem
+from app.core.authorization import REVIEW_ROLLEN, review_filter
 from app.core.deps import get_current_user
+from app.services.meldingen import calculate_priority
 
 router = APIRouter(tags=["Mijn Taken"])
 
 
-def calculate_priority(deadline: datetime = None) -> str:
-    """
-    Calculate priority based on deadline
-    - Hoog: deadline binnen 3 dagen of verlopen
-    - Middel: deadline binnen 7 dagen
-    - Laag: deadline > 7 dagen of geen deadline
-    """
-    if not deadline:
-        return "laag"
-
-    now = datetime.now(timezone.utc)
-    days_until_deadline = (deadline - now).days
-
-    if days_until_deadline <= 3:
-        return "hoog"
-    elif days_until_deadline <= 7:
-        return "middel"
-    else:
-        return "laag"
-
-
 @router.get("/me/taken", response_model=MijnTakenResponse)
 def get_mijn_taken(
     current_user: User = Depends(get_current_user),
@@ -79,21 +60,18 @@ def get_mijn_taken(
             beschrijving=f"Verantwoordelijk voor {fase.naam}"
         ))
 
-    # 2. WACHT OP ACCEPTATIE - fases in review status (alleen voor beheerders/projectleiders)
+    # 2. WACHT OP ACCEPTATIE - fases in review status (beheerders, controleurs
+    #    en projectleiders; die laatsten alleen voor hun eigen projecten)
     wacht_op_acceptatie = []
-    if current_user.role in ['beheerder', 'projectleider', 'controleur']:
+    if current_user.role in REVIEW_ROLLEN:
         acceptatie_query = db.query(ProjectFase).join(
             Project, ProjectFase.project_id == Project.id
         ).filter(
-            ProjectFase.status == ProjectFaseStatus.IN_REVIEW
+            ProjectFase.status == ProjectFaseStatus.IN_REVIEW,
+            review_filter(current_user),
         ).all()
 
         for fase in acceptatie_query:
-            # Voor projectleiders: alleen hun eigen projecten
-            if current_user.role == 'projectleider':
-                if fase.project.projectleider_id != current_user.id:
-                    continue
-
             wacht_op_acceptatie.append(TaakItem(
                 fase_id=fase.id,
                 project_id=fase.project.id,
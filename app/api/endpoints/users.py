@@ -11,7 +11,9 @@ from datetime import datetime
 import uuid
 
 from app.db.session import get_db
+from app.core.authorization import vereis_rol
 from app.core.deps import get_current_user
+from app.core.versie import controleer_versie, verwachte_versie
 from app.models.user import User, UserRole
 from app.core.security import get_password_hash
 from app.models.historie_setup import HistorieContext
@@ -60,11 +62,7 @@ class UserUpdate(BaseModel):
 
 def check_admin_rights(user: User):
     """Check if user has admin rights"""
-    if user.role != UserRole.BEHEERDER:
-        raise HTTPException(
-            status_code=http_status.HTTP_403_FORBIDDEN,
-            detail="Only administrators can manage users"
-        )
+    vereis_rol(user, [UserRole.BEHEERDER], "Only administrators can manage users")
 
 
 # ============================================================================
@@ -185,6 +183,7 @@ def create_user(
 def update_user(
     user_id: str,
     user_data: UserUpdate,
+    verwacht: Optional[set] = Depends(verwachte_versie),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -200,6 +199,7 @@ def update_user(
             status_code=http_status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    controleer_versie(user, verwacht)
 
     # Validate leverancier requirement
     new_role = user_data.role if user_data.role is not None else user.role
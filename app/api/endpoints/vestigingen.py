@@ -1,22 +1,30 @@
 """
 Vestigingen endpoints - Complete CRUD
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from typing import Optional
 import uuid
 
 from app.db.session import get_db
 from app.core.deps import get_current_user
+from app.core.versie import controleer_versie, verwachte_versie, versie_conflict
+from app.core.cache import response_cache, query_versie, object_versie
 from app.models.user import User
 from app.models.vestiging import Vestiging
 from app.models.historie_setup import HistorieContext
+from app.services.zoek_filters import tekst_filter
+from app.schemas.vestiging import (
+    VestigingCreate, VestigingListResponse, VestigingMutatieResponse, VestigingResponse, VestigingUpdate,
+)
 
 router = APIRouter(tags=["Vestigingen"])
 
 
-@router.get("/vestigingen")
+@router.get("/vestigingen", response_model=VestigingListResponse)
 def list_vestigingen(
+    request: Request,
     page: int = 1,
     limit: int = 25,
     search: Optional[str] = None,
@@ -33,16 +41,18 @@ def list_vestigingen(
 
         # Apply filters
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                (Vestiging.naam.ilike(search_term)) |
-                (Vestiging.code.ilike(search_term)) |
-                (Vestiging.adres_plaats.ilike(search_term))
-            )
+            query = query.filter(tekst_filter(Vestiging, search))
 
         if actief is not None:
             query = query.filter(Vestiging.is_actief == actief)
 
+        # Conditional GET / response cache
+        cache = response_cache.lookup(
+            request, current_user, query_versie(query, Vestiging),
+        )
+        if cache.response is not None:
+            return cache.response
+
         # Count total
         total = query.count()
 
@@ -54,38 +64,18 @@ def list_vestigingen(
         vestiging_list = []
         for v in vestigingen:
             try:
-                vestiging_data = {
-                    "id": v.id,
-                    "naam": v.naam,
-                    "code": v.code,
-                    "adres": {
-                        "straat": v.adres_straat,
-                        "huisnummer": v.adres_huisnummer,
-                        "postcode": v.adres_postcode,
-                        "plaats": v.adres_plaats,
-                        "land": v.adres_land,
-                        "volledig": v.volledig_adres
-                    },
-                    "telefoon": v.telefoon,
-                    "email": v.email,
-                    "notities": v.notities,
-                    "is_actief": v.is_actief,
-                    "versie_nummer": v.versie_nummer,
-                    "created_at": v.created_at.isoformat() if v.created_at else None,
-                    "updated_at": v.updated_at.isoformat() if v.updated_at else None
-                }
-                vestiging_list.append(vestiging_data)
+                vestiging_list.append(VestigingResponse.van_model(v))
             except Exception as e:
                 print(f"Error formatting vestiging {v.id}: {e}")
                 continue
 
-        return {
-            "items": vestiging_list,
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "pages": (total + limit - 1) // limit
-        }
+        return cache.opslaan(VestigingListResponse(
+            items=vestiging_list,
+            total=total,
+            page=page,
+            limit=limit,
+            pages=(total + limit - 1) // limit,
+        ))
 
     except Exception as e:
         print(f"Error listing vestigingen: {e}")
@@ -95,8 +85,9 @@ def list_vestigingen(
         )
 
 
-@router.get("/vestigingen/{vestiging_id}")
+@router.get("/vestigingen/{vestiging_id}", response_model=VestigingResponse)
 def get_vestiging(
+    request: Request,
     vestiging_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -112,31 +103,19 @@ def get_vestiging(
             detail=f"Vestiging {vestiging_id} niet gevonden"
         )
 
-    return {
-        "id": vestiging.id,
-        "naam": vestiging.naam,
-        "code": vestiging.code,
-        "adres": {
-            "straat": vestiging.adres_straat,
-            "huisnummer": vestiging.adres_huisnummer,
-            "postcode": vestiging.adres_postcode,
-            "plaats": vestiging.adres_plaats,
-            "land": vestiging.adres_land,
-            "volledig": vestiging.volledig_adres
-        },
-        "telefoon": vestiging.telefoon,
-        "email": vestiging.email,
-        "notities": vestiging.notities,
-        "is_actief": vestiging.is_actief,
-        "versie_nummer": vestiging.versie_nummer,
-        "created_at": vestiging.created_at.isoformat() if vestiging.created_at else None,
-        "updated_at": vestiging.updated_at.isoformat() if vestiging.updated_at else None
-    }
-
-
-@router.post("/vestigingen")
+    # Conditional GET / response cache
+    cache = response_cache.lookup(
+        request, current_user, object_versie(vestiging),
+    )
+    if cache.response is not None:
+        return cache.response
+
+    return cache.opslaan(VestigingResponse.van_model(vestiging))
+
+
+@router.post("/vestigingen", response_model=VestigingMutatieResponse)
 def create_vestiging(
-    data: dict,
+    data: VestigingCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -144,37 +123,18 @@ def create_vestiging(
     Create new vestiging
     """
     try:
-        # Check required fields
-        required_fields = ["naam", "code", "adres_plaats"]
-        for field in required_fields:
-            if field not in data:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Veld '{field}' is verplicht"
-                )
-
         # Check unique code
-        existing = db.query(Vestiging).filter(Vestiging.code == data["code"]).first()
+        existing = db.query(Vestiging).filter(Vestiging.code == data.code).first()
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Code '{data['code']}' is al in gebruik"
+                detail=f"Code '{data.code}' is al in gebruik"
             )
 
         # Create vestiging
         vestiging = Vestiging(
             id=f"ves_{uuid.uuid4().hex[:8]}",
-            naam=data["naam"],
-            code=data["code"],
-            adres_straat=data.get("adres_straat"),
-            adres_huisnummer=data.get("adres_huisnummer"),
-            adres_postcode=data.get("adres_postcode"),
-            adres_plaats=data["adres_plaats"],
-            adres_land=data.get("adres_land", "Nederland"),
-            telefoon=data.get("telefoon"),
-            email=data.get("email"),
-            notities=data.get("notities"),
-            is_actief=data.get("is_actief", True),
+            **data.model_dump(),
             versie_nummer=1
         )
 
@@ -202,15 +162,19 @@ def create_vestiging(
         )
 
 
-@router.put("/vestigingen/{vestiging_id}")
+@router.put("/vestigingen/{vestiging_id}", response_model=VestigingMutatieResponse)
 def update_vestiging(
     vestiging_id: str,
-    data: dict,
+    data: VestigingUpdate,
+    verwacht: Optional[set] = Depends(verwachte_versie),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update vestiging
+
+    Met If-Match: "<versie>" of ?versie= alleen als de vestiging die versie
+    nog heeft, anders 409
     """
     try:
         vestiging = db.query(Vestiging).filter(Vestiging.id == vestiging_id).first()
@@ -220,28 +184,22 @@ def update_vestiging(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Vestiging {vestiging_id} niet gevonden"
             )
+        controleer_versie(vestiging, verwacht)
+
+        wijzigingen = data.model_dump(exclude_unset=True)
 
         # Check unique code if changed
-        if "code" in data and data["code"] != vestiging.code:
-            existing = db.query(Vestiging).filter(Vestiging.code == data["code"]).first()
+        if "code" in wijzigingen and wijzigingen["code"] != vestiging.code:
+            existing = db.query(Vestiging).filter(Vestiging.code == wijzigingen["code"]).first()
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Code '{data['code']}' is al in gebruik"
+                    detail=f"Code '{wijzigingen['code']}' is al in gebruik"
                 )
 
-        # Update fields
-        updateable_fields = [
-            "naam", "code", "adres_straat", "adres_huisnummer",
-            "adres_postcode", "adres_plaats", "adres_land",
-            "telefoon", "email", "notities", "is_actief"
-        ]
-
-        for field in updateable_fields:
-            if field in data:
-                setattr(vestiging, field, data[field])
-
-        vestiging.versie_nummer += 1
+        # Update fields (alleen meegestuurde)
+        for field, value in wijzigingen.items():
+            setattr(vestiging, field, value)
 
         # Set historie context
         with HistorieContext(db, current_user.id, "update", "vestiging", vestiging.id):
@@ -252,11 +210,15 @@ def update_vestiging(
             "id": vestiging.id,
             "naam": vestiging.naam,
             "code": vestiging.code,
-            "message": "Vestiging succesvol bijgewerkt"
+            "message": "Vestiging succesvol bijgewerkt",
+            "versie": vestiging.versie_nummer,
         }
 
     except HTTPException:
         raise
+    except StaleDataError:
+        db.rollback()
+        raise versie_conflict()
     except Exception as e:
         db.rollback()
         print(f"Error updating vestiging: {e}")
@@ -286,7 +248,6 @@ def delete_vestiging(
 
         # Soft delete
         vestiging.is_actief = False
-        vestiging.versie_nummer += 1
 
         # Set historie context
         with HistorieContext(db, current_user.id, "delete", "vestiging", vestiging.id):
@@ -0,0 +1,46 @@
+"""
+Zoeken endpoint - full-text zoeken over alle entiteiten
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.db.session import get_db
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.services.zoeken import zoek, ENTITEIT_TYPES
+
+router = APIRouter(tags=["Zoeken"])
+
+
+@router.get("/search")
+def search(
+    q: str = Query(..., min_length=1, description="Zoekterm"),
+    type: Optional[List[str]] = Query(None, description="Beperk tot entiteit types"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Zoek in projecten, contracten, leveranciers, vestigingen, commentaren
+    en documenten
+
+    Resultaten zijn gesorteerd op relevantie en gefilterd op de rechten van
+    de gebruiker (leveranciers vinden alleen wat bij hen hoort).
+    """
+    if type:
+        onbekend = [t for t in type if t not in ENTITEIT_TYPES]
+        if onbekend:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Onbekend type: {', '.join(onbekend)}. Kies uit: {', '.join(ENTITEIT_TYPES)}"
+            )
+
+    resultaten = zoek(db, q, current_user, types=type, limit=limit, offset=offset)
+
+    return {
+        "success": True,
+        "query": q,
+        "data": resultaten,
+    }
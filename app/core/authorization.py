@@ -0,0 +1,114 @@
+"""
+Autorisatie per rol
+===================
+
+De toegangsregels staan hier op één plek, in twee vormen:
+
+- *_filter(user):   SQL predicate voor lijst queries. Leveranciers krijgen
+                    dan alleen hun eigen rijen uit de database (geen volledige
+                    load die daarna in Python gefilterd wordt) en de
+                    paginatie telt alleen wat ze mogen zien.
+- check_*(…, user): dezelfde regel op één geladen object, voor detail
+                    endpoints en de live stream.
+
+Alleen user.id, user.role en user.leverancier_id worden gebruikt, zodat
+ook een losgekoppelde user (SimpleNamespace) werkt.
+
+Regels:
+- fases:      leveranciers alleen fases met hun leverancier_id (zonder
+              leverancier_id: niets); interne rollen alles
+- documenten: leveranciers alleen zichtbaar_voor_leverancier
+- reviews:    beheerders en controleurs alle fases in review,
+              projectleiders alleen die van hun eigen projecten
+"""
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import false, true
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.project import Project
+from app.models.projectfase import ProjectFase, ProjectFaseDocument
+from app.models.user import UserRole
+
+# Zien en accepteren de fases die op review wachten (/me/taken, digest)
+REVIEW_ROLLEN = [UserRole.BEHEERDER, UserRole.PROJECTLEIDER, UserRole.CONTROLEUR]
+
+
+# ============================================================================
+# ROLLEN
+# ============================================================================
+
+def vereis_rol(user, rollen: Iterable[UserRole], detail: str = "Geen rechten voor deze actie") -> None:
+    """403 als de user geen van de rollen heeft"""
+    if user.role not in rollen:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+# ============================================================================
+# FASES
+# ============================================================================
+
+def fase_filter(user) -> ColumnElement:
+    """WHERE clause op ProjectFase: de fases die de user mag zien"""
+    if user.role != UserRole.LEVERANCIER:
+        return true()
+    if not user.leverancier_id:
+        # User heeft LEVERANCIER role maar geen leverancier_id → geen toegang
+        return false()
+    return ProjectFase.leverancier_id == user.leverancier_id
+
+
+def check_fase_toegang(fase, user) -> bool:
+    """
+    Check of user toegang heeft tot deze fase
+
+    - Beheerders, projectleiders, medewerkers: altijd
+    - Leveranciers: ALLEEN als leverancier_id = hun leverancier
+    """
+    if user.role != UserRole.LEVERANCIER:
+        return True
+    return bool(user.leverancier_id) and fase.leverancier_id == user.leverancier_id
+
+
+# ============================================================================
+# DOCUMENTEN
+# ============================================================================
+
+def document_filter(user) -> ColumnElement:
+    """WHERE clause op ProjectFaseDocument (naast fase_filter op de fase)"""
+    if user.role != UserRole.LEVERANCIER:
+        return true()
+    return ProjectFaseDocument.zichtbaar_voor_leverancier.is_(True)
+
+
+def check_document_toegang(document, user) -> bool:
+    """
+    Check of user dit document mag zien
+
+    - Interne rollen: altijd
+    - Leveranciers: alleen als zichtbaar_voor_leverancier = True
+    """
+    if user.role != UserRole.LEVERANCIER:
+        return True
+    return bool(document.zichtbaar_voor_leverancier)
+
+
+# ============================================================================
+# REVIEWS
+# ============================================================================
+
+def review_filter(user) -> ColumnElement:
+    """WHERE clause op Project: van welke projecten de user reviews ziet"""
+    if user.role not in REVIEW_ROLLEN:
+        return false()
+    if user.role == UserRole.PROJECTLEIDER:
+        return Project.projectleider_id == user.id
+    return true()
+
+
+def check_review_toegang(user, projectleider_id: Optional[str]) -> bool:
+    """Check of user een fase in review ziet (projectleider_id van het project)"""
+    if user.role not in REVIEW_ROLLEN:
+        return False
+    return user.role != UserRole.PROJECTLEIDER or projectleider_id == user.id
@@ -0,0 +1,272 @@
+"""
+Response cache voor GET endpoints
+=================================
+
+Conditional GET + een in-process LRU van geserialiseerde responses:
+
+- De ETag (weak) wordt afgeleid van de data: voor lijsten count,
+  max(updated_at) en sum(versie_nummer) over de gefilterde query, voor
+  detail endpoints id/versie_nummer/updated_at van het record. Daarnaast
+  telt per tabel een generatie mee die bij elke commit met wijzigingen
+  in die tabel wordt opgehoogd (voor gerelateerde data in de response,
+  zoals de leverancier naam bij een contract).
+- If-None-Match → 304, zonder de pagina op te halen of te serialiseren.
+- Anders wordt de body uit de LRU gehaald of opgebouwd en bewaard.
+  Response models worden direct door pydantic-core naar JSON bytes
+  geschreven, dicts via orjson (geen jsonable_encoder tussenstap).
+
+Gebruik in een endpoint:
+
+    cache = response_cache.lookup(request, current_user, query_versie(query, Project),
+                                  tabellen=["projects", "users"])
+    if cache.response is not None:
+        return cache.response
+    ...
+    return cache.opslaan(result)
+
+De generaties leven per proces. Bij meerdere workers blijft de ETag
+correct voor de hoofdtabel (die komt uit de database); gerelateerde
+tabellen worden alleen binnen hetzelfde proces gevolgd.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import event, func
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weak vergelijking van If-None-Match met een ETag"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag.removeprefix("W/")
+        for tag in header.split(",")
+    )
+
+
+def _json_default(obj: Any) -> Any:
+    """Types die orjson niet zelf kent"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type {type(obj).__name__} is niet JSON serializeerbaar")
+
+
+def dumps(data: Any) -> bytes:
+    """Serialiseer een response model of dict naar JSON bytes"""
+    if isinstance(data, BaseModel):
+        return data.model_dump_json().encode()
+    return orjson.dumps(data, default=_json_default)
+
+
+def query_versie(query: Query, model: type) -> Tuple:
+    """
+    Versie van het resultaat van een (gefilterde) lijst query
+
+    Eén aggregate query; verandert bij elke insert, update en delete.
+    """
+    laatst_gewijzigd = func.coalesce(model.updated_at, model.created_at)
+    return tuple(
+        query.with_entities(
+            func.count(model.id),
+            func.max(laatst_gewijzigd),
+            func.sum(model.versie_nummer),
+        ).order_by(None).one()
+    )
+
+
+def object_versie(obj) -> Tuple:
+    """Versie van één record"""
+    return (obj.id, obj.versie_nummer, obj.updated_at or obj.created_at)
+
+
+@dataclass
+class CacheLookup:
+    """Resultaat van ResponseCache.lookup()"""
+    cache: "ResponseCache"
+    etag: str
+    tabellen: List[str]
+    response: Optional[Response] = None
+
+    def opslaan(self, data: Any) -> Response:
+        """Serialiseer de data, bewaar de body en geef de response terug"""
+        body = dumps(data)
+        self.cache.bewaar(self.etag, body, self.tabellen)
+        return self.cache.maak_response(self.etag, body)
+
+
+class ResponseCache:
+    """
+    LRU van geserialiseerde JSON bodies, op ETag
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+        self._per_tabel: Dict[str, Set[str]] = {}
+        self._generaties: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    # ETag
+    # ------------------------------------------------------------------
+
+    def generatie(self, tabel: str) -> int:
+        return self._generaties.get(tabel, 0)
+
+    def maak_etag(self, request: Request, user, versie: Tuple, tabellen: Iterable[str]) -> str:
+        scope = f"{getattr(user.role, 'value', user.role)}:{user.leverancier_id or ''}"
+        generaties = ",".join(f"{t}={self.generatie(t)}" for t in sorted(tabellen))
+        sleutel = "|".join([
+            request.url.path,
+            str(request.url.query),
+            scope,
+            repr(versie),
+            generaties,
+        ])
+        return 'W/"' + hashlib.sha1(sleutel.encode()).hexdigest() + '"'
+
+    # ------------------------------------------------------------------
+    # Lookup / opslag
+    # ------------------------------------------------------------------
+
+    def lookup(self, request: Request, user, versie: Tuple, tabellen: Iterable[str] = ()) -> CacheLookup:
+        """
+        Zoek een response op voor deze request
+
+        Geeft een 304 als de client de versie al heeft, een response uit de
+        LRU als die er is, en anders een lookup zonder response (opbouwen en
+        via opslaan() bewaren).
+        """
+        tabellen = list(tabellen)
+        etag = self.maak_etag(request, user, versie, tabellen)
+        lookup = CacheLookup(cache=self, etag=etag, tabellen=tabellen)
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            lookup.response = Response(
+                status_code=304,
+                headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+            )
+            return lookup
+
+        with self._lock:
+            body = self._bodies.get(etag)
+            if body is not None:
+                self._bodies.move_to_end(etag)
+        if body is not None:
+            lookup.response = self.maak_response(etag, body)
+
+        return lookup
+
+    def maak_response(self, etag: str, body: bytes) -> Response:
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
+
+    def bewaar(self, etag: str, body: bytes, tabellen: Iterable[str]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._bodies[etag] = body
+            self._bodies.move_to_end(etag)
+            for tabel in tabellen:
+                self._per_tabel.setdefault(tabel, set()).add(etag)
+
+            while len(self._bodies) > self.max_size:
+                oudste, _ = self._bodies.popitem(last=False)
+                for etags in self._per_tabel.values():
+                    etags.discard(oudste)
+
+    # ------------------------------------------------------------------
+    # Invalidatie
+    # ------------------------------------------------------------------
+
+    def invalideer(self, tabellen: Iterable[str]) -> None:
+        """Hoog de generatie op en gooi bodies weg die van deze tabellen afhangen"""
+        with self._lock:
+            for tabel in tabellen:
+                self._generaties[tabel] = self._generaties.get(tabel, 0) + 1
+                for etag in self._per_tabel.pop(tabel, set()):
+                    self._bodies.pop(etag, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bodies.clear()
+            self._per_tabel.clear()
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE)
+
+
+# ============================================================================
+# INVALIDATIE VIA SESSION EVENTS
+# ============================================================================
+# Gewijzigde tabellen worden per sessie verzameld en pas na een geslaagde
+# commit geïnvalideerd; na een rollback vervalt de lijst.
+
+_SESSION_KEY = "response_cache_tabellen"
+
+
+def _noteer(session: Session, tabellen: Iterable[str]) -> None:
+    session.info.setdefault(_SESSION_KEY, set()).update(tabellen)
+
+
+def markeer_gewijzigd(session: Session, tabellen: Iterable[str]) -> None:
+    """
+    Noteer gewijzigde tabellen voor schrijfacties die de flush omzeilen
+
+    (bijv. bulk inserts); ze worden na de commit geïnvalideerd.
+    """
+    _noteer(session, tabellen)
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    _noteer(session, {
+        obj.__table__.name
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if hasattr(obj, "__table__")
+    })
+
+
+def _after_bulk(context) -> None:
+    _noteer(context.session, [context.mapper.local_table.name])
+
+
+def _after_commit(session: Session) -> None:
+    tabellen = session.info.pop(_SESSION_KEY, None)
+    if tabellen:
+        response_cache.invalideer(tabellen)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+def setup_cache_listeners() -> None:
+    """Registreer de invalidatie listeners (bij startup)"""
+    for naam, listener in [
+        ("after_flush", _after_flush),
+        ("after_bulk_update", _after_bulk),
+        ("after_bulk_delete", _after_bulk),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ]:
+        if not event.contains(Session, naam, listener):
+            event.listen(Session, naam, listener)
@@ -17,6 +17,7 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    DOWNLOAD_URL_EXPIRE_MINUTES: int = 15
     
     # CORS
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
@@ -24,6 +25,74 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: str = "development"
     
+    # Documentopslag
+    UPLOAD_DIR: str = "./uploads/documenten"
+    DOCUMENT_OPSLAG_TYPE: str = "local"  # "local", "cas" (content-addressed, met deduplicatie) of "s3"
+    CAS_DIR: str = "./uploads/cas"
+    
+    # S3-compatible opslag (AWS S3, MinIO, ...) - alleen bij DOCUMENT_OPSLAG_TYPE=s3
+    S3_BUCKET: str = "vastgoed-documenten"
+    S3_PREFIX: str = "documenten/"
+    S3_ENDPOINT_URL: str = ""  # bijv. http://localhost:9000 voor MinIO
+    S3_REGION: str = ""
+    S3_ACCESS_KEY: str = ""
+    S3_SECRET_KEY: str = ""
+    
+    # Downloads via signed URLs laten afhandelen door de webserver
+    DOWNLOAD_OFFLOAD: str = ""  # "", "x-accel" (nginx) of "x-sendfile" (apache/lighttpd)
+    DOWNLOAD_ACCEL_PREFIX: str = "/protected/"  # nginx internal location
+    DOWNLOAD_ACCEL_ROOT: str = "./uploads"  # directory waar DOWNLOAD_ACCEL_PREFIX naar wijst
+    
+    # Previews (thumbnails van foto's, eerste pagina van PDF's)
+    PREVIEW_WORKERS: int = 2
+    PREVIEW_MAX_PIXELS: int = 480  # langste zijde van een preview
+    
+    # Response cache voor GET endpoints (aantal bodies in het geheugen, 0 = uit)
+    RESPONSE_CACHE_SIZE: int = 256
+
+    # Bulk endpoints (/projects/bulk, /contracts/bulk, /leveranciers/bulk)
+    BULK_MAX_ITEMS: int = 1000
+
+    # Import van leveranciers/contracten uit CSV of XLSX
+    IMPORT_CHUNK_SIZE: int = 500  # rijen per batch (en per commit)
+    IMPORT_MAX_BESTAND_MB: int = 50
+    IMPORT_DIR: str = "./uploads/imports"  # bestanden tot de import job ze verwerkt heeft
+
+    # Export naar CSV/XLSX: rijen per fetch van de server-side cursor
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Domain events (outbox): aflevering aan de abonnees
+    EVENT_BATCH_SIZE: int = 200  # events per batch per abonnee
+    EVENT_POLL_SECONDEN: float = 2.0  # na een commit direct, anders elke zoveel seconden
+    EVENT_MAX_POGINGEN: int = 5  # daarna één voor één, blijvend falende events overslaan
+    EVENT_BEWAAR_DAGEN: int = 7  # afgeleverde events (job opruimen.outbox)
+
+    # Live updates (SSE)
+    LIVE_HEARTBEAT_SECONDEN: float = 15.0  # ": ping" om proxies de verbinding open te laten houden
+    LIVE_QUEUE_MAX: int = 1000  # meldingen per client; loopt die vol, dan volgt een "resync"
+    LIVE_REPLAY_MAX: int = 500  # gemiste events na Last-Event-ID; meer dan dit → "resync"
+
+    # Digests van deadlines en reviews
+    MELDING_KANAAL: str = "bestand"  # "bestand" (.eml in MELDING_DIR), "smtp" of "uit"
+    MELDING_DIR: str = "./uploads/meldingen"
+    MELDING_DEADLINE_DAGEN: int = 7  # deadlines binnen zoveel dagen melden
+    MELDING_VERLOPEN_DAGEN: int = 30  # verlopen deadlines tot zoveel dagen terug melden
+    MELDING_AFZENDER: str = "noreply@comaker.cloud"
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_GEBRUIKER: str = ""
+    SMTP_WACHTWOORD: str = ""
+    SMTP_STARTTLS: bool = False
+
+    # Achtergrondtaken (jobs tabel, schema's via /jobs/schemas)
+    JOB_WORKERS: int = 2
+    JOB_POLL_SECONDEN: float = 1.0
+    JOB_PLANNER_SECONDEN: float = 30.0  # hoe vaak de cron schema's bekeken worden
+    JOB_MAX_POGINGEN: int = 3
+    JOB_BACKOFF_SECONDEN: int = 30  # 30s, 60s, 120s, ... (max 1 uur)
+    JOB_MAX_DUUR_MINUTEN: int = 30  # langer bezig → worker gecrasht, opnieuw in de wachtrij
+    JOB_BEWAAR_DAGEN: int = 30  # afgeronde jobs
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
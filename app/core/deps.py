@@ -1,7 +1,9 @@
 """
 Authentication dependencies
 """
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
@@ -20,8 +22,35 @@ def get_current_user(
     """
     Get current authenticated user from JWT token
     """
-    token = credentials.credentials
-    
+    return user_uit_token(credentials.credentials, db)
+
+
+def get_current_user_stream(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    token: Optional[str] = Query(default=None, description="Access token (EventSource kan geen headers zetten)"),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Als get_current_user, maar de token mag ook als ?token= meekomen
+
+    Alleen voor streams (SSE): de browser EventSource API ondersteunt geen
+    Authorization header.
+    """
+    if credentials is not None:
+        token = credentials.credentials
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_uit_token(token, db)
+
+
+def user_uit_token(token: str, db: Session) -> User:
+    """
+    Actieve user bij een access token (401/403/404 als dat niet lukt)
+    """
     # Decode token
     payload = decode_token(token)
     
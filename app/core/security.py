@@ -73,6 +73,31 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
+def create_download_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """
+    Create signed download token (HMAC-SHA256 via JWT)
+
+    Ondertekend, niet versleuteld: zet er alleen id's en hashes in, geen
+    opslagpaden of andere server details.
+    """
+    to_encode = data.copy()
+    
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=settings.DOWNLOAD_URL_EXPIRE_MINUTES)
+    
+    to_encode.update({"exp": expire, "type": "download"})
+    
+    encoded_jwt = jwt.encode(
+        to_encode,
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+    
+    return encoded_jwt
+
+
 def decode_token(token: str) -> dict:
     """
     Decode and verify JWT token
@@ -0,0 +1,64 @@
+"""
+Optimistic concurrency op versie_nummer
+=======================================
+
+versie_nummer is de version_id_col van de getrackte models: elke ORM
+update wordt UPDATE ... SET versie_nummer = :nieuw WHERE id = :id AND
+versie_nummer = :oud. Is het record intussen door een ander gewijzigd, dan
+matcht geen rij en geeft SQLAlchemy een StaleDataError (→ 409).
+
+Update endpoints accepteren daarnaast de versie waarop de client zijn
+wijziging baseert, als If-Match header ("3" of W/"3") of als ?versie=3.
+Komt die niet overeen met de huidige versie, dan volgt meteen een 409.
+"""
+from typing import Optional
+
+from fastapi import Header, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+
+VERSIE_CONFLICT = "Record is intussen gewijzigd; haal de laatste versie op en probeer opnieuw"
+
+
+def versie_conflict(huidige_versie: Optional[int] = None) -> HTTPException:
+    detail = VERSIE_CONFLICT if huidige_versie is None else f"{VERSIE_CONFLICT} (huidige versie {huidige_versie})"
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+def _parse_if_match(if_match: str) -> Optional[set]:
+    """If-Match waarden als versienummers; None bij '*' (elke versie)"""
+    versies = set()
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return None
+        tag = tag.removeprefix("W/").strip('"')
+        if not tag.isdigit():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="If-Match verwacht een versie_nummer, bijv. \"3\"",
+            )
+        versies.add(int(tag))
+    return versies or None
+
+
+def verwachte_versie(
+    if_match: Optional[str] = Header(default=None),
+    versie: Optional[int] = Query(default=None, description="Versie waarop de wijziging gebaseerd is"),
+) -> Optional[set]:
+    """Dependency: de versie(s) die de client verwacht, of None (geen check)"""
+    if versie is not None:
+        return {versie}
+    if if_match:
+        return _parse_if_match(if_match)
+    return None
+
+
+def controleer_versie(obj, verwacht: Optional[set]) -> None:
+    """409 als het record niet (meer) de verwachte versie heeft"""
+    if verwacht is not None and obj.versie_nummer not in verwacht:
+        raise versie_conflict(obj.versie_nummer)
+
+
+async def stale_data_handler(request, exc) -> ORJSONResponse:
+    """Exception handler voor StaleDataError buiten de endpoints om"""
+    return ORJSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": VERSIE_CONFLICT})
@@ -1,6 +1,11 @@
 """
 Initialize database with tables and seed data
 """
+import logging
+
+from sqlalchemy import UniqueConstraint, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 import uuid
 from datetime import datetime, timezone, timedelta, date
@@ -13,6 +18,7 @@ from app.models.project import Project, ProjectStatus
 from app.models.contract import Contract, ContractStatus, ContractType
 from app.models.leverancier import Leverancier, LeverancierStatus, LeverancierType
 from app.models.vestiging import Vestiging
+from app.models.document_opslag import DocumentBlob
 from app.models.projectfase import (
     ProjectFase, ProjectFaseDocument, ProjectFaseCommentaar,
     ProjectFaseStatus, DocumentType, CommentaarType, CommentaarStatus
@@ -27,6 +33,91 @@ from app.core.security import get_password_hash
 # Import voor historie tracking
 from app.models.historie_setup import disable_historie_tracking, enable_historie_tracking
 
+from app.services.zoeken import maak_zoek_index, init_zoek_index
+from app.services.zoek_filters import maak_trigram_indexes
+from app.services.financien import init_financien
+
+logger = logging.getLogger(__name__)
+
+
+# Kolommen die na het aanmaken van een tabel aan het model zijn toegevoegd:
+# (tabel, kolom, kolomdefinitie, backfill). create_all wijzigt bestaande
+# tabellen niet. Een NOT NULL kolom krijgt in de definitie een DEFAULT mee,
+# zodat bestaande rijen meteen een geldige waarde hebben; de backfill
+# (optioneel) vult daarna de echte waarden in.
+KOLOM_MIGRATIES = [
+    ("project_fase_documenten", "content_hash", "VARCHAR", None),
+    ("project_fase_documenten", "preview_status", "VARCHAR", None),
+    ("project_fase_documenten", "preview_opslag_pad", "VARCHAR", None),
+    ("project_fase_documenten", "preview_content_hash", "VARCHAR", None),
+    ("project_fase_documenten", "preview_bestandstype", "VARCHAR", None),
+]
+
+
+def _maak_unieke_constraints(conn: Connection, tabel) -> None:
+    """
+    Unique constraints die later aan een model zijn toegevoegd
+
+    SQLite kan geen constraint aan een bestaande tabel toevoegen; een unieke
+    index met dezelfde naam en kolommen dwingt hetzelfde af. Alleen
+    constraints met een naam; naamloze (Column(unique=True)) bestaan al
+    sinds het aanmaken van de tabel.
+    """
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    bestaand = {c["name"] for c in inspector.get_unique_constraints(tabel.name)}
+    bestaand |= {i["name"] for i in inspector.get_indexes(tabel.name) if i["unique"]}
+    for constraint in tabel.constraints:
+        if not isinstance(constraint, UniqueConstraint) or not constraint.name or constraint.name in bestaand:
+            continue
+        # Als tekst: een Index() met deze kolommen zou aan het model blijven hangen
+        kolommen = ", ".join(quote(kolom.name) for kolom in constraint.columns)
+        try:
+            conn.execute(text(f"CREATE UNIQUE INDEX {quote(constraint.name)} ON {quote(tabel.name)} ({kolommen})"))
+        except IntegrityError as e:
+            raise RuntimeError(
+                f"Unique constraint {constraint.name} kan niet aangemaakt worden: "
+                f"{tabel.name} bevat dubbele waarden voor {', '.join(constraint.columns.keys())}"
+            ) from e
+        logger.info("Unique constraint %s toegevoegd", constraint.name)
+
+
+def werk_tabellen_bij(conn: Connection) -> None:
+    """
+    Voer de kolom migraties uit en maak ontbrekende indexes aan
+
+    Elke stap kijkt eerst of de kolom, index of unique constraint al
+    bestaat, dus dit kan bij elke start draaien. Mist er daarna nog een
+    kolom van een model, dan stopt de start: zonder migratie zou die kolom
+    stil NULL blijven.
+    """
+    inspector = inspect(conn)
+    bestaande_tabellen = set(inspector.get_table_names())
+    quote = conn.dialect.identifier_preparer.quote
+
+    def kolommen(tabel: str) -> set:
+        return {kolom["name"] for kolom in inspect(conn).get_columns(tabel)}
+
+    for tabel, kolom, definitie, backfill in KOLOM_MIGRATIES:
+        if tabel not in bestaande_tabellen or kolom in kolommen(tabel):
+            continue
+        conn.execute(text(f"ALTER TABLE {quote(tabel)} ADD COLUMN {quote(kolom)} {definitie}"))
+        if backfill:
+            conn.execute(text(backfill))
+        logger.info("Kolom %s.%s toegevoegd", tabel, kolom)
+
+    for tabel in Base.metadata.sorted_tables:
+        if tabel.name not in bestaande_tabellen:
+            continue
+        ontbrekend = [kolom.name for kolom in tabel.columns if kolom.name not in kolommen(tabel.name)]
+        if ontbrekend:
+            raise RuntimeError(
+                f"Tabel {tabel.name} mist kolom(men) {', '.join(ontbrekend)}: voeg een migratie toe aan KOLOM_MIGRATIES"
+            )
+        for index in tabel.indexes:
+            index.create(conn, checkfirst=True)
+        _maak_unieke_constraints(conn, tabel)
+
 
 def init_db():
     """
@@ -35,6 +126,10 @@ def init_db():
     # Create all tables
     print("📦 Creating tables...")
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        werk_tabellen_bij(conn)
+        maak_zoek_index(conn)
+        maak_trigram_indexes(conn)
     print("✅ Tables created")
     
     # Seed test data
@@ -716,6 +811,12 @@ def init_db():
         else:
             print(f"ℹ️  Database already initialized with {existing_users} users")
         
+        # Zoekindex opbouwen als hij nog leeg is
+        init_zoek_index(db)
+        
+        # Financiële totalen opbouwen als ze nog leeg zijn
+        init_financien(db)
+        
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
         import traceback
@@ -30,6 +30,12 @@ from app.models.historie import (
     ProjectFaseHistorie
 )
 from app.models.vestiging import Vestiging
+from app.models.document_opslag import DocumentBlob
+from app.models.financien import LosseContractFinancien, ProjectFinancien, VestigingFinancien
+from app.models.factuur import Factuur
+from app.models.outbox import OutboxEvent, EventAbonnee
+from app.models.melding import VerstuurdeMelding
+from app.models.job import Job, JobSchema
 
 __all__ = [
     # User
@@ -69,4 +75,20 @@ __all__ = [
     "ProjectFaseHistorie",
     # Vestiging
     "Vestiging",
+    # Documentopslag
+    "DocumentBlob",
+    # Financiële totalen
+    "ProjectFinancien",
+    "VestigingFinancien",
+    "LosseContractFinancien",
+    # Facturen
+    "Factuur",
+    # Domain events
+    "OutboxEvent",
+    "EventAbonnee",
+    # Meldingen
+    "VerstuurdeMelding",
+    # Jobs
+    "Job",
+    "JobSchema",
 ]
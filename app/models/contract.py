@@ -1,15 +1,21 @@
 """
 Contract model - UPDATED with Leverancier relationship
 """
-from sqlalchemy import Column, String, Integer, DateTime, Enum as SQLEnum, ForeignKey, Numeric, Date, Text, Boolean
+from sqlalchemy import Column, String, Integer, DateTime, Enum as SQLEnum, ForeignKey, Numeric, Date, Text, Boolean, and_, case, or_
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 import enum
 
 from app.db.session import Base
 
 
+def peildatum() -> date:
+    """Datum van vandaag (UTC); bepaalt of een contract loopt (is_actief)"""
+    return datetime.now(timezone.utc).date()
+
+
 class ContractStatus(str, enum.Enum):
     """Contract status"""
     CONCEPT = "concept"
@@ -79,6 +85,7 @@ class Contract(Base):
     
     # Versiebeheer
     versie_nummer = Column(Integer, default=1, nullable=False)
+    __mapper_args__ = {"version_id_col": versie_nummer}
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -87,52 +94,56 @@ class Contract(Base):
     def __repr__(self):
         return f"<Contract {self.contract_nummer}>"
     
-    @property
+    # ------------------------------------------------------------------
+    # Afgeleide waarden: in Python per object, in SQL als expressie
+    # (filteren/sorteren in de database, bijv. Contract.is_actief)
+    # ------------------------------------------------------------------
+
+    @hybrid_property
     def gefactureerd_percentage(self) -> float:
-        """Calculate percentage invoiced"""
-        if not self.contract_bedrag or self.contract_bedrag == 0:
+        """Percentage gefactureerd (0-100, 2 decimalen)"""
+        if not self.contract_bedrag:
             return 0.0
-        
-        percentage = (float(self.gefactureerd_bedrag) / float(self.contract_bedrag)) * 100
+        percentage = float(self.gefactureerd_bedrag or 0) / float(self.contract_bedrag) * 100
         return round(min(percentage, 100.0), 2)
-    
-    @property
+
+    @gefactureerd_percentage.inplace.expression
+    @classmethod
+    def _gefactureerd_percentage_expression(cls):
+        percentage = func.coalesce(cls.gefactureerd_bedrag, 0) * 100.0 / cls.contract_bedrag
+        return case(
+            (func.coalesce(cls.contract_bedrag, 0) == 0, 0.0),
+            (percentage >= 100, 100.0),
+            else_=func.round(percentage, 2),
+        )
+
+    @hybrid_property
     def restant_bedrag(self) -> float:
-        """Calculate remaining amount"""
-        return float(self.contract_bedrag - self.gefactureerd_bedrag)
-    
-    @property
+        """Nog te factureren bedrag"""
+        return float((self.contract_bedrag or 0) - (self.gefactureerd_bedrag or 0))
+
+    @restant_bedrag.inplace.expression
+    @classmethod
+    def _restant_bedrag_expression(cls):
+        return func.coalesce(cls.contract_bedrag, 0) - func.coalesce(cls.gefactureerd_bedrag, 0)
+
+    @hybrid_property
     def is_actief(self) -> bool:
-        """Check if contract is active based on status and dates"""
-        try:
-            if self.status != ContractStatus.ACTIEF:
-                return False
-            
-            now = datetime.now(timezone.utc)
-            
-            if self.start_datum:
-                start = self.start_datum
-                if start.tzinfo is None:
-                    from datetime import timezone as dt_timezone
-                    start = datetime.combine(start, datetime.min.time()).replace(tzinfo=dt_timezone.utc)
-                else:
-                    start = datetime.combine(start, datetime.min.time()).replace(tzinfo=start.tzinfo)
-                
-                if start > now:
-                    return False
-            
-            if self.eind_datum:
-                eind = self.eind_datum
-                if eind.tzinfo is None:
-                    from datetime import timezone as dt_timezone
-                    eind = datetime.combine(eind, datetime.min.time()).replace(tzinfo=dt_timezone.utc)
-                else:
-                    eind = datetime.combine(eind, datetime.min.time()).replace(tzinfo=eind.tzinfo)
-                
-                if eind < now:
-                    return False
-            
-            return True
-        except Exception as e:
-            print(f"Warning in is_actief: {e}")
-            return self.status == ContractStatus.ACTIEF
+        """Status actief en vandaag binnen de looptijd (op de eind_datum is het contract afgelopen)"""
+        if self.status != ContractStatus.ACTIEF:
+            return False
+        vandaag = peildatum()
+        return (
+            (self.start_datum is None or self.start_datum <= vandaag)
+            and (self.eind_datum is None or self.eind_datum > vandaag)
+        )
+
+    @is_actief.inplace.expression
+    @classmethod
+    def _is_actief_expression(cls):
+        vandaag = peildatum()
+        return and_(
+            cls.status == ContractStatus.ACTIEF,
+            or_(cls.start_datum.is_(None), cls.start_datum <= vandaag),
+            or_(cls.eind_datum.is_(None), cls.eind_datum > vandaag),
+        )
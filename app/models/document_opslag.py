@@ -0,0 +1,37 @@
+"""
+DocumentBlob model - Content-addressed opslag van documentbestanden
+
+Elk uniek bestand (op basis van SHA-256 hash) wordt één keer opgeslagen.
+Meerdere ProjectFaseDocumenten kunnen naar dezelfde blob verwijzen;
+aantal_referenties houdt bij hoeveel dat er zijn.
+"""
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class DocumentBlob(Base):
+    """
+    DocumentBlob model
+
+    Eén fysiek bestand in de content-addressed store.
+    Het bestand wordt pas verwijderd als de laatste referentie verdwijnt.
+    """
+    __tablename__ = "document_blobs"
+
+    # Primary key = SHA-256 hash van de inhoud
+    content_hash = Column(String, primary_key=True)
+
+    # Bestand info
+    bestandsgrootte = Column(Integer, nullable=False)
+
+    # Reference counting
+    aantal_referenties = Column(Integer, default=1, nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DocumentBlob {self.content_hash[:12]} ({self.aantal_referenties} refs)>"
@@ -0,0 +1,44 @@
+"""
+Factuur model - grootboek van gefactureerde bedragen per contract
+
+Append-only: een factuur wordt nooit gewijzigd of verwijderd. Een correctie
+is een nieuwe boeking met een negatief bedrag (creditfactuur).
+Contract.gefactureerd_bedrag = beginsaldo + som van de boekingen.
+"""
+from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Date, Text, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class Factuur(Base):
+    """
+    Eén boeking op een contract
+    """
+    __tablename__ = "facturen"
+    __table_args__ = (
+        # Een factuurnummer komt per contract maar één keer voor (NULL mag vaker)
+        UniqueConstraint("contract_id", "factuurnummer", name="uq_facturen_contract_factuurnummer"),
+    )
+
+    # Primary key
+    id = Column(String, primary_key=True, index=True)
+
+    contract_id = Column(String, ForeignKey("contracts.id"), nullable=False, index=True)
+
+    factuurnummer = Column(String, nullable=True, index=True)
+    bedrag = Column(Numeric(12, 2), nullable=False)  # negatief = creditfactuur
+    factuur_datum = Column(Date, nullable=False, index=True)
+    omschrijving = Column(Text, nullable=True)
+
+    # Wie & wanneer geboekt
+    geboekt_door_id = Column(String, ForeignKey("users.id"), nullable=True)
+    geboekt_op = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Relationships
+    contract = relationship("Contract", foreign_keys=[contract_id])
+    geboekt_door = relationship("User", foreign_keys=[geboekt_door_id])
+
+    def __repr__(self):
+        return f"<Factuur {self.factuurnummer or self.id} {self.bedrag}>"
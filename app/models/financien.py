@@ -0,0 +1,72 @@
+"""
+Financiële totalen per project, per vestiging en van de contracten zonder project
+Worden bijgehouden door app/services/financien.py (niet met de hand wijzigen)
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Numeric
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class ProjectFinancien(Base):
+    """
+    Totalen van de contracten van één project
+    """
+    __tablename__ = "project_financien"
+
+    project_id = Column(String, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+
+    aantal_contracten = Column(Integer, default=0, nullable=False)
+    contract_totaal = Column(Numeric(14, 2), default=0, nullable=False)
+    gefactureerd_totaal = Column(Numeric(14, 2), default=0, nullable=False)
+
+    bijgewerkt_op = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ProjectFinancien {self.project_id}>"
+
+
+class VestigingFinancien(Base):
+    """
+    Totalen van een vestiging: projecten (budget) en hun contracten
+
+    Contracten zonder project tellen mee bij hun eigen vestiging_id.
+    """
+    __tablename__ = "vestiging_financien"
+
+    vestiging_id = Column(String, ForeignKey("vestigingen.id", ondelete="CASCADE"), primary_key=True)
+
+    aantal_projecten = Column(Integer, default=0, nullable=False)
+    budget_totaal = Column(Numeric(14, 2), default=0, nullable=False)
+    aantal_contracten = Column(Integer, default=0, nullable=False)
+    contract_totaal = Column(Numeric(14, 2), default=0, nullable=False)
+    gefactureerd_totaal = Column(Numeric(14, 2), default=0, nullable=False)
+
+    bijgewerkt_op = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<VestigingFinancien {self.vestiging_id}>"
+
+
+LOSSE_CONTRACTEN = "zonder_project"
+
+
+class LosseContractFinancien(Base):
+    """
+    Totalen van alle contracten zonder project (één rij: LOSSE_CONTRACTEN)
+
+    Die tellen niet mee in project_financien; het portfolio totaal telt ze
+    erbij op, ook als ze geen vestiging hebben.
+    """
+    __tablename__ = "losse_contract_financien"
+
+    sleutel = Column(String, primary_key=True, default=LOSSE_CONTRACTEN)
+
+    aantal_contracten = Column(Integer, default=0, nullable=False)
+    contract_totaal = Column(Numeric(14, 2), default=0, nullable=False)
+    gefactureerd_totaal = Column(Numeric(14, 2), default=0, nullable=False)
+
+    bijgewerkt_op = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<LosseContractFinancien {self.aantal_contracten} contracten>"
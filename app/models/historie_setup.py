@@ -1,14 +1,12 @@
 """
 Historie tracking setup - Event listeners voor automatische historie logging
 """
-from sqlalchemy import event
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from contextvars import ContextVar
 from typing import Optional
 import uuid
 
-from app.db.session import SessionLocal
 
 # Context variables voor tracking
 _user_id: ContextVar[Optional[str]] = ContextVar('user_id', default=None)
@@ -120,131 +118,34 @@ def should_track_model(obj) -> bool:
     return obj.__class__.__name__ in TRACKED_MODELS
 
 
-def create_historie_record(session: Session, obj, actie: str, oude_waarde: dict = None, nieuwe_waarde: dict = None):
+def schrijf_historie(db: Session, events: list) -> None:
     """
-    Maak een historie record
-    
-    Args:
-        session: SQLAlchemy session
-        obj: Het object dat gewijzigd is
-        actie: Type actie (INSERT, UPDATE, DELETE)
-        oude_waarde: Dict met oude waardes (voor UPDATE/DELETE)
-        nieuwe_waarde: Dict met nieuwe waardes (voor INSERT/UPDATE)
-    """
-    # ✅ CHECK: Is historie tracking disabled?
-    if session.info.get('disable_historie', False):
-        return
-    
-    from app.models.historie import Historie
-    
-    # Get context info
-    user_id = HistorieContext.get_user_id()
-    opmerking = HistorieContext.get_opmerking()
-    
-    # Bepaal tabel en record info
-    tabel_naam = obj.__class__.__tablename__
-    record_id = str(obj.id) if hasattr(obj, 'id') else None
-    
-    # Maak historie record
-    historie = Historie(
-        id=str(uuid.uuid4()),
-        tabel_naam=tabel_naam,
-        record_id=record_id,
-        actie=actie,
-        oude_waarde=oude_waarde,
-        nieuwe_waarde=nieuwe_waarde,
-        uitgevoerd_door_id=user_id,
-        uitgevoerd_op=datetime.now(timezone.utc),
-        opmerking=opmerking
-    )
-    
-    session.add(historie)
+    Event abonnee: schrijf een HistorieRecord per OutboxEvent (één executemany)
 
-
-@event.listens_for(Session, "before_flush")
-def before_flush(session, flush_context, instances):
-    """
-    Track changes before flush
+    Bij een update bevat data_diff per gewijzigd veld de oude en nieuwe waarde.
     """
-    # ✅ CHECK: Is historie tracking disabled?
-    if session.info.get('disable_historie', False):
-        return
-    
-    # Track nieuwe objecten (INSERT)
-    for obj in session.new:
-        if should_track_model(obj):
-            # Sla object state op voor after_flush
-            if not hasattr(session, '_historie_inserts'):
-                session._historie_inserts = []
-            session._historie_inserts.append(obj)
-    
-    # Track gewijzigde objecten (UPDATE)
-    for obj in session.dirty:
-        if should_track_model(obj):
-            if not hasattr(session, '_historie_updates'):
-                session._historie_updates = []
-            
-            # Get oude waardes
-            from sqlalchemy import inspect as sqla_inspect
-            oude_waarde = {}
-
-            # Get the old value of updated_at if it changed
-            insp = sqla_inspect(obj)
-            if 'updated_at' in insp.attrs:
-                hist = insp.attrs.updated_at.history
-                if hist.has_changes() and hist.deleted:
-                    oude_waarde['updated_at'] = str(hist.deleted[0]) if hist.deleted[0] else None
-
-            session._historie_updates.append((obj, oude_waarde))
-    
-    # Track verwijderde objecten (DELETE)
-    for obj in session.deleted:
-        if should_track_model(obj):
-            if not hasattr(session, '_historie_deletes'):
-                session._historie_deletes = []
-            session._historie_deletes.append(obj)
-
-
-@event.listens_for(Session, "after_flush")
-def after_flush(session, flush_context):
-    """
-    Create historie records after flush
-    """
-    # ✅ CHECK: Is historie tracking disabled?
-    if session.info.get('disable_historie', False):
-        return
-    
-    try:
-        # Process INSERTs
-        if hasattr(session, '_historie_inserts'):
-            for obj in session._historie_inserts:
-                nieuwe_waarde = {
-                    'id': str(obj.id) if hasattr(obj, 'id') else None
-                }
-                create_historie_record(session, obj, 'INSERT', nieuwe_waarde=nieuwe_waarde)
-            delattr(session, '_historie_inserts')
-        
-        # Process UPDATEs
-        if hasattr(session, '_historie_updates'):
-            for obj, oude_waarde in session._historie_updates:
-                nieuwe_waarde = {
-                    'updated_at': str(obj.updated_at) if hasattr(obj, 'updated_at') else None
-                }
-                create_historie_record(session, obj, 'UPDATE', oude_waarde=oude_waarde, nieuwe_waarde=nieuwe_waarde)
-            delattr(session, '_historie_updates')
-        
-        # Process DELETEs
-        if hasattr(session, '_historie_deletes'):
-            for obj in session._historie_deletes:
-                oude_waarde = {
-                    'id': str(obj.id) if hasattr(obj, 'id') else None
-                }
-                create_historie_record(session, obj, 'DELETE', oude_waarde=oude_waarde)
-            delattr(session, '_historie_deletes')
-    
-    except Exception as e:
-        # Log error maar laat operatie niet falen
-        print(f"⚠️  Historie tracking error: {e}")
+    import json
+    from app.models.historie import HistorieRecord
+
+    db.execute(HistorieRecord.__table__.insert(), [
+        {
+            "id": str(uuid.uuid4()),
+            "tabel_naam": ev.tabel_naam,
+            "record_id": ev.record_id,
+            "versie_nummer": ev.versie_nummer or 1,
+            "actie": ev.actie,
+            "data_voor": json.dumps(ev.data_voor) if ev.data_voor else None,
+            "data_na": json.dumps(ev.data_na) if ev.data_na else None,
+            "data_diff": {
+                veld: {"oud": (ev.data_voor or {}).get(veld), "nieuw": nieuw}
+                for veld, nieuw in ev.data_na.items()
+            } if ev.actie == "update" and ev.data_na else None,
+            "gewijzigd_door_id": ev.gewijzigd_door_id,
+            "gewijzigd_op": ev.aangemaakt_op or datetime.now(timezone.utc),
+            "opmerking": ev.opmerking,
+        }
+        for ev in events
+    ])
 
 
 # Setup event listeners
@@ -252,8 +153,13 @@ def setup_historie_listeners():
     """
     Setup historie event listeners
 
-    Dit wordt aangeroepen bij startup
+    Dit wordt aangeroepen bij startup. De wijzigingen komen als events uit de
+    outbox (app/services/events.py); de historie is daar een abonnee van.
     """
+    from app.services.events import abonneer, setup_event_listeners
+
+    setup_event_listeners()
+    abonneer("historie", schrijf_historie)
     print("✅ Historie tracking event listeners geregistreerd")
     print("   - User")
     print("   - Project")
@@ -0,0 +1,75 @@
+"""
+Job models - achtergrondtaken en hun schema's (zie app/services/jobs.py)
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Boolean, Index
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+JOB_WACHTRIJ = "wachtrij"
+JOB_BEZIG = "bezig"
+JOB_KLAAR = "klaar"
+JOB_MISLUKT = "mislukt"
+
+
+class Job(Base):
+    """
+    Eén uitvoering van een geregistreerde taak
+
+    Een worker claimt een job door de status van wachtrij naar bezig te
+    zetten (conditionele UPDATE); mislukt de taak, dan gaat de job terug in
+    de wachtrij met uitvoeren_op in de toekomst (backoff), tot max_pogingen.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers zoeken de eerstvolgende job in de wachtrij
+        Index("ix_jobs_status_uitvoeren_op", "status", "uitvoeren_op"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+
+    soort = Column(String, nullable=False, index=True)  # naam van de geregistreerde taak
+    parameters = Column(JSON, nullable=True)
+    schema_naam = Column(String, nullable=True, index=True)  # ingepland door een schema
+
+    status = Column(String, nullable=False, default=JOB_WACHTRIJ)
+    pogingen = Column(Integer, nullable=False, default=0)
+    max_pogingen = Column(Integer, nullable=False, default=3)
+    uitvoeren_op = Column(DateTime(timezone=True), nullable=False)
+
+    resultaat = Column(JSON, nullable=True)
+    fout = Column(Text, nullable=True)
+    worker = Column(String, nullable=True)
+
+    aangemaakt_door_id = Column(String, nullable=True)
+    aangemaakt_op = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    gestart_op = Column(DateTime(timezone=True), nullable=True)
+    klaar_op = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.soort} {self.status}>"
+
+
+class JobSchema(Base):
+    """
+    Terugkerende taak met een cron expressie (UTC)
+
+    Wordt bij het opstarten aangemaakt vanuit de registratie; cron en actief
+    kunnen daarna via /jobs/schemas aangepast worden.
+    """
+    __tablename__ = "job_schemas"
+
+    naam = Column(String, primary_key=True)
+    soort = Column(String, nullable=False)
+    cron = Column(String, nullable=False)  # "minuut uur dag maand weekdag"
+    parameters = Column(JSON, nullable=True)
+    actief = Column(Boolean, nullable=False, default=True)
+
+    volgende_run = Column(DateTime(timezone=True), nullable=True)
+    laatste_run = Column(DateTime(timezone=True), nullable=True)
+    laatste_job_id = Column(String, nullable=True)
+
+    bijgewerkt_op = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<JobSchema {self.naam} '{self.cron}'>"
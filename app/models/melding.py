@@ -0,0 +1,32 @@
+"""
+Verstuurde meldingen - voorkomt dat een digest dezelfde deadline of review
+steeds opnieuw meldt
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class VerstuurdeMelding(Base):
+    """
+    Eén item dat in een digest aan een user gemeld is
+
+    De sleutel bevat wat het item opnieuw meldenswaardig maakt, bijv.
+    "deadline:<fase_id>:hoog:2024-03-01" of "review:<fase_id>:<versie>".
+    """
+    __tablename__ = "verstuurde_meldingen"
+    __table_args__ = (
+        UniqueConstraint("user_id", "sleutel", name="uq_verstuurde_melding"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    sleutel = Column(String, nullable=False)
+    kanaal = Column(String, nullable=False)
+
+    verstuurd_op = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<VerstuurdeMelding {self.user_id} {self.sleutel}>"
@@ -0,0 +1,56 @@
+"""
+Outbox - domain events van wijzigingen, in dezelfde transactie geschreven
+Worden na de commit afgeleverd door app/services/events.py
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class OutboxEvent(Base):
+    """
+    Eén wijziging (create/update/delete) van een record
+
+    Bij een update bevatten data_voor/data_na alleen de gewijzigde velden.
+    """
+    __tablename__ = "outbox_events"
+    # Zonder AUTOINCREMENT hergebruikt SQLite ids na het opruimen van de outbox
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    # Oplopend: abonnees onthouden tot welk event ze verwerkt hebben
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    tabel_naam = Column(String, nullable=False, index=True)
+    record_id = Column(String, nullable=False)
+    actie = Column(String, nullable=False)  # "create", "update", "delete"
+    versie_nummer = Column(Integer, nullable=True)
+
+    data_voor = Column(JSON, nullable=True)
+    data_na = Column(JSON, nullable=True)
+
+    gewijzigd_door_id = Column(String, nullable=True)
+    opmerking = Column(Text, nullable=True)
+    aangemaakt_op = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<OutboxEvent {self.id} {self.actie} {self.tabel_naam}:{self.record_id}>"
+
+
+class EventAbonnee(Base):
+    """
+    Voortgang van een abonnee: laatst verwerkte event en retry status
+    """
+    __tablename__ = "event_abonnees"
+
+    naam = Column(String, primary_key=True)
+
+    laatste_event_id = Column(Integer, default=0, nullable=False)
+    pogingen = Column(Integer, default=0, nullable=False)
+    volgende_poging = Column(DateTime(timezone=True), nullable=True)
+    laatste_fout = Column(Text, nullable=True)
+
+    bijgewerkt_op = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<EventAbonnee {self.naam} @{self.laatste_event_id}>"
@@ -75,6 +75,7 @@ class ProcesTemplate(Base):
 
     # Versiebeheer
     versie_nummer = Column(Integer, default=1, nullable=False)
+    __mapper_args__ = {"version_id_col": versie_nummer}
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -134,6 +135,7 @@ class TemplateStap(Base):
 
     # Versiebeheer
     versie_nummer = Column(Integer, default=1, nullable=False)
+    __mapper_args__ = {"version_id_col": versie_nummer}
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -182,6 +184,7 @@ class TemplateDocumentSjabloon(Base):
 
     # Versiebeheer
     versie_nummer = Column(Integer, default=1, nullable=False)
+    __mapper_args__ = {"version_id_col": versie_nummer}
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -56,6 +56,7 @@ class Project(Base):
     
     # Versiebeheer
     versie_nummer = Column(Integer, default=1, nullable=False)
+    __mapper_args__ = {"version_id_col": versie_nummer}
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
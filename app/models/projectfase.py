@@ -73,7 +73,7 @@ class ProjectFase(Base):
     fase_nummer = Column(Integer, nullable=False)
     naam = Column(String, nullable=False)
     beschrijving = Column(Text, nullable=True)
-    status = Column(SQLEnum(ProjectFaseStatus), default=ProjectFaseStatus.NIET_GESTART, nullable=False)
+    status = Column(SQLEnum(ProjectFaseStatus), default=ProjectFaseStatus.NIET_GESTART, nullable=False, index=True)
     
     # Verantwoordelijke
     verantwoordelijke_id = Column(String, ForeignKey('users.id'), nullable=True, index=True)
@@ -83,7 +83,7 @@ class ProjectFase(Base):
     
     # Datums
     geplande_start_datum = Column(DateTime(timezone=True), nullable=True)
-    geplande_eind_datum = Column(DateTime(timezone=True), nullable=True)
+    geplande_eind_datum = Column(DateTime(timezone=True), nullable=True, index=True)  # range scan digest
     werkelijke_start_datum = Column(DateTime(timezone=True), nullable=True)
     werkelijke_eind_datum = Column(DateTime(timezone=True), nullable=True)
     
@@ -98,6 +98,7 @@ class ProjectFase(Base):
     
     # Versiebeheer
     versie_nummer = Column(Integer, default=1, nullable=False)
+    __mapper_args__ = {"version_id_col": versie_nummer}
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -150,6 +151,13 @@ class ProjectFaseDocument(Base):
     opslag_type = Column(String, nullable=False, default="local")
     opslag_pad = Column(String, nullable=False)
     sharepoint_id = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True, index=True)  # SHA-256 van de inhoud
+    
+    # Preview (thumbnail / eerste pagina), in dezelfde opslag als het origineel
+    preview_status = Column(String, nullable=True)  # wachtrij, klaar, mislukt
+    preview_opslag_pad = Column(String, nullable=True)
+    preview_content_hash = Column(String, nullable=True)
+    preview_bestandstype = Column(String, nullable=True)
     
     # Versie beheer
     versie = Column(String, nullable=False, default="1.0")
@@ -168,6 +176,7 @@ class ProjectFaseDocument(Base):
     
     # Versiebeheer
     versie_nummer = Column(Integer, default=1, nullable=False)
+    __mapper_args__ = {"version_id_col": versie_nummer}
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -223,7 +232,7 @@ class ProjectFaseCommentaar(Base):
     leverancier_id = Column(String, ForeignKey('leveranciers.id'), nullable=True, index=True)
     
     # Reactie op ander commentaar? (threading)
-    parent_commentaar_id = Column(String, ForeignKey('project_fase_commentaren.id'), nullable=True)
+    parent_commentaar_id = Column(String, ForeignKey('project_fase_commentaren.id'), nullable=True, index=True)
     
     # Timestamps
     gepubliceerd_op = Column(DateTime(timezone=True), nullable=True)
@@ -237,6 +246,7 @@ class ProjectFaseCommentaar(Base):
     
     # Versiebeheer
     versie_nummer = Column(Integer, default=1, nullable=False)
+    __mapper_args__ = {"version_id_col": versie_nummer}
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,40 @@
+"""
+Request en response schemas voor de bulk endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+
+class BulkRequest(BaseModel):
+    """
+    Bulk create/update: één object per item
+
+    De items worden per stuk gevalideerd (zelfde velden als de gewone
+    create/update endpoints; bij update ook 'id'), zodat fouten per item
+    teruggemeld kunnen worden.
+    """
+    items: List[Dict[str, Any]] = Field(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class BulkDeleteRequest(BaseModel):
+    """Bulk delete: lijst van ids"""
+    ids: List[str] = Field(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class BulkItemResultaat(BaseModel):
+    """Resultaat van één item"""
+    index: int
+    id: Optional[str] = None
+    status: str  # aangemaakt, bijgewerkt, verwijderd, fout, overgeslagen
+    fouten: List[str] = Field(default_factory=list)
+
+
+class BulkResponse(BaseModel):
+    """Response van een bulk endpoint"""
+    success: bool
+    totaal: int
+    geslaagd: int
+    mislukt: int
+    resultaten: List[BulkItemResultaat]
@@ -0,0 +1,57 @@
+"""
+Gedeelde response schemas (paginatie, adres)
+"""
+from pydantic import BaseModel
+from typing import Optional
+
+
+class Pagination(BaseModel):
+    """Paginatie info bij lijst responses"""
+    current_page: int
+    per_page: int
+    total: int
+    total_pages: int
+    has_next: bool
+    has_prev: bool
+
+    @classmethod
+    def maak(cls, page: int, limit: int, total: int) -> "Pagination":
+        return cls(
+            current_page=page,
+            per_page=limit,
+            total=total,
+            total_pages=max(1, (total + limit - 1) // limit),
+            has_next=page * limit < total,
+            has_prev=page > 1,
+        )
+
+
+class Adres(BaseModel):
+    """Adres van een leverancier of vestiging"""
+    straat: Optional[str] = None
+    huisnummer: Optional[str] = None
+    postcode: Optional[str] = None
+    plaats: Optional[str] = None
+    land: Optional[str] = None
+    volledig: Optional[str] = None
+
+    @classmethod
+    def van_model(cls, obj) -> "Adres":
+        return cls(
+            straat=obj.adres_straat,
+            huisnummer=obj.adres_huisnummer,
+            postcode=obj.adres_postcode,
+            plaats=obj.adres_plaats,
+            land=obj.adres_land,
+            volledig=obj.volledig_adres,
+        )
+
+
+class UserRef(BaseModel):
+    """Verwijzing naar een gebruiker (projectleider, verantwoordelijke)"""
+    id: str
+    name: str
+    email: str
+
+    class Config:
+        from_attributes = True
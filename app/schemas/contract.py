@@ -0,0 +1,236 @@
+"""
+Request en response schemas voor contracten
+"""
+from decimal import Decimal
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional
+from datetime import date, datetime
+
+from app.models.contract import Contract, ContractStatus, ContractType
+from app.models.user import UserRole
+from app.schemas.common import Pagination, UserRef
+
+
+# Numeric(12, 2) in de database
+Bedrag = Annotated[Decimal, Field(max_digits=12, decimal_places=2)]
+
+
+# ===== Request Schemas =====
+
+class ContractCreate(BaseModel):
+    """Schema for creating a contract"""
+    contract_nummer: str = Field(min_length=1)
+    naam: str = Field(min_length=1)
+    beschrijving: Optional[str] = None
+    type: ContractType
+    status: ContractStatus = ContractStatus.CONCEPT
+    leverancier_id: str = Field(min_length=1)
+    contract_bedrag: Bedrag = Field(gt=0)
+    gefactureerd_bedrag: Bedrag = Decimal(0)  # beginsaldo; daarna via facturen
+    start_datum: Optional[date] = None
+    eind_datum: Optional[date] = None
+    project_id: Optional[str] = None
+    verantwoordelijke_id: str = Field(min_length=1)
+
+
+class ContractUpdate(BaseModel):
+    """
+    Schema for updating a contract (alleen meegestuurde velden)
+
+    gefactureerd_bedrag staat hier bewust niet in: dat wijzigt alleen door
+    facturen te boeken (POST /contracts/{id}/facturen).
+    """
+    contract_nummer: Optional[str] = None
+    naam: Optional[str] = None
+    beschrijving: Optional[str] = None
+    type: Optional[ContractType] = None
+    status: Optional[ContractStatus] = None
+    leverancier_id: Optional[str] = None
+    contract_bedrag: Optional[Bedrag] = None
+    start_datum: Optional[date] = None
+    eind_datum: Optional[date] = None
+    getekend_datum: Optional[date] = None
+    goedgekeurd_door_id: Optional[str] = None
+    goedkeurings_datum: Optional[datetime] = None
+    opmerkingen: Optional[str] = None
+    project_id: Optional[str] = None
+    verantwoordelijke_id: Optional[str] = None
+    vestiging_id: Optional[str] = None
+
+
+# ===== Response Schemas =====
+
+class ContractSamenvatting(BaseModel):
+    """Kern van een contract in create/update/delete responses"""
+    id: str
+    contract_nummer: str
+    naam: str
+    status: Optional[ContractStatus] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ContractMutatieResponse(BaseModel):
+    success: bool = True
+    data: ContractSamenvatting
+    message: str
+    versie: Optional[int] = None
+
+
+class ContractLeverancierRef(BaseModel):
+    id: str
+    naam: str
+    kvk_nummer: Optional[str] = None
+    contactpersoon: Optional[str] = None
+    email: Optional[str] = None
+    telefoon: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ContractLeverancierId(BaseModel):
+    leverancier_id: str
+
+
+class ContractProjectRef(BaseModel):
+    id: str
+    naam: str
+    project_nummer: str
+
+    class Config:
+        from_attributes = True
+
+
+class VerantwoordelijkeRef(UserRef):
+    role: UserRole
+
+
+class GoedgekeurdDoorRef(BaseModel):
+    id: str
+    name: str
+
+    class Config:
+        from_attributes = True
+
+
+class ContractGoedkeuring(BaseModel):
+    goedgekeurd_door: Optional[GoedgekeurdDoorRef] = None
+    datum: Optional[datetime] = None
+
+
+class ContractBedragen(BaseModel):
+    contract: float
+    gefactureerd: float
+    restant: float
+    percentage: float
+
+    @classmethod
+    def van_model(cls, c: Contract) -> "ContractBedragen":
+        return cls(
+            contract=float(c.contract_bedrag or 0),
+            gefactureerd=float(c.gefactureerd_bedrag or 0),
+            restant=c.restant_bedrag,
+            percentage=c.gefactureerd_percentage,
+        )
+
+
+class ContractResponse(BaseModel):
+    """Contract in een lijst"""
+    id: str
+    contract_nummer: str
+    naam: str
+    beschrijving: Optional[str] = None
+    type: Optional[ContractType] = None
+    status: ContractStatus = ContractStatus.CONCEPT
+    leverancier: Optional[ContractLeverancierRef] = None
+    bedragen: ContractBedragen
+    start_datum: Optional[date] = None
+    eind_datum: Optional[date] = None
+    getekend_datum: Optional[date] = None
+    is_actief: bool
+    project: Optional[ContractProjectRef] = None
+    verantwoordelijke: Optional[UserRef] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def van_model(cls, c: Contract) -> "ContractResponse":
+        return cls(
+            id=c.id,
+            contract_nummer=c.contract_nummer,
+            naam=c.naam,
+            beschrijving=c.beschrijving,
+            type=c.type,
+            status=c.status or ContractStatus.CONCEPT,
+            leverancier=ContractLeverancierRef.model_validate(c.leverancier) if c.leverancier else None,
+            bedragen=ContractBedragen.van_model(c),
+            start_datum=c.start_datum,
+            eind_datum=c.eind_datum,
+            getekend_datum=c.getekend_datum,
+            is_actief=c.is_actief,
+            project=ContractProjectRef.model_validate(c.project) if c.project else None,
+            verantwoordelijke=UserRef.model_validate(c.verantwoordelijke) if c.verantwoordelijke else None,
+            created_at=c.created_at,
+            updated_at=c.updated_at,
+        )
+
+
+class ContractDetail(BaseModel):
+    """Contract detail (met goedkeuring)"""
+    id: str
+    contract_nummer: str
+    naam: str
+    beschrijving: Optional[str] = None
+    type: Optional[ContractType] = None
+    status: ContractStatus = ContractStatus.CONCEPT
+    leverancier: ContractLeverancierId
+    bedragen: ContractBedragen
+    start_datum: Optional[date] = None
+    eind_datum: Optional[date] = None
+    getekend_datum: Optional[date] = None
+    is_actief: bool
+    goedkeuring: ContractGoedkeuring
+    project: Optional[ContractProjectRef] = None
+    verantwoordelijke: Optional[VerantwoordelijkeRef] = None
+    versie: int = 1  # voor If-Match bij PATCH
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def van_model(cls, c: Contract) -> "ContractDetail":
+        return cls(
+            id=c.id,
+            contract_nummer=c.contract_nummer,
+            naam=c.naam,
+            beschrijving=c.beschrijving,
+            type=c.type,
+            status=c.status or ContractStatus.CONCEPT,
+            leverancier=ContractLeverancierId(leverancier_id=c.leverancier_id),
+            bedragen=ContractBedragen.van_model(c),
+            start_datum=c.start_datum,
+            eind_datum=c.eind_datum,
+            getekend_datum=c.getekend_datum,
+            is_actief=c.is_actief,
+            goedkeuring=ContractGoedkeuring(
+                goedgekeurd_door=GoedgekeurdDoorRef.model_validate(c.goedgekeurd_door) if c.goedgekeurd_door else None,
+                datum=c.goedkeurings_datum,
+            ),
+            project=ContractProjectRef.model_validate(c.project) if c.project else None,
+            verantwoordelijke=VerantwoordelijkeRef.model_validate(c.verantwoordelijke) if c.verantwoordelijke else None,
+            versie=c.versie_nummer,
+            created_at=c.created_at,
+            updated_at=c.updated_at,
+        )
+
+
+class ContractListResponse(BaseModel):
+    success: bool = True
+    data: List[ContractResponse]
+    pagination: Pagination
+
+
+class ContractDetailResponse(BaseModel):
+    success: bool = True
+    data: ContractDetail
@@ -0,0 +1,76 @@
+"""
+Request en response schemas voor het factuur grootboek
+"""
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.schemas.common import Pagination
+from app.schemas.contract import Bedrag
+
+Periode = Literal["maand", "kwartaal", "jaar"]
+
+
+class FactuurCreate(BaseModel):
+    """Boek een factuur op een contract (negatief bedrag = creditfactuur)"""
+    factuurnummer: Optional[str] = Field(default=None, max_length=100)
+    bedrag: Bedrag
+    factuur_datum: date
+    omschrijving: Optional[str] = None
+
+    @field_validator("bedrag")
+    @classmethod
+    def niet_nul(cls, bedrag):
+        if bedrag == 0:
+            raise ValueError("bedrag mag niet 0 zijn")
+        return bedrag
+
+
+class FactuurBoeking(FactuurCreate):
+    """Eén item van POST /facturen/bulk"""
+    contract_id: str = Field(min_length=1)
+
+
+class FactuurResponse(BaseModel):
+    id: str
+    contract_id: str
+    factuurnummer: Optional[str] = None
+    bedrag: float
+    factuur_datum: date
+    omschrijving: Optional[str] = None
+    geboekt_door_id: Optional[str] = None
+    geboekt_op: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class FactuurListResponse(BaseModel):
+    success: bool = True
+    data: List[FactuurResponse]
+    gefactureerd_bedrag: float  # stand van het contract (beginsaldo + boekingen)
+    pagination: Pagination
+
+
+class FactuurMutatieResponse(BaseModel):
+    success: bool = True
+    message: str
+    data: FactuurResponse
+    gefactureerd_bedrag: float  # nieuwe stand van het contract
+
+
+class PeriodeTotaal(BaseModel):
+    """Boekingen in één periode, bijv. '2024-03', '2024-K1' of '2024'"""
+    periode: str
+    aantal: int
+    gefactureerd: float  # som van de facturen
+    gecrediteerd: float  # som van de creditfacturen (negatief)
+    totaal: float
+
+
+class FactuurPeriodenResponse(BaseModel):
+    success: bool = True
+    periode: Periode
+    data: List[PeriodeTotaal]
+    totaal: float
@@ -0,0 +1,66 @@
+"""
+Response schemas voor de financiële totalen (project detail, portfolio)
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+
+from app.models.project import ProjectStatus
+
+
+class Financien(BaseModel):
+    """Gecontracteerd en gefactureerd t.o.v. het budget"""
+    aantal_contracten: int = 0
+    contract_totaal: float = 0.0
+    gefactureerd: float = 0.0
+    restant: float = 0.0  # gecontracteerd, nog niet gefactureerd
+    budget_totaal: float = 0.0
+    budget_vrij: float = 0.0  # budget dat nog niet gecontracteerd is
+    budget_benut_percentage: float = 0.0  # gefactureerd t.o.v. budget
+
+    @staticmethod
+    def velden(budget_totaal, aantal_contracten, contract_totaal, gefactureerd) -> dict:
+        budget = float(budget_totaal or 0)
+        contract = float(contract_totaal or 0)
+        gefactureerd = float(gefactureerd or 0)
+        return dict(
+            aantal_contracten=aantal_contracten or 0,
+            contract_totaal=contract,
+            gefactureerd=gefactureerd,
+            restant=contract - gefactureerd,
+            budget_totaal=budget,
+            budget_vrij=budget - contract,
+            budget_benut_percentage=round(gefactureerd / budget * 100, 2) if budget else 0.0,
+        )
+
+    @classmethod
+    def bereken(cls, budget_totaal, aantal_contracten, contract_totaal, gefactureerd) -> "Financien":
+        return cls(**cls.velden(budget_totaal, aantal_contracten, contract_totaal, gefactureerd))
+
+
+class ProjectPortfolio(Financien):
+    project_id: str
+    project_nummer: str
+    naam: str
+    status: ProjectStatus
+
+
+class VestigingPortfolio(Financien):
+    vestiging_id: str
+    naam: str
+    code: str
+    aantal_projecten: int = 0
+
+
+class PortfolioTotaal(Financien):
+    aantal_projecten: int = 0
+
+
+class Portfolio(BaseModel):
+    totaal: PortfolioTotaal
+    vestigingen: List[VestigingPortfolio]
+    projecten: Optional[List[ProjectPortfolio]] = None  # alleen met vestiging_id
+
+
+class PortfolioResponse(BaseModel):
+    success: bool = True
+    data: Portfolio
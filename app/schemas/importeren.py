@@ -0,0 +1,32 @@
+"""
+Response schemas voor de import endpoints
+"""
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+
+
+class ImportFoutRegel(BaseModel):
+    """Afgekeurde rij (rijnummer zoals in het bestand, kop = rij 1)"""
+    rij: int
+    fouten: List[str]
+
+
+class ImportJobResponse(BaseModel):
+    """Status en voortgang van een import"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    soort: str
+    bestandsnaam: str
+    status: str  # wachtrij, bezig, klaar, mislukt
+    totaal_rijen: Optional[int] = None
+    rijen_verwerkt: int
+    aangemaakt: int
+    bijgewerkt: int
+    aantal_fouten: int
+    fouten: List[ImportFoutRegel]  # eerste 100
+    melding: Optional[str] = None
+    aangemaakt_op: datetime
+    gestart_op: Optional[datetime] = None
+    klaar_op: Optional[datetime] = None
@@ -0,0 +1,67 @@
+"""
+Request en response schemas voor achtergrondtaken
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.common import Pagination
+
+
+class JobCreate(BaseModel):
+    """Plan een geregistreerde taak in"""
+    soort: str = Field(min_length=1)
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+    uitvoeren_op: Optional[datetime] = None  # leeg = zo snel mogelijk
+
+
+class JobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    soort: str
+    parameters: Optional[Dict[str, Any]] = None
+    schema_naam: Optional[str] = None
+    status: str  # wachtrij, bezig, klaar, mislukt
+    pogingen: int
+    max_pogingen: int
+    uitvoeren_op: datetime
+    resultaat: Optional[Dict[str, Any]] = None
+    fout: Optional[str] = None
+    aangemaakt_door_id: Optional[str] = None
+    aangemaakt_op: Optional[datetime] = None
+    gestart_op: Optional[datetime] = None
+    klaar_op: Optional[datetime] = None
+
+
+class JobListResponse(BaseModel):
+    success: bool = True
+    data: List[JobResponse]
+    pagination: Pagination
+
+
+class TaakResponse(BaseModel):
+    """Een geregistreerde taak"""
+    naam: str
+    omschrijving: str
+    max_pogingen: int
+    cron: Optional[str] = None  # standaard schema
+
+
+class JobSchemaResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    naam: str
+    soort: str
+    cron: str
+    parameters: Optional[Dict[str, Any]] = None
+    actief: bool
+    volgende_run: Optional[datetime] = None
+    laatste_run: Optional[datetime] = None
+    laatste_job_id: Optional[str] = None
+
+
+class JobSchemaUpdate(BaseModel):
+    cron: Optional[str] = None
+    actief: Optional[bool] = None
@@ -0,0 +1,146 @@
+"""
+Request en response schemas voor leveranciers
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+from app.models.leverancier import Leverancier, LeverancierStatus, LeverancierType
+from app.schemas.common import Adres, Pagination
+
+
+# ===== Request Schemas =====
+
+class LeverancierCreate(BaseModel):
+    """Schema for creating a leverancier"""
+    naam: str = Field(min_length=1)
+    kvk_nummer: Optional[str] = None
+    btw_nummer: Optional[str] = None
+    type: LeverancierType
+    status: LeverancierStatus = LeverancierStatus.ACTIEF
+    contactpersoon: Optional[str] = None
+    email: Optional[str] = None
+    telefoon: Optional[str] = None
+    mobiel: Optional[str] = None
+    website: Optional[str] = None
+    adres_straat: Optional[str] = None
+    adres_huisnummer: Optional[str] = None
+    adres_postcode: Optional[str] = None
+    adres_plaats: Optional[str] = None
+    adres_land: Optional[str] = "Nederland"
+    iban: Optional[str] = None
+    bank_naam: Optional[str] = None
+    notities: Optional[str] = None
+
+
+class LeverancierUpdate(BaseModel):
+    """Schema for updating a leverancier (alleen meegestuurde velden)"""
+    naam: Optional[str] = None
+    kvk_nummer: Optional[str] = None
+    btw_nummer: Optional[str] = None
+    type: Optional[LeverancierType] = None
+    status: Optional[LeverancierStatus] = None
+    contactpersoon: Optional[str] = None
+    email: Optional[str] = None
+    telefoon: Optional[str] = None
+    mobiel: Optional[str] = None
+    website: Optional[str] = None
+    adres_straat: Optional[str] = None
+    adres_huisnummer: Optional[str] = None
+    adres_postcode: Optional[str] = None
+    adres_plaats: Optional[str] = None
+    adres_land: Optional[str] = None
+    iban: Optional[str] = None
+    bank_naam: Optional[str] = None
+    notities: Optional[str] = None
+    rating: Optional[float] = None
+
+
+# ===== Response Schemas =====
+
+class LeverancierSamenvatting(BaseModel):
+    """Kern van een leverancier in create/update/delete responses"""
+    id: str
+    naam: str
+    status: Optional[LeverancierStatus] = None
+
+    class Config:
+        from_attributes = True
+
+
+class LeverancierMutatieResponse(BaseModel):
+    success: bool = True
+    data: LeverancierSamenvatting
+    message: str
+    versie: Optional[int] = None
+
+
+class LeverancierBank(BaseModel):
+    iban: Optional[str] = None
+    naam: Optional[str] = None
+
+
+class LeverancierResponse(BaseModel):
+    """Leverancier in een lijst"""
+    id: str
+    naam: str
+    kvk_nummer: Optional[str] = None
+    btw_nummer: Optional[str] = None
+    type: Optional[LeverancierType] = None
+    status: LeverancierStatus = LeverancierStatus.ACTIEF
+    contactpersoon: Optional[str] = None
+    email: Optional[str] = None
+    telefoon: Optional[str] = None
+    mobiel: Optional[str] = None
+    website: Optional[str] = None
+    adres: Adres
+    bank: LeverancierBank
+    is_actief: bool
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def velden(cls, l: Leverancier) -> dict:
+        return dict(
+            id=l.id,
+            naam=l.naam,
+            kvk_nummer=l.kvk_nummer,
+            btw_nummer=l.btw_nummer,
+            type=l.type,
+            status=l.status or LeverancierStatus.ACTIEF,
+            contactpersoon=l.contactpersoon,
+            email=l.email,
+            telefoon=l.telefoon,
+            mobiel=l.mobiel,
+            website=l.website,
+            adres=Adres.van_model(l),
+            bank=LeverancierBank(iban=l.iban, naam=l.bank_naam),
+            is_actief=l.is_actief,
+            created_at=l.created_at,
+            updated_at=l.updated_at,
+        )
+
+    @classmethod
+    def van_model(cls, l: Leverancier) -> "LeverancierResponse":
+        return cls(**cls.velden(l))
+
+
+class LeverancierDetail(LeverancierResponse):
+    """Leverancier detail (met notities en versie voor If-Match)"""
+    notities: Optional[str] = None
+    versie: int = 1
+
+    @classmethod
+    def van_model(cls, l: Leverancier) -> "LeverancierDetail":
+        return cls(**cls.velden(l), notities=l.notities, versie=l.versie_nummer)
+
+
+class LeverancierListResponse(BaseModel):
+    success: bool = True
+    data: List[LeverancierResponse]
+    pagination: Pagination
+
+
+class LeverancierDetailResponse(BaseModel):
+    success: bool = True
+    data: LeverancierDetail
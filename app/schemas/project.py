@@ -0,0 +1,153 @@
+"""
+Request en response schemas voor projecten
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+from app.models.project import Project, ProjectStatus
+from app.models.user import UserRole
+from app.schemas.common import Pagination, UserRef
+from app.schemas.financien import Financien
+
+
+# ===== Request Schemas =====
+
+class ProjectCreate(BaseModel):
+    """Schema for creating a project"""
+    project_nummer: str = Field(min_length=1)
+    naam: str = Field(min_length=1)
+    beschrijving: Optional[str] = None
+    status: ProjectStatus = ProjectStatus.CONCEPT
+    budget_totaal: int = Field(gt=0)
+    budget_besteed: int = 0
+    start_datum: Optional[datetime] = None
+    eind_datum: Optional[datetime] = None
+    projectleider_id: str = Field(min_length=1)
+    template_id: Optional[str] = None
+    vestiging_id: Optional[str] = None
+
+
+class ProjectUpdate(BaseModel):
+    """Schema for updating a project (alleen meegestuurde velden)"""
+    project_nummer: Optional[str] = None
+    naam: Optional[str] = None
+    beschrijving: Optional[str] = None
+    status: Optional[ProjectStatus] = None
+    budget_totaal: Optional[int] = None
+    budget_besteed: Optional[int] = None
+    start_datum: Optional[datetime] = None
+    eind_datum: Optional[datetime] = None
+    projectleider_id: Optional[str] = None
+    template_id: Optional[str] = None
+    vestiging_id: Optional[str] = None
+    opmerkingen: Optional[str] = None
+
+
+# ===== Response Schemas =====
+
+class ProjectSamenvatting(BaseModel):
+    """Kern van een project in create/update/delete responses"""
+    id: str
+    project_nummer: str
+    naam: str
+    status: Optional[ProjectStatus] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectMutatieResponse(BaseModel):
+    success: bool = True
+    data: ProjectSamenvatting
+    message: str
+    versie: Optional[int] = None
+
+
+class ProjectBudget(BaseModel):
+    totaal: int = 0
+    besteed: int = 0
+    percentage: int = 0
+
+
+class ProjectleiderRef(UserRef):
+    role: UserRole
+
+
+class ProjectVestigingRef(BaseModel):
+    id: str
+    naam: str
+    code: str
+    plaats: Optional[str] = None
+
+
+class ProjectResponse(BaseModel):
+    """Project zoals het in lijst en detail wordt teruggegeven"""
+    id: str
+    project_nummer: str
+    naam: str
+    beschrijving: Optional[str] = None
+    status: ProjectStatus = ProjectStatus.CONCEPT
+    budget: ProjectBudget
+    start_datum: Optional[datetime] = None
+    eind_datum: Optional[datetime] = None
+    projectleider: Optional[ProjectleiderRef] = None
+    vestiging: Optional[ProjectVestigingRef] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def van_model(cls, p: Project) -> "ProjectResponse":
+        return cls(
+            id=p.id,
+            project_nummer=p.project_nummer,
+            naam=p.naam,
+            beschrijving=p.beschrijving,
+            status=p.status or ProjectStatus.CONCEPT,
+            budget=ProjectBudget(
+                totaal=p.budget_totaal or 0,
+                besteed=p.budget_besteed or 0,
+                percentage=p.budget_percentage,
+            ),
+            start_datum=p.start_datum,
+            eind_datum=p.eind_datum,
+            projectleider=ProjectleiderRef.model_validate(p.projectleider) if p.projectleider else None,
+            vestiging=ProjectVestigingRef(
+                id=p.vestiging.id,
+                naam=p.vestiging.naam,
+                code=p.vestiging.code,
+                plaats=p.vestiging.adres_plaats,
+            ) if p.vestiging else None,
+            created_at=p.created_at,
+            updated_at=p.updated_at,
+        )
+
+
+class ProjectListResponse(BaseModel):
+    success: bool = True
+    data: List[ProjectResponse]
+    pagination: Pagination
+
+
+class ProjectDetail(ProjectResponse):
+    """Project detail, met de totalen van de contracten en de versie (If-Match)"""
+    financien: Financien
+    versie: int = 1
+
+    @classmethod
+    def van_model(cls, p: Project, financien=None) -> "ProjectDetail":
+        return cls(
+            **dict(ProjectResponse.van_model(p)),
+            versie=p.versie_nummer,
+            financien=Financien.bereken(
+                p.budget_totaal,
+                financien.aantal_contracten if financien else 0,
+                financien.contract_totaal if financien else 0,
+                financien.gefactureerd_totaal if financien else 0,
+            ),
+        )
+
+
+class ProjectDetailResponse(BaseModel):
+    success: bool = True
+    data: ProjectDetail
@@ -0,0 +1,98 @@
+"""
+Request en response schemas voor projectfases en commentaren
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+from app.models.projectfase import CommentaarStatus, CommentaarType, ProjectFaseStatus
+from app.schemas.common import Pagination
+
+
+# ===== Fase Schemas =====
+
+class ProjectFaseCreate(BaseModel):
+    """Schema for creating a projectfase"""
+    fase_nummer: int
+    naam: str = Field(min_length=1)
+    beschrijving: Optional[str] = None
+    status: ProjectFaseStatus = ProjectFaseStatus.NIET_GESTART
+    verantwoordelijke_id: Optional[str] = None
+    leverancier_id: Optional[str] = None
+    geplande_start_datum: Optional[datetime] = None
+    geplande_eind_datum: Optional[datetime] = None
+
+
+class ProjectFaseUpdate(BaseModel):
+    """Schema for updating a projectfase (alleen meegestuurde velden)"""
+    fase_nummer: Optional[int] = None
+    naam: Optional[str] = Field(default=None, min_length=1)
+    beschrijving: Optional[str] = None
+    status: Optional[ProjectFaseStatus] = None
+    verantwoordelijke_id: Optional[str] = None
+    leverancier_id: Optional[str] = None
+    geplande_start_datum: Optional[datetime] = None
+    geplande_eind_datum: Optional[datetime] = None
+    werkelijke_start_datum: Optional[datetime] = None
+    werkelijke_eind_datum: Optional[datetime] = None
+
+
+class ProjectFaseResponse(BaseModel):
+    """Fase in de lijst van een project"""
+    id: str
+    fase_nummer: int
+    naam: str
+    beschrijving: Optional[str] = None
+    status: ProjectFaseStatus
+    verantwoordelijke_id: Optional[str] = None
+    leverancier_id: Optional[str] = None
+    geplande_start_datum: Optional[datetime] = None
+    geplande_eind_datum: Optional[datetime] = None
+    werkelijke_start_datum: Optional[datetime] = None
+    werkelijke_eind_datum: Optional[datetime] = None
+    aantal_documenten: int = 0
+    aantal_commentaren: int = 0
+
+
+# ===== Commentaar Schemas =====
+
+class CommentaarCreate(BaseModel):
+    """Schema for creating a commentaar"""
+    onderwerp: Optional[str] = None
+    bericht: str = Field(min_length=1)
+    leverancier_id: Optional[str] = None  # alleen voor comakers
+    parent_commentaar_id: Optional[str] = None
+
+
+class CommentaarUpdate(BaseModel):
+    """Schema for updating a commentaar"""
+    onderwerp: Optional[str] = None
+    bericht: Optional[str] = Field(default=None, min_length=1)
+
+
+class CommentaarResponse(BaseModel):
+    """Commentaar in de platte lijst van een fase"""
+    id: str
+    type: CommentaarType
+    status: CommentaarStatus
+    onderwerp: Optional[str] = None
+    bericht: str
+    auteur_id: str
+    leverancier_id: Optional[str] = None
+    parent_commentaar_id: Optional[str] = None
+    gepubliceerd_op: Optional[datetime] = None
+    bewerkt_op: Optional[datetime] = None
+    versie_nummer: int
+    aantal_reacties: int = 0
+
+
+class CommentaarThread(CommentaarResponse):
+    """Commentaar met de volledige boom aan reacties"""
+    totaal_reacties: int = 0  # alle reacties in de boom eronder
+    reacties: List["CommentaarThread"] = []
+
+
+class CommentaarThreadListResponse(BaseModel):
+    success: bool = True
+    data: List[CommentaarThread]
+    pagination: Pagination
@@ -0,0 +1,91 @@
+"""
+Request en response schemas voor vestigingen
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+from app.models.vestiging import Vestiging
+from app.schemas.common import Adres
+
+
+# ===== Request Schemas =====
+
+class VestigingCreate(BaseModel):
+    """Schema for creating a vestiging"""
+    naam: str = Field(min_length=1)
+    code: str = Field(min_length=1)
+    adres_straat: Optional[str] = None
+    adres_huisnummer: Optional[str] = None
+    adres_postcode: Optional[str] = None
+    adres_plaats: str = Field(min_length=1)
+    adres_land: Optional[str] = "Nederland"
+    telefoon: Optional[str] = None
+    email: Optional[str] = None
+    notities: Optional[str] = None
+    is_actief: bool = True
+
+
+class VestigingUpdate(BaseModel):
+    """Schema for updating a vestiging (alleen meegestuurde velden)"""
+    naam: Optional[str] = None
+    code: Optional[str] = None
+    adres_straat: Optional[str] = None
+    adres_huisnummer: Optional[str] = None
+    adres_postcode: Optional[str] = None
+    adres_plaats: Optional[str] = None
+    adres_land: Optional[str] = None
+    telefoon: Optional[str] = None
+    email: Optional[str] = None
+    notities: Optional[str] = None
+    is_actief: Optional[bool] = None
+
+
+# ===== Response Schemas =====
+
+class VestigingMutatieResponse(BaseModel):
+    """Response van create/update"""
+    id: str
+    naam: str
+    code: str
+    message: str
+    versie: Optional[int] = None
+
+
+class VestigingResponse(BaseModel):
+    """Vestiging zoals het in lijst en detail wordt teruggegeven"""
+    id: str
+    naam: str
+    code: str
+    adres: Adres
+    telefoon: Optional[str] = None
+    email: Optional[str] = None
+    notities: Optional[str] = None
+    is_actief: bool
+    versie_nummer: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def van_model(cls, v: Vestiging) -> "VestigingResponse":
+        return cls(
+            id=v.id,
+            naam=v.naam,
+            code=v.code,
+            adres=Adres.van_model(v),
+            telefoon=v.telefoon,
+            email=v.email,
+            notities=v.notities,
+            is_actief=v.is_actief,
+            versie_nummer=v.versie_nummer,
+            created_at=v.created_at,
+            updated_at=v.updated_at,
+        )
+
+
+class VestigingListResponse(BaseModel):
+    items: List[VestigingResponse]
+    total: int
+    page: int
+    limit: int
+    pages: int
@@ -0,0 +1,353 @@
+"""
+Bulk create/update/delete
+=========================
+
+Generieke afhandeling van de /bulk endpoints (projects, contracts,
+leveranciers):
+
+1. Alle items worden vooraf gevalideerd, per item met pydantic
+2. Uniciteit (bijv. project_nummer) en verwijzingen (bijv. leverancier_id)
+   worden per veld met één IN query gecontroleerd, ook binnen de batch
+3. De geldige items worden met executemany geschreven, in één transactie
+4. Eén gebatchte outbox write (events, o.a. voor de historie), daarna
+   herindexering en cache invalidatie
+
+Met alles_of_niets=True wordt niets geschreven zodra één item fout is.
+
+De schrijfacties gaan buiten de ORM flush om; de flush listeners (historie,
+zoekindex, response cache, financiële totalen) zien ze dus niet en worden
+hier expliciet bijgewerkt.
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import markeer_gewijzigd
+from app.models.user import User
+from app.services.events import publiceer_batch
+from app.services.financien import Sleutels, financien_sleutels, herbereken_financien
+from app.schemas.bulk import BulkItemResultaat, BulkResponse
+from app.services.zoeken import herindexeer_entiteiten
+
+AANGEMAAKT = "aangemaakt"
+BIJGEWERKT = "bijgewerkt"
+VERWIJDERD = "verwijderd"
+FOUT = "fout"
+OVERGESLAGEN = "overgeslagen"
+
+
+@dataclass
+class BulkEntiteit:
+    """Configuratie van een entiteit voor de bulk endpoints"""
+    model: type
+    create_schema: Type[BaseModel]
+    update_schema: Type[BaseModel]
+    id_prefix: str
+    uniek_veld: Optional[str] = None
+    # veld → model waar het naar verwijst (bestaan wordt gecontroleerd)
+    verwijzingen: Dict[str, type] = field(default_factory=dict)
+    # extra check op een nieuw item; geeft een foutmelding of None
+    controleer_nieuw: Optional[Callable[[BaseModel], Optional[str]]] = None
+    # check vóór verwijderen; geeft {id: foutmelding} voor records die moeten blijven
+    controleer_verwijderen: Optional[Callable[[Session, List[str]], Dict[str, str]]] = None
+
+    @property
+    def tabel(self) -> str:
+        return self.model.__tablename__
+
+
+@dataclass
+class _Item:
+    """Werkstaat van één item in de batch"""
+    index: int
+    id: Optional[str] = None
+    velden: Dict[str, Any] = field(default_factory=dict)
+    json: Dict[str, Any] = field(default_factory=dict)  # velden voor de historie
+    versie: int = 1  # versie na het schrijven
+    verwacht: Optional[int] = None  # 'versie' uit het item (optimistic locking)
+    fouten: List[str] = field(default_factory=list)
+
+
+# ============================================================================
+# VALIDATIE
+# ============================================================================
+
+def validatie_fouten(e: ValidationError) -> List[str]:
+    """Pydantic fouten als leesbare regels ('veld: melding')"""
+    return [
+        f"{'.'.join(str(deel) for deel in fout['loc']) or 'item'}: {fout['msg']}"
+        for fout in e.errors()
+    ]
+
+
+def _controleer_uniek(db: Session, config: BulkEntiteit, items: List[_Item]) -> None:
+    """Uniek veld: dubbel binnen de batch of al in gebruik (één IN query)"""
+    veld = config.uniek_veld
+    if not veld:
+        return
+
+    kandidaten = [i for i in items if not i.fouten and i.velden.get(veld) is not None]
+    gezien = set()
+    for item in kandidaten:
+        waarde = item.velden[veld]
+        if waarde in gezien:
+            item.fouten.append(f"{veld} '{waarde}' komt meerdere keren voor in de batch")
+        gezien.add(waarde)
+
+    if not gezien:
+        return
+
+    kolom = getattr(config.model, veld)
+    in_gebruik = dict(db.execute(
+        select(kolom, config.model.id).where(kolom.in_(gezien))
+    ).all())
+    for item in kandidaten:
+        eigenaar = in_gebruik.get(item.velden[veld])
+        if eigenaar is not None and eigenaar != item.id:
+            item.fouten.append(f"{veld} '{item.velden[veld]}' bestaat al")
+
+
+def _controleer_verwijzingen(db: Session, config: BulkEntiteit, items: List[_Item]) -> None:
+    """Verwijzingen naar andere tabellen: één IN query per veld"""
+    for veld, model in config.verwijzingen.items():
+        waarden = {
+            i.velden[veld] for i in items
+            if not i.fouten and i.velden.get(veld) is not None
+        }
+        if not waarden:
+            continue
+        gevonden = set(db.scalars(select(model.id).where(model.id.in_(waarden))))
+        for item in items:
+            waarde = item.velden.get(veld)
+            if not item.fouten and waarde is not None and waarde not in gevonden:
+                item.fouten.append(f"{veld} '{waarde}' niet gevonden")
+
+
+def _bestaande_versies(db: Session, config: BulkEntiteit, items: List[_Item]) -> None:
+    """Zoek de te wijzigen records op (één IN query) en onthoud hun versie"""
+    ids = {i.id for i in items if not i.fouten}
+    if not ids:
+        return
+    versies = dict(db.execute(
+        select(config.model.id, config.model.versie_nummer).where(config.model.id.in_(ids))
+    ).all())
+    for item in items:
+        if item.fouten:
+            continue
+        if item.id not in versies:
+            item.fouten.append(f"id '{item.id}' niet gevonden")
+        elif item.verwacht is not None and item.verwacht != versies[item.id]:
+            item.fouten.append(
+                f"versie {item.verwacht} is niet meer actueel (huidige versie {versies[item.id]})"
+            )
+        else:
+            item.versie = (versies[item.id] or 0) + 1
+
+
+def _controleer_dubbele_ids(items: List[_Item]) -> None:
+    gezien = set()
+    for item in items:
+        if item.fouten:
+            continue
+        if item.id in gezien:
+            item.fouten.append(f"id '{item.id}' komt meerdere keren voor in de batch")
+        gezien.add(item.id)
+
+
+# ============================================================================
+# RESULTAAT
+# ============================================================================
+
+def _resultaat(items: List[_Item], status: str, geschreven: bool) -> BulkResponse:
+    resultaten = [
+        BulkItemResultaat(
+            index=i.index,
+            id=i.id,
+            status=FOUT if i.fouten else (status if geschreven else OVERGESLAGEN),
+            fouten=i.fouten,
+        )
+        for i in items
+    ]
+    mislukt = sum(1 for i in items if i.fouten)
+    geslaagd = len(items) - mislukt if geschreven else 0
+    return BulkResponse(
+        success=mislukt == 0,
+        totaal=len(items),
+        geslaagd=geslaagd,
+        mislukt=mislukt,
+        resultaten=resultaten,
+    )
+
+
+def _mag_schrijven(items: List[_Item], alles_of_niets: bool) -> bool:
+    if alles_of_niets and any(i.fouten for i in items):
+        return False
+    return any(not i.fouten for i in items)
+
+
+def _na_schrijven(db: Session, config: BulkEntiteit, ids: List[str], voor: Optional[Sleutels] = None) -> None:
+    """Zoekindex, totalen en response cache bijwerken (de flush listeners zien dit niet)"""
+    markeer_gewijzigd(db, [config.tabel])
+    herbereken_financien(db, config.model, ids, voor)
+    try:
+        herindexeer_entiteiten(db, config.model, ids)
+    except Exception as e:
+        print(f"⚠️  Zoekindex update error: {e}")
+
+
+# ============================================================================
+# BULK OPERATIES
+# ============================================================================
+
+def bulk_aanmaken(
+    db: Session,
+    config: BulkEntiteit,
+    ruwe_items: List[Dict[str, Any]],
+    user: User,
+    alles_of_niets: bool = False,
+) -> BulkResponse:
+    """Maak records aan: valideren, één INSERT (executemany), één commit"""
+    items = []
+    for index, data in enumerate(ruwe_items):
+        item = _Item(index=index)
+        try:
+            obj = config.create_schema.model_validate(data)
+        except ValidationError as e:
+            item.fouten = validatie_fouten(e)
+        else:
+            fout = config.controleer_nieuw(obj) if config.controleer_nieuw else None
+            if fout:
+                item.fouten.append(fout)
+            item.velden = obj.model_dump()
+            item.json = obj.model_dump(mode="json")
+        items.append(item)
+
+    _controleer_uniek(db, config, items)
+    _controleer_verwijzingen(db, config, items)
+
+    if not _mag_schrijven(items, alles_of_niets):
+        return _resultaat(items, AANGEMAAKT, geschreven=False)
+
+    geldig = [i for i in items if not i.fouten]
+    for item in geldig:
+        item.id = f"{config.id_prefix}_{uuid.uuid4().hex[:8]}"
+
+    db.execute(insert(config.model), [{"id": i.id, **i.velden} for i in geldig])
+    publiceer_batch(
+        db, config.tabel, "create",
+        [(i.id, 1, None, {"id": i.id, **i.json}) for i in geldig],
+        user_id=user.id,
+        opmerking="Bulk aangemaakt via API",
+    )
+    _na_schrijven(db, config, [i.id for i in geldig])
+    db.commit()
+
+    return _resultaat(items, AANGEMAAKT, geschreven=True)
+
+
+def bulk_bijwerken(
+    db: Session,
+    config: BulkEntiteit,
+    ruwe_items: List[Dict[str, Any]],
+    user: User,
+    alles_of_niets: bool = False,
+) -> BulkResponse:
+    """
+    Werk records bij: elk item heeft een 'id' plus de te wijzigen velden
+
+    Net als bij PATCH worden alleen meegestuurde velden gewijzigd en wordt
+    null genegeerd. Met 'versie' in een item wordt dat item alleen bijgewerkt
+    als het record nog die versie heeft.
+    """
+    items = []
+    for index, data in enumerate(ruwe_items):
+        data = dict(data)
+        item = _Item(index=index, id=data.pop("id", None), verwacht=data.pop("versie", None))
+        if not isinstance(item.id, str) or not item.id:
+            item.fouten.append("id: Field required")
+        if item.verwacht is not None and not isinstance(item.verwacht, int):
+            item.fouten.append("versie: Input should be a valid integer")
+        try:
+            obj = config.update_schema.model_validate(data)
+        except ValidationError as e:
+            item.fouten.extend(validatie_fouten(e))
+        else:
+            item.velden = obj.model_dump(exclude_unset=True, exclude_none=True)
+            item.json = obj.model_dump(mode="json", exclude_unset=True, exclude_none=True)
+            if not item.velden and not item.fouten:
+                item.fouten.append("Geen velden om bij te werken")
+        items.append(item)
+
+    _controleer_dubbele_ids(items)
+    _bestaande_versies(db, config, items)
+    _controleer_uniek(db, config, items)
+    _controleer_verwijzingen(db, config, items)
+
+    if not _mag_schrijven(items, alles_of_niets):
+        return _resultaat(items, BIJGEWERKT, geschreven=False)
+
+    geldig = [i for i in items if not i.fouten]
+    nu = datetime.now(timezone.utc)
+    voor = financien_sleutels(db, config.model, [i.id for i in geldig])
+
+    # ORM bulk UPDATE op primary key: executemany per combinatie van velden.
+    # versie_nummer is de version_id_col: de gelezen versie gaat in de WHERE
+    # en SQLAlchemy verhoogt hem; een tussentijdse wijziging geeft StaleDataError
+    db.execute(update(config.model), [
+        {"id": i.id, **i.velden, "versie_nummer": i.versie - 1, "updated_at": nu}
+        for i in geldig
+    ])
+    publiceer_batch(
+        db, config.tabel, "update",
+        [(i.id, i.versie, None, i.json) for i in geldig],
+        user_id=user.id,
+        opmerking="Bulk bijgewerkt via API",
+    )
+    _na_schrijven(db, config, [i.id for i in geldig], voor)
+    db.commit()
+
+    return _resultaat(items, BIJGEWERKT, geschreven=True)
+
+
+def bulk_verwijderen(
+    db: Session,
+    config: BulkEntiteit,
+    ids: List[str],
+    user: User,
+    alles_of_niets: bool = False,
+) -> BulkResponse:
+    """Verwijder records met één DELETE ... WHERE id IN (...)"""
+    items = [_Item(index=index, id=record_id) for index, record_id in enumerate(ids)]
+
+    _controleer_dubbele_ids(items)
+    _bestaande_versies(db, config, items)
+    if config.controleer_verwijderen:
+        fouten = config.controleer_verwijderen(db, [i.id for i in items if not i.fouten])
+        for item in items:
+            if item.id in fouten and not item.fouten:
+                item.fouten.append(fouten[item.id])
+
+    if not _mag_schrijven(items, alles_of_niets):
+        return _resultaat(items, VERWIJDERD, geschreven=False)
+
+    geldig = [i for i in items if not i.fouten]
+    voor = financien_sleutels(db, config.model, [i.id for i in geldig])
+    db.execute(
+        delete(config.model).where(config.model.id.in_([i.id for i in geldig])),
+        execution_options={"synchronize_session": False},
+    )
+    publiceer_batch(
+        db, config.tabel, "delete",
+        [(i.id, i.versie - 1, {"id": i.id}, None) for i in geldig],
+        user_id=user.id,
+        opmerking="Bulk verwijderd via API",
+    )
+    _na_schrijven(db, config, [i.id for i in geldig], voor)
+    db.commit()
+
+    return _resultaat(items, VERWIJDERD, geschreven=True)
@@ -0,0 +1,123 @@
+"""
+Commentaar threads
+==================
+
+Een fase kan honderden commentaren hebben, met reacties op reacties.
+In plaats van per commentaar de reacties via de relatie op te halen:
+
+- laad_threads:      één query; de root commentaren van de pagina (met het
+                     totaal via een window functie) en alle gepubliceerde
+                     reacties daaronder via een recursieve CTE. De boom
+                     wordt daarna in het geheugen opgebouwd.
+- tel_reacties:      aantal gepubliceerde reacties per commentaar met één
+                     GROUP BY (voor de platte lijst)
+
+Alleen gepubliceerde commentaren tellen mee; reacties onder een concept
+of gearchiveerd commentaar vallen met dat commentaar weg.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.projectfase import CommentaarStatus, ProjectFaseCommentaar
+
+# Bescherming tegen een (onbedoelde) cyclus in parent_commentaar_id
+MAX_DIEPTE = 50
+
+# Kolommen die in de API terugkomen
+VELDEN = [
+    "id", "type", "status", "onderwerp", "bericht", "auteur_id", "leverancier_id",
+    "parent_commentaar_id", "gepubliceerd_op", "bewerkt_op", "versie_nummer",
+]
+
+
+def _als_dict(row) -> dict:
+    return {veld: getattr(row, veld) for veld in VELDEN}
+
+
+def tel_reacties(db: Session, commentaar_ids: Iterable[str]) -> Dict[str, int]:
+    """Aantal gepubliceerde (directe) reacties per commentaar"""
+    commentaar_ids = list(commentaar_ids)
+    if not commentaar_ids:
+        return {}
+    return dict(db.execute(
+        select(ProjectFaseCommentaar.parent_commentaar_id, func.count())
+        .where(
+            ProjectFaseCommentaar.parent_commentaar_id.in_(commentaar_ids),
+            ProjectFaseCommentaar.status == CommentaarStatus.GEPUBLICEERD,
+        )
+        .group_by(ProjectFaseCommentaar.parent_commentaar_id)
+    ).all())
+
+
+def laad_threads(db: Session, fase_id: str, page: int, limit: int) -> Tuple[List[dict], int]:
+    """
+    Root commentaren van een fase (nieuwste eerst) met hun volledige
+    reactieboom (oudste eerst)
+
+    Returns:
+        (threads, totaal aantal root commentaren)
+    """
+    C = ProjectFaseCommentaar
+    gepubliceerd = C.status == CommentaarStatus.GEPUBLICEERD
+
+    volgorde = (C.gepubliceerd_op.desc(), C.created_at.desc(), C.id)
+    pagina = (
+        select(
+            C.id,
+            func.count().over().label("totaal"),
+            func.row_number().over(order_by=volgorde).label("volgorde"),
+        )
+        .where(C.fase_id == fase_id, C.parent_commentaar_id.is_(None), gepubliceerd)
+        .order_by(*volgorde)
+        .offset((page - 1) * limit)
+        .limit(limit)
+        .cte("pagina")
+    )
+
+    boom = select(pagina.c.id, literal(0).label("diepte")).cte("boom", recursive=True)
+    reactie = aliased(C)
+    boom = boom.union_all(
+        select(reactie.id, boom.c.diepte + 1)
+        .join(boom, reactie.parent_commentaar_id == boom.c.id)
+        .where(reactie.status == CommentaarStatus.GEPUBLICEERD, boom.c.diepte < MAX_DIEPTE)
+    )
+
+    rows = db.execute(
+        select(*[getattr(C, veld) for veld in VELDEN], boom.c.diepte, pagina.c.totaal, pagina.c.volgorde)
+        .join(boom, boom.c.id == C.id)
+        .outerjoin(pagina, pagina.c.id == C.id)
+        .order_by(boom.c.diepte, C.gepubliceerd_op, C.created_at, C.id)
+    ).all()
+
+    roots = [row for row in rows if row.diepte == 0]
+    if roots:
+        totaal = roots[0].totaal
+    elif page > 1:
+        totaal = db.scalar(
+            select(func.count()).select_from(C)
+            .where(C.fase_id == fase_id, C.parent_commentaar_id.is_(None), gepubliceerd)
+        )
+    else:
+        totaal = 0
+
+    # Per diepte gesorteerd: een parent staat altijd vóór zijn reacties
+    knopen: Dict[str, dict] = {}
+    for row in rows:
+        knoop = _als_dict(row)
+        knoop["reacties"] = []
+        knopen[row.id] = knoop
+        if row.diepte > 0:
+            knopen[row.parent_commentaar_id]["reacties"].append(knoop)
+
+    def _tel(knoop: dict) -> int:
+        knoop["aantal_reacties"] = len(knoop["reacties"])
+        knoop["totaal_reacties"] = sum(1 + _tel(kind) for kind in knoop["reacties"])
+        return knoop["totaal_reacties"]
+
+    roots.sort(key=lambda row: row.volgorde)
+    threads = [knopen[row.id] for row in roots]
+    for thread in threads:
+        _tel(thread)
+    return threads, totaal
@@ -0,0 +1,205 @@
+"""
+HTTP download helpers voor documenten
+=====================================
+
+Bouwt de response voor een documentdownload:
+- Strong ETag op basis van de content hash
+- If-None-Match → 304 Not Modified
+- Range requests (206 Partial Content) voor hervatbare downloads
+- Media type op basis van bestandstype
+- Optioneel: afhandeling door de webserver (X-Accel-Redirect / X-Sendfile)
+"""
+import mimetypes
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.services.storage import StorageBackend
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def media_type_voor(bestandstype: Optional[str]) -> str:
+    """Bepaal het media type op basis van de extensie (bijv. 'pdf' → application/pdf)"""
+    if bestandstype:
+        media_type, _ = mimetypes.guess_type(f"bestand.{bestandstype.lower()}")
+        if media_type:
+            return media_type
+    return "application/octet-stream"
+
+
+def content_disposition(bestandsnaam: str, disposition: str = "attachment") -> str:
+    """Content-Disposition header, met RFC 5987 encoding voor niet-ASCII namen"""
+    quoted = quote(bestandsnaam)
+    if quoted != bestandsnaam:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{bestandsnaam}"'
+
+
+def etag_voor(content_hash: Optional[str]) -> Optional[str]:
+    """Strong ETag voor een content hash"""
+    return f'"{content_hash}"' if content_hash else None
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Check of een If-None-Match / If-Range header de ETag bevat
+
+    Weak vergelijking (W/ prefix wordt genegeerd), zoals RFC 9110 voorschrijft
+    voor If-None-Match.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    kandidaten = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in kandidaten)
+
+
+def parse_range(header: Optional[str], grootte: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse een Range header met één byte range
+
+    Returns:
+        (start, einde) inclusief, of None als de header ontbreekt of uit
+        meerdere ranges bestaat (dan wordt het hele bestand teruggegeven)
+
+    Raises:
+        ValueError als de range niet te vervullen is (→ 416)
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+
+    ranges = header[len("bytes="):].split(",")
+    if len(ranges) != 1:
+        return None
+
+    start_str, _, einde_str = ranges[0].strip().partition("-")
+    try:
+        if start_str == "":
+            # Suffix range: laatste N bytes
+            lengte = int(einde_str)
+            if lengte <= 0:
+                raise ValueError("Lege suffix range")
+            start = max(grootte - lengte, 0)
+            einde = grootte - 1
+        else:
+            start = int(start_str)
+            einde = int(einde_str) if einde_str else grootte - 1
+            einde = min(einde, grootte - 1)
+    except ValueError:
+        raise ValueError(f"Ongeldige range: {header}")
+
+    if start >= grootte or start > einde:
+        raise ValueError(f"Range niet te vervullen: {header}")
+
+    return start, einde
+
+
+def build_download_response(
+    request: Request,
+    storage: StorageBackend,
+    opslag_pad: str,
+    bestandsnaam: str,
+    bestandstype: Optional[str],
+    content_hash: Optional[str],
+    disposition: str = "attachment",
+    cache_control: str = CACHE_CONTROL,
+) -> Response:
+    """
+    Bouw een (partial) download response voor een opgeslagen bestand
+    """
+    etag = etag_voor(content_hash)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+        "Content-Disposition": content_disposition(bestandsnaam, disposition),
+    }
+    if etag:
+        headers["ETag"] = etag
+
+        # Conditional GET: browser heeft deze versie al
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(
+                status_code=304,
+                headers={k: v for k, v in headers.items() if k != "Content-Disposition"},
+            )
+
+    grootte = storage.size(opslag_pad)
+    media_type = media_type_voor(bestandstype)
+
+    # If-Range: alleen een partial response als de client dezelfde versie heeft
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and if_range and not (etag and etag_matches(if_range, etag)):
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, grootte)
+    except ValueError:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{grootte}"},
+        )
+
+    if byte_range is None:
+        headers["Content-Length"] = str(grootte)
+        return StreamingResponse(
+            storage.open(opslag_pad),
+            media_type=media_type,
+            headers=headers,
+        )
+
+    start, einde = byte_range
+    headers["Content-Range"] = f"bytes {start}-{einde}/{grootte}"
+    headers["Content-Length"] = str(einde - start + 1)
+    return StreamingResponse(
+        storage.open(opslag_pad, start, einde),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def build_offload_response(
+    local_path: Path,
+    bestandsnaam: str,
+    bestandstype: Optional[str],
+    content_hash: Optional[str],
+) -> Optional[Response]:
+    """
+    Laat de webserver het bestand serveren (DOWNLOAD_OFFLOAD)
+
+    - x-accel:    nginx, via een internal location onder DOWNLOAD_ACCEL_PREFIX
+    - x-sendfile: apache mod_xsendfile / lighttpd, met het absolute pad
+
+    Returns:
+        Response met de offload header, of None als offload uit staat of
+        het bestand buiten DOWNLOAD_ACCEL_ROOT valt
+    """
+    headers = {
+        "Cache-Control": CACHE_CONTROL,
+        "Content-Disposition": content_disposition(bestandsnaam),
+    }
+    etag = etag_voor(content_hash)
+    if etag:
+        headers["ETag"] = etag
+
+    if settings.DOWNLOAD_OFFLOAD == "x-sendfile":
+        headers["X-Sendfile"] = str(local_path.resolve())
+    elif settings.DOWNLOAD_OFFLOAD == "x-accel":
+        root = Path(settings.DOWNLOAD_ACCEL_ROOT).resolve()
+        try:
+            relatief = local_path.resolve().relative_to(root)
+        except ValueError:
+            return None
+        prefix = settings.DOWNLOAD_ACCEL_PREFIX.rstrip("/")
+        headers["X-Accel-Redirect"] = f"{prefix}/{quote(relatief.as_posix())}"
+    else:
+        return None
+
+    return Response(media_type=media_type_voor(bestandstype), headers=headers)
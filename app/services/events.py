@@ -0,0 +1,421 @@
+"""
+Domain events: outbox en in-process event bus
+=============================================
+
+1. Bij elke flush wordt per gewijzigd record (zie TRACKED_MODELS in
+   historie_setup) een OutboxEvent toegevoegd, in dezelfde transactie.
+   Schrijfacties buiten de ORM om (bulk, import, facturen) publiceren hun
+   events met publiceer_batch().
+2. Na de commit wordt de dispatcher gewekt (anders elke EVENT_POLL_SECONDEN).
+   Die levert de events in batches af aan de abonnees (abonneer()).
+3. Elke abonnee heeft een eigen cursor (laatst verwerkte event id):
+   - gewone abonnees: cursor in event_abonnees, bijgewerkt in dezelfde
+     transactie als het werk van de handler (precies één keer verwerkt)
+   - lokale abonnees (lokaal=True, bijv. in-memory structuren): cursor in
+     het geheugen van dit proces, beginnend bij het laatste event
+4. Faalt een handler, dan volgt een nieuwe poging met exponentiële backoff.
+   Na EVENT_MAX_POGINGEN worden de events één voor één aangeboden en wordt
+   een event dat blijft falen overgeslagen (met melding).
+
+Handlers krijgen (db, events) en mogen niet zelf committen.
+"""
+import enum
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, event, func, inspect, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.historie_setup import HistorieContext, should_track_model
+from app.models.outbox import EventAbonnee, OutboxEvent
+
+Handler = Callable[[Session, List[OutboxEvent]], None]
+
+_SESSION_KEY = "_outbox_events"
+_UITGESLOTEN = {"hashed_password"}
+
+# Een gat in de ids kan een transactie zijn die nog niet gecommit is;
+# pas na zoveel seconden gaan we ervan uit dat het een rollback was
+_GAT_SECONDEN = 10
+
+
+@dataclass
+class Abonnee:
+    naam: str
+    handler: Handler
+    tabellen: Optional[Set[str]] = None  # None = alle tabellen
+    lokaal: bool = False
+    # Alleen voor lokale abonnees (de rest staat in event_abonnees)
+    laatste_event_id: Optional[int] = None
+    pogingen: int = 0
+    volgende_poging: Optional[datetime] = None
+
+
+_abonnees: Dict[str, Abonnee] = {}
+_verwerk_lock = threading.Lock()
+_wekker = threading.Event()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def abonneer(naam: str, handler: Handler, tabellen: Optional[Iterable[str]] = None, lokaal: bool = False) -> None:
+    """Registreer een abonnee (bij startup); een bestaande naam wordt vervangen"""
+    _abonnees[naam] = Abonnee(
+        naam=naam,
+        handler=handler,
+        tabellen=set(tabellen) if tabellen else None,
+        lokaal=lokaal,
+    )
+
+
+# ============================================================================
+# OUTBOX SCHRIJVEN
+# ============================================================================
+
+def _json_waarde(waarde):
+    if isinstance(waarde, enum.Enum):
+        return waarde.value
+    if isinstance(waarde, (datetime, date)):
+        return waarde.isoformat()
+    if isinstance(waarde, Decimal):
+        return float(waarde)
+    return waarde
+
+
+def _snapshot(obj) -> dict:
+    return {
+        kolom.key: _json_waarde(getattr(obj, kolom.key))
+        for kolom in inspect(obj).mapper.column_attrs
+        if kolom.key not in _UITGESLOTEN
+    }
+
+
+def _wijzigingen(obj):
+    """Oude en nieuwe waarden van de gewijzigde kolommen"""
+    voor, na = {}, {}
+    staat = inspect(obj)
+    for kolom in staat.mapper.column_attrs:
+        if kolom.key in _UITGESLOTEN:
+            continue
+        historie = staat.attrs[kolom.key].history
+        if not historie.has_changes():
+            continue
+        voor[kolom.key] = _json_waarde(historie.deleted[0]) if historie.deleted else None
+        na[kolom.key] = _json_waarde(historie.added[0]) if historie.added else None
+    return voor, na
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    """Voeg een OutboxEvent toe per nieuw, gewijzigd of verwijderd record"""
+    if session.info.get("disable_historie", False):
+        return
+
+    events = []
+    for obj in session.new:
+        if should_track_model(obj):
+            events.append(("create", obj, None, _snapshot(obj), 1))
+    for obj in session.dirty:
+        if should_track_model(obj) and session.is_modified(obj):
+            voor, na = _wijzigingen(obj)
+            if na:
+                # versie_nummer wordt tijdens deze flush opgehoogd
+                events.append(("update", obj, voor, na, (obj.versie_nummer or 0) + 1))
+    for obj in session.deleted:
+        if should_track_model(obj):
+            events.append(("delete", obj, _snapshot(obj), None, obj.versie_nummer))
+
+    if not events:
+        return
+
+    user_id = HistorieContext.get_user_id()
+    opmerking = HistorieContext.get_opmerking()
+    nu = datetime.now(timezone.utc)
+    session.add_all([
+        OutboxEvent(
+            tabel_naam=obj.__tablename__,
+            record_id=str(obj.id),
+            actie=actie,
+            versie_nummer=versie,
+            data_voor=voor,
+            data_na=na,
+            gewijzigd_door_id=user_id,
+            opmerking=opmerking,
+            aangemaakt_op=nu,
+        )
+        for actie, obj, voor, na, versie in events
+    ])
+    session.info[_SESSION_KEY] = True
+
+
+def publiceer_batch(
+    db: Session,
+    tabel_naam: str,
+    actie: str,
+    records: list,
+    user_id: str = None,
+    opmerking: str = None,
+) -> int:
+    """
+    Publiceer events voor schrijfacties buiten de ORM flush (één executemany)
+
+    Args:
+        records: List van (record_id, versie_nummer, data_voor, data_na),
+                 data als JSON-compatibele dicts
+
+    Returns:
+        Aantal events
+    """
+    if not records:
+        return 0
+    nu = datetime.now(timezone.utc)
+    db.execute(insert(OutboxEvent), [
+        {
+            "tabel_naam": tabel_naam,
+            "record_id": record_id,
+            "actie": actie,
+            "versie_nummer": versie,
+            "data_voor": data_voor,
+            "data_na": data_na,
+            "gewijzigd_door_id": user_id,
+            "opmerking": opmerking,
+            "aangemaakt_op": nu,
+        }
+        for record_id, versie, data_voor, data_na in records
+    ])
+    db.info[_SESSION_KEY] = True
+    return len(records)
+
+
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_SESSION_KEY, False):
+        _wekker.set()
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+def setup_event_listeners() -> None:
+    """Registreer de outbox listeners (bij startup)"""
+    for naam, listener in [
+        ("before_flush", _before_flush),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ]:
+        if not event.contains(Session, naam, listener):
+            event.listen(Session, naam, listener)
+
+
+# ============================================================================
+# AFLEVEREN
+# ============================================================================
+
+def _utc(moment: datetime) -> datetime:
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _volgende_events(db: Session, na_id: int) -> List[OutboxEvent]:
+    """
+    De volgende batch events na na_id, tot aan een recent gat in de ids
+
+    Ids worden bij de insert uitgedeeld, niet bij de commit: een lager id kan
+    later zichtbaar worden. Tot het gat oud genoeg is wachten we daarop.
+    """
+    events = db.scalars(
+        select(OutboxEvent)
+        .where(OutboxEvent.id > na_id)
+        .order_by(OutboxEvent.id)
+        .limit(settings.EVENT_BATCH_SIZE)
+    ).all()
+
+    grens = datetime.now(timezone.utc) - timedelta(seconds=_GAT_SECONDEN)
+    vorige = na_id
+    for index, ev in enumerate(events):
+        if ev.id != vorige + 1 and vorige > 0 and _utc(ev.aangemaakt_op) > grens:
+            return events[:index]
+        vorige = ev.id
+    return events
+
+
+def _voor_abonnee(abonnee: Abonnee, events: List[OutboxEvent]) -> List[OutboxEvent]:
+    if abonnee.tabellen is None:
+        return events
+    return [ev for ev in events if ev.tabel_naam in abonnee.tabellen]
+
+
+def _backoff(pogingen: int) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=min(2 ** pogingen, 300))
+
+
+def _een_voor_een(db: Session, abonnee: Abonnee, events: List[OutboxEvent]) -> None:
+    """Laatste redmiddel: elk event apart, blijvend falende events overslaan"""
+    for ev in events:
+        try:
+            with db.begin_nested():
+                abonnee.handler(db, [ev])
+        except Exception as e:
+            print(f"⚠️  Event {ev.id} overgeslagen voor '{abonnee.naam}': {e}")
+
+
+def _verwerk_gedeeld(abonnee: Abonnee) -> int:
+    """Eén batch voor een abonnee met cursor in de database"""
+    db = SessionLocal()
+    db.info["disable_historie"] = True  # het werk van abonnees zelf geeft geen events
+    try:
+        vergrendel = select(EventAbonnee).where(EventAbonnee.naam == abonnee.naam).with_for_update(skip_locked=True)
+        cursor = db.execute(vergrendel).scalar_one_or_none()
+        if cursor is None:
+            if db.get(EventAbonnee, abonnee.naam) is not None:
+                return 0  # in gebruik door een ander proces
+            # Eerst vastleggen, zodat een mislukte eerste batch de cursor niet meeneemt
+            db.add(EventAbonnee(naam=abonnee.naam, laatste_event_id=0, pogingen=0))
+            db.commit()
+            cursor = db.execute(vergrendel).scalar_one_or_none()
+            if cursor is None:
+                return 0
+        if cursor.volgende_poging and _utc(cursor.volgende_poging) > datetime.now(timezone.utc):
+            return 0
+
+        events = _volgende_events(db, cursor.laatste_event_id)
+        if not events:
+            db.commit()
+            return 0
+        laatste_id = events[-1].id
+        relevant = _voor_abonnee(abonnee, events)
+
+        try:
+            if relevant:
+                if cursor.pogingen >= settings.EVENT_MAX_POGINGEN:
+                    _een_voor_een(db, abonnee, relevant)
+                else:
+                    abonnee.handler(db, relevant)
+            cursor.laatste_event_id = laatste_id
+            cursor.pogingen = 0
+            cursor.volgende_poging = None
+            cursor.laatste_fout = None
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            cursor = db.get(EventAbonnee, abonnee.naam)
+            cursor.pogingen += 1
+            cursor.volgende_poging = _backoff(cursor.pogingen)
+            cursor.laatste_fout = str(e)[:2000]
+            db.commit()
+            print(f"⚠️  Event abonnee '{abonnee.naam}' poging {cursor.pogingen} mislukt: {e}")
+            return 0
+        return len(events)
+    finally:
+        db.close()
+
+
+def _verwerk_lokaal(abonnee: Abonnee) -> int:
+    """Eén batch voor een abonnee met cursor in het geheugen"""
+    nu = datetime.now(timezone.utc)
+    if abonnee.volgende_poging and abonnee.volgende_poging > nu:
+        return 0
+    db = SessionLocal()
+    db.info["disable_historie"] = True
+    try:
+        if abonnee.laatste_event_id is None:
+            abonnee.laatste_event_id = db.scalar(select(func.coalesce(func.max(OutboxEvent.id), 0)))
+            return 0
+        events = _volgende_events(db, abonnee.laatste_event_id)
+        if not events:
+            return 0
+        relevant = _voor_abonnee(abonnee, events)
+        try:
+            if relevant:
+                abonnee.handler(db, relevant)
+        except Exception as e:
+            db.rollback()
+            abonnee.pogingen += 1
+            if abonnee.pogingen < settings.EVENT_MAX_POGINGEN:
+                abonnee.volgende_poging = _backoff(abonnee.pogingen)
+                print(f"⚠️  Event abonnee '{abonnee.naam}' poging {abonnee.pogingen} mislukt: {e}")
+                return 0
+            print(f"⚠️  Events {events[0].id}-{events[-1].id} overgeslagen voor '{abonnee.naam}': {e}")
+        abonnee.laatste_event_id = events[-1].id
+        abonnee.pogingen = 0
+        abonnee.volgende_poging = None
+        return len(events)
+    finally:
+        db.close()
+
+
+def verwerk_events() -> int:
+    """Lever alle openstaande events af (tot de batches leeg zijn)"""
+    totaal = 0
+    with _verwerk_lock:
+        for abonnee in list(_abonnees.values()):
+            verwerk = _verwerk_lokaal if abonnee.lokaal else _verwerk_gedeeld
+            while True:
+                try:
+                    aantal = verwerk(abonnee)
+                except Exception as e:
+                    print(f"⚠️  Event dispatcher fout bij '{abonnee.naam}': {e}")
+                    break
+                totaal += aantal
+                if aantal < settings.EVENT_BATCH_SIZE:
+                    break
+    return totaal
+
+
+def ruim_outbox_op(db: Session, bewaar_dagen: int) -> int:
+    """
+    Verwijder events die alle gewone abonnees verwerkt hebben en ouder zijn
+    dan bewaar_dagen (lokale abonnees en Last-Event-ID replay kijken niet
+    verder terug)
+    """
+    gedeeld = [abonnee.naam for abonnee in _abonnees.values() if not abonnee.lokaal]
+    aantal, grens_id = db.execute(
+        select(func.count(), func.min(EventAbonnee.laatste_event_id)).where(EventAbonnee.naam.in_(gedeeld))
+    ).one()
+    if not gedeeld or aantal < len(gedeeld):
+        return 0  # een abonnee die nog nooit gedraaid heeft begint bij event 1
+    # Het laatste event blijft altijd staan: een tabel van vóór AUTOINCREMENT
+    # zou anders na een lege outbox weer bij max(id) + 1 = 1 beginnen
+    hoogste_id = db.scalar(select(func.max(OutboxEvent.id)))
+    if hoogste_id is None:
+        return 0
+    grens = datetime.now(timezone.utc) - timedelta(days=bewaar_dagen)
+    return db.execute(
+        delete(OutboxEvent).where(
+            OutboxEvent.id <= min(grens_id, hoogste_id - 1), OutboxEvent.aangemaakt_op < grens
+        )
+    ).rowcount
+
+
+# ============================================================================
+# DISPATCHER THREAD
+# ============================================================================
+
+def _dispatcher() -> None:
+    while not _stop.is_set():
+        _wekker.clear()
+        verwerk_events()
+        _wekker.wait(timeout=settings.EVENT_POLL_SECONDEN)
+
+
+def start_event_dispatcher() -> None:
+    """Start de dispatcher thread (in de lifespan van de app)"""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_dispatcher, name="event-dispatcher", daemon=True)
+    _thread.start()
+
+
+def stop_event_dispatcher() -> None:
+    """Stop de dispatcher; openstaande events blijven in de outbox staan"""
+    global _thread
+    _stop.set()
+    _wekker.set()
+    if _thread is not None:
+        _thread.join(timeout=10)
+        _thread = None
@@ -0,0 +1,155 @@
+"""
+Export naar CSV en XLSX
+=======================
+
+Exports lezen de rijen via een server-side cursor (yield_per) en schrijven
+ze direct weg, zodat het geheugengebruik gelijk blijft bij 100k rijen:
+
+- CSV:  een generator die per blok rijen bytes oplevert (StreamingResponse)
+- XLSX: openpyxl in write_only modus naar een tijdelijk bestand, daarna als
+        FileResponse (XLSX is een zip en kan niet rij voor rij verstuurd
+        worden); het bestand wordt na het versturen verwijderd
+
+De export query draait in een eigen sessie: een StreamingResponse loopt
+nog door nadat de request sessie (get_db) al gesloten is.
+
+De query selecteert kolommen, geen ORM objecten, zodat er per rij geen
+object in de identity map komt.
+
+XLSX vereist openpyxl (optioneel).
+"""
+import csv
+import enum
+import io
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.sql import Select
+from starlette.background import BackgroundTask
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+EXPORT_FORMATEN = {"csv", "xlsx"}
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+Rij = Sequence[Any]
+
+
+def stream_rijen(stmt: Select, rij: Optional[Callable[[Any], Rij]] = None) -> Iterator[Rij]:
+    """
+    Lees een select() in blokken van EXPORT_BATCH_SIZE rijen
+
+    Draait in een eigen sessie die gesloten wordt als de generator klaar is
+    (of afgebroken, bijvoorbeeld als de client de download stopt).
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        for row in result:
+            yield rij(row) if rij else tuple(row)
+    finally:
+        db.close()
+
+
+def _tekst(waarde: Any) -> Any:
+    if waarde is None:
+        return ""
+    if isinstance(waarde, enum.Enum):
+        return waarde.value
+    if isinstance(waarde, (datetime, date)):
+        return waarde.isoformat()
+    return waarde
+
+
+def _excel(waarde: Any) -> Any:
+    """Excel kent geen tijdzones en geen enums"""
+    if isinstance(waarde, enum.Enum):
+        return waarde.value
+    if isinstance(waarde, datetime) and waarde.tzinfo is not None:
+        return waarde.replace(tzinfo=None)
+    if isinstance(waarde, Decimal):
+        return float(waarde)
+    return waarde
+
+
+def csv_stream(koppen: List[str], rijen: Iterable[Rij]) -> Iterator[bytes]:
+    """CSV (UTF-8 met BOM voor Excel) in blokken van EXPORT_BATCH_SIZE rijen"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    buffer.write("\ufeff")
+    writer.writerow(koppen)
+    for nummer, rij in enumerate(rijen, start=1):
+        writer.writerow([_tekst(w) for w in rij])
+        if nummer % settings.EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def xlsx_bestand(koppen: List[str], rijen: Iterable[Rij], titel: str) -> str:
+    """Schrijf een XLSX in write_only modus; geeft het pad van het tijdelijke bestand"""
+    from openpyxl import Workbook
+
+    werkboek = Workbook(write_only=True)
+    werkblad = werkboek.create_sheet(title=titel[:31])
+    werkblad.append(koppen)
+    for rij in rijen:
+        werkblad.append([_excel(w) for w in rij])
+
+    fd, pad = tempfile.mkstemp(prefix="export_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        werkboek.save(pad)
+    except Exception:
+        os.remove(pad)
+        raise
+    return pad
+
+
+def controleer_formaat(formaat: str) -> str:
+    formaat = formaat.lower()
+    if formaat not in EXPORT_FORMATEN:
+        raise HTTPException(status_code=400, detail="Formaat moet csv of xlsx zijn")
+    if formaat == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=400, detail="XLSX export is niet beschikbaar, gebruik CSV")
+    return formaat
+
+
+def export_response(formaat: str, naam: str, koppen: List[str], rijen: Iterable[Rij]):
+    """
+    Response voor een export
+
+    Args:
+        formaat: csv of xlsx (zie controleer_formaat)
+        naam: bestandsnaam zonder extensie, ook de naam van het werkblad
+        rijen: bij voorkeur stream_rijen(...), wordt pas tijdens het
+               versturen (csv) of schrijven (xlsx) gelezen
+    """
+    bestandsnaam = f"{naam}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formaat}"
+    headers = {"Content-Disposition": f'attachment; filename="{bestandsnaam}"'}
+
+    if formaat == "xlsx":
+        pad = xlsx_bestand(koppen, rijen, naam)
+        return FileResponse(
+            pad,
+            media_type=XLSX_MEDIA_TYPE,
+            headers=headers,
+            background=BackgroundTask(os.remove, pad),
+        )
+
+    return StreamingResponse(
+        csv_stream(koppen, rijen),
+        media_type="text/csv",
+        headers=headers,
+    )
@@ -0,0 +1,317 @@
+"""
+Factuur grootboek
+=================
+
+Facturen worden geboekt, nooit gewijzigd of verwijderd; een correctie is
+een creditfactuur (negatief bedrag). Per boeking (ook in bulk):
+
+1. Contracten en factuurnummers worden met één IN query gecontroleerd
+2. De facturen worden met executemany ingevoegd; boekt een ander
+   intussen hetzelfde factuurnummer, dan houdt de unique constraint
+   (contract_id, factuurnummer) dat tegen en wordt het een fout van dat item
+3. Contract.gefactureerd_bedrag wordt per contract opgehoogd met
+   UPDATE ... SET gefactureerd_bedrag = gefactureerd_bedrag + :bedrag,
+   zodat gelijktijdige boekingen elkaar niet overschrijven
+4. Events (historie), financiële totalen en response cache worden expliciet
+   bijgewerkt (de flush listeners zien deze schrijfacties niet)
+
+Periode totalen (maand, kwartaal, jaar) worden in SQL opgeteld.
+"""
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, case, cast, event, func, insert, select, String, Integer
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import markeer_gewijzigd
+from app.models.contract import Contract
+from app.models.factuur import Factuur
+from app.models.user import User
+from app.schemas.bulk import BulkItemResultaat, BulkResponse
+from app.schemas.factuur import FactuurBoeking
+from app.services.bulk import AANGEMAAKT, FOUT, OVERGESLAGEN, validatie_fouten
+from app.services.events import publiceer_batch
+from app.services.financien import tel_gefactureerd_op
+
+
+@dataclass
+class Boeking:
+    """Eén te boeken factuur (met eventuele fouten)"""
+    index: int
+    contract_id: Optional[str] = None
+    velden: Dict[str, Any] = field(default_factory=dict)
+    id: Optional[str] = None
+    fouten: List[str] = field(default_factory=list)
+
+
+# ============================================================================
+# CONTROLES
+# ============================================================================
+
+def _controleer(db: Session, boekingen: List[Boeking]) -> None:
+    """Bestaan de contracten en zijn de factuurnummers per contract uniek"""
+    contract_ids = {b.contract_id for b in boekingen if not b.fouten}
+    if not contract_ids:
+        return
+    gevonden = set(db.scalars(select(Contract.id).where(Contract.id.in_(contract_ids))))
+    for b in boekingen:
+        if not b.fouten and b.contract_id not in gevonden:
+            b.fouten.append(f"contract_id '{b.contract_id}' niet gevonden")
+
+    nummers = {b.velden["factuurnummer"] for b in boekingen if not b.fouten and b.velden.get("factuurnummer")}
+    if not nummers:
+        return
+    bestaand = set(db.execute(
+        select(Factuur.contract_id, Factuur.factuurnummer)
+        .where(Factuur.contract_id.in_(contract_ids), Factuur.factuurnummer.in_(nummers))
+    ).all())
+    for b in boekingen:
+        nummer = b.velden.get("factuurnummer")
+        if b.fouten or not nummer:
+            continue
+        sleutel = (b.contract_id, nummer)
+        if sleutel in bestaand:
+            b.fouten.append(f"factuurnummer '{nummer}' is al geboekt op dit contract")
+        bestaand.add(sleutel)
+
+
+GEBOEKT_NIET_VERWIJDEREN = "Contract heeft geboekte facturen; beëindig het contract in plaats van verwijderen"
+
+
+def contracten_met_facturen(db: Session, contract_ids: Iterable[str]) -> Dict[str, str]:
+    """Contracten waarop facturen geboekt zijn mogen niet weg: {id: foutmelding}"""
+    geboekt = db.scalars(
+        select(Factuur.contract_id).where(Factuur.contract_id.in_(list(contract_ids))).distinct()
+    )
+    return {contract_id: GEBOEKT_NIET_VERWIJDEREN for contract_id in geboekt}
+
+
+# ============================================================================
+# BOEKEN
+# ============================================================================
+
+def _schrijf(db: Session, boekingen: List[Boeking], user: User) -> Dict[str, Decimal]:
+    """Facturen invoegen en contracten ophogen; geeft de nieuwe standen terug"""
+    nu = datetime.now(timezone.utc)
+    for b in boekingen:
+        b.id = f"fct_{uuid.uuid4().hex[:8]}"
+        b.velden.update(id=b.id, contract_id=b.contract_id, geboekt_door_id=user.id, geboekt_op=nu)
+    db.execute(insert(Factuur), [b.velden for b in boekingen])
+
+    per_contract: Dict[str, Decimal] = defaultdict(Decimal)
+    for b in boekingen:
+        per_contract[b.contract_id] += b.velden["bedrag"]
+
+    # Atomair ophogen: executemany op de tabel (geen ORM bulk update op pk)
+    contracts = Contract.__table__
+    db.execute(
+        contracts.update()
+        .where(contracts.c.id == bindparam("b_id"))
+        .values(
+            gefactureerd_bedrag=func.coalesce(contracts.c.gefactureerd_bedrag, 0)
+            + bindparam("b_bedrag", type_=contracts.c.gefactureerd_bedrag.type),
+            versie_nummer=contracts.c.versie_nummer + 1,
+            updated_at=nu,
+        ),
+        [{"b_id": contract_id, "b_bedrag": bedrag} for contract_id, bedrag in per_contract.items()],
+    )
+
+    standen = db.execute(
+        select(Contract.id, Contract.versie_nummer, Contract.gefactureerd_bedrag)
+        .where(Contract.id.in_(per_contract))
+    ).all()
+    publiceer_batch(
+        db, Factuur.__tablename__, "create",
+        [
+            (b.id, 1, None, {
+                "contract_id": b.contract_id,
+                "factuurnummer": b.velden.get("factuurnummer"),
+                "bedrag": float(b.velden["bedrag"]),
+                "factuur_datum": b.velden["factuur_datum"].isoformat(),
+            })
+            for b in boekingen
+        ],
+        user_id=user.id,
+    )
+    publiceer_batch(
+        db, Contract.__tablename__, "update",
+        [
+            (contract_id, versie, None, {"gefactureerd_bedrag": float(bedrag or 0)})
+            for contract_id, versie, bedrag in standen
+        ],
+        user_id=user.id,
+        opmerking="Facturen geboekt",
+    )
+
+    tel_gefactureerd_op(db, per_contract)
+    markeer_gewijzigd(db, [Contract.__tablename__, Factuur.__tablename__])
+    return {contract_id: bedrag for contract_id, _, bedrag in standen}
+
+
+def _boek(db: Session, boekingen: List[Boeking], user: User, alles_of_niets: bool = False) -> Dict[str, Decimal]:
+    """
+    Schrijf de boekingen zonder fouten (in een savepoint)
+
+    Botst een insert op de unique constraint (gelijktijdig hetzelfde
+    factuurnummer geboekt), dan wordt er opnieuw gecontroleerd: de
+    betreffende items krijgen een fout en de rest wordt opnieuw geschreven.
+
+    Returns:
+        nieuwe gefactureerd_bedrag per contract ({} als er niets geschreven is)
+    """
+    geldig = [b for b in boekingen if not b.fouten]
+    if not geldig or (alles_of_niets and len(geldig) < len(boekingen)):
+        return {}
+    try:
+        with db.begin_nested():
+            return _schrijf(db, geldig, user)
+    except IntegrityError:
+        for b in geldig:
+            b.id = None
+        _controleer(db, geldig)
+        if not any(b.fouten for b in geldig):
+            raise
+        return _boek(db, boekingen, user, alles_of_niets)
+
+
+def boek_factuur(db: Session, contract_id: str, velden: Dict[str, Any], user: User) -> Tuple[Boeking, Optional[Decimal]]:
+    """
+    Boek één factuur
+
+    Returns:
+        (boeking, nieuwe gefactureerd_bedrag); bij fouten staan die in
+        boeking.fouten en is er niets geschreven
+    """
+    boeking = Boeking(index=0, contract_id=contract_id, velden=dict(velden))
+    _controleer(db, [boeking])
+    standen = _boek(db, [boeking], user)
+    if boeking.fouten:
+        db.rollback()
+        return boeking, None
+    db.commit()
+    return boeking, standen[contract_id]
+
+
+def boek_facturen(
+    db: Session,
+    ruwe_items: List[Dict[str, Any]],
+    user: User,
+    alles_of_niets: bool = False,
+) -> BulkResponse:
+    """Boek facturen op een of meer contracten in één transactie"""
+    boekingen = []
+    for index, data in enumerate(ruwe_items):
+        boeking = Boeking(index=index)
+        try:
+            obj = FactuurBoeking.model_validate(data)
+        except ValidationError as e:
+            boeking.fouten = validatie_fouten(e)
+        else:
+            boeking.contract_id = obj.contract_id
+            boeking.velden = obj.model_dump(exclude={"contract_id"})
+        boekingen.append(boeking)
+
+    _controleer(db, boekingen)
+
+    geschreven = bool(_boek(db, boekingen, user, alles_of_niets))
+    if geschreven:
+        db.commit()
+    geldig = [b for b in boekingen if not b.fouten]
+
+    resultaten = [
+        BulkItemResultaat(
+            index=b.index,
+            id=b.id,
+            status=FOUT if b.fouten else (AANGEMAAKT if geschreven else OVERGESLAGEN),
+            fouten=b.fouten,
+        )
+        for b in boekingen
+    ]
+    mislukt = len(boekingen) - len(geldig)
+    return BulkResponse(
+        success=mislukt == 0,
+        totaal=len(boekingen),
+        geslaagd=len(geldig) if geschreven else 0,
+        mislukt=mislukt,
+        resultaten=resultaten,
+    )
+
+
+# ============================================================================
+# PERIODE TOTALEN
+# ============================================================================
+
+def _periode_expressie(db: Session, periode: str):
+    """Periode label in SQL: '2024-03' (maand), '2024-K1' (kwartaal), '2024' (jaar)"""
+    datum = Factuur.factuur_datum
+    if db.get_bind().dialect.name == "postgresql":
+        formaat = {"maand": "YYYY-MM", "kwartaal": 'YYYY-"K"Q', "jaar": "YYYY"}[periode]
+        return func.to_char(datum, formaat)
+
+    if periode == "kwartaal":
+        kwartaal = (cast(func.strftime("%m", datum), Integer) + 2) // 3
+        return func.strftime("%Y", datum) + "-K" + cast(kwartaal, String)
+    return func.strftime("%Y-%m" if periode == "maand" else "%Y", datum)
+
+
+def factuur_perioden(
+    db: Session,
+    periode: str,
+    van: Optional[date] = None,
+    tot: Optional[date] = None,
+    contract_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    leverancier_id: Optional[str] = None,
+) -> List[dict]:
+    """Aantal en som van de boekingen per periode (GROUP BY in de database)"""
+    label = _periode_expressie(db, periode).label("periode")
+    stmt = select(
+        label,
+        func.count(Factuur.id),
+        func.coalesce(func.sum(case((Factuur.bedrag > 0, Factuur.bedrag), else_=0)), 0),
+        func.coalesce(func.sum(case((Factuur.bedrag < 0, Factuur.bedrag), else_=0)), 0),
+        func.coalesce(func.sum(Factuur.bedrag), 0),
+    )
+
+    if project_id or leverancier_id:
+        stmt = stmt.join(Contract, Contract.id == Factuur.contract_id)
+        if project_id:
+            stmt = stmt.where(Contract.project_id == project_id)
+        if leverancier_id:
+            stmt = stmt.where(Contract.leverancier_id == leverancier_id)
+    if contract_id:
+        stmt = stmt.where(Factuur.contract_id == contract_id)
+    if van:
+        stmt = stmt.where(Factuur.factuur_datum >= van)
+    if tot:
+        stmt = stmt.where(Factuur.factuur_datum <= tot)
+
+    return [
+        dict(periode=p, aantal=aantal, gefactureerd=float(plus), gecrediteerd=float(min_), totaal=float(totaal))
+        for p, aantal, plus, min_, totaal in db.execute(stmt.group_by(label).order_by(label))
+    ]
+
+
+# ============================================================================
+# APPEND-ONLY
+# ============================================================================
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    for obj in session.deleted:
+        if isinstance(obj, Factuur):
+            raise ValueError("Facturen kunnen niet verwijderd worden; boek een creditfactuur")
+    for obj in session.dirty:
+        if isinstance(obj, Factuur) and session.is_modified(obj):
+            raise ValueError("Facturen kunnen niet gewijzigd worden; boek een creditfactuur")
+
+
+def setup_factuur_listeners() -> None:
+    """Weiger wijzigen en verwijderen van facturen via de ORM"""
+    if not event.contains(Session, "before_flush", _before_flush):
+        event.listen(Session, "before_flush", _before_flush)
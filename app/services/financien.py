@@ -0,0 +1,445 @@
+"""
+Financiële totalen (rollups)
+============================
+
+Houdt per project, per vestiging en voor de contracten zonder project bij
+hoeveel er gecontracteerd en gefactureerd is, zodat project detail en
+portfolio niet bij elke request alle contracten hoeven op te tellen.
+
+- project_financien:   incrementeel; elke flush met gewijzigde contracten
+                       telt het verschil op (UPDATE ... SET x = x + :delta,
+                       als upsert)
+- vestiging_financien: per geraakte vestiging opnieuw berekend uit
+                       project_financien (tientallen projecten i.p.v.
+                       honderden contracten) plus de contracten zonder project
+- losse_contract_financien: één rij met de contracten zonder project (met
+                       of zonder vestiging), incrementeel zoals projecten
+
+Het verschil wordt in before_flush bepaald (oude waarden via de attribute
+history) en in after_flush geschreven, in dezelfde transactie als de
+wijziging. Schrijfacties buiten de flush om (bulk endpoints, import)
+roepen herbereken_financien() aan voor de geraakte records.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.cache import markeer_gewijzigd
+from app.models.contract import Contract
+from app.models.financien import (
+    LOSSE_CONTRACTEN, LosseContractFinancien, ProjectFinancien, VestigingFinancien,
+)
+from app.models.project import Project
+from app.models.vestiging import Vestiging
+
+TABELLEN = [
+    ProjectFinancien.__tablename__,
+    VestigingFinancien.__tablename__,
+    LosseContractFinancien.__tablename__,
+]
+
+# (project_ids, vestiging_ids)
+Sleutels = Tuple[Set[str], Set[str]]
+
+_SESSION_KEY = "financien_mutaties"
+
+
+# ============================================================================
+# SCHRIJVEN
+# ============================================================================
+
+def _upsert(conn: Connection, model: type, rijen: list, optellen: bool) -> None:
+    """
+    INSERT ... ON CONFLICT DO UPDATE (SQLite en PostgreSQL)
+
+    optellen=True telt de waarden bij de bestaande rij op (x = x + excluded.x),
+    anders worden ze overschreven.
+    """
+    if not rijen:
+        return
+    tabel = model.__table__
+    sleutel = tabel.primary_key.columns.keys()[0]
+    insert = pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(tabel)
+    waarden = {
+        kolom: (tabel.c[kolom] + stmt.excluded[kolom]) if optellen else stmt.excluded[kolom]
+        for kolom in rijen[0] if kolom != sleutel
+    }
+    waarden["bijgewerkt_op"] = func.now()
+    conn.execute(stmt.on_conflict_do_update(index_elements=[sleutel], set_=waarden), rijen)
+
+
+def _bereken_projecten(conn: Connection, project_ids: Set[str]) -> None:
+    """Zet project_financien opnieuw uit de contracten (één GROUP BY)"""
+    if not project_ids:
+        return
+    totalen = {
+        r.project_id: r
+        for r in conn.execute(
+            select(
+                Contract.project_id,
+                func.count(Contract.id).label("aantal"),
+                func.coalesce(func.sum(Contract.contract_bedrag), 0).label("contract"),
+                func.coalesce(func.sum(Contract.gefactureerd_bedrag), 0).label("gefactureerd"),
+            )
+            .where(Contract.project_id.in_(project_ids))
+            .group_by(Contract.project_id)
+        )
+    }
+    bestaand = set(conn.scalars(select(Project.id).where(Project.id.in_(project_ids))))
+
+    conn.execute(delete(ProjectFinancien).where(
+        ProjectFinancien.project_id.in_(project_ids - bestaand)
+    ))
+    _upsert(conn, ProjectFinancien, [
+        {
+            "project_id": project_id,
+            "aantal_contracten": totalen[project_id].aantal if project_id in totalen else 0,
+            "contract_totaal": totalen[project_id].contract if project_id in totalen else 0,
+            "gefactureerd_totaal": totalen[project_id].gefactureerd if project_id in totalen else 0,
+        }
+        for project_id in sorted(bestaand)
+    ], optellen=False)
+
+
+def _bereken_vestigingen(conn: Connection, vestiging_ids: Set[str]) -> None:
+    """Zet vestiging_financien opnieuw uit project_financien + losse contracten"""
+    vestiging_ids = vestiging_ids - {None}
+    if not vestiging_ids:
+        return
+    totalen = {
+        v: {"vestiging_id": v, "aantal_projecten": 0, "budget_totaal": 0,
+            "aantal_contracten": 0, "contract_totaal": 0, "gefactureerd_totaal": 0}
+        for v in vestiging_ids
+    }
+
+    for r in conn.execute(
+        select(
+            Project.vestiging_id,
+            func.count(Project.id),
+            func.coalesce(func.sum(Project.budget_totaal), 0),
+            func.coalesce(func.sum(ProjectFinancien.aantal_contracten), 0),
+            func.coalesce(func.sum(ProjectFinancien.contract_totaal), 0),
+            func.coalesce(func.sum(ProjectFinancien.gefactureerd_totaal), 0),
+        )
+        .outerjoin(ProjectFinancien, ProjectFinancien.project_id == Project.id)
+        .where(Project.vestiging_id.in_(vestiging_ids))
+        .group_by(Project.vestiging_id)
+    ):
+        rij = totalen[r[0]]
+        (rij["aantal_projecten"], rij["budget_totaal"], rij["aantal_contracten"],
+         rij["contract_totaal"], rij["gefactureerd_totaal"]) = r[1:]
+
+    # Contracten zonder project tellen bij hun eigen vestiging
+    for r in conn.execute(
+        select(
+            Contract.vestiging_id,
+            func.count(Contract.id),
+            func.coalesce(func.sum(Contract.contract_bedrag), 0),
+            func.coalesce(func.sum(Contract.gefactureerd_bedrag), 0),
+        )
+        .where(Contract.project_id.is_(None), Contract.vestiging_id.in_(vestiging_ids))
+        .group_by(Contract.vestiging_id)
+    ):
+        rij = totalen[r[0]]
+        rij["aantal_contracten"] += r[1]
+        rij["contract_totaal"] += r[2]
+        rij["gefactureerd_totaal"] += r[3]
+
+    _upsert(conn, VestigingFinancien, list(totalen.values()), optellen=False)
+
+
+def _bereken_losse_contracten(conn: Connection) -> None:
+    """Zet de totalen van de contracten zonder project opnieuw (één aggregate)"""
+    r = conn.execute(
+        select(
+            func.count(Contract.id),
+            func.coalesce(func.sum(Contract.contract_bedrag), 0),
+            func.coalesce(func.sum(Contract.gefactureerd_bedrag), 0),
+        ).where(Contract.project_id.is_(None))
+    ).one()
+    _upsert(conn, LosseContractFinancien, [{
+        "sleutel": LOSSE_CONTRACTEN,
+        "aantal_contracten": r[0],
+        "contract_totaal": r[1],
+        "gefactureerd_totaal": r[2],
+    }], optellen=False)
+
+
+def _vestigingen_van_projecten(conn: Connection, project_ids: Set[str]) -> Set[str]:
+    if not project_ids:
+        return set()
+    return set(conn.scalars(
+        select(Project.vestiging_id).where(Project.id.in_(project_ids))
+    )) - {None}
+
+
+# ============================================================================
+# BUITEN DE FLUSH OM (bulk, import)
+# ============================================================================
+
+def financien_sleutels(db: Session, model: type, ids: Iterable[str]) -> Sleutels:
+    """
+    Projecten en vestigingen waar deze records aan bijdragen
+
+    Vóór een bulk update/delete aanroepen (de oude koppelingen) en
+    meegeven aan herbereken_financien().
+    """
+    ids = list(ids)
+    if not ids or model not in (Contract, Project):
+        return set(), set()
+
+    if model is Project:
+        rijen = db.execute(select(Project.id, Project.vestiging_id).where(Project.id.in_(ids))).all()
+        return {r[0] for r in rijen}, {r[1] for r in rijen} - {None}
+
+    rijen = db.execute(
+        select(Contract.project_id, Contract.vestiging_id, Project.vestiging_id)
+        .outerjoin(Project, Project.id == Contract.project_id)
+        .where(Contract.id.in_(ids))
+    ).all()
+    project_ids = {r[0] for r in rijen} - {None}
+    vestiging_ids = {r[2] if r[0] else r[1] for r in rijen} - {None}
+    return project_ids, vestiging_ids
+
+
+def herbereken_financien(
+    db: Session,
+    model: type,
+    ids: Iterable[str],
+    voor: Optional[Sleutels] = None,
+) -> None:
+    """
+    Werk de totalen bij na een schrijfactie buiten de flush om
+
+    Args:
+        model, ids: de geschreven (of verwijderde) records
+        voor: financien_sleutels() van vóór de schrijfactie (update/delete)
+    """
+    if model not in (Contract, Project):
+        return
+    ids = list(ids)
+    project_ids, vestiging_ids = financien_sleutels(db, model, ids)
+    if voor:
+        project_ids |= voor[0]
+        vestiging_ids |= voor[1]
+    if model is Project:
+        # Projecten zelf: alleen de rij aanmaken of opruimen
+        project_ids |= set(ids)
+
+    conn = db.connection()
+    _bereken_projecten(conn, project_ids)
+    _bereken_vestigingen(conn, vestiging_ids)
+    if model is Contract:
+        _bereken_losse_contracten(conn)
+    markeer_gewijzigd(db, TABELLEN)
+
+
+def tel_gefactureerd_op(db: Session, per_contract: Dict[str, Decimal]) -> None:
+    """
+    Tel geboekte factuurbedragen op bij de totalen (facturen)
+
+    Net als Contract.gefactureerd_bedrag met x = x + :bedrag, zodat
+    gelijktijdige boekingen elkaar niet overschrijven.
+    """
+    if not per_contract:
+        return
+    rijen = db.execute(
+        select(Contract.id, Contract.project_id, Contract.vestiging_id, Project.vestiging_id)
+        .outerjoin(Project, Project.id == Contract.project_id)
+        .where(Contract.id.in_(per_contract))
+    ).all()
+
+    per_project: Dict[str, Decimal] = defaultdict(Decimal)
+    los = Decimal(0)
+    vestiging_ids = set()
+    for contract_id, project_id, contract_vestiging, project_vestiging in rijen:
+        if project_id:
+            per_project[project_id] += per_contract[contract_id]
+            vestiging_ids.add(project_vestiging)
+        else:
+            los += per_contract[contract_id]
+            vestiging_ids.add(contract_vestiging)
+
+    conn = db.connection()
+    _upsert(conn, ProjectFinancien, [
+        {"project_id": project_id, "aantal_contracten": 0, "contract_totaal": 0, "gefactureerd_totaal": bedrag}
+        for project_id, bedrag in per_project.items()
+    ], optellen=True)
+    if los:
+        _upsert(conn, LosseContractFinancien, [{
+            "sleutel": LOSSE_CONTRACTEN, "aantal_contracten": 0, "contract_totaal": 0, "gefactureerd_totaal": los,
+        }], optellen=True)
+    _bereken_vestigingen(conn, vestiging_ids)
+    markeer_gewijzigd(db, TABELLEN)
+
+
+def herbouw_financien(db: Session) -> None:
+    """Bereken alle totalen opnieuw"""
+    conn = db.connection()
+    conn.execute(delete(ProjectFinancien))
+    conn.execute(delete(VestigingFinancien))
+    _bereken_projecten(conn, set(conn.scalars(select(Project.id))))
+
+    _bereken_vestigingen(conn, set(conn.scalars(select(Vestiging.id))))
+    _bereken_losse_contracten(conn)
+    markeer_gewijzigd(db, TABELLEN)
+    db.commit()
+
+
+def init_financien(db: Session) -> None:
+    """Vul de totalen als ze nog leeg zijn (bij opstarten)"""
+    leeg = db.scalar(select(func.count()).select_from(ProjectFinancien)) == 0
+    if leeg and db.scalar(select(func.count()).select_from(Project)):
+        herbouw_financien(db)
+        print("💶 Financiële totalen opgebouwd")
+    elif db.get(LosseContractFinancien, LOSSE_CONTRACTEN) is None:
+        # Bestaande database van vóór losse_contract_financien
+        _bereken_losse_contracten(db.connection())
+        db.commit()
+
+
+# ============================================================================
+# SYNC VIA FLUSH EVENTS
+# ============================================================================
+
+def _bedrag(waarde) -> Decimal:
+    return Decimal(str(waarde or 0))
+
+
+class _Mutaties:
+    """Verschillen van één flush"""
+
+    def __init__(self):
+        # project_id → {kolom: delta}
+        self.projecten: Dict[str, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+        self.verwijderde_projecten: Set[str] = set()
+        self.vestigingen: Set[str] = set()
+        # contracten zonder project: {kolom: delta}
+        self.los: Dict[str, Decimal] = defaultdict(Decimal)
+
+    def contract(self, project_id, vestiging_id, bedrag, gefactureerd, teken: int) -> None:
+        if project_id:
+            delta = self.projecten[project_id]
+        else:
+            delta = self.los
+            self.vestigingen.add(vestiging_id)
+        delta["aantal_contracten"] += teken
+        delta["contract_totaal"] += teken * _bedrag(bedrag)
+        delta["gefactureerd_totaal"] += teken * _bedrag(gefactureerd)
+
+    def leeg(self) -> bool:
+        return not (self.projecten or self.verwijderde_projecten or self.vestigingen or self.los)
+
+
+def _oud_en_nieuw(obj, kolom: str):
+    """(oude waarde, nieuwe waarde) van een kolom van een gewijzigd object"""
+    history = inspect(obj).attrs[kolom].history
+    nieuw = getattr(obj, kolom)
+    if history.deleted:
+        return history.deleted[0], nieuw
+    return nieuw, nieuw
+
+
+_CONTRACT_KOLOMMEN = ["project_id", "vestiging_id", "contract_bedrag", "gefactureerd_bedrag"]
+_PROJECT_KOLOMMEN = ["vestiging_id", "budget_totaal"]
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    mutaties = session.info.get(_SESSION_KEY) or _Mutaties()
+
+    for obj in session.new:
+        if isinstance(obj, Contract):
+            mutaties.contract(obj.project_id, obj.vestiging_id,
+                              obj.contract_bedrag, obj.gefactureerd_bedrag, +1)
+        elif isinstance(obj, Project):
+            mutaties.projecten[obj.id]  # rij aanmaken
+            mutaties.vestigingen.add(obj.vestiging_id)
+
+    for obj in session.deleted:
+        if isinstance(obj, Contract):
+            mutaties.contract(obj.project_id, obj.vestiging_id,
+                              obj.contract_bedrag, obj.gefactureerd_bedrag, -1)
+        elif isinstance(obj, Project):
+            mutaties.verwijderde_projecten.add(obj.id)
+            mutaties.vestigingen.add(obj.vestiging_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Contract):
+            waarden = [_oud_en_nieuw(obj, k) for k in _CONTRACT_KOLOMMEN]
+            if all(oud == nieuw for oud, nieuw in waarden):
+                continue
+            mutaties.contract(*(oud for oud, _ in waarden), -1)
+            mutaties.contract(*(nieuw for _, nieuw in waarden), +1)
+        elif isinstance(obj, Project):
+            waarden = [_oud_en_nieuw(obj, k) for k in _PROJECT_KOLOMMEN]
+            if all(oud == nieuw for oud, nieuw in waarden):
+                continue
+            mutaties.vestigingen.update({waarden[0][0], waarden[0][1]})
+
+    if not mutaties.leeg():
+        session.info[_SESSION_KEY] = mutaties
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    mutaties: Optional[_Mutaties] = session.info.pop(_SESSION_KEY, None)
+    if mutaties is None:
+        return
+
+    conn = session.connection()
+    verwijderd = mutaties.verwijderde_projecten
+    if verwijderd:
+        conn.execute(delete(ProjectFinancien).where(ProjectFinancien.project_id.in_(verwijderd)))
+
+    projecten = {p: d for p, d in mutaties.projecten.items() if p not in verwijderd}
+    _upsert(conn, ProjectFinancien, [
+        {
+            "project_id": project_id,
+            "aantal_contracten": int(delta.get("aantal_contracten", 0)),
+            "contract_totaal": delta.get("contract_totaal", Decimal(0)),
+            "gefactureerd_totaal": delta.get("gefactureerd_totaal", Decimal(0)),
+        }
+        for project_id, delta in projecten.items()
+    ], optellen=True)
+    if any(mutaties.los.values()):
+        _upsert(conn, LosseContractFinancien, [{
+            "sleutel": LOSSE_CONTRACTEN,
+            "aantal_contracten": int(mutaties.los["aantal_contracten"]),
+            "contract_totaal": mutaties.los["contract_totaal"],
+            "gefactureerd_totaal": mutaties.los["gefactureerd_totaal"],
+        }], optellen=True)
+
+    _bereken_vestigingen(conn, mutaties.vestigingen | _vestigingen_van_projecten(conn, set(projecten)))
+    markeer_gewijzigd(session, TABELLEN)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+def _oude_waarde_laden(target, value, oldvalue, initiator) -> None:
+    """Doet niets; registreert alleen active_history (zie hieronder)"""
+
+
+def setup_financien_listeners() -> None:
+    """Registreer de flush listeners voor de totalen (bij startup)"""
+    # active_history: bij het wijzigen van een niet geladen kolom eerst de
+    # oude waarde laden, anders is het verschil in before_flush onbekend
+    for kolom in [getattr(Contract, k) for k in _CONTRACT_KOLOMMEN] + \
+                 [getattr(Project, k) for k in _PROJECT_KOLOMMEN]:
+        if not event.contains(kolom, "set", _oude_waarde_laden):
+            event.listen(kolom, "set", _oude_waarde_laden, active_history=True)
+
+    for naam, listener in [
+        ("before_flush", _before_flush),
+        ("after_flush", _after_flush),
+        ("after_rollback", _after_rollback),
+    ]:
+        if not event.contains(Session, naam, listener):
+            event.listen(Session, naam, listener)
@@ -0,0 +1,460 @@
+"""
+Import van leveranciers en contracten
+=====================================
+
+Leest een geüpload CSV of XLSX bestand rij voor rij en schrijft het weg in
+batches van IMPORT_CHUNK_SIZE rijen:
+
+- Het bestand wordt gestreamd (csv.reader / openpyxl read_only), er staat
+  nooit meer dan één batch in het geheugen
+- Elke rij wordt gevalideerd met het create schema (nieuw record) of het
+  update schema (bestaand record) van de entiteit
+- Verwijzingen worden per batch met één IN query opgezocht:
+  leverancier via kvk_nummer, project via project_nummer, verantwoordelijke
+  via e-mail
+- Upsert: leveranciers op kvk_nummer, contracten op contract_nummer;
+  bestaande records worden bijgewerkt met alleen de gevulde kolommen
+- Elke batch is één transactie (executemany insert/update, één outbox write)
+
+De import draait als Job (taak import.leveranciers / import.contracts) in
+de job wachtrij van app/services/jobs.py, zodat hij een herstart overleeft
+en door elk proces opgepakt kan worden. Het bestand staat zolang in
+IMPORT_DIR; de voortgang staat na elke batch in Job.resultaat en is via
+/imports/{job_id} op te vragen.
+
+XLSX vereist openpyxl (optioneel).
+"""
+import csv
+import enum
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timezone
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import markeer_gewijzigd
+from app.core.config import settings
+from app.models.contract import Contract
+from app.models.job import Job
+from app.models.leverancier import Leverancier
+from app.models.project import Project
+from app.models.user import User
+from app.schemas.contract import ContractCreate, ContractUpdate
+from app.schemas.leverancier import LeverancierCreate, LeverancierUpdate
+from app.services.bulk import validatie_fouten
+from app.services.events import publiceer_batch
+from app.services.financien import financien_sleutels, herbereken_financien
+from app.services.jobs import plan_job
+from app.services.zoeken import herindexeer_entiteiten
+
+BESTANDSTYPES = {"csv", "xlsx"}
+MAX_FOUTEN = 100  # foutregels die per job bewaard worden
+
+
+class ImportSoort(str, enum.Enum):
+    """Wat er geïmporteerd wordt"""
+    LEVERANCIERS = "leveranciers"
+    CONTRACTS = "contracts"
+
+
+class ImportFout(Exception):
+    """Bestand kan niet geïmporteerd worden"""
+
+
+@dataclass
+class ImportJob:
+    """Voortgang van één import (wordt per batch in Job.resultaat opgeslagen)"""
+    soort: ImportSoort
+    bestandsnaam: str
+    user_id: Optional[str]
+    totaal_rijen: Optional[int] = None  # schatting, vooraf geteld
+    rijen_verwerkt: int = 0
+    aangemaakt: int = 0
+    bijgewerkt: int = 0
+    aantal_fouten: int = 0
+    fouten: List[Dict[str, Any]] = field(default_factory=list)
+
+    def fout(self, rij: int, fouten: List[str]) -> None:
+        self.aantal_fouten += 1
+        if len(self.fouten) < MAX_FOUTEN:
+            self.fouten.append({"rij": rij, "fouten": fouten})
+
+    def voortgang(self) -> Dict[str, Any]:
+        return {
+            "totaal_rijen": self.totaal_rijen,
+            "rijen_verwerkt": self.rijen_verwerkt,
+            "aangemaakt": self.aangemaakt,
+            "bijgewerkt": self.bijgewerkt,
+            "aantal_fouten": self.aantal_fouten,
+            "fouten": self.fouten,
+        }
+
+
+# ============================================================================
+# BESTANDEN LEZEN
+# ============================================================================
+
+def heeft_openpyxl() -> bool:
+    try:
+        import openpyxl  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _kolomnaam(naam: Any) -> str:
+    """'KvK nummer' → 'kvk_nummer'"""
+    return re.sub(r"\W+", "_", str(naam or "").strip().lower()).strip("_")
+
+
+def _cel(waarde: Any) -> Optional[str]:
+    """
+    Normaliseer een cel naar tekst (pydantic parseert verder)
+
+    Excel geeft getallen als float (KvK 12345678.0) en datums als datetime.
+    """
+    if waarde is None:
+        return None
+    if isinstance(waarde, datetime):
+        return waarde.date().isoformat() if waarde.time() == time(0) else waarde.isoformat()
+    if isinstance(waarde, date):
+        return waarde.isoformat()
+    if isinstance(waarde, float) and waarde.is_integer():
+        return str(int(waarde))
+    tekst = str(waarde).strip()
+    return tekst or None
+
+
+def _rij(kop: List[str], waarden) -> Dict[str, str]:
+    """Rij als dict; lege cellen worden weggelaten (dan gelden de defaults)"""
+    rij = {}
+    for kolom, waarde in zip(kop, waarden):
+        waarde = _cel(waarde)
+        if kolom and waarde is not None:
+            rij[kolom] = waarde
+    return rij
+
+
+def _rijen_csv(pad: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    with open(pad, newline="", encoding="utf-8-sig") as f:
+        # Nederlandse Excel exporteert met ';'
+        proef = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(proef, delimiters=";,\t")
+        except csv.Error:
+            dialect = csv.excel
+
+        reader = csv.reader(f, dialect)
+        kop = [_kolomnaam(k) for k in next(reader, [])]
+        for nummer, waarden in enumerate(reader, start=2):
+            rij = _rij(kop, waarden)
+            if rij:
+                yield nummer, rij
+
+
+def _rijen_xlsx(pad: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    from openpyxl import load_workbook
+
+    # read_only: rijen worden uit het bestand gestreamd i.p.v. het hele werkblad te laden
+    werkboek = load_workbook(pad, read_only=True, data_only=True)
+    try:
+        rijen = werkboek.worksheets[0].iter_rows(values_only=True)
+        kop = [_kolomnaam(k) for k in next(rijen, ())]
+        for nummer, waarden in enumerate(rijen, start=2):
+            rij = _rij(kop, waarden)
+            if rij:
+                yield nummer, rij
+    finally:
+        werkboek.close()
+
+
+def lees_rijen(pad: str, bestandstype: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Lees een bestand rij voor rij
+
+    Yields:
+        (rijnummer zoals in het bestand, {kolomnaam: waarde})
+    """
+    if bestandstype == "xlsx":
+        if not heeft_openpyxl():
+            raise ImportFout("XLSX import vereist openpyxl")
+        return _rijen_xlsx(pad)
+    return _rijen_csv(pad)
+
+
+def schat_rijen(pad: str, bestandstype: str) -> Optional[int]:
+    """Aantal datarijen (voor de voortgang), zonder het bestand te laden"""
+    if bestandstype == "xlsx":
+        from openpyxl import load_workbook
+        werkboek = load_workbook(pad, read_only=True)
+        try:
+            max_row = werkboek.worksheets[0].max_row
+            return max(0, max_row - 1) if max_row else None
+        finally:
+            werkboek.close()
+
+    regels = 0
+    with open(pad, "rb") as f:
+        for blok in iter(lambda: f.read(1024 * 1024), b""):
+            regels += blok.count(b"\n")
+    return max(0, regels - 1)
+
+
+def _batches(rijen: Iterator, grootte: int) -> Iterator[List]:
+    while True:
+        batch = list(islice(rijen, grootte))
+        if not batch:
+            return
+        yield batch
+
+
+# ============================================================================
+# UPSERT
+# ============================================================================
+
+def _upsert(
+    db: Session,
+    job: ImportJob,
+    model: type,
+    create_schema: Type[BaseModel],
+    update_schema: Type[BaseModel],
+    sleutel: str,
+    id_prefix: str,
+    rijen: List[Tuple[int, Dict[str, Any], List[str], Set[str]]],
+    standaard_nieuw: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Valideer en schrijf een batch rijen weg (insert of update op de sleutel)
+
+    Nieuwe records worden met het create schema gevalideerd, bestaande met
+    het update schema (alleen de gevulde kolommen worden gewijzigd).
+
+    Args:
+        rijen: (rijnummer, kolommen, fouten die al bij het opzoeken gevonden
+               zijn, velden waarvan de verwijzing niet gevonden is)
+        standaard_nieuw: waarden voor ontbrekende velden van nieuwe records
+    """
+    kolom = getattr(model, sleutel)
+    sleutels = {data.get(sleutel) for _, data, _, _ in rijen} - {None}
+    bestaand = {
+        waarde: (record_id, versie)
+        for waarde, record_id, versie in db.execute(
+            select(kolom, model.id, model.versie_nummer).where(kolom.in_(sleutels))
+        )
+    } if sleutels else {}
+
+    nu = datetime.now(timezone.utc)
+    nieuw, gewijzigd, events_nieuw, events_gewijzigd = [], [], [], []
+    gezien = set()
+    for nummer, data, fouten, niet_gevonden in rijen:
+        waarde = data.get(sleutel)
+        if waarde is not None:
+            if waarde in gezien:
+                fouten.append(f"{sleutel} '{waarde}' staat al eerder in deze batch")
+            gezien.add(waarde)
+
+        try:
+            if waarde in bestaand:
+                obj = update_schema.model_validate(data)
+            else:
+                obj = create_schema.model_validate({**(standaard_nieuw or {}), **data})
+        except ValidationError as e:
+            # Niet gevonden verwijzingen zijn al gemeld, niet nog eens als 'Field required'
+            fouten.extend(f for f in validatie_fouten(e) if f.split(":")[0] not in niet_gevonden)
+
+        if fouten:
+            job.fout(nummer, fouten)
+        elif waarde in bestaand:
+            record_id, versie = bestaand[waarde]
+            # versie_nummer is de version_id_col: de huidige versie gaat in de
+            # WHERE, SQLAlchemy zet zelf versie + 1
+            gewijzigd.append({
+                "id": record_id, **obj.model_dump(exclude_unset=True),
+                "versie_nummer": versie, "updated_at": nu,
+            })
+            events_gewijzigd.append((record_id, versie + 1, None, obj.model_dump(mode="json", exclude_unset=True)))
+        else:
+            record_id = f"{id_prefix}_{uuid.uuid4().hex[:8]}"
+            nieuw.append({"id": record_id, **obj.model_dump()})
+            events_nieuw.append((record_id, 1, None, {"id": record_id, **obj.model_dump(mode="json")}))
+
+    voor = financien_sleutels(db, model, [r["id"] for r in gewijzigd])
+    if nieuw:
+        db.execute(insert(model), nieuw)
+    if gewijzigd:
+        db.execute(update(model), gewijzigd)
+
+    opmerking = f"Import {job.bestandsnaam}"
+    publiceer_batch(db, model.__tablename__, "create", events_nieuw, job.user_id, opmerking)
+    publiceer_batch(db, model.__tablename__, "update", events_gewijzigd, job.user_id, opmerking)
+
+    ids = [r["id"] for r in nieuw] + [r["id"] for r in gewijzigd]
+    if ids:
+        markeer_gewijzigd(db, [model.__tablename__])
+        herbereken_financien(db, model, ids, voor)
+        try:
+            herindexeer_entiteiten(db, model, ids)
+        except Exception as e:
+            print(f"⚠️  Zoekindex update error: {e}")
+
+    db.commit()
+    job.aangemaakt += len(nieuw)
+    job.bijgewerkt += len(gewijzigd)
+
+
+def _opzoeken(db: Session, kolom, waarden: Set[str], id_kolom) -> Dict[str, str]:
+    """Eén IN query: waarde → id"""
+    waarden = waarden - {None}
+    if not waarden:
+        return {}
+    return dict(db.execute(select(kolom, id_kolom).where(kolom.in_(waarden))).all())
+
+
+def _importeer_leveranciers(db: Session, job: ImportJob, batch: List[Tuple[int, Dict[str, str]]]) -> None:
+    _upsert(
+        db, job, Leverancier, LeverancierCreate, LeverancierUpdate, "kvk_nummer", "lev",
+        [(nummer, data, [], set()) for nummer, data in batch],
+    )
+
+
+# Kolom in het bestand → (veld in het schema, kolom waarop opgezocht wordt)
+_CONTRACT_VERWIJZINGEN = {
+    "leverancier_kvk_nummer": ("leverancier_id", Leverancier.kvk_nummer, Leverancier.id),
+    "project_nummer": ("project_id", Project.project_nummer, Project.id),
+    "verantwoordelijke_email": ("verantwoordelijke_id", User.email, User.id),
+}
+
+
+def _importeer_contracten(db: Session, job: ImportJob, batch: List[Tuple[int, Dict[str, str]]]) -> None:
+    """
+    Contracten verwijzen naar leverancier/project/verantwoordelijke via
+    leverancier_kvk_nummer, project_nummer en verantwoordelijke_email
+    (of direct via de *_id kolommen). Zonder verantwoordelijke wordt de
+    gebruiker die importeert verantwoordelijke van nieuwe contracten.
+    """
+    gevonden = {
+        bron: _opzoeken(db, zoek_kolom, {d.get(bron) for _, d in batch}, id_kolom)
+        for bron, (_, zoek_kolom, id_kolom) in _CONTRACT_VERWIJZINGEN.items()
+    }
+
+    rijen = []
+    for nummer, data in batch:
+        fouten, niet_gevonden = [], set()
+        for bron, (veld, _, _) in _CONTRACT_VERWIJZINGEN.items():
+            waarde = data.pop(bron, None)
+            if waarde is None:
+                continue
+            if waarde in gevonden[bron]:
+                data[veld] = gevonden[bron][waarde]
+            else:
+                fouten.append(f"{bron}: '{waarde}' niet gevonden")
+                niet_gevonden.add(veld)
+        rijen.append((nummer, data, fouten, niet_gevonden))
+
+    _upsert(
+        db, job, Contract, ContractCreate, ContractUpdate, "contract_nummer", "ctr", rijen,
+        standaard_nieuw={"verantwoordelijke_id": job.user_id},
+    )
+
+
+_IMPORTEURS = {
+    ImportSoort.LEVERANCIERS: _importeer_leveranciers,
+    ImportSoort.CONTRACTS: _importeer_contracten,
+}
+
+
+# ============================================================================
+# JOBS
+# ============================================================================
+
+def taak_naam(soort: ImportSoort) -> str:
+    return f"import.{soort.value}"
+
+
+def _bewaar_voortgang(db: Session, job_id: str, job: ImportJob) -> None:
+    db.execute(update(Job).where(Job.id == job_id).values(resultaat=job.voortgang()))
+    db.commit()
+
+
+def voer_import_uit(db: Session, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Job handler: verwerk het bestand in batches
+
+    Elke batch wordt apart gecommit en daarna de voortgang. Het bestand
+    wordt altijd verwijderd, daarom is er maar één poging: een tweede zou
+    het bestand niet meer vinden.
+    """
+    job = ImportJob(
+        soort=ImportSoort(parameters["soort"]),
+        bestandsnaam=parameters["bestandsnaam"],
+        user_id=parameters.get("user_id"),
+    )
+    job_id, pad, bestandstype = parameters["job_id"], parameters["pad"], parameters["bestandstype"]
+    importeur = _IMPORTEURS[job.soort]
+    try:
+        job.totaal_rijen = schat_rijen(pad, bestandstype)
+        _bewaar_voortgang(db, job_id, job)
+        for batch in _batches(lees_rijen(pad, bestandstype), settings.IMPORT_CHUNK_SIZE):
+            try:
+                importeur(db, job, batch)
+            except Exception:
+                db.rollback()
+                raise
+            job.rijen_verwerkt += len(batch)
+            _bewaar_voortgang(db, job_id, job)
+    finally:
+        try:
+            os.remove(pad)
+        except OSError:
+            pass
+    return job.voortgang()
+
+
+def start_import(
+    db: Session, soort: ImportSoort, pad: str, bestandstype: str, bestandsnaam: str, user_id: str
+) -> Job:
+    """
+    Zet een import in de job wachtrij (en commit)
+
+    Het bestand op `pad` (in IMPORT_DIR) is een kopie van de upload; de
+    handler ruimt het op.
+    """
+    job = plan_job(db, taak_naam(soort), {
+        "soort": soort.value,
+        "pad": pad,
+        "bestandstype": bestandstype,
+        "bestandsnaam": bestandsnaam,
+        "user_id": user_id,
+    }, user_id=user_id)
+    # De handler krijgt alleen de parameters; de voortgang gaat naar deze job
+    job.parameters = {**job.parameters, "job_id": job.id}
+    db.commit()
+    return job
+
+
+def import_status(job: Job) -> Dict[str, Any]:
+    """Job als ImportJobResponse"""
+    parameters, voortgang = job.parameters or {}, job.resultaat or {}
+    return {
+        "id": job.id,
+        "soort": parameters.get("soort"),
+        "bestandsnaam": parameters.get("bestandsnaam"),
+        "status": job.status,
+        "totaal_rijen": voortgang.get("totaal_rijen"),
+        "rijen_verwerkt": voortgang.get("rijen_verwerkt", 0),
+        "aangemaakt": voortgang.get("aangemaakt", 0),
+        "bijgewerkt": voortgang.get("bijgewerkt", 0),
+        "aantal_fouten": voortgang.get("aantal_fouten", 0),
+        "fouten": voortgang.get("fouten", []),
+        "melding": job.fout,
+        "aangemaakt_op": job.aangemaakt_op,
+        "gestart_op": job.gestart_op,
+        "klaar_op": job.klaar_op,
+    }
@@ -0,0 +1,483 @@
+"""
+Achtergrondtaken
+================
+
+Taken worden bij het opstarten geregistreerd (registreer_taak) en als Job
+in de database ingepland (plan_job, of via een cron schema). Zo overleeft
+de wachtrij een herstart en kunnen meerdere processen dezelfde tabel
+gebruiken:
+
+1. JOB_WORKERS threads claimen jobs met een conditionele UPDATE
+   (status wachtrij → bezig); een job draait dus maar één keer tegelijk
+2. De handler krijgt een eigen sessie en de parameters; na afloop volgt
+   één commit. Een exception zet de job terug in de wachtrij met
+   exponentiële backoff, tot max_pogingen → mislukt
+3. De planner (elke JOB_PLANNER_SECONDEN) maakt jobs aan voor schema's
+   waarvan volgende_run verstreken is (hooguit één openstaande job per
+   schema) en zet jobs die langer dan JOB_MAX_DUUR_MINUTEN bezig zijn
+   (gecrashte worker) terug in de wachtrij
+
+Cron expressies zijn "minuut uur dag maand weekdag" in UTC, met *, */n,
+a-b en lijsten (0 of 7 = zondag).
+"""
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.historie_setup import HistorieContext
+from app.models.job import JOB_BEZIG, JOB_KLAAR, JOB_MISLUKT, JOB_WACHTRIJ, Job, JobSchema
+
+Handler = Callable[[Session, Dict[str, Any]], Optional[dict]]
+
+
+@dataclass
+class Taak:
+    naam: str
+    handler: Handler
+    omschrijving: str = ""
+    max_pogingen: int = 3
+    cron: Optional[str] = None  # standaard schema (None = alleen op aanvraag)
+
+
+_taken: Dict[str, Taak] = {}
+_wekker = threading.Event()
+_stop = threading.Event()
+_threads: List[threading.Thread] = []
+
+
+def registreer_taak(
+    naam: str,
+    handler: Handler,
+    omschrijving: str = "",
+    max_pogingen: Optional[int] = None,
+    cron: Optional[str] = None,
+) -> None:
+    """Registreer een taak (bij startup); cron maakt er een standaard schema bij"""
+    if cron:
+        Cron(cron)  # valideren
+    _taken[naam] = Taak(
+        naam=naam,
+        handler=handler,
+        omschrijving=omschrijving,
+        max_pogingen=max_pogingen or settings.JOB_MAX_POGINGEN,
+        cron=cron,
+    )
+
+
+def get_taken() -> List[Taak]:
+    return sorted(_taken.values(), key=lambda taak: taak.naam)
+
+
+# ============================================================================
+# CRON
+# ============================================================================
+
+def _cron_veld(tekst: str, laag: int, hoog: int) -> Set[int]:
+    waarden = set()
+    for deel in tekst.split(","):
+        bereik, _, stap = deel.partition("/")
+        stap = int(stap) if stap else 1
+        if bereik == "*":
+            start, einde = laag, hoog
+        elif "-" in bereik:
+            start, einde = (int(x) for x in bereik.split("-", 1))
+        else:
+            start = int(bereik)
+            einde = hoog if stap > 1 else start
+        if stap < 1 or start < laag or einde > hoog or start > einde:
+            raise ValueError(f"Ongeldig cron veld: '{tekst}'")
+        waarden.update(range(start, einde + 1, stap))
+    return waarden
+
+
+class Cron:
+    """Cron expressie: "minuut uur dag maand weekdag" """
+
+    def __init__(self, expressie: str):
+        velden = expressie.split()
+        if len(velden) != 5:
+            raise ValueError("Cron expressie heeft 5 velden: minuut uur dag maand weekdag")
+        try:
+            self.minuten = sorted(_cron_veld(velden[0], 0, 59))
+            self.uren = sorted(_cron_veld(velden[1], 0, 23))
+            self.dagen = _cron_veld(velden[2], 1, 31)
+            self.maanden = _cron_veld(velden[3], 1, 12)
+            self.weekdagen = {dag % 7 for dag in _cron_veld(velden[4], 0, 7)}
+        except ValueError as e:
+            raise ValueError(f"Ongeldige cron expressie '{expressie}': {e}")
+        # Zoals cron: zijn dag én weekdag beperkt, dan is één van beide genoeg
+        self._dag_of_weekdag = velden[2] != "*" and velden[4] != "*"
+
+    def _dag_past(self, dag: date) -> bool:
+        if dag.month not in self.maanden:
+            return False
+        in_dagen = dag.day in self.dagen
+        in_weekdagen = dag.isoweekday() % 7 in self.weekdagen
+        return (in_dagen or in_weekdagen) if self._dag_of_weekdag else (in_dagen and in_weekdagen)
+
+    def volgende(self, na: datetime) -> datetime:
+        """Eerstvolgende moment ná na"""
+        moment = (na + timedelta(minutes=1)).replace(second=0, microsecond=0)
+        for _ in range(366 * 5):
+            if self._dag_past(moment.date()):
+                for uur in self.uren:
+                    if uur < moment.hour:
+                        continue
+                    for minuut in self.minuten:
+                        if uur == moment.hour and minuut < moment.minute:
+                            continue
+                        return moment.replace(hour=uur, minute=minuut)
+            moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError("Cron expressie heeft geen volgende run")
+
+
+# ============================================================================
+# INPLANNEN
+# ============================================================================
+
+def _nu() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def plan_job(
+    db: Session,
+    soort: str,
+    parameters: Optional[dict] = None,
+    user_id: Optional[str] = None,
+    uitvoeren_op: Optional[datetime] = None,
+    schema_naam: Optional[str] = None,
+) -> Job:
+    """
+    Zet een job in de wachtrij (de caller commit)
+
+    Raises:
+        ValueError: onbekende taak
+    """
+    taak = _taken.get(soort)
+    if taak is None:
+        raise ValueError(f"Onbekende taak: {soort}")
+    job = Job(
+        id=f"job_{uuid.uuid4().hex[:12]}",
+        soort=soort,
+        parameters=parameters or {},
+        schema_naam=schema_naam,
+        status=JOB_WACHTRIJ,
+        pogingen=0,
+        max_pogingen=taak.max_pogingen,
+        uitvoeren_op=uitvoeren_op or _nu(),
+        aangemaakt_door_id=user_id,
+    )
+    db.add(job)
+    _wekker.set()
+    return job
+
+
+def herplan_job(db: Session, job: Job) -> None:
+    """Mislukte job opnieuw in de wachtrij, met een nieuwe reeks pogingen"""
+    job.status = JOB_WACHTRIJ
+    job.pogingen = 0
+    job.uitvoeren_op = _nu()
+    job.fout = None
+    job.klaar_op = None
+    _wekker.set()
+
+
+def zet_schema(db: Session, schema: JobSchema, cron: Optional[str] = None, actief: Optional[bool] = None) -> None:
+    """Pas cron en/of actief aan en bereken de volgende run (ValueError bij een ongeldige cron)"""
+    if cron is not None:
+        Cron(cron)
+        schema.cron = cron
+    if actief is not None:
+        schema.actief = actief
+    schema.volgende_run = Cron(schema.cron).volgende(_nu()) if schema.actief else None
+
+
+def _init_schemas() -> None:
+    """Standaard schema's aanmaken voor geregistreerde taken met een cron"""
+    db = SessionLocal()
+    try:
+        bestaand = {schema.naam: schema for schema in db.scalars(select(JobSchema))}
+        for taak in _taken.values():
+            if not taak.cron:
+                continue
+            schema = bestaand.get(taak.naam)
+            if schema is None:
+                db.add(JobSchema(
+                    naam=taak.naam,
+                    soort=taak.naam,
+                    cron=taak.cron,
+                    actief=True,
+                    volgende_run=Cron(taak.cron).volgende(_nu()),
+                ))
+            elif schema.actief and schema.volgende_run is None:
+                schema.volgende_run = Cron(schema.cron).volgende(_nu())
+        db.commit()
+    finally:
+        db.close()
+
+
+# ============================================================================
+# UITVOEREN
+# ============================================================================
+
+def _backoff(pogingen: int) -> timedelta:
+    return timedelta(seconds=min(settings.JOB_BACKOFF_SECONDEN * 2 ** max(pogingen - 1, 0), 3600))
+
+
+def _claim(worker: str) -> Optional[str]:
+    """Claim de eerstvolgende job in de wachtrij; None als er niets is"""
+    nu = _nu()
+    with engine.begin() as conn:
+        kandidaten = conn.scalars(
+            select(Job.id)
+            .where(Job.status == JOB_WACHTRIJ, Job.uitvoeren_op <= nu)
+            .order_by(Job.uitvoeren_op)
+            .limit(5)
+        ).all()
+    for job_id in kandidaten:
+        with engine.begin() as conn:
+            geclaimd = conn.execute(
+                update(Job.__table__)
+                .where(Job.id == job_id, Job.status == JOB_WACHTRIJ)
+                .values(status=JOB_BEZIG, gestart_op=nu, worker=worker, pogingen=Job.pogingen + 1, fout=None)
+            ).rowcount
+        if geclaimd:
+            return job_id
+    return None
+
+
+def _afronden(job_id: str, worker: str, **waarden) -> None:
+    # Alleen als de job nog van deze worker is (niet intussen herplant)
+    with engine.begin() as conn:
+        conn.execute(
+            update(Job.__table__)
+            .where(Job.id == job_id, Job.status == JOB_BEZIG, Job.worker == worker)
+            .values(**waarden)
+        )
+
+
+def voer_job_uit(job_id: str, worker: str = "handmatig") -> None:
+    """Voer een geclaimde job uit"""
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        if job is None:
+            return
+        taak = _taken.get(job.soort)
+        if taak is None:
+            _afronden(job_id, worker, status=JOB_MISLUKT, fout=f"Onbekende taak: {job.soort}", klaar_op=_nu())
+            return
+        pogingen, max_pogingen = job.pogingen, job.max_pogingen
+        parameters = dict(job.parameters or {})
+        user_id = job.aangemaakt_door_id
+
+        try:
+            with HistorieContext(db, user_id, "job", Job.__tablename__, job_id, opmerking=f"Job {job.soort}"):
+                resultaat = taak.handler(db, parameters)
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            fout = f"{type(e).__name__}: {e}"[:2000]
+            if pogingen < max_pogingen:
+                _afronden(job_id, worker, status=JOB_WACHTRIJ, fout=fout, uitvoeren_op=_nu() + _backoff(pogingen))
+                print(f"⚠️  Job {job_id} ({taak.naam}) poging {pogingen} mislukt: {e}")
+            else:
+                _afronden(job_id, worker, status=JOB_MISLUKT, fout=fout, klaar_op=_nu())
+                print(f"❌ Job {job_id} ({taak.naam}) mislukt na {pogingen} pogingen: {e}")
+            return
+
+        _afronden(job_id, worker, status=JOB_KLAAR, resultaat=resultaat, klaar_op=_nu())
+    finally:
+        db.close()
+
+
+def _worker(naam: str) -> None:
+    while not _stop.is_set():
+        try:
+            job_id = _claim(naam)
+        except Exception as e:
+            print(f"⚠️  Job worker {naam}: {e}")
+            job_id = None
+        if job_id is None:
+            _wekker.wait(timeout=settings.JOB_POLL_SECONDEN)
+            _wekker.clear()
+            continue
+        voer_job_uit(job_id, naam)
+
+
+# ============================================================================
+# PLANNER
+# ============================================================================
+
+def _herstel_vastgelopen(conn, nu: datetime) -> None:
+    """Jobs van een gecrashte worker terug in de wachtrij (of mislukt)"""
+    grens = nu - timedelta(minutes=settings.JOB_MAX_DUUR_MINUTEN)
+    vastgelopen = (Job.status == JOB_BEZIG) & (Job.gestart_op < grens)
+    conn.execute(
+        update(Job.__table__)
+        .where(vastgelopen, Job.pogingen >= Job.max_pogingen)
+        .values(status=JOB_MISLUKT, fout="Worker gestopt tijdens uitvoeren", klaar_op=nu)
+    )
+    conn.execute(
+        update(Job.__table__)
+        .where(vastgelopen)
+        .values(status=JOB_WACHTRIJ, fout="Worker gestopt tijdens uitvoeren", uitvoeren_op=nu)
+    )
+
+
+def plan_schemas(nu: Optional[datetime] = None) -> int:
+    """Maak jobs aan voor schema's die aan de beurt zijn; geeft het aantal terug"""
+    nu = nu or _nu()
+    gepland = 0
+    db = SessionLocal()
+    try:
+        _herstel_vastgelopen(db.connection(), nu)
+        db.commit()
+
+        schemas = db.scalars(
+            select(JobSchema).where(JobSchema.actief.is_(True), JobSchema.volgende_run <= nu)
+        ).all()
+        for schema in schemas:
+            if schema.soort not in _taken:
+                continue
+            open_job = db.scalar(
+                select(Job.id).where(Job.schema_naam == schema.naam, Job.status.in_([JOB_WACHTRIJ, JOB_BEZIG])).limit(1)
+            )
+            job = None if open_job else plan_job(
+                db, schema.soort, schema.parameters, schema_naam=schema.naam, uitvoeren_op=nu
+            )
+            # Conditioneel doorschuiven: een ander proces kan ons voor zijn
+            doorgeschoven = db.execute(
+                update(JobSchema.__table__)
+                .where(JobSchema.naam == schema.naam, JobSchema.volgende_run == schema.volgende_run)
+                .values(
+                    volgende_run=Cron(schema.cron).volgende(nu),
+                    laatste_run=nu,
+                    laatste_job_id=job.id if job else schema.laatste_job_id,
+                )
+            ).rowcount
+            if job is not None:
+                if doorgeschoven:
+                    gepland += 1
+                else:
+                    db.expunge(job)
+            db.commit()
+    finally:
+        db.close()
+    return gepland
+
+
+def _planner() -> None:
+    while not _stop.is_set():
+        try:
+            plan_schemas()
+        except Exception as e:
+            print(f"⚠️  Job planner: {e}")
+        _stop.wait(timeout=settings.JOB_PLANNER_SECONDEN)
+
+
+def start_jobs() -> None:
+    """Start de workers en de planner (in de lifespan van de app)"""
+    if _threads:
+        return
+    registreer_standaard_taken()
+    _init_schemas()
+    _stop.clear()
+    for nummer in range(settings.JOB_WORKERS):
+        _threads.append(threading.Thread(target=_worker, args=(f"worker-{nummer + 1}",), name=f"job-worker-{nummer + 1}", daemon=True))
+    _threads.append(threading.Thread(target=_planner, name="job-planner", daemon=True))
+    for thread in _threads:
+        thread.start()
+
+
+def stop_jobs() -> None:
+    """Stop workers en planner; lopende jobs worden na JOB_MAX_DUUR_MINUTEN herplant"""
+    _stop.set()
+    _wekker.set()
+    for thread in _threads:
+        thread.join(timeout=10)
+    _threads.clear()
+
+
+# ============================================================================
+# STANDAARD TAKEN
+# ============================================================================
+
+def _digest(db: Session, parameters: dict) -> dict:
+    from app.services.meldingen import verstuur_digests
+    return {"verstuurd": verstuur_digests()}
+
+
+def _herbouw_financien(db: Session, parameters: dict) -> dict:
+    from app.services.financien import herbouw_financien
+    herbouw_financien(db)
+    return {"herbouwd": True}
+
+
+def _opruimen_uploads(db: Session, parameters: dict) -> dict:
+    from app.services.storage.opruimen import ruim_wees_bestanden_op
+    return ruim_wees_bestanden_op(
+        db,
+        min_leeftijd=timedelta(hours=int(parameters.get("min_leeftijd_uur", 24))),
+        droog=bool(parameters.get("droog", False)),
+    )
+
+
+def _opruimen_outbox(db: Session, parameters: dict) -> dict:
+    from app.services.events import ruim_outbox_op
+    return {"verwijderd": ruim_outbox_op(db, int(parameters.get("bewaar_dagen", settings.EVENT_BEWAAR_DAGEN)))}
+
+
+def _import(db: Session, parameters: dict) -> dict:
+    from app.services.importeren import voer_import_uit
+    return voer_import_uit(db, parameters)
+
+
+def _opruimen_jobs(db: Session, parameters: dict) -> dict:
+    grens = _nu() - timedelta(days=int(parameters.get("bewaar_dagen", settings.JOB_BEWAAR_DAGEN)))
+    verwijderd = db.execute(
+        delete(Job).where(Job.status.in_([JOB_KLAAR, JOB_MISLUKT]), Job.klaar_op < grens)
+    ).rowcount
+    return {"verwijderd": verwijderd}
+
+
+def registreer_standaard_taken() -> None:
+    registreer_taak(
+        "meldingen.digest", _digest,
+        omschrijving="Digests van deadlines en reviews versturen",
+        max_pogingen=1,  # de volgende run pakt het toch weer op
+        cron=None if settings.MELDING_KANAAL == "uit" else "0 * * * *",
+    )
+    registreer_taak(
+        "financien.herbouw", _herbouw_financien,
+        omschrijving="Financiële totalen per project en vestiging opnieuw berekenen",
+        cron="30 3 * * *",
+    )
+    for soort in ("leveranciers", "contracts"):
+        registreer_taak(
+            f"import.{soort}", _import,
+            omschrijving=f"Import van {soort} uit een CSV/XLSX bestand (via POST /imports/{soort})",
+            max_pogingen=1,  # het bestand is na de eerste poging weg
+        )
+    registreer_taak(
+        "opruimen.uploads", _opruimen_uploads,
+        omschrijving="Bestanden zonder document of blob verwijderen (parameters: droog, min_leeftijd_uur)",
+        cron="0 4 * * *",
+    )
+    registreer_taak(
+        "opruimen.outbox", _opruimen_outbox,
+        omschrijving="Afgeleverde outbox events verwijderen (parameter: bewaar_dagen)",
+        cron="15 4 * * *",
+    )
+    registreer_taak(
+        "opruimen.jobs", _opruimen_jobs,
+        omschrijving="Afgeronde jobs verwijderen (parameter: bewaar_dagen)",
+        cron="30 4 * * *",
+    )
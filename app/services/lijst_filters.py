@@ -0,0 +1,110 @@
+"""
+Filters van de lijst endpoints
+==============================
+
+Dezelfde filters gelden voor de lijst (JSON) en de export (CSV/XLSX)
+endpoints. Werkt op een ORM Query en op een select(); ongeldige status of
+type waarden worden genegeerd, net als voorheen in de lijst endpoints.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional, TypeVar
+
+from app.models.contract import Contract, ContractStatus, ContractType
+from app.models.historie import HistorieRecord
+from app.models.leverancier import Leverancier
+from app.models.project import Project, ProjectStatus
+from app.services.zoek_filters import tekst_filter
+
+Q = TypeVar("Q")
+
+
+def _enum(enum_type, waarde: Optional[str]):
+    try:
+        return enum_type(waarde) if waarde else None
+    except ValueError:
+        return None
+
+
+def filter_projects(
+    query: Q,
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    vestiging_id: Optional[str] = None,
+) -> Q:
+    if search:
+        query = query.filter(tekst_filter(Project, search))
+
+    project_status = _enum(ProjectStatus, status)
+    if project_status:
+        query = query.filter(Project.status == project_status)
+
+    if vestiging_id:
+        query = query.filter(Project.vestiging_id == vestiging_id)
+    return query
+
+
+def filter_contracts(
+    query: Q,
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    type: Optional[str] = None,
+    project_id: Optional[str] = None,
+    actief: Optional[bool] = None,
+    min_percentage: Optional[float] = None,
+    max_percentage: Optional[float] = None,
+) -> Q:
+    """
+    Contract filters; de query moet Leverancier (outer) joinen voor search
+
+    actief en de percentages gebruiken de SQL expressies van de hybrid
+    properties, bijv. actieve contracten boven 80% gefactureerd:
+    actief=True, min_percentage=80
+    """
+    if search:
+        query = query.filter(
+            tekst_filter(Contract, search) |
+            tekst_filter(Leverancier, search, ["naam"])
+        )
+
+    contract_status = _enum(ContractStatus, status)
+    if contract_status:
+        query = query.filter(Contract.status == contract_status)
+
+    contract_type = _enum(ContractType, type)
+    if contract_type:
+        query = query.filter(Contract.type == contract_type)
+
+    if project_id:
+        query = query.filter(Contract.project_id == project_id)
+
+    if actief is not None:
+        query = query.filter(Contract.is_actief if actief else ~Contract.is_actief)
+
+    if min_percentage is not None:
+        query = query.filter(Contract.gefactureerd_percentage >= min_percentage)
+
+    if max_percentage is not None:
+        query = query.filter(Contract.gefactureerd_percentage <= max_percentage)
+    return query
+
+
+def filter_historie(
+    query: Q,
+    tabel_naam: Optional[str] = None,
+    actie: Optional[str] = None,
+    user_id: Optional[str] = None,
+    hours: Optional[int] = None,
+) -> Q:
+    if tabel_naam:
+        query = query.filter(HistorieRecord.tabel_naam == tabel_naam)
+
+    if actie:
+        query = query.filter(HistorieRecord.actie == actie)
+
+    if user_id:
+        query = query.filter(HistorieRecord.gewijzigd_door_id == user_id)
+
+    if hours:
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        query = query.filter(HistorieRecord.gewijzigd_op >= cutoff)
+    return query
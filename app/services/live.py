@@ -0,0 +1,271 @@
+"""
+Live updates (Server-Sent Events)
+=================================
+
+Clients openen GET /live en krijgen een melding zodra een fase, document of
+commentaar dat zij mogen zien gewijzigd is, plus een "taken" melding als
+hun /me/taken daardoor verandert. De client haalt daarna zelf de actuele
+data op; pollen is niet meer nodig.
+
+Gevoed door de outbox (app/services/events.py) als lokale abonnee: alleen
+gecommitte wijzigingen, ook die van bulk/import en andere processen.
+Per batch events worden de fases in één query opgezocht; daarna wordt per
+verbonden client gefilterd (rechten checks in app/api/endpoints/live.py).
+
+De meldingen bevatten ids en gewijzigde veldnamen, geen inhoud: wat een
+client te zien krijgt bepalen de gewone endpoints.
+"""
+import asyncio
+import json
+import threading
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.outbox import OutboxEvent
+from app.models.project import Project
+from app.models.projectfase import ProjectFase, ProjectFaseCommentaar, ProjectFaseDocument, ProjectFaseStatus
+from app.services.events import abonneer
+
+FASES = ProjectFase.__tablename__
+DOCUMENTEN = ProjectFaseDocument.__tablename__
+COMMENTAREN = ProjectFaseCommentaar.__tablename__
+
+LIVE_TABELLEN = [FASES, DOCUMENTEN, COMMENTAREN]
+SOORTEN = {FASES: "fase", DOCUMENTEN: "document", COMMENTAREN: "commentaar"}
+
+# Velden van een fase die /me/taken beïnvloeden
+TAAK_VELDEN = {"status", "verantwoordelijke_id", "geplande_eind_datum"}
+
+
+@dataclass
+class LiveBericht:
+    """Eén wijziging, met wat nodig is om per client te filteren"""
+    event_id: int
+    soort: str  # "fase", "document", "commentaar"
+    data: dict
+    # Fase context (SimpleNamespace met leverancier_id, project_id, ...)
+    fase: Optional[SimpleNamespace] = None
+    # Alleen voor documenten
+    zichtbaar_voor_leverancier: Optional[bool] = None
+    # Wiens /me/taken verandert
+    taken_voor: Set[str] = field(default_factory=set)
+    review: bool = False  # status ging naar of van IN_REVIEW
+
+
+# ============================================================================
+# OUTBOX EVENTS → BERICHTEN
+# ============================================================================
+
+def _veld(ev: OutboxEvent, naam: str):
+    """Waarde na de wijziging, anders ervoor (delete)"""
+    for data in (ev.data_na, ev.data_voor):
+        if data and naam in data:
+            return data[naam]
+    return None
+
+
+def berichten_uit_events(db: Session, events: List[OutboxEvent]) -> List[LiveBericht]:
+    """Zoek per batch de fase context op (één query per tabel)"""
+    events = [ev for ev in events if ev.tabel_naam in SOORTEN]
+    if not events:
+        return []
+
+    # Bij een update staan alleen de gewijzigde velden in het event
+    fase_van: Dict[str, str] = {}
+    ontbrekend: Set[str] = set()
+    for ev in events:
+        if ev.tabel_naam == FASES:
+            fase_van[ev.record_id] = ev.record_id
+        elif _veld(ev, "fase_id"):
+            fase_van[ev.record_id] = _veld(ev, "fase_id")
+        else:
+            ontbrekend.add(ev.record_id)
+
+    # Documenten altijd opzoeken: de actuele zichtbaarheid is nodig
+    document_zichtbaar: Dict[str, bool] = {}
+    ids = {ev.record_id for ev in events if ev.tabel_naam == DOCUMENTEN}
+    if ids:
+        for doc_id, fase_id, zichtbaar in db.execute(
+            select(ProjectFaseDocument.id, ProjectFaseDocument.fase_id, ProjectFaseDocument.zichtbaar_voor_leverancier)
+            .where(ProjectFaseDocument.id.in_(ids))
+        ):
+            fase_van.setdefault(doc_id, fase_id)
+            document_zichtbaar[doc_id] = zichtbaar
+    if ontbrekend:
+        fase_van.update(db.execute(
+            select(ProjectFaseCommentaar.id, ProjectFaseCommentaar.fase_id)
+            .where(ProjectFaseCommentaar.id.in_(ontbrekend))
+        ).all())
+
+    fases: Dict[str, SimpleNamespace] = {
+        rij.id: SimpleNamespace(**rij._asdict())
+        for rij in db.execute(
+            select(
+                ProjectFase.id, ProjectFase.project_id, ProjectFase.leverancier_id,
+                ProjectFase.verantwoordelijke_id, Project.projectleider_id,
+            )
+            .join(Project, Project.id == ProjectFase.project_id)
+            .where(ProjectFase.id.in_(set(fase_van.values())))
+        )
+    }
+
+    berichten = []
+    for ev in events:
+        fase_id = fase_van.get(ev.record_id)
+        fase = fases.get(fase_id)
+        if fase is None and ev.tabel_naam == FASES and ev.data_voor:
+            # Verwijderde fase: context uit de snapshot
+            fase = SimpleNamespace(
+                id=fase_id,
+                project_id=ev.data_voor.get("project_id"),
+                leverancier_id=ev.data_voor.get("leverancier_id"),
+                verantwoordelijke_id=ev.data_voor.get("verantwoordelijke_id"),
+                projectleider_id=None,
+            )
+        if fase is None:
+            continue  # fase bestaat niet meer, niemand om te melden
+
+        gewijzigd = sorted((ev.data_na or ev.data_voor or {}).keys())
+        bericht = LiveBericht(
+            event_id=ev.id,
+            soort=SOORTEN[ev.tabel_naam],
+            data={
+                "actie": ev.actie,
+                "id": ev.record_id,
+                "fase_id": fase.id,
+                "project_id": fase.project_id,
+                "versie": ev.versie_nummer,
+                "velden": gewijzigd if ev.actie == "update" else [],
+            },
+            fase=fase,
+        )
+
+        if ev.tabel_naam == FASES:
+            if "status" in (ev.data_na or {}):
+                bericht.data["status"] = ev.data_na["status"]
+            if ev.actie != "update" or TAAK_VELDEN & set(gewijzigd):
+                bericht.taken_voor = {
+                    user_id for user_id in (
+                        _veld(ev, "verantwoordelijke_id"),
+                        (ev.data_voor or {}).get("verantwoordelijke_id"),
+                        fase.verantwoordelijke_id,
+                    ) if user_id
+                }
+            statussen = {(ev.data_voor or {}).get("status"), (ev.data_na or {}).get("status")}
+            bericht.review = ProjectFaseStatus.IN_REVIEW.value in statussen
+        elif ev.tabel_naam == DOCUMENTEN:
+            zichtbaar = {document_zichtbaar.get(ev.record_id), _veld(ev, "zichtbaar_voor_leverancier")}
+            if "zichtbaar_voor_leverancier" in (ev.data_voor or {}):
+                zichtbaar.add(ev.data_voor["zichtbaar_voor_leverancier"])
+            # Zichtbaar geweest of geworden: de leverancier moet het ook horen
+            bericht.zichtbaar_voor_leverancier = True in zichtbaar
+            if ev.actie != "update" and fase.verantwoordelijke_id:
+                bericht.taken_voor = {fase.verantwoordelijke_id}  # missende documenten
+
+        berichten.append(bericht)
+    return berichten
+
+
+def gemiste_berichten(na_id: int) -> Optional[List[LiveBericht]]:
+    """
+    Berichten na na_id uit de outbox, voor een client die herverbindt met
+    Last-Event-ID; None als het er meer dan LIVE_REPLAY_MAX zijn
+    """
+    db = SessionLocal()
+    try:
+        events = db.scalars(
+            select(OutboxEvent)
+            .where(OutboxEvent.id > na_id, OutboxEvent.tabel_naam.in_(LIVE_TABELLEN))
+            .order_by(OutboxEvent.id)
+            .limit(settings.LIVE_REPLAY_MAX + 1)
+        ).all()
+        if len(events) > settings.LIVE_REPLAY_MAX:
+            return None
+        return berichten_uit_events(db, events)
+    finally:
+        db.close()
+
+
+def sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    """Eén Server-Sent Event"""
+    regel = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{regel}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# ============================================================================
+# VERBONDEN CLIENTS
+# ============================================================================
+
+class Luisteraar:
+    """
+    Eén open verbinding
+
+    filter(bericht) geeft de SSE event namen die deze client krijgt
+    (bijv. ["fase", "taken"]), of een lege lijst.
+    """
+
+    def __init__(self, filter: Callable[[LiveBericht], List[str]]):
+        self.filter = filter
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_MAX)
+        self.overgelopen = False
+
+    def _plaats(self, event_id: int, tekst: str) -> None:
+        # Draait in de event loop van de verbinding
+        try:
+            self.queue.put_nowait((event_id, tekst))
+        except asyncio.QueueFull:
+            self.overgelopen = True
+
+    def stuur(self, bericht: LiveBericht) -> None:
+        for naam in self.filter(bericht):
+            self.loop.call_soon_threadsafe(
+                self._plaats, bericht.event_id, sse(naam, bericht.data, bericht.event_id)
+            )
+
+
+class LiveHub:
+    """Verdeelt berichten over de verbonden clients van dit proces"""
+
+    def __init__(self):
+        self._luisteraars: Set[Luisteraar] = set()
+        self._lock = threading.Lock()
+
+    def aanmelden(self, luisteraar: Luisteraar) -> None:
+        with self._lock:
+            self._luisteraars.add(luisteraar)
+
+    def afmelden(self, luisteraar: Luisteraar) -> None:
+        with self._lock:
+            self._luisteraars.discard(luisteraar)
+
+    @property
+    def aantal(self) -> int:
+        return len(self._luisteraars)
+
+    def verwerk(self, db: Session, events: List[OutboxEvent]) -> None:
+        """Outbox handler (lokale abonnee, in de dispatcher thread)"""
+        with self._lock:
+            luisteraars = list(self._luisteraars)
+        if not luisteraars:
+            return
+        for bericht in berichten_uit_events(db, events):
+            for luisteraar in luisteraars:
+                try:
+                    luisteraar.stuur(bericht)
+                except RuntimeError:
+                    self.afmelden(luisteraar)  # event loop is al gesloten
+
+
+live_hub = LiveHub()
+
+
+def setup_live_updates() -> None:
+    """Abonneer de hub op de outbox (bij startup)"""
+    abonneer("live", live_hub.verwerk, tabellen=LIVE_TABELLEN, lokaal=True)
@@ -0,0 +1,59 @@
+"""
+Meldingen: digests van deadlines en reviews per user
+
+Gebruik:
+    from app.services.meldingen import get_kanaal, verstuur_digests
+
+    kanaal = get_kanaal()   # standaard kanaal (MELDING_KANAAL)
+    verstuur_digests()      # één ronde (normaal via de job "meldingen.digest")
+"""
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.meldingen.base import Digest, DigestItem, MeldingKanaal
+from app.services.meldingen.bestand import BestandKanaal
+from app.services.meldingen.smtp import SmtpKanaal
+
+_kanalen: Dict[str, MeldingKanaal] = {}
+
+
+def _create_kanaal(naam: str) -> MeldingKanaal:
+    if naam == "bestand":
+        return BestandKanaal(Path(settings.MELDING_DIR))
+    if naam == "smtp":
+        return SmtpKanaal(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            gebruiker=settings.SMTP_GEBRUIKER,
+            wachtwoord=settings.SMTP_WACHTWOORD,
+            starttls=settings.SMTP_STARTTLS,
+        )
+    raise ValueError(f"Onbekend melding kanaal: {naam}")
+
+
+def get_kanaal(naam: Optional[str] = None) -> MeldingKanaal:
+    """
+    Haal een kanaal op (standaard MELDING_KANAAL)
+
+    Kanalen worden één keer aangemaakt en daarna hergebruikt.
+    """
+    naam = naam or settings.MELDING_KANAAL
+    if naam not in _kanalen:
+        _kanalen[naam] = _create_kanaal(naam)
+    return _kanalen[naam]
+
+
+from app.services.meldingen.digest import calculate_priority, stel_digests_samen, verstuur_digests  # noqa: E402
+
+__all__ = [
+    "Digest",
+    "DigestItem",
+    "MeldingKanaal",
+    "BestandKanaal",
+    "SmtpKanaal",
+    "get_kanaal",
+    "calculate_priority",
+    "stel_digests_samen",
+    "verstuur_digests",
+]
@@ -0,0 +1,74 @@
+"""
+Kanaal interface voor meldingen
+
+Een digest bundelt alle nieuwe meldingen voor één user. Elk kanaal krijgt
+hetzelfde e-mailbericht; alleen de aflevering verschilt (SMTP, bestand).
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.message import EmailMessage
+from typing import List, Optional
+
+from app.core.config import settings
+
+
+@dataclass
+class DigestItem:
+    """Eén fase in een digest"""
+    sleutel: str
+    soort: str  # "deadline" of "review"
+    fase_id: str
+    fase_naam: str
+    project_naam: str
+    project_nummer: Optional[str]
+    deadline: Optional[datetime]
+    prioriteit: str
+
+    def regel(self) -> str:
+        deadline = f" - deadline {self.deadline:%d-%m-%Y}" if self.deadline else ""
+        nummer = f"{self.project_nummer} " if self.project_nummer else ""
+        return f"[{self.prioriteit}] {nummer}{self.project_naam}: {self.fase_naam}{deadline}"
+
+
+@dataclass
+class Digest:
+    """Nieuwe meldingen voor één user"""
+    user_id: str
+    email: str
+    naam: str
+    items: List[DigestItem] = field(default_factory=list)
+
+    @property
+    def deadlines(self) -> List[DigestItem]:
+        return [item for item in self.items if item.soort == "deadline"]
+
+    @property
+    def reviews(self) -> List[DigestItem]:
+        return [item for item in self.items if item.soort == "review"]
+
+    def bericht(self) -> EmailMessage:
+        """Het digest als e-mail (platte tekst)"""
+        regels = [f"Hallo {self.naam},", ""]
+        if self.deadlines:
+            regels += ["Deadlines:"] + [f"  - {item.regel()}" for item in self.deadlines] + [""]
+        if self.reviews:
+            regels += ["Wacht op acceptatie:"] + [f"  - {item.regel()}" for item in self.reviews] + [""]
+        regels.append("Zie 'Mijn taken' voor het actuele overzicht.")
+
+        bericht = EmailMessage()
+        bericht["From"] = settings.MELDING_AFZENDER
+        bericht["To"] = self.email
+        bericht["Subject"] = f"{len(self.items)} taken vragen je aandacht"
+        bericht.set_content("\n".join(regels))
+        return bericht
+
+
+class MeldingKanaal(ABC):
+    """Basis voor alle kanalen"""
+
+    naam: str = ""
+
+    @abstractmethod
+    def verstuur(self, digest: Digest) -> None:
+        """Lever één digest af; een exception betekent: niet afgeleverd"""
@@ -0,0 +1,24 @@
+"""
+Bestand kanaal - elk digest als .eml in MELDING_DIR (ontwikkeling en tests)
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.services.meldingen.base import Digest, MeldingKanaal
+
+
+class BestandKanaal(MeldingKanaal):
+    """Schrijft digests weg in plaats van ze te mailen"""
+    naam = "bestand"
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def verstuur(self, digest: Digest) -> None:
+        tijd = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        pad = self.root / f"{tijd}_{digest.user_id}.eml"
+        # Eerst naar een tijdelijk bestand: een half geschreven digest telt niet
+        tijdelijk = pad.with_suffix(".tmp")
+        tijdelijk.write_bytes(digest.bericht().as_bytes())
+        tijdelijk.replace(pad)
@@ -0,0 +1,194 @@
+"""
+Digest engine voor deadlines en reviews
+=======================================
+
+Als job "meldingen.digest" (standaard elk uur, zie /jobs/schemas):
+
+1. Eén query over project_fases: deadlines binnen MELDING_DEADLINE_DAGEN
+   (range scan op de index op geplande_eind_datum, tot MELDING_VERLOPEN_DAGEN
+   terug) plus fases IN_REVIEW (index op status)
+2. Per user de items bepalen, met dezelfde regels als /me/taken (app/core/authorization.py):
+   - deadline: de verantwoordelijke van een niet-afgeronde fase
+   - review: beheerders, controleurs en de projectleider van het project
+3. Items die de user al gemeld zijn (verstuurde_meldingen) vallen af
+4. Per user één digest via het kanaal; pas als dat lukt worden de items
+   als verstuurd vastgelegd (mislukt → volgende ronde opnieuw)
+
+Een item wordt opnieuw gemeld als de prioriteit oploopt (middel → hoog →
+verlopen), de deadline verschuift, of een fase opnieuw in review komt.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.authorization import REVIEW_ROLLEN, check_review_toegang
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.melding import VerstuurdeMelding
+from app.models.project import Project
+from app.models.projectfase import ProjectFase, ProjectFaseStatus
+from app.models.user import User, UserRole
+from app.services.meldingen import get_kanaal
+from app.services.meldingen.base import Digest, DigestItem
+
+def _utc(moment: datetime) -> datetime:
+    # SQLite geeft datums zonder tijdzone terug
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def calculate_priority(deadline: datetime = None, nu: datetime = None) -> str:
+    """
+    Calculate priority based on deadline
+    - Hoog: deadline binnen 3 dagen of verlopen
+    - Middel: deadline binnen 7 dagen
+    - Laag: deadline > 7 dagen of geen deadline
+    """
+    if not deadline:
+        return "laag"
+
+    now = nu or datetime.now(timezone.utc)
+    days_until_deadline = (_utc(deadline) - now).days
+
+    if days_until_deadline <= 3:
+        return "hoog"
+    elif days_until_deadline <= 7:
+        return "middel"
+    else:
+        return "laag"
+
+
+# ============================================================================
+# SAMENSTELLEN
+# ============================================================================
+
+def stel_digests_samen(db: Session, nu: Optional[datetime] = None) -> List[Digest]:
+    """Digests met alleen nieuwe items (nog niets vastgelegd of verstuurd)"""
+    nu = nu or datetime.now(timezone.utc)
+    van = nu - timedelta(days=settings.MELDING_VERLOPEN_DAGEN)
+    tot = nu + timedelta(days=settings.MELDING_DEADLINE_DAGEN)
+
+    fases = db.execute(
+        select(
+            ProjectFase.id, ProjectFase.naam, ProjectFase.status, ProjectFase.versie_nummer,
+            ProjectFase.verantwoordelijke_id, ProjectFase.geplande_eind_datum,
+            Project.naam.label("project_naam"), Project.project_nummer, Project.projectleider_id,
+        )
+        .join(Project, Project.id == ProjectFase.project_id)
+        .where(or_(
+            and_(
+                ProjectFase.geplande_eind_datum.between(van, tot),
+                ProjectFase.status != ProjectFaseStatus.AFGEROND,
+            ),
+            ProjectFase.status == ProjectFaseStatus.IN_REVIEW,
+        ))
+    ).all()
+    if not fases:
+        return []
+
+    user_ids = {f.verantwoordelijke_id for f in fases if f.verantwoordelijke_id}
+    user_ids |= {f.projectleider_id for f in fases if f.projectleider_id and f.status == ProjectFaseStatus.IN_REVIEW}
+    users: Dict[str, User] = {
+        user.id: user
+        for user in db.scalars(
+            select(User).where(
+                User.is_active.is_(True),
+                or_(User.id.in_(user_ids), User.role.in_([UserRole.BEHEERDER, UserRole.CONTROLEUR])),
+            )
+        )
+    }
+    reviewers = [user for user in users.values() if user.role in REVIEW_ROLLEN]
+
+    per_user: Dict[str, Dict[str, DigestItem]] = defaultdict(dict)
+    for f in fases:
+        deadline = _utc(f.geplande_eind_datum) if f.geplande_eind_datum else None
+        prioriteit = calculate_priority(deadline, nu)
+        basis = dict(
+            fase_id=f.id, fase_naam=f.naam, project_naam=f.project_naam,
+            project_nummer=f.project_nummer, deadline=deadline,
+        )
+
+        if deadline and van <= deadline <= tot and f.status != ProjectFaseStatus.AFGEROND and f.verantwoordelijke_id in users:
+            niveau = "verlopen" if deadline < nu else prioriteit
+            sleutel = f"deadline:{f.id}:{niveau}:{deadline:%Y-%m-%d}"
+            per_user[f.verantwoordelijke_id][sleutel] = DigestItem(
+                sleutel=sleutel, soort="deadline", prioriteit=niveau, **basis
+            )
+
+        if f.status == ProjectFaseStatus.IN_REVIEW:
+            ontvangers = [user for user in reviewers if check_review_toegang(user, f.projectleider_id)]
+            sleutel = f"review:{f.id}:{f.versie_nummer}"
+            for user in ontvangers:
+                per_user[user.id][sleutel] = DigestItem(
+                    sleutel=sleutel, soort="review", prioriteit=prioriteit, **basis
+                )
+
+    # Al gemeld → overslaan
+    alle_sleutels = {sleutel for items in per_user.values() for sleutel in items}
+    gemeld = set(db.execute(
+        select(VerstuurdeMelding.user_id, VerstuurdeMelding.sleutel).where(
+            VerstuurdeMelding.user_id.in_(list(per_user)),
+            VerstuurdeMelding.sleutel.in_(alle_sleutels),
+        )
+    ).all())
+
+    digests = []
+    for user_id, items in per_user.items():
+        nieuw = [item for sleutel, item in items.items() if (user_id, sleutel) not in gemeld]
+        if nieuw:
+            user = users[user_id]
+            nieuw.sort(key=lambda item: (item.soort, item.deadline or tot))
+            digests.append(Digest(user_id=user.id, email=user.email, naam=user.name, items=nieuw))
+    return digests
+
+
+# ============================================================================
+# VERSTUREN
+# ============================================================================
+
+def verstuur_digests(nu: Optional[datetime] = None) -> int:
+    """
+    Eén ronde: digests samenstellen en versturen
+
+    Returns:
+        Aantal verstuurde digests
+    """
+    nu = nu or datetime.now(timezone.utc)
+    kanaal = get_kanaal()
+    db = SessionLocal()
+    db.info["disable_historie"] = True
+    verstuurd = 0
+    try:
+        for digest in stel_digests_samen(db, nu):
+            # Eerst vastleggen (unieke sleutel): een tweede proces dat dezelfde
+            # ronde draait faalt hier en verstuurt niets dubbel
+            try:
+                db.add_all([
+                    VerstuurdeMelding(user_id=digest.user_id, sleutel=item.sleutel, kanaal=kanaal.naam, verstuurd_op=nu)
+                    for item in digest.items
+                ])
+                db.flush()
+                kanaal.verstuur(digest)
+                db.commit()
+                verstuurd += 1
+            except IntegrityError:
+                db.rollback()
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️  Digest voor {digest.email} niet verstuurd: {e}")
+
+        # Oude registraties vallen buiten elk venster en kunnen weg
+        db.execute(delete(VerstuurdeMelding).where(
+            VerstuurdeMelding.verstuurd_op
+            < nu - timedelta(days=settings.MELDING_VERLOPEN_DAGEN + settings.MELDING_DEADLINE_DAGEN)
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    if verstuurd:
+        print(f"📬 {verstuurd} digest(s) verstuurd via {kanaal.naam}")
+    return verstuurd
@@ -0,0 +1,26 @@
+"""
+SMTP kanaal - digests als e-mail
+"""
+import smtplib
+
+from app.services.meldingen.base import Digest, MeldingKanaal
+
+
+class SmtpKanaal(MeldingKanaal):
+    """Verstuurt via een SMTP server (ook een lokale stand-in, bijv. aiosmtpd)"""
+    naam = "smtp"
+
+    def __init__(self, host: str, port: int, gebruiker: str = "", wachtwoord: str = "", starttls: bool = False):
+        self.host = host
+        self.port = port
+        self.gebruiker = gebruiker
+        self.wachtwoord = wachtwoord
+        self.starttls = starttls
+
+    def verstuur(self, digest: Digest) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.gebruiker:
+                smtp.login(self.gebruiker, self.wachtwoord)
+            smtp.send_message(digest.bericht())
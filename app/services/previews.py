@@ -0,0 +1,194 @@
+"""
+Previews voor documenten
+========================
+
+Na een upload wordt op de achtergrond een kleine preview gemaakt:
+- Foto's: thumbnail (JPEG), langste zijde PREVIEW_MAX_PIXELS
+- PDF's (tekeningen, rapporten): eerste pagina als PNG
+
+De preview wordt via de storage laag naast het origineel opgeslagen en
+is op te vragen via /documenten/{id}/preview. Zo hoeft een documentgrid
+niet de volledige (multi-MB) bestanden op te halen.
+
+Vereist Pillow, voor PDF's ook PyMuPDF (beide optioneel). Zonder deze
+packages blijft preview_status leeg en valt de frontend terug op een icoon.
+"""
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.projectfase import ProjectFaseDocument
+from app.services.storage import get_storage
+
+AFBEELDING_TYPES = {"jpg", "jpeg", "png", "gif", "webp", "bmp", "tif", "tiff"}
+PDF_TYPES = {"pdf"}
+
+PREVIEW_WACHTRIJ = "wachtrij"
+PREVIEW_KLAAR = "klaar"
+PREVIEW_MISLUKT = "mislukt"
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _heeft_pillow() -> bool:
+    try:
+        import PIL  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _heeft_pymupdf() -> bool:
+    try:
+        import fitz  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def kan_preview_maken(bestandstype: Optional[str]) -> bool:
+    """Check of er voor dit bestandstype een preview gemaakt kan worden"""
+    bestandstype = (bestandstype or "").lower()
+    if bestandstype in AFBEELDING_TYPES:
+        return _heeft_pillow()
+    if bestandstype in PDF_TYPES:
+        return _heeft_pymupdf()
+    return False
+
+
+def _thumbnail_afbeelding(data: bytes) -> Tuple[bytes, str]:
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as img:
+        # Foto's van telefoons: rotatie staat in de EXIF data
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((settings.PREVIEW_MAX_PIXELS, settings.PREVIEW_MAX_PIXELS))
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        output = io.BytesIO()
+        img.save(output, format="JPEG", quality=80, optimize=True)
+        return output.getvalue(), "jpg"
+
+
+def _preview_pdf(data: bytes) -> Tuple[bytes, str]:
+    import fitz
+
+    with fitz.open(stream=data, filetype="pdf") as pdf:
+        pagina = pdf[0]
+        schaal = settings.PREVIEW_MAX_PIXELS / max(pagina.rect.width, pagina.rect.height)
+        pixmap = pagina.get_pixmap(matrix=fitz.Matrix(schaal, schaal), alpha=False)
+        return pixmap.tobytes("png"), "png"
+
+
+def maak_preview(data: bytes, bestandstype: str) -> Tuple[bytes, str]:
+    """
+    Maak een preview van de inhoud van een bestand
+
+    Returns:
+        (preview bytes, bestandstype van de preview)
+    """
+    if bestandstype.lower() in PDF_TYPES:
+        return _preview_pdf(data)
+    return _thumbnail_afbeelding(data)
+
+
+def _zet_preview(document_id: str, **values) -> int:
+    """
+    Werk de preview kolommen bij zonder de ORM
+
+    Gaat bewust niet via een flush, zodat er geen historie record of nieuwe
+    versie ontstaat voor iets wat de gebruiker niet gewijzigd heeft.
+    """
+    documenten = ProjectFaseDocument.__table__
+    with engine.begin() as conn:
+        return conn.execute(
+            update(documenten)
+            .where(documenten.c.id == document_id)
+            .values(**values)
+        ).rowcount
+
+
+def genereer_preview(document_id: str) -> None:
+    """
+    Genereer en bewaar de preview van een document (draait in de worker pool)
+    """
+    db = SessionLocal()
+    try:
+        document = db.query(ProjectFaseDocument).filter(
+            ProjectFaseDocument.id == document_id
+        ).first()
+        if not document:
+            return
+        opslag_type = document.opslag_type
+        opslag_pad = document.opslag_pad
+        bestandstype = document.bestandstype
+    finally:
+        db.close()
+
+    storage = get_storage(opslag_type)
+    try:
+        data = b"".join(storage.open(opslag_pad))
+        preview, preview_type = maak_preview(data, bestandstype)
+        opgeslagen = storage.save(io.BytesIO(preview), f"preview_{document_id}.{preview_type}")
+    except Exception as e:
+        print(f"⚠️  Preview voor document {document_id} mislukt: {e}")
+        _zet_preview(document_id, preview_status=PREVIEW_MISLUKT)
+        return
+
+    bijgewerkt = _zet_preview(
+        document_id,
+        preview_status=PREVIEW_KLAAR,
+        preview_opslag_pad=opgeslagen.opslag_pad,
+        preview_content_hash=opgeslagen.content_hash,
+        preview_bestandstype=preview_type,
+    )
+    if not bijgewerkt:
+        # Document is tussentijds verwijderd
+        storage.delete(opgeslagen.opslag_pad)
+
+
+def plan_preview(document_id: str) -> None:
+    """Zet een document in de wachtrij van de preview workers"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PREVIEW_WORKERS,
+            thread_name_prefix="preview",
+        )
+    _executor.submit(genereer_preview, document_id)
+
+
+def herplan_open_previews() -> None:
+    """
+    Plan previews die nog in de wachtrij stonden opnieuw in
+
+    De wachtrij leeft in het geheugen; na een herstart zijn openstaande
+    taken weg. Wordt bij het opstarten aangeroepen.
+    """
+    db = SessionLocal()
+    try:
+        document_ids = [
+            row.id for row in db.query(ProjectFaseDocument.id).filter(
+                ProjectFaseDocument.preview_status == PREVIEW_WACHTRIJ
+            )
+        ]
+    finally:
+        db.close()
+
+    for document_id in document_ids:
+        plan_preview(document_id)
+    if document_ids:
+        print(f"🖼️  {len(document_ids)} preview(s) opnieuw ingepland")
+
+
+def stop_preview_workers() -> None:
+    """Stop de worker pool (bij shutdown); openstaande taken vervallen"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,58 @@
+"""
+Storage backends voor documentbestanden
+
+Gebruik:
+    from app.services.storage import get_storage
+
+    storage = get_storage()                      # standaard backend (DOCUMENT_OPSLAG_TYPE)
+    storage = get_storage(document.opslag_type)  # backend van een bestaand document
+"""
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.storage.base import StorageBackend, OpgeslagenBestand
+from app.services.storage.local import LocalStorage
+from app.services.storage.content_addressed import ContentAddressedStorage
+from app.services.storage.s3 import S3Storage
+
+_backends: Dict[str, StorageBackend] = {}
+
+
+def _create_backend(opslag_type: str) -> StorageBackend:
+    if opslag_type == "local":
+        return LocalStorage(Path(settings.UPLOAD_DIR))
+    if opslag_type == "cas":
+        return ContentAddressedStorage(Path(settings.CAS_DIR))
+    if opslag_type == "s3":
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+        )
+    raise ValueError(f"Onbekend opslag_type: {opslag_type}")
+
+
+def get_storage(opslag_type: Optional[str] = None) -> StorageBackend:
+    """
+    Haal de storage backend op voor een opslag_type
+
+    Backends worden één keer aangemaakt en daarna hergebruikt.
+    """
+    opslag_type = opslag_type or settings.DOCUMENT_OPSLAG_TYPE
+    if opslag_type not in _backends:
+        _backends[opslag_type] = _create_backend(opslag_type)
+    return _backends[opslag_type]
+
+
+__all__ = [
+    "StorageBackend",
+    "OpgeslagenBestand",
+    "LocalStorage",
+    "ContentAddressedStorage",
+    "S3Storage",
+    "get_storage",
+]
@@ -0,0 +1,110 @@
+"""
+Storage interface voor documentbestanden
+
+Elke backend slaat bestanden op onder een sleutel (opslag_pad) en kan ze
+streamend teruglezen. Welke backend bij een document hoort staat in
+ProjectFaseDocument.opslag_type.
+"""
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+@dataclass
+class OpgeslagenBestand:
+    """Resultaat van StorageBackend.save()"""
+    opslag_pad: str
+    content_hash: str
+    bestandsgrootte: int
+
+
+class HashingReader:
+    """
+    File-like wrapper die tijdens het lezen SHA-256 en grootte bijhoudt
+
+    Zo kan een backend een upload in één keer doorsturen (naar schijf of S3)
+    en toch de content hash bepalen zonder het bestand twee keer te lezen.
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.grootte = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.fileobj.read(size)
+        if chunk:
+            self.sha256.update(chunk)
+            self.grootte += len(chunk)
+        return chunk
+
+    @property
+    def content_hash(self) -> str:
+        return self.sha256.hexdigest()
+
+
+class StorageBackend(ABC):
+    """
+    Abstracte storage backend
+
+    Implementaties:
+    - LocalStorage:             bestanden in UPLOAD_DIR
+    - ContentAddressedStorage:  gededupliceerd op SHA-256, met reference counting
+    - S3Storage:                S3-compatible object storage (AWS, MinIO, ...)
+    """
+
+    #: Waarde voor ProjectFaseDocument.opslag_type
+    opslag_type: str = ""
+
+    @abstractmethod
+    def save(self, fileobj: BinaryIO, bestandsnaam: str) -> OpgeslagenBestand:
+        """Sla een bestand streamend op"""
+
+    @abstractmethod
+    def open(self, opslag_pad: str, start: int = 0, einde: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Lees een bestand streamend in chunks
+
+        Args:
+            start: Eerste byte (inclusief)
+            einde: Laatste byte (inclusief), None = tot het einde
+        """
+
+    @abstractmethod
+    def size(self, opslag_pad: str) -> int:
+        """Grootte van het bestand in bytes"""
+
+    @abstractmethod
+    def exists(self, opslag_pad: str) -> bool:
+        """Check of het bestand bestaat"""
+
+    @abstractmethod
+    def delete(self, opslag_pad: str) -> None:
+        """Verwijder (of geef een referentie vrij op) het bestand"""
+
+    def local_path(self, opslag_pad: str) -> Optional[Path]:
+        """
+        Pad op het lokale filesystem, als de backend dat heeft
+
+        Wordt gebruikt om downloads door de webserver te laten afhandelen.
+        """
+        return None
+
+
+def iter_file(path: Path, start: int = 0, einde: Optional[int] = None) -> Iterator[bytes]:
+    """Lees (een deel van) een lokaal bestand in chunks"""
+    with path.open("rb") as f:
+        f.seek(start)
+        resterend = None if einde is None else einde - start + 1
+        while resterend is None or resterend > 0:
+            lees = CHUNK_SIZE if resterend is None else min(CHUNK_SIZE, resterend)
+            chunk = f.read(lees)
+            if not chunk:
+                break
+            if resterend is not None:
+                resterend -= len(chunk)
+            yield chunk
@@ -0,0 +1,161 @@
+"""
+Content-addressed storage backend
+=================================
+
+Bestanden worden opgeslagen onder hun SHA-256 hash in een gesharde
+directory structuur:
+
+    <CAS_DIR>/ab/cd/abcdef0123...
+
+Identieke bestanden (standaard contracten, tekeningen die in meerdere
+fases terugkomen) worden zo maar één keer op schijf gezet. Het aantal
+documenten dat naar een blob verwijst staat in de document_blobs tabel;
+het bestand wordt pas verwijderd als de laatste referentie vrijgegeven is.
+"""
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from sqlalchemy import update, insert, delete
+from sqlalchemy.exc import IntegrityError
+
+from app.db.session import engine
+from app.models.document_opslag import DocumentBlob
+from app.services.storage.base import (
+    StorageBackend, OpgeslagenBestand, HashingReader, CHUNK_SIZE, iter_file
+)
+
+
+class ContentAddressedStorage(StorageBackend):
+    """
+    Content-addressed opslag met reference counting
+
+    opslag_pad is de relatieve sleutel 'ab/cd/<hash>'. Elke save() telt als
+    een referentie, elke delete() geeft er één vrij. De teller staat buiten
+    de transactie van het document; opruimen.herstel_blob_referenties telt
+    hem periodiek opnieuw vanuit de documenten.
+    """
+    opslag_type = "cas"
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.tmp_dir = root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def sleutel_voor(self, content_hash: str) -> str:
+        """Relatief pad (sleutel) voor een hash, bijv. 'ab/cd/abcd...'"""
+        return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+    def pad_voor(self, content_hash: str) -> Path:
+        """Absoluut pad naar het bestand van een hash"""
+        return self.root / self.sleutel_voor(content_hash)
+
+    def save(self, fileobj: BinaryIO, bestandsnaam: str) -> OpgeslagenBestand:
+        """
+        Sla een bestand op (of hergebruik een bestaande blob)
+
+        Het bestand wordt in chunks gelezen en tegelijk gehasht, zodat het
+        nooit in zijn geheel in het geheugen staat.
+        """
+        reader = HashingReader(fileobj)
+
+        tmp = tempfile.NamedTemporaryFile(dir=self.tmp_dir, delete=False)
+        try:
+            with tmp:
+                while True:
+                    chunk = reader.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    tmp.write(chunk)
+
+            content_hash = reader.content_hash
+            self._referentie_toevoegen(content_hash, reader.grootte, Path(tmp.name))
+        finally:
+            if os.path.exists(tmp.name):
+                os.unlink(tmp.name)
+
+        return OpgeslagenBestand(
+            opslag_pad=self.sleutel_voor(content_hash),
+            content_hash=content_hash,
+            bestandsgrootte=reader.grootte,
+        )
+
+    def _referentie_toevoegen(self, content_hash: str, grootte: int, tmp_pad: Path):
+        """
+        Verhoog de referentie teller en zet het bestand op zijn plek
+
+        Dit gebeurt binnen één database transactie, zodat een gelijktijdige
+        delete() het bestand niet tussendoor kan verwijderen.
+        """
+        blobs = DocumentBlob.__table__
+
+        for _ in range(2):
+            try:
+                with engine.begin() as conn:
+                    result = conn.execute(
+                        update(blobs)
+                        .where(blobs.c.content_hash == content_hash)
+                        .values(aantal_referenties=blobs.c.aantal_referenties + 1)
+                    )
+                    if result.rowcount == 0:
+                        conn.execute(
+                            insert(blobs).values(
+                                content_hash=content_hash,
+                                bestandsgrootte=grootte,
+                                aantal_referenties=1,
+                            )
+                        )
+
+                    doel = self.pad_voor(content_hash)
+                    if not doel.exists():
+                        doel.parent.mkdir(parents=True, exist_ok=True)
+                        os.replace(tmp_pad, doel)
+                return
+            except IntegrityError:
+                # Gelijktijdige eerste upload van hetzelfde bestand: opnieuw
+                # proberen, nu bestaat de blob en wordt de teller verhoogd
+                continue
+
+        raise RuntimeError(f"Kon blob {content_hash} niet registreren")
+
+    def _pad(self, opslag_pad: str) -> Path:
+        return self.root / opslag_pad
+
+    def open(self, opslag_pad: str, start: int = 0, einde: Optional[int] = None) -> Iterator[bytes]:
+        return iter_file(self._pad(opslag_pad), start, einde)
+
+    def size(self, opslag_pad: str) -> int:
+        return os.path.getsize(self._pad(opslag_pad))
+
+    def exists(self, opslag_pad: str) -> bool:
+        return self._pad(opslag_pad).exists()
+
+    def delete(self, opslag_pad: str) -> None:
+        """
+        Geef een referentie vrij
+
+        Het bestand wordt alleen fysiek verwijderd als dit de laatste
+        referentie was.
+        """
+        content_hash = Path(opslag_pad).name
+        blobs = DocumentBlob.__table__
+
+        with engine.begin() as conn:
+            conn.execute(
+                update(blobs)
+                .where(blobs.c.content_hash == content_hash)
+                .values(aantal_referenties=blobs.c.aantal_referenties - 1)
+            )
+            verwijderd = conn.execute(
+                delete(blobs).where(
+                    blobs.c.content_hash == content_hash,
+                    blobs.c.aantal_referenties <= 0,
+                )
+            ).rowcount
+
+            if verwijderd:
+                self.pad_voor(content_hash).unlink(missing_ok=True)
+
+    def local_path(self, opslag_pad: str) -> Optional[Path]:
+        return self._pad(opslag_pad)
@@ -0,0 +1,63 @@
+"""
+Lokale storage backend - bestanden in UPLOAD_DIR
+"""
+import os
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from app.services.storage.base import (
+    StorageBackend, OpgeslagenBestand, HashingReader, CHUNK_SIZE, iter_file
+)
+
+
+class LocalStorage(StorageBackend):
+    """
+    Bestanden op de lokale schijf
+
+    opslag_pad is het pad naar het bestand (zoals voorheen bij alle
+    documenten), zodat bestaande records gewoon blijven werken.
+    """
+    opslag_type = "local"
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def save(self, fileobj: BinaryIO, bestandsnaam: str) -> OpgeslagenBestand:
+        file_path = self.root / bestandsnaam
+        if file_path.exists():
+            file_path = self.root / f"{uuid.uuid4().hex[:8]}_{bestandsnaam}"
+
+        reader = HashingReader(fileobj)
+        try:
+            with file_path.open("wb") as buffer:
+                while True:
+                    chunk = reader.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    buffer.write(chunk)
+        except Exception:
+            file_path.unlink(missing_ok=True)
+            raise
+
+        return OpgeslagenBestand(
+            opslag_pad=str(file_path),
+            content_hash=reader.content_hash,
+            bestandsgrootte=reader.grootte,
+        )
+
+    def open(self, opslag_pad: str, start: int = 0, einde: Optional[int] = None) -> Iterator[bytes]:
+        return iter_file(Path(opslag_pad), start, einde)
+
+    def size(self, opslag_pad: str) -> int:
+        return os.path.getsize(opslag_pad)
+
+    def exists(self, opslag_pad: str) -> bool:
+        return Path(opslag_pad).exists()
+
+    def delete(self, opslag_pad: str) -> None:
+        Path(opslag_pad).unlink(missing_ok=True)
+
+    def local_path(self, opslag_pad: str) -> Optional[Path]:
+        return Path(opslag_pad)
@@ -0,0 +1,148 @@
+"""
+Opruimen van weesbestanden in de lokale opslag
+
+Na een crash tijdens een upload of een mislukte transactie kan een bestand
+op schijf staan zonder document (local) of zonder blob registratie (cas).
+Alleen bestanden ouder dan min_leeftijd komen in aanmerking, zodat een
+upload die nog bezig is niet geraakt wordt. S3 valt hierbuiten (daar is
+een lifecycle regel op de bucket het juiste middel).
+
+De referentie teller van een cas blob wordt buiten de transactie van het
+document bijgewerkt. Een upload die na save() alsnog faalt, of documenten
+die via een cascade verdwijnen, laten de teller dus afwijken; daarom wordt
+aantal_referenties eerst opnieuw geteld vanuit de documenten.
+"""
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Set
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.document_opslag import DocumentBlob
+from app.models.projectfase import ProjectFaseDocument
+from app.services.storage import get_storage
+
+
+def _oude_bestanden(root: Path, grens: float) -> Iterator[Path]:
+    if not root.exists():
+        return
+    for pad in root.rglob("*"):
+        if pad.is_file() and pad.stat().st_mtime < grens:
+            yield pad
+
+
+def herstel_blob_referenties(db: Session, min_leeftijd: timedelta, droog: bool = False) -> dict:
+    """
+    Tel aantal_referenties van de cas blobs opnieuw vanuit de documenten
+
+    Een document telt mee met content_hash en (als die er is) met
+    preview_content_hash. Alleen blobs die langer dan min_leeftijd niet
+    gewijzigd zijn worden aangepast, en alleen als de teller intussen niet
+    veranderd is: een upload of delete die nog bezig is blijft buiten schot.
+    Blobs zonder referentie verdwijnen (het bestand ruimt de sweep daarna op);
+    een bestand waar documenten naar verwijzen maar dat geen blob meer heeft
+    krijgt die terug.
+
+    Returns:
+        Aantallen gecorrigeerde, verwijderde en herstelde blobs
+    """
+    grens = datetime.now(timezone.utc) - min_leeftijd
+    resultaat = {"gecorrigeerd": 0, "verwijderd": 0, "hersteld": 0}
+
+    telling: Counter = Counter()
+    for content_hash, preview_hash in db.execute(
+        select(ProjectFaseDocument.content_hash, ProjectFaseDocument.preview_content_hash)
+        .where(ProjectFaseDocument.opslag_type == "cas")
+    ):
+        telling.update(h for h in (content_hash, preview_hash) if h)
+
+    blobs = DocumentBlob.__table__
+    laatst_gewijzigd = func.coalesce(blobs.c.updated_at, blobs.c.created_at)
+    bekend = set()
+    for content_hash, aantal in db.execute(
+        select(blobs.c.content_hash, blobs.c.aantal_referenties).where(laatst_gewijzigd < grens)
+    ):
+        bekend.add(content_hash)
+        nieuw = telling.get(content_hash, 0)
+        if nieuw == aantal:
+            continue
+        soort = "gecorrigeerd" if nieuw else "verwijderd"
+        if droog:
+            resultaat[soort] += 1
+            continue
+        ongewijzigd = (blobs.c.content_hash == content_hash) & (blobs.c.aantal_referenties == aantal)
+        if nieuw:
+            aangepast = db.execute(update(blobs).where(ongewijzigd).values(aantal_referenties=nieuw))
+        else:
+            aangepast = db.execute(delete(blobs).where(ongewijzigd))
+        resultaat[soort] += aangepast.rowcount
+
+    bekend |= set(db.scalars(select(blobs.c.content_hash).where(blobs.c.content_hash.in_(list(telling)))))
+    cas = get_storage("cas")
+    for content_hash, aantal in telling.items():
+        pad = cas.pad_voor(content_hash)
+        if content_hash in bekend or not pad.exists():
+            continue
+        if droog:
+            resultaat["hersteld"] += 1
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(blobs.insert().values(
+                    content_hash=content_hash, bestandsgrootte=pad.stat().st_size, aantal_referenties=aantal,
+                ))
+            resultaat["hersteld"] += 1
+        except IntegrityError:
+            pass  # intussen door een upload aangemaakt
+
+    # Vastleggen vóór de sweep bestanden weghaalt
+    if not droog:
+        db.commit()
+    return resultaat
+
+
+def ruim_wees_bestanden_op(db: Session, min_leeftijd: timedelta, droog: bool = False) -> dict:
+    """
+    Herstel de cas referenties en verwijder bestanden zonder verwijzing
+
+    Returns:
+        Aantallen per soort, het aantal vrijgekomen bytes en de
+        correcties op de cas referenties
+    """
+    referenties = herstel_blob_referenties(db, min_leeftijd, droog)
+    grens = time.time() - min_leeftijd.total_seconds()
+    resultaat = {"local": 0, "cas": 0, "cas_tmp": 0, "bytes": 0, "cas_referenties": referenties, "droog": droog}
+
+    def verwijder(pad: Path, soort: str) -> None:
+        resultaat[soort] += 1
+        resultaat["bytes"] += pad.stat().st_size
+        if not droog:
+            pad.unlink(missing_ok=True)
+
+    # Local: opslag_pad (en preview) is het pad naar het bestand
+    in_gebruik: Set[str] = set()
+    for opslag_pad, preview_pad in db.execute(
+        select(ProjectFaseDocument.opslag_pad, ProjectFaseDocument.preview_opslag_pad)
+        .where(ProjectFaseDocument.opslag_type == "local")
+    ):
+        in_gebruik.update(str(Path(pad).resolve()) for pad in (opslag_pad, preview_pad) if pad)
+    for pad in _oude_bestanden(Path(settings.UPLOAD_DIR), grens):
+        if str(pad.resolve()) not in in_gebruik:
+            verwijder(pad, "local")
+
+    # CAS: de bestandsnaam is de hash; tmp bevat afgebroken uploads
+    cas_root = Path(settings.CAS_DIR)
+    blobs = set(db.scalars(select(DocumentBlob.content_hash)))
+    for pad in _oude_bestanden(cas_root, grens):
+        if pad.parent == cas_root / "tmp":
+            verwijder(pad, "cas_tmp")
+        elif pad.name not in blobs:
+            verwijder(pad, "cas")
+
+    print(f"🧹 Weesbestanden{' (droog)' if droog else ''}: {resultaat}")
+    return resultaat
@@ -0,0 +1,91 @@
+"""
+S3-compatible storage backend
+
+Werkt met AWS S3 en met S3-compatible servers zoals MinIO. Voor lokaal
+testen kan S3_ENDPOINT_URL naar een MinIO container wijzen, bijv.:
+
+    docker run -p 9000:9000 minio/minio server /data
+    S3_ENDPOINT_URL=http://localhost:9000
+
+Vereist boto3 (optionele dependency).
+"""
+import uuid
+from typing import BinaryIO, Iterator, Optional
+
+from app.services.storage.base import StorageBackend, OpgeslagenBestand, HashingReader, CHUNK_SIZE
+
+
+class S3Storage(StorageBackend):
+    """
+    Bestanden in een S3 bucket
+
+    opslag_pad is de object key binnen de bucket.
+    """
+    opslag_type = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+    ):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("S3 opslag vereist boto3: pip install boto3")
+
+        self._client_error = ClientError
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+        )
+
+    def save(self, fileobj: BinaryIO, bestandsnaam: str) -> OpgeslagenBestand:
+        key = f"{self.prefix}{uuid.uuid4().hex}_{bestandsnaam}"
+        reader = HashingReader(fileobj)
+
+        # upload_fileobj doet een multipart upload in delen; het bestand
+        # hoeft dus niet in zijn geheel in het geheugen te staan
+        self.client.upload_fileobj(reader, self.bucket, key)
+
+        return OpgeslagenBestand(
+            opslag_pad=key,
+            content_hash=reader.content_hash,
+            bestandsgrootte=reader.grootte,
+        )
+
+    def open(self, opslag_pad: str, start: int = 0, einde: Optional[int] = None) -> Iterator[bytes]:
+        kwargs = {}
+        if start or einde is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if einde is None else einde}"
+
+        response = self.client.get_object(Bucket=self.bucket, Key=opslag_pad, **kwargs)
+        body = response["Body"]
+        try:
+            for chunk in body.iter_chunks(CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    def size(self, opslag_pad: str) -> int:
+        response = self.client.head_object(Bucket=self.bucket, Key=opslag_pad)
+        return response["ContentLength"]
+
+    def exists(self, opslag_pad: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=opslag_pad)
+            return True
+        except self._client_error:
+            return False
+
+    def delete(self, opslag_pad: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=opslag_pad)
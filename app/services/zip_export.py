@@ -0,0 +1,146 @@
+"""
+ZIP export van documenten
+=========================
+
+Streamt een ZIP archief van meerdere documenten zonder temp files:
+- Het archief wordt tijdens het downloaden opgebouwd
+- Geheugengebruik is constant (één chunk per keer)
+- Al gecomprimeerde formaten (foto's, pdf, office) worden opgeslagen
+  zonder compressie (ZIP_STORED), de rest met deflate
+
+Alle metadata wordt vooraf opgehaald; de generator zelf doet geen database
+queries, zodat hij na het sluiten van de request sessie kan blijven lopen.
+
+Ontbreekt een bestand in de opslag, dan staat het in ONTBREKEND_BESTAND
+in het archief: de response is dan al begonnen en kan geen fout meer geven.
+"""
+import logging
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from app.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+ONTBREKEND_BESTAND = "ONTBREKENDE BESTANDEN.txt"
+
+# Formaten die al gecomprimeerd zijn: deflate levert hier niets op
+GECOMPRIMEERDE_TYPES = {
+    "jpg", "jpeg", "png", "gif", "webp", "heic",
+    "pdf", "docx", "xlsx", "pptx", "odt", "ods",
+    "zip", "7z", "rar", "gz",
+    "mp3", "mp4", "mov", "avi",
+}
+
+
+@dataclass
+class ZipItem:
+    """Eén bestand in het archief"""
+    pad_in_zip: str
+    opslag_type: str
+    opslag_pad: str
+    bestandstype: Optional[str] = None
+    bestandsgrootte: Optional[int] = None
+    datum: Optional[datetime] = None
+
+
+class _StreamBuffer:
+    """
+    Minimale write-only file voor zipfile
+
+    zipfile ziet dat er niet geseekt kan worden en schrijft dan data
+    descriptors na elk bestand, zodat het archief in één keer vooruit
+    geschreven kan worden.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def leeg(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def veilige_naam(naam: str) -> str:
+    """Maak een naam geschikt als pad onderdeel in een ZIP"""
+    naam = re.sub(r'[\\/:*?"<>|\x00-\x1f]', "_", naam).strip(" .")
+    return naam or "document"
+
+
+def unieke_pad(pad: str, gebruikt: set) -> str:
+    """Voeg ' (2)', ' (3)', ... toe als een pad al in het archief zit"""
+    if pad not in gebruikt:
+        gebruikt.add(pad)
+        return pad
+
+    basis, punt, extensie = pad.rpartition(".")
+    if not punt or "/" in extensie:
+        basis, extensie = pad, ""
+    teller = 2
+    while True:
+        kandidaat = f"{basis} ({teller})" + (f".{extensie}" if extensie else "")
+        if kandidaat not in gebruikt:
+            gebruikt.add(kandidaat)
+            return kandidaat
+        teller += 1
+
+
+def stream_zip(items: Iterable[ZipItem]) -> Iterator[bytes]:
+    """
+    Genereer een ZIP archief in chunks
+
+    Bestanden die niet (meer) in de opslag staan worden overgeslagen en
+    aan het eind in ONTBREKEND_BESTAND opgesomd.
+    """
+    buffer = _StreamBuffer()
+    ontbrekend: List[str] = []
+
+    with zipfile.ZipFile(buffer, mode="w") as zf:
+        for item in items:
+            storage = get_storage(item.opslag_type)
+            if not storage.exists(item.opslag_pad):
+                logger.warning("ZIP export: bestand ontbreekt, overgeslagen: %s", item.opslag_pad)
+                ontbrekend.append(item.pad_in_zip)
+                continue
+
+            datum = item.datum or datetime.now()
+            zinfo = zipfile.ZipInfo(item.pad_in_zip, date_time=datum.timetuple()[:6])
+            zinfo.file_size = item.bestandsgrootte or 0
+            if (item.bestandstype or "").lower() in GECOMPRIMEERDE_TYPES:
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+
+            with zf.open(zinfo, mode="w") as doel:
+                for chunk in storage.open(item.opslag_pad):
+                    doel.write(chunk)
+                    data = buffer.leeg()
+                    if data:
+                        yield data
+
+            data = buffer.leeg()
+            if data:
+                yield data
+
+        if ontbrekend:
+            zf.writestr(ONTBREKEND_BESTAND, "\n".join([
+                "Deze bestanden ontbreken in de opslag en zitten niet in dit archief:",
+                "",
+                *ontbrekend,
+                "",
+            ]))
+
+    # Central directory
+    yield buffer.leeg()
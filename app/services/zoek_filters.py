@@ -0,0 +1,184 @@
+"""
+Geïndexeerde zoekfilters voor de lijst endpoints
+================================================
+
+De lijst endpoints zoeken met '%term%' (substring) op een paar kolommen.
+Zonder hulp is dat een sequential scan; deze module zorgt voor indexes
+en een filter dat die indexes gebruikt:
+
+- PostgreSQL: pg_trgm GIN indexes; ILIKE '%term%' gebruikt die direct
+- SQLite:     per tabel een FTS5 tabel met de trigram tokenizer, gekoppeld
+              aan de string ids via <tabel>_trigram_ids en bijgehouden met
+              triggers, gezocht via MATCH
+
+Termen korter dan 3 tekens hebben geen trigram en vallen terug op een
+gewone ILIKE.
+
+Gebruik:
+    query = query.filter(tekst_filter(Project, search))
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import column, literal, literal_column, or_, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.session import engine
+from app.models.contract import Contract
+from app.models.leverancier import Leverancier
+from app.models.project import Project
+from app.models.vestiging import Vestiging
+
+MIN_TRIGRAM_LENGTE = 3
+
+# Doorzoekbare kolommen per model (in de volgorde van de lijst endpoints)
+ZOEK_KOLOMMEN: Dict[type, List[str]] = {
+    Project: ["naam", "project_nummer"],
+    Contract: ["naam", "contract_nummer"],
+    Leverancier: ["naam", "kvk_nummer", "contactpersoon", "email"],
+    Vestiging: ["naam", "code", "adres_plaats"],
+}
+
+
+def _is_postgres(bind=None) -> bool:
+    return (bind or engine).dialect.name == "postgresql"
+
+
+def _trigram_tabel(tabel: str) -> str:
+    return f"{tabel}_trigram"
+
+
+def _id_tabel(tabel: str) -> str:
+    return f"{tabel}_trigram_ids"
+
+
+# ============================================================================
+# INDEXES
+# ============================================================================
+
+def _maak_sqlite_trigram(conn: Connection, tabel: str, kolommen: List[str]) -> None:
+    fts = _trigram_tabel(tabel)
+    ids = _id_tabel(tabel)
+    bestaat = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :naam"),
+        {"naam": ids},
+    ).first()
+    if bestaat:
+        return
+
+    # Eerdere versie (external content op de impliciete rowid) opruimen
+    for trigger in ("ai", "ad", "au"):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{trigger}"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {fts}"))
+
+    kolom_lijst = ", ".join(kolommen)
+    nieuw = ", ".join(f"new.{k}" for k in kolommen)
+    fts_rowid = "(SELECT rowid FROM {ids} WHERE id = {{}}.id)".format(ids=ids)
+
+    # De primary keys zijn strings; de impliciete rowid van de brontabel is
+    # niet stabiel (VACUUM mag hem hernummeren). Elk id krijgt daarom een
+    # eigen INTEGER PRIMARY KEY in {tabel}_trigram_ids en dat is de rowid
+    # in de FTS tabel.
+    conn.execute(text(f"""
+        CREATE TABLE {ids} (
+            rowid INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE VIRTUAL TABLE {fts} USING fts5(
+            {kolom_lijst},
+            tokenize = 'trigram'
+        )
+    """))
+
+    # De triggers houden de index gelijk met de brontabel (ook bij bulk updates)
+    conn.execute(text(f"""
+        CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabel} BEGIN
+            INSERT INTO {ids}(id) VALUES (new.id);
+            INSERT INTO {fts}(rowid, {kolom_lijst}) VALUES ({fts_rowid.format('new')}, {nieuw});
+        END
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabel} BEGIN
+            DELETE FROM {fts} WHERE rowid = {fts_rowid.format('old')};
+            DELETE FROM {ids} WHERE id = old.id;
+        END
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER {fts}_au AFTER UPDATE OF id, {kolom_lijst} ON {tabel} BEGIN
+            UPDATE {ids} SET id = new.id WHERE id = old.id;
+            DELETE FROM {fts} WHERE rowid = {fts_rowid.format('new')};
+            INSERT INTO {fts}(rowid, {kolom_lijst}) VALUES ({fts_rowid.format('new')}, {nieuw});
+        END
+    """))
+
+    # Bestaande rijen indexeren
+    conn.execute(text(f"INSERT INTO {ids}(id) SELECT id FROM {tabel}"))
+    conn.execute(text(f"""
+        INSERT INTO {fts}(rowid, {kolom_lijst})
+        SELECT {ids}.rowid, {", ".join(f"{tabel}.{k}" for k in kolommen)}
+        FROM {tabel} JOIN {ids} ON {ids}.id = {tabel}.id
+    """))
+
+
+def _maak_pg_trigram(conn: Connection, tabel: str, kolommen: List[str]) -> None:
+    for kolom in kolommen:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{tabel}_{kolom}_trgm "
+            f"ON {tabel} USING gin ({kolom} gin_trgm_ops)"
+        ))
+
+
+def maak_trigram_indexes(conn: Connection) -> None:
+    """Maak de trigram indexes aan als ze nog niet bestaan (bij opstarten)"""
+    if _is_postgres(conn):
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    for model, kolommen in ZOEK_KOLOMMEN.items():
+        if _is_postgres(conn):
+            _maak_pg_trigram(conn, model.__tablename__, kolommen)
+        else:
+            _maak_sqlite_trigram(conn, model.__tablename__, kolommen)
+
+
+# ============================================================================
+# QUERY BUILDER
+# ============================================================================
+
+def _ilike_filter(model: type, kolommen: List[str], term: str) -> ColumnElement:
+    zoekterm = f"%{term}%"
+    return or_(*(getattr(model, k).ilike(zoekterm) for k in kolommen))
+
+
+def _fts_filter(model: type, kolommen: List[str], term: str) -> ColumnElement:
+    """id IN (SELECT id FROM <tabel>_trigram_ids JOIN <tabel>_trigram ... MATCH ...)"""
+    tabel = model.__tablename__
+    fts = table(_trigram_tabel(tabel), column("rowid"))
+    ids = table(_id_tabel(tabel), column("rowid"), column("id"))
+
+    # Eén phrase (substring) binnen één van de kolommen
+    phrase = '"' + term.replace('"', '""') + '"'
+    match = "{" + " ".join(kolommen) + "}: " + phrase
+
+    subquery = select(ids.c.id).join(fts, fts.c.rowid == ids.c.rowid).where(
+        literal_column(fts.name).op("MATCH")(literal(match))
+    )
+    return model.id.in_(subquery)
+
+
+def tekst_filter(model: type, term: str, kolommen: Optional[List[str]] = None) -> ColumnElement:
+    """
+    Substring filter ('%term%', hoofdletterongevoelig) over de zoekkolommen
+
+    Kiest de geïndexeerde strategie voor de database; korte termen vallen
+    terug op ILIKE.
+    """
+    kolommen = kolommen or ZOEK_KOLOMMEN[model]
+    term = term.strip()
+
+    if _is_postgres() or len(term) < MIN_TRIGRAM_LENGTE:
+        # PostgreSQL: ILIKE gebruikt de pg_trgm index
+        return _ilike_filter(model, kolommen, term)
+
+    return _fts_filter(model, kolommen, term)
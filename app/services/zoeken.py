@@ -0,0 +1,456 @@
+"""
+Full-text zoeken
+================
+
+Eén zoekindex (tabel zoek_index) over:
+- Projecten, contracten, leveranciers en vestigingen
+- Gepubliceerde fase commentaren
+- Document metadata (naam, beschrijving, bestandsnaam, type)
+
+Per database:
+- SQLite:     FTS5 virtual table, ranking met bm25()
+- PostgreSQL: tabel met een gegenereerde tsvector kolom + GIN index,
+              ranking met ts_rank()
+
+De index wordt bijgehouden in een after_flush listener, in dezelfde
+transactie als de wijziging zelf (een rollback draait de index dus ook
+terug). Bulk query.update() / query.delete() gaan niet via de flush en
+moeten zelf herindexeer_entiteiten() aanroepen.
+"""
+import hashlib
+import re
+from enum import Enum
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.session import engine
+from app.models.contract import Contract
+from app.models.leverancier import Leverancier
+from app.models.project import Project
+from app.models.projectfase import ProjectFaseDocument, ProjectFaseCommentaar, CommentaarStatus
+from app.models.user import User, UserRole
+from app.models.vestiging import Vestiging
+
+PG_TEXT_CONFIG = "dutch"
+
+# Entiteit types in de index
+PROJECT = "project"
+CONTRACT = "contract"
+LEVERANCIER = "leverancier"
+VESTIGING = "vestiging"
+COMMENTAAR = "commentaar"
+DOCUMENT = "document"
+
+ENTITEIT_TYPES = [PROJECT, CONTRACT, LEVERANCIER, VESTIGING, COMMENTAAR, DOCUMENT]
+
+
+def _is_postgres(bind=None) -> bool:
+    return (bind or engine).dialect.name == "postgresql"
+
+
+def _waarde(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+
+def _tekst(*delen) -> str:
+    return " ".join(_waarde(d) for d in delen if d not in (None, ""))
+
+
+# ============================================================================
+# INDEX DOCUMENTEN PER MODEL
+# ============================================================================
+# Elke functie geeft de index velden voor een object, of None als het object
+# (niet meer) gevonden mag worden.
+
+def _project_doc(p: Project) -> Optional[dict]:
+    return {
+        "titel": _tekst(p.project_nummer, p.naam),
+        "inhoud": _tekst(p.beschrijving, p.opmerkingen),
+        "project_id": p.id,
+    }
+
+
+def _contract_doc(c: Contract) -> Optional[dict]:
+    return {
+        "titel": _tekst(c.contract_nummer, c.naam),
+        "inhoud": _tekst(c.beschrijving, c.opmerkingen, c.type),
+        "project_id": c.project_id,
+        "leverancier_id": c.leverancier_id,
+    }
+
+
+def _leverancier_doc(l: Leverancier) -> Optional[dict]:
+    return {
+        "titel": _tekst(l.naam),
+        "inhoud": _tekst(
+            l.kvk_nummer, l.contactpersoon, l.email,
+            l.adres_plaats, l.type, l.notities,
+        ),
+        "leverancier_id": l.id,
+    }
+
+
+def _vestiging_doc(v: Vestiging) -> Optional[dict]:
+    return {
+        "titel": _tekst(v.code, v.naam),
+        "inhoud": _tekst(v.adres_straat, v.adres_plaats, v.notities),
+    }
+
+
+def _commentaar_doc(c: ProjectFaseCommentaar) -> Optional[dict]:
+    if c.status != CommentaarStatus.GEPUBLICEERD:
+        return None
+    return {
+        "titel": _tekst(c.onderwerp),
+        "inhoud": _tekst(c.bericht),
+        "fase_id": c.fase_id,
+        "zichtbaar_voor_leverancier": True,
+    }
+
+
+def _document_doc(d: ProjectFaseDocument) -> Optional[dict]:
+    return {
+        "titel": _tekst(d.naam),
+        "inhoud": _tekst(d.beschrijving, d.bestandsnaam, d.type),
+        "fase_id": d.fase_id,
+        "zichtbaar_voor_leverancier": bool(d.zichtbaar_voor_leverancier),
+    }
+
+
+ZOEK_BRONNEN: Dict[type, tuple] = {
+    Project: (PROJECT, _project_doc),
+    Contract: (CONTRACT, _contract_doc),
+    Leverancier: (LEVERANCIER, _leverancier_doc),
+    Vestiging: (VESTIGING, _vestiging_doc),
+    ProjectFaseCommentaar: (COMMENTAAR, _commentaar_doc),
+    ProjectFaseDocument: (DOCUMENT, _document_doc),
+}
+
+INDEX_KOLOMMEN = [
+    "entiteit_type", "entiteit_id", "titel", "inhoud",
+    "project_id", "fase_id", "leverancier_id", "zichtbaar_voor_leverancier",
+]
+
+
+# ============================================================================
+# INDEX BEHEER
+# ============================================================================
+
+def maak_zoek_index(conn: Connection) -> None:
+    """Maak de zoekindex aan als die nog niet bestaat"""
+    if _is_postgres(conn):
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS zoek_index (
+                entiteit_type VARCHAR NOT NULL,
+                entiteit_id VARCHAR NOT NULL,
+                titel TEXT,
+                inhoud TEXT,
+                project_id VARCHAR,
+                fase_id VARCHAR,
+                leverancier_id VARCHAR,
+                zichtbaar_voor_leverancier BOOLEAN,
+                zoek_vector TSVECTOR GENERATED ALWAYS AS (
+                    setweight(to_tsvector('{PG_TEXT_CONFIG}', coalesce(titel, '')), 'A') ||
+                    setweight(to_tsvector('{PG_TEXT_CONFIG}', coalesce(inhoud, '')), 'B')
+                ) STORED,
+                PRIMARY KEY (entiteit_type, entiteit_id)
+            )
+        """))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_zoek_index_vector ON zoek_index USING GIN (zoek_vector)"
+        ))
+    else:
+        conn.execute(text("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS zoek_index USING fts5(
+                titel,
+                inhoud,
+                entiteit_type UNINDEXED,
+                entiteit_id UNINDEXED,
+                project_id UNINDEXED,
+                fase_id UNINDEXED,
+                leverancier_id UNINDEXED,
+                zichtbaar_voor_leverancier UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """))
+
+
+def _index_rij(entiteit_type: str, obj, doc: dict) -> dict:
+    return {
+        "entiteit_type": entiteit_type,
+        "entiteit_id": obj.id,
+        "titel": doc.get("titel", ""),
+        "inhoud": doc.get("inhoud", ""),
+        "project_id": doc.get("project_id"),
+        "fase_id": doc.get("fase_id"),
+        "leverancier_id": doc.get("leverancier_id"),
+        "zichtbaar_voor_leverancier": doc.get("zichtbaar_voor_leverancier", False),
+    }
+
+
+def _fts_rowid(entiteit_type: str, entiteit_id: str) -> int:
+    """
+    Vaste FTS5 rowid voor een entiteit
+
+    FTS5 kan alleen op rowid snel een rij vinden; UNINDEXED kolommen worden
+    bij een WHERE volledig gescand. De rowid is daarom een (63-bit) hash van
+    type en id.
+    """
+    digest = hashlib.sha1(f"{entiteit_type}:{entiteit_id}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") >> 1
+
+
+def _schrijf_index(conn: Connection, verwijderen: List[dict], rijen: List[dict]) -> None:
+    """Verwijder en (her)schrijf index rijen (FTS5 kent geen upsert)"""
+    sleutels = verwijderen + [
+        {"entiteit_type": r["entiteit_type"], "entiteit_id": r["entiteit_id"]}
+        for r in rijen
+    ]
+    kolommen = list(INDEX_KOLOMMEN)
+
+    if _is_postgres(conn):
+        delete_sql = "DELETE FROM zoek_index WHERE entiteit_type = :entiteit_type AND entiteit_id = :entiteit_id"
+    else:
+        delete_sql = "DELETE FROM zoek_index WHERE rowid = :rowid"
+        for rij in sleutels + rijen:
+            rij["rowid"] = _fts_rowid(rij["entiteit_type"], rij["entiteit_id"])
+        kolommen.append("rowid")
+
+    if sleutels:
+        conn.execute(text(delete_sql), sleutels)
+    if rijen:
+        waarden = ", ".join(f":{k}" for k in kolommen)
+        conn.execute(text(f"INSERT INTO zoek_index ({', '.join(kolommen)}) VALUES ({waarden})"), rijen)
+
+
+def indexeer_objecten(conn: Connection, objecten: Iterable, verwijderd: Iterable = ()) -> None:
+    """Werk de index bij voor gewijzigde en verwijderde objecten"""
+    verwijderen = []
+    rijen = []
+
+    for obj in verwijderd:
+        bron = ZOEK_BRONNEN.get(type(obj))
+        if bron:
+            verwijderen.append({"entiteit_type": bron[0], "entiteit_id": obj.id})
+
+    for obj in objecten:
+        bron = ZOEK_BRONNEN.get(type(obj))
+        if not bron:
+            continue
+        entiteit_type, maak_doc = bron
+        doc = maak_doc(obj)
+        if doc is None:
+            verwijderen.append({"entiteit_type": entiteit_type, "entiteit_id": obj.id})
+        else:
+            rijen.append(_index_rij(entiteit_type, obj, doc))
+
+    _schrijf_index(conn, verwijderen, rijen)
+
+
+def herindexeer_entiteiten(db: Session, model: type, ids: Iterable[str]) -> None:
+    """
+    Herindexeer specifieke records (na bulk updates die de flush omzeilen)
+    """
+    ids = list(ids)
+    if not ids or model not in ZOEK_BRONNEN:
+        return
+    objecten = db.query(model).filter(model.id.in_(ids)).all()
+    gevonden = {o.id for o in objecten}
+    entiteit_type = ZOEK_BRONNEN[model][0]
+    verwijderen = [
+        {"entiteit_type": entiteit_type, "entiteit_id": i}
+        for i in ids if i not in gevonden
+    ]
+    conn = db.connection()
+    _schrijf_index(conn, verwijderen, [])
+    indexeer_objecten(conn, objecten)
+
+
+def herbouw_zoek_index(db: Session, batch_size: int = 500) -> int:
+    """
+    Bouw de volledige zoekindex opnieuw op
+
+    Returns:
+        Aantal geïndexeerde records
+    """
+    conn = db.connection()
+    conn.execute(text("DELETE FROM zoek_index"))
+
+    totaal = 0
+    for model, (entiteit_type, maak_doc) in ZOEK_BRONNEN.items():
+        rijen = []
+        for obj in db.query(model).yield_per(batch_size):
+            doc = maak_doc(obj)
+            if doc is not None:
+                rijen.append(_index_rij(entiteit_type, obj, doc))
+            if len(rijen) >= batch_size:
+                _schrijf_index(conn, [], rijen)
+                totaal += len(rijen)
+                rijen = []
+        _schrijf_index(conn, [], rijen)
+        totaal += len(rijen)
+
+    db.commit()
+    return totaal
+
+
+def init_zoek_index(db: Session) -> None:
+    """Vul de index als hij leeg is (bij opstarten, na maak_zoek_index)"""
+    aantal = db.execute(text("SELECT count(*) FROM zoek_index")).scalar()
+    if aantal == 0:
+        totaal = herbouw_zoek_index(db)
+        print(f"🔎 Zoekindex opgebouwd ({totaal} records)")
+
+
+# ============================================================================
+# SYNC VIA FLUSH EVENTS
+# ============================================================================
+
+def _after_flush(session: Session, flush_context) -> None:
+    """
+    Werk de index bij voor alles wat in deze flush is gewijzigd
+
+    new/dirty/deleted bevatten hier nog de stand van vóór de flush.
+    """
+    gewijzigd = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if type(obj) in ZOEK_BRONNEN
+    ]
+    verwijderd = [obj for obj in session.deleted if type(obj) in ZOEK_BRONNEN]
+    if not gewijzigd and not verwijderd:
+        return
+
+    # Zoekindex mag een wijziging niet laten falen (bijv. index nog niet
+    # aangemaakt). In een SAVEPOINT, zodat een fout alleen de index update
+    # terugdraait: op PostgreSQL breekt een mislukt statement anders de
+    # hele transactie af en faalt de wijziging zelf pas bij de commit.
+    # (Session.begin_nested kan niet tijdens een flush; dit is het
+    # SAVEPOINT op de connectie van die flush.)
+    conn = session.connection()
+    savepoint = conn.begin_nested()
+    try:
+        indexeer_objecten(conn, gewijzigd, verwijderd)
+        savepoint.commit()
+    except Exception as e:
+        savepoint.rollback()
+        print(
+            f"⚠️  Zoekindex update mislukt voor {len(gewijzigd)} gewijzigde en "
+            f"{len(verwijderd)} verwijderde records (wijziging zelf gaat door): {e}"
+        )
+
+
+def setup_zoek_listeners() -> None:
+    """Registreer de flush listener voor de zoekindex (bij startup)"""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+
+
+# ============================================================================
+# ZOEKEN
+# ============================================================================
+
+def _zoek_termen(query: str) -> List[str]:
+    """Splits de zoekopdracht in woorden (zonder query syntax tekens)"""
+    return re.findall(r"\w+", query.lower())
+
+
+def _rol_filter(user: User, params: dict) -> Optional[str]:
+    """
+    SQL filter op basis van de rol van de gebruiker
+
+    Leveranciers vinden alleen hun eigen leverancier record en contracten,
+    en commentaren/documenten in fases die aan hen zijn toegewezen (documenten
+    alleen met zichtbaar_voor_leverancier). Interne rollen vinden alles.
+    """
+    if user.role != UserRole.LEVERANCIER:
+        return None
+    if not user.leverancier_id:
+        return "1 = 0"
+
+    params["user_leverancier_id"] = user.leverancier_id
+    return f"""(
+        (entiteit_type IN ('{CONTRACT}', '{LEVERANCIER}') AND leverancier_id = :user_leverancier_id)
+        OR (
+            entiteit_type IN ('{COMMENTAAR}', '{DOCUMENT}')
+            AND zichtbaar_voor_leverancier = :zichtbaar
+            AND fase_id IN (
+                SELECT id FROM project_fases WHERE leverancier_id = :user_leverancier_id
+            )
+        )
+    )"""
+
+
+def zoek(
+    db: Session,
+    query: str,
+    user: User,
+    types: Optional[List[str]] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[dict]:
+    """
+    Zoek in de index, gesorteerd op relevantie
+
+    Elk woord moet voorkomen; het laatste woord mag een prefix zijn
+    (zoeken tijdens het typen).
+    """
+    termen = _zoek_termen(query)
+    if not termen:
+        return []
+
+    params = {"limit": limit, "offset": offset, "zichtbaar": True}
+    filters = []
+
+    if _is_postgres():
+        params["q"] = " & ".join(termen[:-1] + [f"{termen[-1]}:*"])
+        select_sql = f"""
+            SELECT entiteit_type, entiteit_id, titel, project_id, fase_id,
+                   ts_headline('{PG_TEXT_CONFIG}', coalesce(inhoud, ''), q,
+                               'StartSel=<b>, StopSel=</b>, MaxFragments=1, MaxWords=20') AS fragment,
+                   ts_rank(zoek_vector, q) AS score
+            FROM zoek_index, to_tsquery('{PG_TEXT_CONFIG}', :q) AS q
+        """
+        filters.append("zoek_vector @@ q")
+        order_sql = "ORDER BY score DESC"
+    else:
+        params["q"] = " ".join(f'"{t}"' for t in termen[:-1]) + f' "{termen[-1]}"*'
+        select_sql = """
+            SELECT entiteit_type, entiteit_id, titel, project_id, fase_id,
+                   snippet(zoek_index, 1, '<b>', '</b>', '…', 20) AS fragment,
+                   -bm25(zoek_index, 10.0, 1.0) AS score
+            FROM zoek_index
+        """
+        filters.append("zoek_index MATCH :q")
+        order_sql = "ORDER BY score DESC"
+
+    if types:
+        type_params = {f"type_{i}": t for i, t in enumerate(types)}
+        params.update(type_params)
+        filters.append(f"entiteit_type IN ({', '.join(':' + k for k in type_params)})")
+
+    rol_filter = _rol_filter(user, params)
+    if rol_filter:
+        filters.append(rol_filter)
+
+    sql = f"{select_sql} WHERE {' AND '.join(filters)} {order_sql} LIMIT :limit OFFSET :offset"
+    rows = db.execute(text(sql), params).mappings().all()
+
+    return [
+        {
+            "type": row["entiteit_type"],
+            "id": row["entiteit_id"],
+            "titel": row["titel"],
+            "fragment": row["fragment"],
+            "project_id": row["project_id"],
+            "fase_id": row["fase_id"],
+            "score": round(float(row["score"]), 4),
+        }
+        for row in rows
+    ]
@@ -3,15 +3,26 @@ Vastgoed API - FastAPI Backend
 Main application entry point
 """
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.models.historie_setup import setup_historie_listeners  # Historie toevoeging
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.api.endpoints.projectfase_endpoints import router as projectfase_router
 
+from sqlalchemy.orm.exc import StaleDataError
 from app.core.config import settings
+from app.core.versie import stale_data_handler
 from app.api.api import api_router
 from app.db.init_db import init_db
 from app.db.session import engine
+from app.services.previews import herplan_open_previews, stop_preview_workers
+from app.services.events import start_event_dispatcher, stop_event_dispatcher
+from app.services.zoeken import setup_zoek_listeners
+from app.core.cache import setup_cache_listeners
+from app.services.financien import setup_financien_listeners
+from app.services.facturen import setup_factuur_listeners
+from app.services.live import setup_live_updates
+from app.services.jobs import start_jobs, stop_jobs
 
 
 @asynccontextmanager
@@ -23,11 +34,17 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting up...")
     init_db()
     print("✅ Database initialized")
+    herplan_open_previews()
+    start_event_dispatcher()
+    start_jobs()
     
     yield
     
     # Shutdown
     print("👋 Shutting down...")
+    stop_event_dispatcher()
+    stop_jobs()
+    stop_preview_workers()
 
 
 # Create FastAPI app
@@ -38,12 +55,31 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Gelijktijdige wijziging (versie_nummer klopt niet meer) → 409
+app.add_exception_handler(StaleDataError, stale_data_handler)
+
 # Setup historie listeners 
 setup_historie_listeners()
 
+# Zoekindex bijhouden bij elke flush
+setup_zoek_listeners()
+
+# Response cache invalideren na elke commit
+setup_cache_listeners()
+
+# Financiële totalen per project/vestiging bijhouden bij elke flush
+setup_financien_listeners()
+
+# Facturen zijn append-only (geen wijzigen/verwijderen via de ORM)
+setup_factuur_listeners()
+
+# Live updates (SSE) uit de outbox
+setup_live_updates()
+
 # CORS middleware - CRITICAL!
 app.add_middleware(
     CORSMiddleware,
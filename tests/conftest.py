@@ -0,0 +1,148 @@
+"""
+Gedeelde fixtures
+
+De app draait tegen een tijdelijke SQLite database met de seed data uit
+init_db; documenten en meldingen gaan naar een tijdelijke map. De
+achtergrond threads (event dispatcher, job workers) worden niet gestart:
+tests roepen verwerk_events() en voer_job_uit() zelf aan.
+"""
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Vóór de eerste import van app.*: settings en de engine lezen dit bij import
+_TMP = Path(tempfile.mkdtemp(prefix="vastgoed-tests-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP / 'test.db'}"
+os.environ["UPLOAD_DIR"] = str(_TMP / "documenten")
+os.environ["IMPORT_DIR"] = str(_TMP / "imports")
+os.environ["CAS_DIR"] = str(_TMP / "cas")
+os.environ["MELDING_DIR"] = str(_TMP / "meldingen")
+os.environ["MELDING_KANAAL"] = "bestand"
+os.environ["DOCUMENT_OPSLAG_TYPE"] = "local"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+WACHTWOORD = "Test1234!"
+BEHEERDER = "beheerder@comaker.cloud"
+PROJECTLEIDER = "projectleider@comaker.cloud"
+LEVERANCIER = "maria@installatietech.nl"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+    yield
+    shutil.rmtree(_TMP, ignore_errors=True)
+
+
+@pytest.fixture
+def tmp_dir() -> Path:
+    """De tijdelijke map van deze test run (uploads, meldingen)"""
+    return _TMP
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    # Zonder 'with': de lifespan (init_db + threads) draait niet
+    return TestClient(main.app)
+
+
+@pytest.fixture(scope="session")
+def login(client):
+    """login(email) → Authorization headers"""
+    tokens = {}
+
+    def _login(email: str = BEHEERDER) -> dict:
+        if email not in tokens:
+            response = client.post("/api/v1/auth/login", json={"email": email, "password": WACHTWOORD})
+            assert response.status_code == 200, response.text
+            tokens[email] = response.json()["access_token"]
+        return {"Authorization": f"Bearer {tokens[email]}"}
+
+    return _login
+
+
+@pytest.fixture
+def beheerder(login) -> dict:
+    return login(BEHEERDER)
+
+
+@pytest.fixture
+def leverancier(login) -> dict:
+    return login(LEVERANCIER)
+
+
+@pytest.fixture
+def nieuw_contract(client, beheerder, db):
+    """nieuw_contract(**velden) → contract id (via de API, met geldige standaardwaarden)"""
+    import uuid
+    from app.models.leverancier import Leverancier
+    from app.models.user import User
+
+    def _nieuw(headers: dict = None, **velden) -> str:
+        data = {
+            "contract_nummer": f"CTR-{uuid.uuid4().hex[:8]}",
+            "naam": "Testcontract",
+            "type": "onderhoudscontract",
+            "leverancier_id": db.query(Leverancier.id).order_by(Leverancier.id).first().id,
+            "contract_bedrag": "1000.00",
+            "verantwoordelijke_id": db.query(User.id).filter(User.email == BEHEERDER).scalar(),
+            **velden,
+        }
+        response = client.post("/api/v1/contracts", headers=headers or beheerder, json=data)
+        assert response.status_code == 200, response.text
+        return response.json()["data"]["id"]
+
+    return _nieuw
+
+
+@pytest.fixture
+def fase_id(db) -> str:
+    """Een fase uit de seed data"""
+    from app.models.projectfase import ProjectFase
+    return db.query(ProjectFase.id).order_by(ProjectFase.id).first().id
+
+
+@pytest.fixture
+def leverancier_fases(db):
+    """(fase van LEVERANCIER, fase van een andere leverancier) uit de seed data"""
+    from app.models.projectfase import ProjectFase
+    from app.models.user import User
+    leverancier_id = db.query(User.leverancier_id).filter(User.email == LEVERANCIER).scalar()
+    eigen = db.query(ProjectFase.id).filter(ProjectFase.leverancier_id == leverancier_id).first().id
+    andere = db.query(ProjectFase.id).filter(
+        ProjectFase.leverancier_id.isnot(None), ProjectFase.leverancier_id != leverancier_id
+    ).first().id
+    return eigen, andere
+
+
+@pytest.fixture
+def upload(client, beheerder, fase_id):
+    """upload(bestandsnaam, data, **velden) → document id"""
+
+    def _upload(bestandsnaam: str, data: bytes, fase: str = None, headers: dict = None, **velden) -> str:
+        response = client.post(
+            f"/api/v1/fases/{fase or fase_id}/documenten", headers=headers or beheerder,
+            files={"file": (bestandsnaam, data)}, data={"naam": bestandsnaam, **velden},
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+
+    return _upload
@@ -0,0 +1,153 @@
+"""
+Autorisatie: SQL predicates per rol en de lijsten die ze gebruiken
+"""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.authorization import (
+    check_document_toegang, check_fase_toegang, check_review_toegang,
+    document_filter, fase_filter, review_filter,
+)
+from app.models.project import Project
+from app.models.projectfase import ProjectFase, ProjectFaseDocument, ProjectFaseStatus
+from app.models.user import User, UserRole
+from tests.conftest import BEHEERDER, LEVERANCIER, PROJECTLEIDER
+
+
+def _user(db, email):
+    user = db.query(User).filter(User.email == email).one()
+    return SimpleNamespace(id=user.id, role=user.role, leverancier_id=user.leverancier_id)
+
+
+# ============================================================================
+# PREDICATES
+# ============================================================================
+
+@pytest.mark.parametrize("email", [BEHEERDER, PROJECTLEIDER, LEVERANCIER])
+def test_fase_filter_komt_overeen_met_check(db, email):
+    user = _user(db, email)
+
+    zichtbaar = set(db.scalars(select(ProjectFase.id).where(fase_filter(user))))
+
+    for fase in db.query(ProjectFase):
+        assert (fase.id in zichtbaar) == check_fase_toegang(fase, user), fase.id
+
+
+def test_leverancier_ziet_alleen_eigen_fases(db):
+    user = _user(db, LEVERANCIER)
+
+    aantal = db.scalar(select(func.count()).select_from(ProjectFase).where(fase_filter(user)))
+
+    eigen = db.query(ProjectFase).filter(ProjectFase.leverancier_id == user.leverancier_id).count()
+    assert aantal == eigen
+    assert 0 < aantal < db.query(ProjectFase).count()
+
+
+def test_leverancier_zonder_leverancier_id_ziet_niets(db):
+    user = SimpleNamespace(id="usr_los", role=UserRole.LEVERANCIER, leverancier_id=None)
+
+    assert db.scalar(select(func.count()).select_from(ProjectFase).where(fase_filter(user))) == 0
+    assert not any(check_fase_toegang(fase, user) for fase in db.query(ProjectFase))
+
+
+def test_document_filter_komt_overeen_met_check(db, upload, leverancier_fases):
+    eigen, _ = leverancier_fases
+    upload("verborgen.txt", b"verborgen", fase=eigen, zichtbaar_voor_leverancier="false")
+    upload("zichtbaar.txt", b"zichtbaar", fase=eigen, zichtbaar_voor_leverancier="true")
+
+    for email in (BEHEERDER, LEVERANCIER):
+        user = _user(db, email)
+        zichtbaar = set(db.scalars(select(ProjectFaseDocument.id).where(document_filter(user))))
+        for document in db.query(ProjectFaseDocument).filter(ProjectFaseDocument.fase_id == eigen):
+            assert (document.id in zichtbaar) == check_document_toegang(document, user), (email, document.naam)
+
+
+@pytest.mark.parametrize("email", [BEHEERDER, PROJECTLEIDER, LEVERANCIER])
+def test_review_filter_komt_overeen_met_check(db, email):
+    user = _user(db, email)
+
+    zichtbaar = set(db.scalars(select(Project.id).where(review_filter(user))))
+
+    for project in db.query(Project):
+        assert (project.id in zichtbaar) == check_review_toegang(user, project.projectleider_id), project.id
+
+
+# ============================================================================
+# LIJSTEN EN AANTALLEN
+# ============================================================================
+
+def test_fase_lijst_van_leverancier(client, beheerder, leverancier, db, leverancier_fases):
+    eigen, _ = leverancier_fases
+    user = _user(db, LEVERANCIER)
+    project_id = db.get(ProjectFase, eigen).project_id
+
+    fases = client.get(f"/api/v1/projects/{project_id}/fases", headers=leverancier).json()
+
+    assert eigen in {f["id"] for f in fases}
+    assert {f["leverancier_id"] for f in fases} == {user.leverancier_id}
+    alle = client.get(f"/api/v1/projects/{project_id}/fases", headers=beheerder).json()
+    assert len(fases) == sum(1 for f in alle if f["leverancier_id"] == user.leverancier_id)
+
+
+def test_aantal_documenten_telt_alleen_zichtbare(client, beheerder, leverancier, db, upload, leverancier_fases):
+    eigen, _ = leverancier_fases
+    project_id = db.get(ProjectFase, eigen).project_id
+    upload("alleen intern.txt", b"intern", fase=eigen, zichtbaar_voor_leverancier="false")
+    upload("ook extern.txt", b"extern", fase=eigen, zichtbaar_voor_leverancier="true")
+
+    def _aantal(headers):
+        fases = client.get(f"/api/v1/projects/{project_id}/fases", headers=headers).json()
+        return next(f["aantal_documenten"] for f in fases if f["id"] == eigen)
+
+    documenten = client.get(f"/api/v1/fases/{eigen}/documenten", headers=leverancier).json()
+    zichtbaar = db.query(ProjectFaseDocument).filter(
+        ProjectFaseDocument.fase_id == eigen, ProjectFaseDocument.zichtbaar_voor_leverancier.is_(True)
+    ).count()
+
+    assert all(d["zichtbaar_voor_leverancier"] for d in documenten)
+    assert len(documenten) == zichtbaar == _aantal(leverancier)
+    assert _aantal(beheerder) == db.query(ProjectFaseDocument).filter(ProjectFaseDocument.fase_id == eigen).count()
+    assert _aantal(beheerder) > _aantal(leverancier)
+
+
+@pytest.fixture
+def review_fase_ander_project(client, beheerder, db):
+    """Fase in review in een project van een andere projectleider"""
+    response = client.post("/api/v1/projects", headers=beheerder, json={
+        "project_nummer": f"PRJ-{uuid.uuid4().hex[:6]}",
+        "naam": "Project van de beheerder",
+        "budget_totaal": 1000,
+        "projectleider_id": _user(db, BEHEERDER).id,
+    })
+    assert response.status_code == 200, response.text
+    response = client.post(
+        f"/api/v1/projects/{response.json()['data']['id']}/fases", headers=beheerder,
+        json={"fase_nummer": 1, "naam": "Ter review", "status": "in_review"},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_review_taken_van_projectleider(client, login, beheerder, db, review_fase_ander_project):
+    projectleider = _user(db, PROJECTLEIDER)
+    eigen = db.query(ProjectFase).join(Project).filter(
+        Project.projectleider_id == projectleider.id,
+        ProjectFase.status != ProjectFaseStatus.IN_REVIEW,
+    ).first()
+    oude_status = eigen.status.value
+
+    client.put(f"/api/v1/fases/{eigen.id}", headers=beheerder, json={"status": "in_review"})
+    try:
+        def _in_review(headers):
+            taken = client.get("/api/v1/me/taken", headers=headers).json()
+            return {taak["fase_id"] for taak in taken["wacht_op_acceptatie"]}
+
+        assert eigen.id in _in_review(login(PROJECTLEIDER))
+        assert review_fase_ander_project not in _in_review(login(PROJECTLEIDER))
+        assert {eigen.id, review_fase_ander_project} <= _in_review(beheerder)
+        assert _in_review(login(LEVERANCIER)) == set()
+    finally:
+        client.put(f"/api/v1/fases/{eigen.id}", headers=beheerder, json={"status": oude_status})
@@ -0,0 +1,81 @@
+"""
+Bulk endpoints: validatie per item en alles_of_niets
+"""
+import uuid
+
+from app.models.leverancier import Leverancier
+
+
+def _nieuwe_leveranciers(client, headers, aantal=2):
+    items = [
+        {"naam": f"Bulk leverancier {i}", "type": "bouw", "kvk_nummer": uuid.uuid4().hex[:8]}
+        for i in range(aantal)
+    ]
+    response = client.post("/api/v1/leveranciers/bulk", headers=headers, json={"items": items})
+    assert response.status_code == 200, response.text
+    return [resultaat["id"] for resultaat in response.json()["resultaten"]]
+
+
+def _versie(db, leverancier_id):
+    db.expire_all()
+    return db.get(Leverancier, leverancier_id).versie_nummer
+
+
+def test_aanmaken_met_fout_item(client, beheerder):
+    kvk = uuid.uuid4().hex[:8]
+    items = [
+        {"naam": "Goed", "type": "bouw", "kvk_nummer": kvk},
+        {"naam": "", "type": "bouw"},
+        {"naam": "Dubbel", "type": "bouw", "kvk_nummer": kvk},
+    ]
+
+    response = client.post("/api/v1/leveranciers/bulk", headers=beheerder, json={"items": items})
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["geslaagd"], body["mislukt"]) == (1, 2)
+    assert [r["status"] for r in body["resultaten"]] == ["aangemaakt", "fout", "fout"]
+
+
+def test_alles_of_niets_schrijft_niets_bij_een_fout(client, beheerder, db):
+    kvk = uuid.uuid4().hex[:8]
+    items = [
+        {"naam": "Blijft weg", "type": "bouw", "kvk_nummer": kvk},
+        {"naam": "", "type": "bouw"},
+    ]
+
+    response = client.post(
+        "/api/v1/leveranciers/bulk?alles_of_niets=true", headers=beheerder, json={"items": items}
+    )
+
+    assert [r["status"] for r in response.json()["resultaten"]] == ["overgeslagen", "fout"]
+    assert db.query(Leverancier).filter(Leverancier.kvk_nummer == kvk).count() == 0
+
+
+def test_bijwerken_negeert_onbekende_velden(client, beheerder, db):
+    eerste, tweede = _nieuwe_leveranciers(client, beheerder)
+    items = [
+        {"id": eerste, "naam": "Bijgewerkt", "email": None},
+        {"id": tweede, "plaats_onbekend": "x"},
+        {"id": "lev_bestaat_niet", "naam": "Niemand"},
+    ]
+
+    response = client.patch("/api/v1/leveranciers/bulk", headers=beheerder, json={"items": items})
+
+    resultaten = response.json()["resultaten"]
+    assert [r["status"] for r in resultaten] == ["bijgewerkt", "fout", "fout"]
+    assert resultaten[1]["fouten"] == ["Geen velden om bij te werken"]
+    db.expire_all()
+    assert db.get(Leverancier, eerste).naam == "Bijgewerkt"
+    assert db.get(Leverancier, tweede).naam == "Bulk leverancier 1"
+
+
+def test_verwijderen(client, beheerder, db):
+    ids = _nieuwe_leveranciers(client, beheerder)
+
+    response = client.request(
+        "DELETE", "/api/v1/leveranciers/bulk", headers=beheerder, json={"ids": [*ids, "lev_bestaat_niet"]}
+    )
+
+    assert [r["status"] for r in response.json()["resultaten"]] == ["verwijderd", "verwijderd", "fout"]
+    assert db.query(Leverancier).filter(Leverancier.id.in_(ids)).count() == 0
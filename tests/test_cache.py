@@ -0,0 +1,72 @@
+"""
+Response cache: ETag, 304 en invalidatie na wijzigingen
+"""
+import uuid
+
+from app.core.cache import response_cache
+from app.models.leverancier import Leverancier
+
+
+def _get(client, url, headers, etag=None, **params):
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get(url, headers=headers, params=params)
+
+
+def test_lijst_304_tot_er_iets_wijzigt(client, beheerder, nieuw_contract):
+    contract_id = nieuw_contract()
+    response = _get(client, "/api/v1/contracts", beheerder)
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    assert _get(client, "/api/v1/contracts", beheerder, etag).status_code == 304
+
+    client.patch(f"/api/v1/contracts/{contract_id}", headers=beheerder, json={"naam": "Gewijzigd"})
+
+    response = _get(client, "/api/v1/contracts", beheerder, etag)
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_gerelateerde_tabel_invalideert(client, beheerder, nieuw_contract, db):
+    woord = uuid.uuid4().hex[:8]
+    nieuw_contract(naam=f"Beveiliging {woord}")
+    etag = _get(client, "/api/v1/contracts", beheerder, search=woord).headers["etag"]
+    assert _get(client, "/api/v1/contracts", beheerder, etag, search=woord).status_code == 304
+
+    # De leverancier naam staat in de lijst, maar het contract zelf wijzigt niet
+    leverancier_id = _get(client, "/api/v1/contracts", beheerder, search=woord).json()["data"][0]["leverancier"]["id"]
+    leverancier = db.get(Leverancier, leverancier_id)
+    leverancier.naam = f"Hernoemd {woord}"
+    db.commit()
+
+    response = _get(client, "/api/v1/contracts", beheerder, etag, search=woord)
+    assert response.status_code == 200
+    assert response.json()["data"][0]["leverancier"]["naam"] == f"Hernoemd {woord}"
+
+
+def test_rollback_invalideert_niet(client, beheerder, db):
+    etag = _get(client, "/api/v1/leveranciers", beheerder).headers["etag"]
+
+    db.add(Leverancier(id=f"lev_{uuid.uuid4().hex[:8]}", naam="Nooit opgeslagen", type="BOUW"))
+    db.flush()
+    db.rollback()
+
+    assert _get(client, "/api/v1/leveranciers", beheerder, etag).status_code == 304
+
+
+def test_etag_per_rol_en_query(client, beheerder, leverancier):
+    etag = _get(client, "/api/v1/contracts", beheerder).headers["etag"]
+
+    assert _get(client, "/api/v1/contracts", beheerder, etag, page=2).status_code == 200
+    assert _get(client, "/api/v1/contracts", leverancier, etag).status_code != 304
+
+
+def test_body_uit_de_cache(client, beheerder):
+    response_cache.clear()
+    eerste = _get(client, "/api/v1/leveranciers", beheerder)
+    tweede = _get(client, "/api/v1/leveranciers", beheerder)
+
+    assert eerste.content == tweede.content
+    assert eerste.headers["etag"] in response_cache._bodies
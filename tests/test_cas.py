@@ -0,0 +1,130 @@
+"""
+Content-addressed opslag: deduplicatie, reference counting en herstel
+"""
+import hashlib
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.core.config import settings
+from app.models.document_opslag import DocumentBlob
+from app.models.projectfase import ProjectFase, ProjectFaseDocument
+from app.services.storage import get_storage
+from app.services.storage.opruimen import herstel_blob_referenties, ruim_wees_bestanden_op
+
+
+@pytest.fixture
+def cas():
+    return get_storage("cas")
+
+
+def _referenties(db, content_hash):
+    db.expire_all()
+    blob = db.get(DocumentBlob, content_hash)
+    return blob.aantal_referenties if blob else None
+
+
+def _verouder(db, content_hash):
+    oud = datetime.now(timezone.utc) - timedelta(days=2)
+    db.execute(
+        update(DocumentBlob).where(DocumentBlob.content_hash == content_hash)
+        .values(created_at=oud, updated_at=oud)
+    )
+    db.commit()
+
+
+def test_cas_dedupliceert_gelijke_inhoud(cas, db):
+    data = b"zelfde inhoud voor cas"
+
+    eerste = cas.save(io.BytesIO(data), "a.txt")
+    tweede = cas.save(io.BytesIO(data), "b.txt")
+
+    assert eerste.opslag_pad == tweede.opslag_pad
+    assert eerste.content_hash == hashlib.sha256(data).hexdigest()
+    assert _referenties(db, eerste.content_hash) == 2
+    assert b"".join(cas.open(eerste.opslag_pad)) == data
+
+
+def test_cas_verwijdert_bestand_pas_bij_laatste_referentie(cas, db):
+    data = b"refcount test"
+    pad = cas.save(io.BytesIO(data), "a.txt").opslag_pad
+    cas.save(io.BytesIO(data), "b.txt")
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    cas.delete(pad)
+    assert cas.exists(pad)
+    assert _referenties(db, content_hash) == 1
+
+    cas.delete(pad)
+    assert not cas.exists(pad)
+    assert _referenties(db, content_hash) is None
+
+
+def test_cas_range(cas):
+    data = b"0123456789"
+    pad = cas.save(io.BytesIO(data), "cijfers.txt").opslag_pad
+
+    assert b"".join(cas.open(pad, start=3, einde=5)) == b"345"
+
+
+# ============================================================================
+# HERSTEL VAN DE REFERENTIE TELLER
+# ============================================================================
+
+@pytest.fixture
+def cas_document(client, beheerder, db, monkeypatch):
+    """Upload via de API met DOCUMENT_OPSLAG_TYPE=cas"""
+    monkeypatch.setattr(settings, "DOCUMENT_OPSLAG_TYPE", "cas")
+    fase_id = db.query(ProjectFase.id).first().id
+    data = b"herstel " * 100 + datetime.now().isoformat().encode()
+
+    response = client.post(
+        f"/api/v1/fases/{fase_id}/documenten", headers=beheerder,
+        files={"file": ("tekening.txt", data)}, data={"naam": "Tekening"},
+    )
+    assert response.status_code == 201, response.text
+    return db.get(ProjectFaseDocument, response.json()["id"])
+
+
+def test_herstel_corrigeert_referentie_zonder_document(cas_document, cas, db):
+    content_hash = cas_document.content_hash
+    # Een tweede upload die na save() mislukte: geteld, maar geen document
+    cas.save(io.BytesIO(b"".join(cas.open(cas_document.opslag_pad))), "mislukt.txt")
+    assert _referenties(db, content_hash) == 2
+
+    # Recent gewijzigd: kan een upload zijn die nog bezig is
+    assert herstel_blob_referenties(db, timedelta(hours=1))["gecorrigeerd"] == 0
+    assert _referenties(db, content_hash) == 2
+
+    _verouder(db, content_hash)
+    assert herstel_blob_referenties(db, timedelta(hours=1))["gecorrigeerd"] == 1
+    assert _referenties(db, content_hash) == 1
+
+
+def test_herstel_verwijdert_blob_van_verdwenen_document(cas_document, cas, db):
+    content_hash, pad = cas_document.content_hash, cas_document.opslag_pad
+    # Document verdwenen zonder storage.delete() (bijv. via een cascade)
+    db.execute(delete(ProjectFaseDocument).where(ProjectFaseDocument.id == cas_document.id))
+    db.commit()
+    _verouder(db, content_hash)
+
+    resultaat = ruim_wees_bestanden_op(db, min_leeftijd=timedelta(0))
+
+    assert resultaat["cas_referenties"]["verwijderd"] >= 1
+    assert _referenties(db, content_hash) is None
+    assert not cas.exists(pad)
+
+
+def test_herstel_maakt_ontbrekende_blob_opnieuw_aan(cas_document, cas, db):
+    content_hash, pad = cas_document.content_hash, cas_document.opslag_pad
+    # Teller te vaak verlaagd: de blob is weg, het document en bestand niet
+    db.execute(delete(DocumentBlob).where(DocumentBlob.content_hash == content_hash))
+    db.commit()
+
+    resultaat = ruim_wees_bestanden_op(db, min_leeftijd=timedelta(0))
+
+    assert resultaat["cas_referenties"]["hersteld"] == 1
+    assert _referenties(db, content_hash) == 1
+    assert cas.exists(pad)
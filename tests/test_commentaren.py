@@ -0,0 +1,127 @@
+"""
+Commentaren: toegang per fase en de opbouw van threads
+"""
+import pytest
+
+from app.models.projectfase import CommentaarStatus, ProjectFase, ProjectFaseCommentaar
+
+
+def _commentaar(client, headers, fase_id, bericht, parent=None):
+    return client.post(
+        f"/api/v1/fases/{fase_id}/commentaren", headers=headers,
+        json={"bericht": bericht, "parent_commentaar_id": parent},
+    )
+
+
+def _nieuw(client, headers, fase_id, bericht, parent=None):
+    response = _commentaar(client, headers, fase_id, bericht, parent)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+# ============================================================================
+# TOEGANG
+# ============================================================================
+
+def test_leverancier_reageert_alleen_in_eigen_fases(client, beheerder, leverancier, leverancier_fases):
+    eigen, andere = leverancier_fases
+    vreemd = _nieuw(client, beheerder, andere, "intern overleg")
+
+    assert _commentaar(client, leverancier, andere, "ongevraagd").status_code == 403
+    assert _commentaar(client, leverancier, andere, "reactie", parent=vreemd).status_code == 403
+    assert _commentaar(client, leverancier, eigen, "eigen fase").status_code == 201
+
+
+def test_reactie_moet_in_dezelfde_fase(client, beheerder, leverancier_fases):
+    eigen, andere = leverancier_fases
+    parent = _nieuw(client, beheerder, andere, "andere fase")
+
+    assert _commentaar(client, beheerder, eigen, "verkeerde fase", parent=parent).status_code == 400
+
+
+# ============================================================================
+# THREADS
+# ============================================================================
+
+@pytest.fixture
+def lege_fase(client, beheerder, db, fase_id):
+    """Nieuwe fase zonder commentaren"""
+    project_id = db.get(ProjectFase, fase_id).project_id
+    response = client.post(
+        f"/api/v1/projects/{project_id}/fases", headers=beheerder,
+        json={"fase_nummer": 99, "naam": "Threads"},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def thread(client, beheerder, db, lege_fase):
+    """
+    eerste
+    ├── reactie 1
+    │   └── reactie 1.1
+    ├── reactie 2
+    └── concept            (niet gepubliceerd, met een reactie eronder)
+        └── onder concept
+    tweede
+    """
+    ids = {}
+    ids["eerste"] = _nieuw(client, beheerder, lege_fase, "eerste")
+    ids["reactie 1"] = _nieuw(client, beheerder, lege_fase, "reactie 1", ids["eerste"])
+    ids["reactie 1.1"] = _nieuw(client, beheerder, lege_fase, "reactie 1.1", ids["reactie 1"])
+    ids["reactie 2"] = _nieuw(client, beheerder, lege_fase, "reactie 2", ids["eerste"])
+    ids["concept"] = _nieuw(client, beheerder, lege_fase, "concept", ids["eerste"])
+    ids["onder concept"] = _nieuw(client, beheerder, lege_fase, "onder concept", ids["concept"])
+    ids["tweede"] = _nieuw(client, beheerder, lege_fase, "tweede")
+
+    db.get(ProjectFaseCommentaar, ids["concept"]).status = CommentaarStatus.CONCEPT
+    db.commit()
+    return lege_fase, ids
+
+
+def _threads(client, headers, fase_id, **params):
+    response = client.get(f"/api/v1/fases/{fase_id}/commentaren/threads", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_threads_worden_als_boom_opgebouwd(client, beheerder, thread):
+    fase_id, ids = thread
+
+    resultaat = _threads(client, beheerder, fase_id)
+
+    # Roots nieuwste eerst, reacties oudste eerst; concept valt met zijn reacties weg
+    assert [t["bericht"] for t in resultaat["data"]] == ["tweede", "eerste"]
+    eerste = resultaat["data"][1]
+    assert [r["bericht"] for r in eerste["reacties"]] == ["reactie 1", "reactie 2"]
+    assert [r["bericht"] for r in eerste["reacties"][0]["reacties"]] == ["reactie 1.1"]
+    assert eerste["aantal_reacties"] == 2
+    assert eerste["totaal_reacties"] == 3
+    assert resultaat["pagination"]["total"] == 2
+
+
+def test_threads_pagineren_op_roots(client, beheerder, thread):
+    fase_id, _ = thread
+
+    tweede_pagina = _threads(client, beheerder, fase_id, page=2, limit=1)
+    assert [t["bericht"] for t in tweede_pagina["data"]] == ["eerste"]
+    assert tweede_pagina["data"][0]["totaal_reacties"] == 3
+    assert tweede_pagina["pagination"]["total"] == 2
+
+    # Voorbij de laatste pagina: leeg, maar wel het totaal
+    voorbij = _threads(client, beheerder, fase_id, page=3, limit=1)
+    assert voorbij["data"] == []
+    assert voorbij["pagination"]["total"] == 2
+
+
+def test_platte_lijst_telt_gepubliceerde_reacties(client, beheerder, thread):
+    fase_id, ids = thread
+
+    response = client.get(f"/api/v1/fases/{fase_id}/commentaren", headers=beheerder)
+
+    aantallen = {c["id"]: c["aantal_reacties"] for c in response.json()}
+    assert ids["concept"] not in aantallen
+    assert aantallen[ids["eerste"]] == 2
+    assert aantallen[ids["reactie 1"]] == 1
+    assert aantallen[ids["tweede"]] == 0
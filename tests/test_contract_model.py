@@ -0,0 +1,61 @@
+"""
+Contract hybrid properties: in Python en in SQL hetzelfde antwoord
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models import contract as contract_module
+from app.models.contract import Contract, ContractStatus
+
+VANDAAG = date(2025, 6, 14)
+DAG = timedelta(days=1)
+
+
+@pytest.fixture
+def vandaag(monkeypatch):
+    monkeypatch.setattr(contract_module, "peildatum", lambda: VANDAAG)
+    return VANDAAG
+
+
+def _in_sql(db, contract_id, expressie):
+    return db.query(Contract.id).filter(Contract.id == contract_id, expressie).count() == 1
+
+
+@pytest.mark.parametrize("start, eind, verwacht", [
+    (None, None, True),
+    (VANDAAG, None, True),            # de startdatum telt mee
+    (VANDAAG + DAG, None, False),
+    (None, VANDAAG + DAG, True),
+    (None, VANDAAG, False),           # op de einddatum is het contract afgelopen
+    (VANDAAG - DAG, VANDAAG - DAG, False),
+])
+def test_is_actief_rond_start_en_eind_datum(vandaag, nieuw_contract, db, start, eind, verwacht):
+    contract_id = nieuw_contract(status="actief", start_datum=start and start.isoformat(), eind_datum=eind and eind.isoformat())
+    contract = db.get(Contract, contract_id)
+
+    assert contract.is_actief is verwacht
+    assert _in_sql(db, contract_id, Contract.is_actief) is verwacht
+
+
+def test_is_actief_vereist_status_actief(vandaag, nieuw_contract, db):
+    contract_id = nieuw_contract(status=ContractStatus.GETEKEND.value)
+
+    assert db.get(Contract, contract_id).is_actief is False
+    assert _in_sql(db, contract_id, Contract.is_actief) is False
+
+
+@pytest.mark.parametrize("bedrag, gefactureerd, percentage", [
+    ("1000.00", "333.33", 33.33),
+    ("1000.00", "1500.00", 100.0),
+    ("1000.00", "0", 0.0),
+])
+def test_percentage_en_restant(nieuw_contract, db, bedrag, gefactureerd, percentage):
+    contract_id = nieuw_contract(contract_bedrag=bedrag, gefactureerd_bedrag=gefactureerd)
+    contract = db.get(Contract, contract_id)
+
+    assert contract.gefactureerd_percentage == percentage
+    assert db.query(Contract.gefactureerd_percentage).filter(Contract.id == contract_id).scalar() == percentage
+    assert contract.restant_bedrag == float(Decimal(bedrag) - Decimal(gefactureerd))
+    assert float(db.query(Contract.restant_bedrag).filter(Contract.id == contract_id).scalar()) == contract.restant_bedrag
@@ -0,0 +1,46 @@
+"""
+Contracten lijst: zoeken, paginatie en filters
+"""
+import uuid
+
+from sqlalchemy import delete
+
+from app.models.leverancier import Leverancier
+
+
+def _lijst(client, headers, **params):
+    response = client.get("/api/v1/contracts", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_zoeken_met_paginatie_telt_alles(client, beheerder, nieuw_contract):
+    woord = uuid.uuid4().hex[:8]
+    ids = {nieuw_contract(naam=f"Liften {woord} {i}") for i in range(5)}
+
+    eerste = _lijst(client, beheerder, search=woord, limit=2, page=1)
+    laatste = _lijst(client, beheerder, search=woord, limit=2, page=3)
+    voorbij = _lijst(client, beheerder, search=woord, limit=2, page=4)
+
+    assert eerste["pagination"]["total"] == 5
+    assert len(eerste["data"]) == 2 and len(laatste["data"]) == 1
+    assert voorbij["data"] == [] and voorbij["pagination"]["total"] == 5
+    gezien = {c["id"] for p in range(1, 4) for c in _lijst(client, beheerder, search=woord, limit=2, page=p)["data"]}
+    assert gezien == ids
+
+
+def test_contract_zonder_leverancier_valt_niet_weg(client, beheerder, nieuw_contract, db):
+    woord = uuid.uuid4().hex[:8]
+    leverancier_id = f"lev_{uuid.uuid4().hex[:8]}"
+    db.add(Leverancier(id=leverancier_id, naam=f"Tijdelijk {woord}", type="BOUW"))
+    db.commit()
+    contract_id = nieuw_contract(naam=f"Schoonmaak {woord}", leverancier_id=leverancier_id)
+    # Leverancier weg (SQLite dwingt de foreign key niet af)
+    db.execute(delete(Leverancier).where(Leverancier.id == leverancier_id))
+    db.commit()
+
+    body = _lijst(client, beheerder, search=woord)
+
+    assert [c["id"] for c in body["data"]] == [contract_id]
+    assert body["data"][0]["leverancier"] is None
+    assert body["pagination"]["total"] == 1
@@ -0,0 +1,133 @@
+"""
+Document downloads: ETag, conditional GET, Range requests en ondertekende URLs
+"""
+import pytest
+from jose import jwt
+from sqlalchemy import update
+
+from app.core.security import create_download_token
+from app.models.projectfase import ProjectFaseDocument
+
+DATA = b"0123456789" * 100
+
+
+@pytest.fixture
+def download(upload):
+    return f"/api/v1/documenten/{upload('meetrapport.txt', DATA)}/download"
+
+
+def test_download_met_etag_en_304(client, beheerder, download):
+    response = client.get(download, headers=beheerder)
+    assert response.status_code == 200
+    assert response.content == DATA
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+
+    response = client.get(download, headers={**beheerder, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get(download, headers={**beheerder, "If-None-Match": '"anders"'})
+    assert response.status_code == 200
+
+
+def test_range_request(client, beheerder, download):
+    response = client.get(download, headers={**beheerder, "Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == DATA[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(DATA)}"
+    assert response.headers["content-length"] == "10"
+
+    response = client.get(download, headers={**beheerder, "Range": "bytes=-5"})
+    assert response.status_code == 206
+    assert response.content == DATA[-5:]
+
+    response = client.get(download, headers={**beheerder, "Range": "bytes=990-"})
+    assert response.content == DATA[990:]
+
+    response = client.get(download, headers={**beheerder, "Range": f"bytes={len(DATA)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+def test_if_range(client, beheerder, download):
+    etag = client.get(download, headers=beheerder).headers["etag"]
+
+    response = client.get(download, headers={**beheerder, "Range": "bytes=0-9", "If-Range": etag})
+    assert response.status_code == 206
+
+    # Bestand is veranderd sinds de eerste chunk: dan het hele bestand
+    response = client.get(download, headers={**beheerder, "Range": "bytes=0-9", "If-Range": '"verouderd"'})
+    assert response.status_code == 200
+    assert response.content == DATA
+
+
+def test_download_zonder_login(client, download):
+    assert client.get(download).status_code in (401, 403)
+
+
+# ============================================================================
+# ONDERTEKENDE DOWNLOAD URLS
+# ============================================================================
+
+@pytest.fixture
+def download_url(client, beheerder, upload):
+    document_id = upload("tekening.txt", DATA)
+    response = client.post(f"/api/v1/documenten/{document_id}/download-url", headers=beheerder)
+    assert response.status_code == 200, response.text
+    return document_id, response.json()["url"]
+
+
+def test_token_bevat_geen_opslag_details(download_url):
+    document_id, url = download_url
+
+    claims = jwt.get_unverified_claims(url.rsplit("/", 1)[1])
+
+    assert claims["sub"] == document_id
+    assert {"sub", "h", "exp", "type"} == set(claims)
+
+
+def test_download_via_token(client, download_url):
+    _, url = download_url
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == DATA
+
+    response = client.get(url, headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+
+
+def test_ongeldige_token(client, download_url):
+    _, url = download_url
+
+    assert client.get(url[:-3] + "abc").status_code == 403
+
+
+def test_verwijderd_document_niet_meer_te_downloaden(client, beheerder, download_url):
+    document_id, url = download_url
+
+    assert client.delete(f"/api/v1/documenten/{document_id}", headers=beheerder).status_code == 204
+
+    assert client.get(url).status_code == 404
+
+
+def test_document_zonder_content_hash(client, beheerder, upload, db):
+    document_id = upload("oud.txt", DATA)
+    db.execute(update(ProjectFaseDocument).where(ProjectFaseDocument.id == document_id).values(content_hash=None))
+    db.commit()
+
+    url = client.post(f"/api/v1/documenten/{document_id}/download-url", headers=beheerder).json()["url"]
+    claims = jwt.get_unverified_claims(url.rsplit("/", 1)[1])
+    assert "h" not in claims and claims["v"] == 1
+    assert client.get(url).status_code == 200
+
+    # Een token zonder hash (h=None) mag niet langer elk document openen
+    token = create_download_token({"sub": document_id, "h": None})
+    assert client.get(f"/api/v1/downloads/{token}").status_code == 404
+
+    # Gewijzigd document: de versie klopt niet meer
+    document = db.get(ProjectFaseDocument, document_id)
+    document.beschrijving = "gewijzigd"
+    db.commit()
+    assert client.get(url).status_code == 404
@@ -0,0 +1,108 @@
+"""
+Outbox en event bus: aflevering, cursors en retries
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.models.leverancier import Leverancier
+from app.models.outbox import EventAbonnee, OutboxEvent
+from app.models.projectfase import ProjectFase
+from app.services import events
+from app.services.events import abonneer, ruim_outbox_op, verwerk_events
+
+
+@pytest.fixture
+def ontvangen():
+    """Abonnee op leveranciers die de afgeleverde events verzamelt"""
+    lijst = []
+    fouten = []
+
+    def handler(db, batch):
+        if fouten:
+            raise RuntimeError(fouten.pop())
+        lijst.extend((ev.id, ev.tabel_naam, ev.record_id, ev.actie, ev.data_na) for ev in batch)
+
+    abonneer("test", handler, tabellen=["leveranciers"])
+    verwerk_events()  # cursor aanmaken en de historie inhalen
+    lijst.clear()
+    yield lijst, fouten
+    events._abonnees.pop("test", None)
+
+
+def _wijzig_leverancier(db, naam):
+    leverancier = db.query(Leverancier).first()
+    leverancier.naam = naam
+    db.commit()
+    return leverancier.id
+
+
+def test_wijziging_wordt_afgeleverd(ontvangen, db):
+    lijst, _ = ontvangen
+
+    leverancier_id = _wijzig_leverancier(db, "Via de outbox")
+    verwerk_events()
+
+    assert [(tabel, record, actie) for _, tabel, record, actie, _ in lijst] == [
+        ("leveranciers", leverancier_id, "update")
+    ]
+    assert lijst[0][4]["naam"] == "Via de outbox"
+    db.expire_all()
+    assert db.get(EventAbonnee, "test").laatste_event_id >= lijst[0][0]
+
+
+def test_andere_tabellen_worden_niet_aangeboden(ontvangen, client, beheerder, db):
+    lijst, _ = ontvangen
+    fase_id = db.query(ProjectFase.id).first().id
+
+    client.post(f"/api/v1/fases/{fase_id}/commentaren", headers=beheerder, json={"bericht": "geen leverancier"})
+    verwerk_events()
+
+    assert lijst == []
+
+
+def test_mislukte_handler_wordt_opnieuw_geprobeerd(ontvangen, db):
+    lijst, fouten = ontvangen
+    fouten.append("tijdelijk niet bereikbaar")
+    cursor_voor = db.get(EventAbonnee, "test").laatste_event_id
+
+    leverancier_id = _wijzig_leverancier(db, "Tweede poging")
+    verwerk_events()
+
+    db.expire_all()
+    cursor = db.get(EventAbonnee, "test")
+    assert lijst == []
+    assert cursor.laatste_event_id == cursor_voor
+    assert cursor.pogingen == 1
+    assert "tijdelijk niet bereikbaar" in cursor.laatste_fout
+
+    # Backoff voorbij
+    cursor.volgende_poging = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    verwerk_events()
+
+    db.expire_all()
+    assert [record for _, _, record, _, _ in lijst] == [leverancier_id]
+    assert db.get(EventAbonnee, "test").pogingen == 0
+
+
+def test_nieuwe_events_na_opruimen(ontvangen, db):
+    lijst, _ = ontvangen
+    _wijzig_leverancier(db, "Voor het opruimen")
+    verwerk_events()
+    hoogste_id = db.scalar(select(func.max(OutboxEvent.id)))
+    db.execute(update(OutboxEvent).values(aangemaakt_op=datetime.now(timezone.utc) - timedelta(days=30)))
+    db.commit()
+
+    assert ruim_outbox_op(db, bewaar_dagen=7) > 0
+    db.commit()
+
+    # Het laatste event blijft staan, nieuwe ids lopen door boven de cursors
+    assert db.scalar(select(func.max(OutboxEvent.id))) == hoogste_id
+    lijst.clear()
+    leverancier_id = _wijzig_leverancier(db, "Na het opruimen")
+    verwerk_events()
+
+    assert [record for _, _, record, _, _ in lijst] == [leverancier_id]
+    assert lijst[0][0] > hoogste_id
@@ -0,0 +1,90 @@
+"""
+Export naar CSV en XLSX: filters, kolommen en streaming
+"""
+import csv
+import io
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.services.events import verwerk_events
+from app.services.exporteren import csv_stream
+
+from tests.conftest import PROJECTLEIDER
+
+
+def _csv(response) -> list:
+    assert response.status_code == 200, response.text
+    tekst = response.content.decode("utf-8")
+    assert tekst.startswith("﻿")
+    return list(csv.DictReader(io.StringIO(tekst[1:])))
+
+
+def test_contracten_csv_met_filters_en_bedragen(client, beheerder, nieuw_contract):
+    woord = uuid.uuid4().hex[:8]
+    nieuw_contract(naam=f"Export {woord}", contract_bedrag="1000.00", gefactureerd_bedrag="250.00")
+    nieuw_contract(naam="Ander contract")
+
+    response = client.get("/api/v1/contracts/export", headers=beheerder, params={"search": woord})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="contracten_' in response.headers["content-disposition"]
+    rijen = _csv(response)
+    assert len(rijen) == 1
+    assert rijen[0]["naam"] == f"Export {woord}"
+    assert rijen[0]["type"] == "onderhoudscontract"
+    assert float(rijen[0]["restant_bedrag"]) == 750.0
+    assert float(rijen[0]["gefactureerd_percentage"]) == 25.0
+
+
+def test_contracten_xlsx(client, beheerder, nieuw_contract):
+    openpyxl = pytest.importorskip("openpyxl")
+    woord = uuid.uuid4().hex[:8]
+    nieuw_contract(naam=f"Excel {woord}", contract_bedrag="99.95", start_datum="2024-05-01")
+
+    response = client.get("/api/v1/contracts/export", headers=beheerder, params={"search": woord, "formaat": "xlsx"})
+
+    assert response.status_code == 200
+    werkblad = openpyxl.load_workbook(io.BytesIO(response.content)).active
+    koppen, rij = [[cel.value for cel in r] for r in werkblad.iter_rows()]
+    waarden = dict(zip(koppen, rij))
+    assert waarden["naam"] == f"Excel {woord}"
+    assert waarden["contract_bedrag"] == 99.95
+    assert waarden["start_datum"].date().isoformat() == "2024-05-01"
+
+
+def test_projecten_csv_met_budget(client, beheerder):
+    rijen = _csv(client.get("/api/v1/projects/export", headers=beheerder, params={"search": "PRJ-001"}))
+
+    assert [r["project_nummer"] for r in rijen] == ["PRJ-001"]
+    rij = rijen[0]
+    assert int(rij["budget_restant"]) == int(rij["budget_totaal"]) - int(rij["budget_besteed"])
+
+
+def test_historie_export(client, beheerder, login, nieuw_contract):
+    contract_id = nieuw_contract()
+    verwerk_events()  # de historie is een abonnee van de outbox
+
+    rijen = _csv(client.get(
+        "/api/v1/historie/export", headers=beheerder, params={"tabel_naam": "contracts", "hours": 1}
+    ))
+
+    assert {r["tabel_naam"] for r in rijen} == {"contracts"}
+    assert any(r["record_id"] == contract_id and r["actie"] == "create" for r in rijen)
+    assert client.get("/api/v1/historie/export", headers=login(PROJECTLEIDER)).status_code == 403
+
+
+def test_onbekend_formaat(client, beheerder):
+    response = client.get("/api/v1/contracts/export", headers=beheerder, params={"formaat": "pdf"})
+
+    assert response.status_code == 400
+
+
+def test_csv_stream_levert_blokken(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+
+    blokken = list(csv_stream(["nummer"], ((i,) for i in range(5))))
+
+    assert len(blokken) == 3
+    assert b"".join(blokken).decode("utf-8").split() == ["﻿nummer", "0", "1", "2", "3", "4"]
@@ -0,0 +1,120 @@
+"""
+Facturen: boeken, uniek factuurnummer per contract en periode totalen
+"""
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.db.session import engine
+from app.models.contract import Contract
+from app.models.factuur import Factuur
+from app.services import facturen
+
+
+def _boek(client, headers, contract_id, **velden):
+    return client.post(
+        f"/api/v1/contracts/{contract_id}/facturen", headers=headers,
+        json={"bedrag": "100.00", "factuur_datum": "2025-03-10", **velden},
+    )
+
+
+def _gefactureerd(db, contract_id):
+    db.expire_all()
+    return db.get(Contract, contract_id).gefactureerd_bedrag
+
+
+def test_boeken_hoogt_contract_op(client, beheerder, nieuw_contract, db):
+    contract_id = nieuw_contract()
+
+    assert _boek(client, beheerder, contract_id, bedrag="250.00").status_code == 201
+    assert _boek(client, beheerder, contract_id, bedrag="-50.00").status_code == 201
+
+    assert _gefactureerd(db, contract_id) == 200
+
+
+def test_dubbel_factuurnummer_wordt_geweigerd(client, beheerder, nieuw_contract, db):
+    contract_id, ander_contract = nieuw_contract(), nieuw_contract()
+
+    assert _boek(client, beheerder, contract_id, factuurnummer="F-001").status_code == 201
+    response = _boek(client, beheerder, contract_id, factuurnummer="F-001")
+
+    assert response.status_code == 409
+    assert "F-001" in response.json()["detail"]
+    assert _gefactureerd(db, contract_id) == 100
+    # Hetzelfde nummer op een ander contract, of zonder nummer, mag wel
+    assert _boek(client, beheerder, ander_contract, factuurnummer="F-001").status_code == 201
+    assert _boek(client, beheerder, contract_id).status_code == 201
+    assert _boek(client, beheerder, contract_id).status_code == 201
+
+
+def test_bulk_met_dubbel_nummer_in_de_batch(client, beheerder, nieuw_contract, db):
+    contract_id = nieuw_contract()
+    item = {"contract_id": contract_id, "bedrag": "10.00", "factuur_datum": "2025-03-10", "factuurnummer": "B-1"}
+
+    response = client.post("/api/v1/facturen/bulk", headers=beheerder, json={"items": [item, item]})
+
+    assert [r["status"] for r in response.json()["resultaten"]] == ["aangemaakt", "fout"]
+    assert _gefactureerd(db, contract_id) == 10
+
+
+def test_database_dwingt_uniek_nummer_af(nieuw_contract, db):
+    contract_id = nieuw_contract()
+    rij = {"contract_id": contract_id, "factuurnummer": "D-1", "bedrag": 1, "factuur_datum": date(2025, 1, 1)}
+
+    with engine.begin() as conn:
+        conn.execute(insert(Factuur), {"id": f"fct_{uuid.uuid4().hex[:8]}", **rij})
+    with pytest.raises(IntegrityError):
+        with engine.begin() as conn:
+            conn.execute(insert(Factuur), {"id": f"fct_{uuid.uuid4().hex[:8]}", **rij})
+
+
+@pytest.fixture
+def gelijktijdige_boeking(monkeypatch):
+    """Boek hetzelfde factuurnummer 'door een ander' direct na de controle"""
+    origineel = facturen._controleer
+    geboekt = []
+
+    def met_gelijktijdige_boeking(db, boekingen):
+        origineel(db, boekingen)
+        if geboekt:
+            return
+        for b in boekingen:
+            if not b.fouten and b.velden.get("factuurnummer") == "RACE":
+                with engine.begin() as conn:
+                    conn.execute(insert(Factuur), {
+                        "id": f"fct_{uuid.uuid4().hex[:8]}", "contract_id": b.contract_id,
+                        "factuurnummer": "RACE", "bedrag": 1, "factuur_datum": date(2025, 1, 1),
+                    })
+                geboekt.append(b.contract_id)
+
+    monkeypatch.setattr(facturen, "_controleer", met_gelijktijdige_boeking)
+    return geboekt
+
+
+def test_gelijktijdig_zelfde_nummer_wordt_fout_van_het_item(client, beheerder, nieuw_contract, db, gelijktijdige_boeking):
+    contract_id = nieuw_contract()
+
+    response = _boek(client, beheerder, contract_id, factuurnummer="RACE")
+
+    assert response.status_code == 409
+    assert gelijktijdige_boeking == [contract_id]
+    assert _gefactureerd(db, contract_id) == 0
+
+
+def test_gelijktijdig_in_bulk_schrijft_de_rest(client, beheerder, nieuw_contract, db, gelijktijdige_boeking):
+    contract_id = nieuw_contract()
+    items = [
+        {"contract_id": contract_id, "bedrag": "5.00", "factuur_datum": "2025-03-10", "factuurnummer": nummer}
+        for nummer in ("RACE", "OK-1")
+    ]
+
+    response = client.post("/api/v1/facturen/bulk", headers=beheerder, json={"items": items})
+
+    resultaten = response.json()["resultaten"]
+    assert [r["status"] for r in resultaten] == ["fout", "aangemaakt"]
+    assert resultaten[0]["id"] is None
+    assert "RACE" in resultaten[0]["fouten"][0]
+    assert _gefactureerd(db, contract_id) == 5
@@ -0,0 +1,122 @@
+"""
+Import van leveranciers en contracten: job wachtrij, upsert en voortgang
+"""
+import io
+import os
+import uuid
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.core.config import settings
+from app.models.contract import Contract
+from app.models.job import JOB_BEZIG, JOB_KLAAR, JOB_MISLUKT, JOB_WACHTRIJ, Job
+from app.models.leverancier import Leverancier
+from app.services.jobs import registreer_standaard_taken, voer_job_uit
+
+from tests.conftest import LEVERANCIER, PROJECTLEIDER
+
+
+@pytest.fixture(autouse=True)
+def taken(db):
+    registreer_standaard_taken()
+    yield
+    # Niet uitgevoerde imports niet laten liggen voor andere tests die jobs claimen
+    db.execute(delete(Job).where(Job.soort.like("import.%"), Job.status == JOB_WACHTRIJ))
+    db.commit()
+
+
+def _start(client, headers, soort, inhoud, bestandsnaam="import.csv"):
+    return client.post(
+        f"/api/v1/imports/{soort}", headers=headers,
+        files={"file": (bestandsnaam, io.BytesIO(inhoud.encode()))},
+    )
+
+
+def _voer_uit(client, headers, db, job_id) -> dict:
+    """Claim precies deze job (niet de oudste in de wachtrij) en voer hem uit"""
+    geclaimd = db.execute(
+        update(Job).where(Job.id == job_id, Job.status == JOB_WACHTRIJ)
+        .values(status=JOB_BEZIG, worker="test-worker", pogingen=1)
+    ).rowcount
+    db.commit()
+    assert geclaimd == 1
+    voer_job_uit(job_id, worker="test-worker")
+    response = client.get(f"/api/v1/imports/{job_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_import_staat_als_job_in_de_wachtrij(client, beheerder, db):
+    response = _start(client, beheerder, "leveranciers", "naam;type\nWachtrij BV;bouw\n")
+
+    assert response.status_code == 202, response.text
+    body = response.json()
+    assert body["status"] == JOB_WACHTRIJ and body["rijen_verwerkt"] == 0
+    job = db.get(Job, body["id"])
+    assert job.soort == "import.leveranciers"
+    assert os.path.samefile(os.path.dirname(job.parameters["pad"]), settings.IMPORT_DIR)
+
+
+def test_leveranciers_upsert_op_kvk(client, beheerder, db):
+    kvk = uuid.uuid4().hex[:8]
+    inhoud = (
+        "Naam;Type;KvK nummer\n"
+        f"Import BV;bouw;{kvk}\n"
+        ";bouw;\n"
+        f"Dubbel BV;bouw;{kvk}\n"
+    )
+    job_id = _start(client, beheerder, "leveranciers", inhoud).json()["id"]
+    pad = db.get(Job, job_id).parameters["pad"]
+
+    status = _voer_uit(client, beheerder, db, job_id)
+
+    assert status["status"] == JOB_KLAAR
+    assert (status["rijen_verwerkt"], status["aangemaakt"], status["aantal_fouten"]) == (3, 1, 2)
+    assert [fout["rij"] for fout in status["fouten"]] == [3, 4]
+    assert not os.path.exists(pad)
+
+    # Tweede import met dezelfde kvk: bijwerken, niet dupliceren
+    job_id = _start(client, beheerder, "leveranciers", f"kvk_nummer,naam\n{kvk},Hernoemd BV\n").json()["id"]
+    status = _voer_uit(client, beheerder, db, job_id)
+
+    assert (status["aangemaakt"], status["bijgewerkt"]) == (0, 1)
+    assert [l.naam for l in db.query(Leverancier).filter(Leverancier.kvk_nummer == kvk)] == ["Hernoemd BV"]
+
+
+def test_contracten_verwijzen_via_kvk_en_projectnummer(client, beheerder, db):
+    kvk, nummer = uuid.uuid4().hex[:8], f"CTR-{uuid.uuid4().hex[:8]}"
+    db.add(Leverancier(id=f"lev_{kvk}", naam="Verwijzing BV", type="BOUW", kvk_nummer=kvk))
+    db.commit()
+    inhoud = (
+        "contract_nummer;naam;type;contract_bedrag;leverancier_kvk_nummer;project_nummer\n"
+        f"{nummer};Liften;onderhoudscontract;1500.50;{kvk};PRJ-001\n"
+        f"{nummer}-X;Onbekend;onderhoudscontract;10;00000000;PRJ-001\n"
+    )
+    job_id = _start(client, beheerder, "contracts", inhoud).json()["id"]
+
+    status = _voer_uit(client, beheerder, db, job_id)
+
+    assert (status["aangemaakt"], status["aantal_fouten"]) == (1, 1)
+    assert status["fouten"][0]["fouten"] == ["leverancier_kvk_nummer: '00000000' niet gevonden"]
+    contract = db.query(Contract).filter(Contract.contract_nummer == nummer).one()
+    assert contract.leverancier_id == f"lev_{kvk}"
+    assert contract.project.project_nummer == "PRJ-001"
+    assert str(contract.contract_bedrag) == "1500.50"
+
+
+def test_mislukte_import(client, beheerder, db):
+    job_id = _start(client, beheerder, "leveranciers", "naam;type\nX;bouw\n").json()["id"]
+    os.remove(db.get(Job, job_id).parameters["pad"])
+
+    status = _voer_uit(client, beheerder, db, job_id)
+
+    assert status["status"] == JOB_MISLUKT
+    assert "FileNotFoundError" in status["melding"]
+
+
+def test_status_alleen_voor_eigen_imports(client, beheerder, login):
+    job_id = _start(client, beheerder, "leveranciers", "naam;type\nPrive BV;bouw\n").json()["id"]
+
+    assert client.get(f"/api/v1/imports/{job_id}", headers=login(PROJECTLEIDER)).status_code == 404
+    assert _start(client, login(LEVERANCIER), "leveranciers", "naam\nX\n").status_code == 403
@@ -0,0 +1,96 @@
+"""
+Schema updates van bestaande databases (werk_tabellen_bij)
+"""
+import pytest
+from sqlalchemy import MetaData, Table, create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from app.db.init_db import KOLOM_MIGRATIES, werk_tabellen_bij
+from app.db.session import Base
+from app.models.factuur import Factuur
+
+
+@pytest.fixture
+def oude_database(tmp_dir):
+    """Database met alle tabellen, maar project_fase_documenten van vóór de nieuwe kolommen"""
+    engine = create_engine(f"sqlite:///{tmp_dir / 'oud.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_project_fase_documenten_content_hash"))
+        for tabel, kolom, _, _ in KOLOM_MIGRATIES:
+            conn.execute(text(f"ALTER TABLE {tabel} DROP COLUMN {kolom}"))
+    yield engine
+    engine.dispose()
+    (tmp_dir / "oud.db").unlink()
+
+
+def _kolommen(engine, tabel):
+    return {kolom["name"] for kolom in inspect(engine).get_columns(tabel)}
+
+
+def test_ontbrekende_kolommen_en_indexes_worden_toegevoegd(oude_database):
+    with oude_database.begin() as conn:
+        werk_tabellen_bij(conn)
+
+    assert {kolom for _, kolom, _, _ in KOLOM_MIGRATIES} <= _kolommen(oude_database, "project_fase_documenten")
+    indexes = {index["name"] for index in inspect(oude_database).get_indexes("project_fase_documenten")}
+    assert "ix_project_fase_documenten_content_hash" in indexes
+
+    # Tweede keer: niets te doen
+    with oude_database.begin() as conn:
+        werk_tabellen_bij(conn)
+
+
+def test_kolom_zonder_migratie_stopt_de_start(oude_database):
+    with oude_database.begin() as conn:
+        conn.execute(text("ALTER TABLE project_fase_documenten DROP COLUMN beschrijving"))
+
+    with pytest.raises(RuntimeError, match="beschrijving"):
+        with oude_database.begin() as conn:
+            werk_tabellen_bij(conn)
+
+
+@pytest.fixture
+def facturen_zonder_constraint(oude_database):
+    """facturen zoals vóór de unique constraint op (contract_id, factuurnummer)"""
+    metadata = MetaData()
+    for model_tabel in Base.metadata.sorted_tables:
+        model_tabel.to_metadata(metadata)
+    metadata.remove(metadata.tables[Factuur.__tablename__])
+    tabel = Table(Factuur.__tablename__, metadata, *(kolom._copy() for kolom in Factuur.__table__.columns))
+    with oude_database.begin() as conn:
+        conn.execute(text("DROP TABLE facturen"))
+        tabel.create(conn)
+    return oude_database
+
+
+def _factuur(conn, factuur_id, nummer):
+    conn.execute(text(
+        "INSERT INTO facturen (id, contract_id, factuurnummer, bedrag, factuur_datum, geboekt_op) "
+        "VALUES (:id, 'ctr_1', :nummer, 1, '2025-01-01', '2025-01-01')"
+    ), {"id": factuur_id, "nummer": nummer})
+
+
+def test_unique_constraint_wordt_toegevoegd(facturen_zonder_constraint):
+    engine = facturen_zonder_constraint
+    with engine.begin() as conn:
+        werk_tabellen_bij(conn)
+
+    indexes = {i["name"]: i for i in inspect(engine).get_indexes("facturen")}
+    assert indexes["uq_facturen_contract_factuurnummer"]["unique"]
+    with engine.begin() as conn:
+        _factuur(conn, "fct_1", "F-1")
+    with pytest.raises(IntegrityError):
+        with engine.begin() as conn:
+            _factuur(conn, "fct_2", "F-1")
+
+
+def test_dubbele_factuurnummers_stoppen_de_start(facturen_zonder_constraint):
+    engine = facturen_zonder_constraint
+    with engine.begin() as conn:
+        _factuur(conn, "fct_1", "F-1")
+        _factuur(conn, "fct_2", "F-1")
+
+    with pytest.raises(RuntimeError, match="dubbele waarden"):
+        with engine.begin() as conn:
+            werk_tabellen_bij(conn)
@@ -0,0 +1,110 @@
+"""
+Job queue: cron expressies, uitvoeren en retries met backoff
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.job import JOB_KLAAR, JOB_MISLUKT, JOB_WACHTRIJ, Job
+from app.services import jobs
+from app.services.jobs import Cron, plan_job, registreer_taak, voer_job_uit
+
+# ============================================================================
+# CRON
+# ============================================================================
+
+# Zaterdag 14 juni 2025, 10:07
+NU = datetime(2025, 6, 14, 10, 7)
+
+
+@pytest.mark.parametrize("expressie, verwacht", [
+    ("0 * * * *", datetime(2025, 6, 14, 11, 0)),
+    ("*/15 * * * *", datetime(2025, 6, 14, 10, 15)),
+    ("30 6-8,22 * * *", datetime(2025, 6, 14, 22, 30)),
+    ("0 7 * * 1-5", datetime(2025, 6, 16, 7, 0)),      # eerstvolgende werkdag
+    ("0 7 * * 7", datetime(2025, 6, 15, 7, 0)),        # 7 is ook zondag
+    ("0 0 1 * *", datetime(2025, 7, 1, 0, 0)),
+    ("0 0 1 * 1", datetime(2025, 6, 16, 0, 0)),        # dag óf weekdag, zoals cron
+    ("0 0 29 2 *", datetime(2028, 2, 29, 0, 0)),
+])
+def test_cron_volgende(expressie, verwacht):
+    assert Cron(expressie).volgende(NU) == verwacht
+
+
+def test_cron_volgende_is_altijd_later():
+    assert Cron("7 10 * * *").volgende(NU) == datetime(2025, 6, 15, 10, 7)
+
+
+@pytest.mark.parametrize("expressie", ["* * * *", "60 * * * *", "* 5-2 * * *", "*/0 * * * *", "a * * * *"])
+def test_cron_ongeldig(expressie):
+    with pytest.raises(ValueError):
+        Cron(expressie)
+
+
+# ============================================================================
+# UITVOEREN
+# ============================================================================
+
+@pytest.fixture
+def taak():
+    """Test taak die de eerste `fouten` aanroepen faalt"""
+    aanroepen = []
+
+    def handler(db, parameters):
+        aanroepen.append(parameters)
+        if len(aanroepen) <= parameters.get("fouten", 0):
+            raise RuntimeError(f"poging {len(aanroepen)} faalt")
+        return {"aanroepen": len(aanroepen)}
+
+    registreer_taak("test", handler, max_pogingen=2)
+    yield aanroepen
+    jobs._taken.pop("test", None)
+
+
+def _plan(db, **parameters) -> str:
+    job = plan_job(db, "test", parameters, uitvoeren_op=datetime.now(timezone.utc) - timedelta(seconds=1))
+    db.commit()
+    return job.id
+
+
+def _claim_en_voer_uit(db, job_id) -> Job:
+    assert jobs._claim("test-worker") == job_id
+    voer_job_uit(job_id, worker="test-worker")
+    db.expire_all()
+    return db.get(Job, job_id)
+
+
+def test_job_wordt_uitgevoerd(taak, db):
+    job_id = _plan(db, melding="hallo")
+
+    job = _claim_en_voer_uit(db, job_id)
+
+    assert taak == [{"melding": "hallo"}]
+    assert job.status == JOB_KLAAR
+    assert job.resultaat == {"aanroepen": 1}
+    assert job.pogingen == 1
+
+
+def test_mislukte_job_met_backoff_en_max_pogingen(taak, db):
+    job_id = _plan(db, fouten=2)
+
+    job = _claim_en_voer_uit(db, job_id)
+    assert job.status == JOB_WACHTRIJ
+    assert "poging 1 faalt" in job.fout
+    assert job.uitvoeren_op.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+    assert jobs._claim("test-worker") is None
+
+    # Backoff voorbij
+    job.uitvoeren_op = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    job = _claim_en_voer_uit(db, job_id)
+
+    assert job.status == JOB_MISLUKT
+    assert job.pogingen == 2
+    assert "poging 2 faalt" in job.fout
+    assert len(taak) == 2
+
+
+def test_onbekende_taak():
+    with pytest.raises(ValueError):
+        plan_job(None, "bestaat-niet")
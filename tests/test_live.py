@@ -0,0 +1,101 @@
+"""
+Live updates: berichten uit de outbox en de filtering per client
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func
+
+from app.api.endpoints.live import _maak_filter
+from app.models.outbox import OutboxEvent
+from app.models.projectfase import ProjectFase
+from app.models.user import User
+from app.services.live import gemiste_berichten
+from tests.conftest import BEHEERDER, LEVERANCIER
+
+
+def _user(db, email):
+    user = db.query(User).filter(User.email == email).one()
+    return SimpleNamespace(id=user.id, role=user.role, leverancier_id=user.leverancier_id)
+
+
+@pytest.fixture
+def nieuwe_berichten(db):
+    """nieuwe_berichten() → berichten voor de outbox events van deze test"""
+    start = db.query(func.max(OutboxEvent.id)).scalar() or 0
+    return lambda: gemiste_berichten(start)
+
+
+def _commentaar(client, headers, fase_id, bericht):
+    response = client.post(f"/api/v1/fases/{fase_id}/commentaren", headers=headers, json={"bericht": bericht})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_leverancier_krijgt_alleen_eigen_fases(client, beheerder, db, leverancier_fases, nieuwe_berichten):
+    eigen, andere = leverancier_fases
+    _commentaar(client, beheerder, eigen, "voor de leverancier")
+    _commentaar(client, beheerder, andere, "voor een ander")
+
+    berichten = {b.fase.id: b for b in nieuwe_berichten() if b.soort == "commentaar"}
+    voor_leverancier = _maak_filter(_user(db, LEVERANCIER), None, None)
+    voor_beheerder = _maak_filter(_user(db, BEHEERDER), None, None)
+
+    assert voor_leverancier(berichten[eigen]) == ["commentaar"]
+    assert voor_leverancier(berichten[andere]) == []
+    assert voor_beheerder(berichten[eigen]) == ["commentaar"]
+    assert voor_beheerder(berichten[andere]) == ["commentaar"]
+
+
+def test_onzichtbaar_document_niet_naar_leverancier(upload, db, leverancier_fases, nieuwe_berichten):
+    eigen, _ = leverancier_fases
+    verborgen = upload("intern.txt", b"intern", fase=eigen, zichtbaar_voor_leverancier="false")
+    zichtbaar = upload("gedeeld.txt", b"gedeeld", fase=eigen, zichtbaar_voor_leverancier="true")
+
+    berichten = {b.data["id"]: b for b in nieuwe_berichten() if b.soort == "document"}
+    voor_leverancier = _maak_filter(_user(db, LEVERANCIER), None, None)
+
+    assert "document" not in voor_leverancier(berichten[verborgen])
+    assert "document" in voor_leverancier(berichten[zichtbaar])
+    assert "document" in _maak_filter(_user(db, BEHEERDER), None, None)(berichten[verborgen])
+
+
+def test_project_en_fase_filter(client, beheerder, db, leverancier_fases, nieuwe_berichten):
+    eigen, andere = leverancier_fases
+    _commentaar(client, beheerder, eigen, "binnen het filter")
+    _commentaar(client, beheerder, andere, "buiten het filter")
+    project_id = db.get(ProjectFase, eigen).project_id
+
+    berichten = {b.fase.id: b for b in nieuwe_berichten() if b.soort == "commentaar"}
+    user = _user(db, BEHEERDER)
+
+    assert _maak_filter(user, None, eigen)(berichten[eigen]) == ["commentaar"]
+    assert _maak_filter(user, None, eigen)(berichten[andere]) == []
+    assert _maak_filter(user, project_id, None)(berichten[eigen]) == ["commentaar"]
+    assert _maak_filter(user, "prj_bestaat_niet", None)(berichten[eigen]) == []
+
+
+def test_review_status_meldt_taken(client, beheerder, db, leverancier_fases, nieuwe_berichten):
+    eigen, _ = leverancier_fases
+    oude_status = db.get(ProjectFase, eigen).status.value
+
+    response = client.put(f"/api/v1/fases/{eigen}", headers=beheerder, json={"status": "in_review"})
+    assert response.status_code == 200, response.text
+    try:
+        bericht = next(b for b in nieuwe_berichten() if b.soort == "fase")
+        assert bericht.data["status"] == "in_review"
+        assert bericht.review
+
+        assert _maak_filter(_user(db, BEHEERDER), None, None)(bericht) == ["fase", "taken"]
+        assert "taken" not in _maak_filter(_user(db, LEVERANCIER), None, None)(bericht)
+    finally:
+        client.put(f"/api/v1/fases/{eigen}", headers=beheerder, json={"status": oude_status})
+
+
+def test_stream_controleert_toegang(client, beheerder, leverancier, leverancier_fases):
+    _, andere = leverancier_fases
+
+    assert client.get("/api/v1/live", params={"fase_id": andere}, headers=leverancier).status_code == 403
+    assert client.get("/api/v1/live", params={"fase_id": "fase_bestaat_niet"}, headers=beheerder).status_code == 404
+    assert client.get("/api/v1/live", params={"project_id": "prj_bestaat_niet"}, headers=beheerder).status_code == 404
+    assert client.get("/api/v1/live").status_code == 401
@@ -0,0 +1,95 @@
+"""
+Digests van deadlines via het bestand kanaal
+"""
+from datetime import datetime, timedelta, timezone
+from email import message_from_bytes, policy
+
+import pytest
+
+from app.models.melding import VerstuurdeMelding
+from app.models.project import Project
+from app.models.projectfase import ProjectFase, ProjectFaseStatus
+from app.models.user import User
+from app.services.meldingen import digest, stel_digests_samen, verstuur_digests
+from tests.conftest import BEHEERDER, LEVERANCIER, PROJECTLEIDER
+
+
+@pytest.fixture
+def deadline_fase(db):
+    """Fase van de projectleider met een deadline over 5 dagen"""
+    user = db.query(User).filter(User.email == PROJECTLEIDER).one()
+    fase = db.query(ProjectFase).filter(ProjectFase.status != ProjectFaseStatus.AFGEROND).first()
+    fase.verantwoordelijke_id = user.id
+    fase.geplande_eind_datum = datetime.now(timezone.utc) + timedelta(days=5)
+    db.commit()
+    return user, fase
+
+
+def _digests_voor(tmp_dir, user_id):
+    return sorted((tmp_dir / "meldingen").glob(f"*_{user_id}.eml"))
+
+
+def test_deadline_digest_wordt_weggeschreven(deadline_fase, tmp_dir):
+    user, fase = deadline_fase
+
+    assert verstuur_digests() >= 1
+
+    (pad,) = _digests_voor(tmp_dir, user.id)
+    bericht = message_from_bytes(pad.read_bytes(), policy=policy.default)
+    assert bericht["To"] == PROJECTLEIDER
+    tekst = bericht.get_content()
+    assert "Deadlines:" in tekst
+    assert fase.naam in tekst
+
+    # Al gemeld: geen tweede digest
+    assert verstuur_digests() == 0
+    assert len(_digests_voor(tmp_dir, user.id)) == 1
+
+    # Prioriteit loopt op (middel → hoog): opnieuw gemeld
+    assert verstuur_digests(datetime.now(timezone.utc) + timedelta(days=3)) >= 1
+    assert len(_digests_voor(tmp_dir, user.id)) == 2
+
+
+def test_review_gaat_naar_reviewers(db):
+    fase = db.query(ProjectFase).filter(ProjectFase.status != ProjectFaseStatus.IN_REVIEW).first()
+    oude_status = fase.status
+    fase.status = ProjectFaseStatus.IN_REVIEW
+    db.commit()
+    try:
+        sleutel = f"review:{fase.id}:{fase.versie_nummer}"
+        ontvangers = {
+            d.email for d in stel_digests_samen(db)
+            if any(item.sleutel == sleutel for item in d.items)
+        }
+        projectleider_id = db.get(Project, fase.project_id).projectleider_id
+        projectleider = db.query(User).filter(User.email == PROJECTLEIDER).one()
+
+        assert BEHEERDER in ontvangers
+        assert LEVERANCIER not in ontvangers
+        assert (PROJECTLEIDER in ontvangers) == (projectleider_id == projectleider.id)
+    finally:
+        fase.status = oude_status
+        db.commit()
+
+
+class _KapotKanaal:
+    naam = "kapot"
+
+    def verstuur(self, digest):
+        raise OSError("mailserver onbereikbaar")
+
+
+def test_mislukte_digest_wordt_later_opnieuw_verstuurd(deadline_fase, db, tmp_dir, monkeypatch):
+    user, fase = deadline_fase
+    fase.geplande_eind_datum = datetime.now(timezone.utc) + timedelta(days=6)
+    db.commit()
+    aantal = len(_digests_voor(tmp_dir, user.id))
+
+    with monkeypatch.context() as m:
+        m.setattr(digest, "get_kanaal", lambda: _KapotKanaal())
+        assert verstuur_digests() == 0
+    db.expire_all()
+    assert db.query(VerstuurdeMelding).filter(VerstuurdeMelding.kanaal == "kapot").count() == 0
+
+    assert verstuur_digests() >= 1
+    assert len(_digests_voor(tmp_dir, user.id)) == aantal + 1
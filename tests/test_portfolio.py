@@ -0,0 +1,134 @@
+"""
+Portfolio: bijgehouden totalen na contractwijzigingen en cache invalidatie
+"""
+import pytest
+from sqlalchemy import func, select, update
+
+from app.db.session import engine
+from app.models.contract import Contract
+from app.models.financien import LosseContractFinancien
+from app.models.project import Project
+from app.services.financien import herbouw_financien
+
+
+def _portfolio(client, headers, **params):
+    response = client.get("/api/v1/reports/portfolio", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def _live_totaal(db):
+    """Wat de bijgehouden totalen zouden moeten zijn: alle contracten opgeteld"""
+    db.expire_all()
+    aantal, contract, gefactureerd = db.execute(select(
+        func.count(Contract.id),
+        func.coalesce(func.sum(Contract.contract_bedrag), 0),
+        func.coalesce(func.sum(Contract.gefactureerd_bedrag), 0),
+    )).one()
+    return {"aantal_contracten": aantal, "contract_totaal": float(contract), "gefactureerd": float(gefactureerd)}
+
+
+def _klopt(client, headers, db):
+    totaal = _portfolio(client, headers)["totaal"]
+    assert {k: totaal[k] for k in ("aantal_contracten", "contract_totaal", "gefactureerd")} == pytest.approx(_live_totaal(db))
+    return totaal
+
+
+def _project_financien(client, headers, project_id):
+    response = client.get(f"/api/v1/projects/{project_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]["financien"]
+
+
+@pytest.fixture
+def project_id(db):
+    return db.query(Project.id).filter(Project.project_nummer == "PRJ-001").scalar()
+
+
+def test_totaal_volgt_contract_zonder_project_en_vestiging(client, beheerder, nieuw_contract, db):
+    voor = _klopt(client, beheerder, db)
+
+    contract_id = nieuw_contract(contract_bedrag="400.00", gefactureerd_bedrag="100.00")
+    na = _klopt(client, beheerder, db)
+    assert na["aantal_contracten"] == voor["aantal_contracten"] + 1
+    assert na["contract_totaal"] == pytest.approx(voor["contract_totaal"] + 400)
+
+    client.patch(f"/api/v1/contracts/{contract_id}", headers=beheerder, json={"contract_bedrag": "250.00"})
+    na = _klopt(client, beheerder, db)
+    assert na["contract_totaal"] == pytest.approx(voor["contract_totaal"] + 250)
+
+    client.delete(f"/api/v1/contracts/{contract_id}", headers=beheerder)
+    na = _klopt(client, beheerder, db)
+    assert na["aantal_contracten"] == voor["aantal_contracten"]
+
+
+def test_contract_naar_project_verhuist_tussen_rollups(client, beheerder, nieuw_contract, db, project_id):
+    contract_id = nieuw_contract(contract_bedrag="300.00")
+    los_voor = db.get(LosseContractFinancien, "zonder_project").contract_totaal
+    project_voor = _project_financien(client, beheerder, project_id)
+
+    response = client.patch(f"/api/v1/contracts/{contract_id}", headers=beheerder, json={"project_id": project_id})
+    assert response.status_code == 200, response.text
+
+    db.expire_all()
+    assert db.get(LosseContractFinancien, "zonder_project").contract_totaal == los_voor - 300
+    project_na = _project_financien(client, beheerder, project_id)
+    assert project_na["aantal_contracten"] == project_voor["aantal_contracten"] + 1
+    assert project_na["contract_totaal"] == pytest.approx(project_voor["contract_totaal"] + 300)
+    _klopt(client, beheerder, db)
+
+
+def test_herbouw_geeft_dezelfde_totalen(client, beheerder, nieuw_contract, db):
+    nieuw_contract(contract_bedrag="123.45")
+    voor = _klopt(client, beheerder, db)
+
+    herbouw_financien(db)
+
+    assert _klopt(client, beheerder, db) == voor
+
+
+def test_304_vervalt_na_wijziging_van_los_contract(client, beheerder, nieuw_contract, db):
+    contract_id = nieuw_contract(contract_bedrag="500.00")
+    eerste = client.get("/api/v1/reports/portfolio", headers=beheerder)
+    etag = eerste.headers["etag"]
+    assert client.get("/api/v1/reports/portfolio", headers={**beheerder, "If-None-Match": etag}).status_code == 304
+
+    client.patch(f"/api/v1/contracts/{contract_id}", headers=beheerder, json={"contract_bedrag": "600.00"})
+
+    response = client.get("/api/v1/reports/portfolio", headers={**beheerder, "If-None-Match": etag})
+    assert response.status_code == 200
+    totaal = response.json()["data"]["totaal"]["contract_totaal"]
+    assert totaal == pytest.approx(eerste.json()["data"]["totaal"]["contract_totaal"] + 100)
+
+
+def test_304_vervalt_na_wijziging_door_ander_proces(client, beheerder, db):
+    etag = client.get("/api/v1/reports/portfolio", headers=beheerder).headers["etag"]
+    # Een ander proces: geen invalidatie in dit proces, alleen de rollup rij verandert
+    with engine.begin() as conn:
+        conn.execute(
+            update(LosseContractFinancien)
+            .values(contract_totaal=LosseContractFinancien.contract_totaal + 1)
+        )
+    try:
+        response = client.get("/api/v1/reports/portfolio", headers={**beheerder, "If-None-Match": etag})
+        assert response.status_code == 200
+    finally:
+        herbouw_financien(db)
+
+
+def test_factuur_en_bulk_op_los_contract(client, beheerder, nieuw_contract, db):
+    contract_id = nieuw_contract(contract_bedrag="800.00")
+
+    response = client.post(
+        f"/api/v1/contracts/{contract_id}/facturen", headers=beheerder,
+        json={"bedrag": "200.00", "factuur_datum": "2025-01-15"},
+    )
+    assert response.status_code in (200, 201), response.text
+    _klopt(client, beheerder, db)
+
+    response = client.patch(
+        "/api/v1/contracts/bulk", headers=beheerder,
+        json={"items": [{"id": contract_id, "contract_bedrag": "900.00"}]},
+    )
+    assert response.json()["geslaagd"] == 1, response.text
+    _klopt(client, beheerder, db)
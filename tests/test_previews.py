@@ -0,0 +1,91 @@
+"""
+Previews van foto's en PDF's (de worker wordt hier direct aangeroepen)
+"""
+import io
+
+import pytest
+
+from app.core.config import settings
+from app.models.projectfase import ProjectFaseDocument
+from app.api.endpoints import projectfase_endpoints
+from app.services.previews import PREVIEW_KLAAR, PREVIEW_MISLUKT, PREVIEW_WACHTRIJ, genereer_preview
+
+# Pillow is optioneel (requirements.txt); zonder Pillow worden geen previews gemaakt
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture(autouse=True)
+def ingepland(monkeypatch):
+    """Vang plan_preview af: geen worker threads in de tests"""
+    document_ids = []
+    monkeypatch.setattr(projectfase_endpoints, "plan_preview", document_ids.append)
+    return document_ids
+
+
+def _foto(breedte=1600, hoogte=1200) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (breedte, hoogte), (200, 120, 40)).save(output, format="PNG")
+    return output.getvalue()
+
+
+def _status(db, document_id):
+    db.expire_all()
+    return db.get(ProjectFaseDocument, document_id).preview_status
+
+
+def test_thumbnail_van_foto(client, beheerder, upload, ingepland, db):
+    document_id = upload("gevel.png", _foto())
+    assert ingepland == [document_id]
+    assert _status(db, document_id) == PREVIEW_WACHTRIJ
+    assert client.get(f"/api/v1/documenten/{document_id}/preview", headers=beheerder).status_code == 404
+
+    genereer_preview(document_id)
+
+    assert _status(db, document_id) == PREVIEW_KLAAR
+    response = client.get(f"/api/v1/documenten/{document_id}/preview", headers=beheerder)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].startswith("inline")
+    with Image.open(io.BytesIO(response.content)) as preview:
+        assert preview.format == "JPEG"
+        assert max(preview.size) == settings.PREVIEW_MAX_PIXELS
+
+    # Geen nieuwe versie voor iets wat de gebruiker niet wijzigde
+    assert db.get(ProjectFaseDocument, document_id).versie_nummer == 1
+
+
+def test_preview_van_pdf(client, beheerder, upload, db):
+    fitz = pytest.importorskip("fitz")
+    with fitz.open() as pdf:
+        pdf.new_page().insert_text((72, 72), "Plattegrond begane grond")
+        data = pdf.tobytes()
+    document_id = upload("plattegrond.pdf", data)
+
+    genereer_preview(document_id)
+
+    response = client.get(f"/api/v1/documenten/{document_id}/preview", headers=beheerder)
+    assert response.status_code == 200
+    assert response.content.startswith(b"\x89PNG")
+
+
+def test_kapotte_foto_geeft_mislukt(upload, ingepland, db):
+    document_id = upload("kapot.jpg", b"geen jpeg")
+
+    genereer_preview(document_id)
+
+    assert _status(db, document_id) == PREVIEW_MISLUKT
+
+
+def test_geen_preview_voor_tekst(upload, ingepland, db):
+    document_id = upload("notities.txt", b"tekst")
+
+    assert ingepland == []
+    assert _status(db, document_id) is None
+
+
+def test_document_verwijderd_voor_de_preview_klaar_is(client, beheerder, upload, tmp_dir):
+    document_id = upload("weg.png", _foto(200, 100))
+    assert client.delete(f"/api/v1/documenten/{document_id}", headers=beheerder).status_code == 204
+
+    genereer_preview(document_id)
+
+    assert not list((tmp_dir / "documenten").glob(f"*preview_{document_id}*"))
@@ -0,0 +1,87 @@
+"""
+JSON responses via orjson: bedragen, datums en de vorm van de lijsten
+"""
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import orjson
+
+from app.core.cache import dumps
+from app.schemas.common import Pagination
+
+
+def test_dumps_kent_decimal_datum_en_modellen():
+    data = {
+        "bedrag": Decimal("1234.50"),
+        "datum": date(2024, 3, 1),
+        "moment": datetime(2024, 3, 1, 12, 30),
+        "pagination": Pagination.maak(page=2, limit=10, total=25),
+    }
+
+    assert orjson.loads(dumps(data)) == {
+        "bedrag": 1234.5,
+        "datum": "2024-03-01",
+        "moment": "2024-03-01T12:30:00",
+        "pagination": {
+            "current_page": 2, "per_page": 10, "total": 25,
+            "total_pages": 3, "has_next": True, "has_prev": True,
+        },
+    }
+
+
+def test_dumps_van_model_is_model_json():
+    model = Pagination.maak(page=1, limit=20, total=0)
+
+    assert dumps(model) == model.model_dump_json().encode()
+    assert orjson.loads(dumps(model))["total_pages"] == 1
+
+
+def test_contract_lijst_houdt_de_vorm(client, beheerder, nieuw_contract):
+    woord = uuid.uuid4().hex[:8]
+    nieuw_contract(naam=f"Dakonderhoud {woord}", contract_bedrag="2500.75", start_datum="2024-01-01")
+
+    response = client.get("/api/v1/contracts", headers=beheerder, params={"search": woord})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    contract = response.json()["data"][0]
+    assert {
+        "id", "contract_nummer", "naam", "beschrijving", "type", "status", "leverancier",
+        "bedragen", "start_datum", "eind_datum", "getekend_datum", "is_actief", "project",
+        "verantwoordelijke", "created_at", "updated_at",
+    } <= contract.keys()
+    assert contract["bedragen"] == {"contract": 2500.75, "gefactureerd": 0.0, "restant": 2500.75, "percentage": 0.0}
+    assert contract["start_datum"] == "2024-01-01"
+    assert contract["eind_datum"] is None
+    assert {"id", "naam", "kvk_nummer"} <= contract["leverancier"].keys()
+    assert set(contract["verantwoordelijke"]) == {"id", "name", "email"}
+
+
+def test_contract_detail_bedragen_zijn_getallen(client, beheerder, nieuw_contract):
+    contract_id = nieuw_contract(contract_bedrag="99.99")
+
+    data = client.get(f"/api/v1/contracts/{contract_id}", headers=beheerder).json()["data"]
+
+    assert data["bedragen"]["contract"] == 99.99
+    assert isinstance(data["bedragen"]["restant"], float)
+
+
+def test_lijsten_met_paginatie(client, beheerder):
+    for pad in ("/api/v1/projects", "/api/v1/leveranciers"):
+        response = client.get(pad, headers=beheerder, params={"limit": 1})
+
+        assert response.status_code == 200, pad
+        body = response.json()
+        assert body["success"] is True
+        assert len(body["data"]) == 1
+        assert body["pagination"]["per_page"] == 1
+        assert body["pagination"]["has_next"] == (body["pagination"]["total"] > 1)
+
+
+def test_vestigingen_lijst_houdt_eigen_vorm(client, beheerder):
+    body = client.get("/api/v1/vestigingen", headers=beheerder, params={"limit": 1}).json()
+
+    assert set(body) == {"items", "total", "page", "limit", "pages"}
+    assert len(body["items"]) == 1
+    assert body["pages"] == body["total"]
@@ -0,0 +1,97 @@
+"""
+Storage backends: lokaal en S3 (tegen moto als S3/MinIO stand-in)
+"""
+import hashlib
+import io
+
+import pytest
+
+from app.services.storage import LocalStorage, S3Storage, get_storage
+
+# ============================================================================
+# LOKAAL
+# ============================================================================
+
+def test_get_storage_per_opslag_type():
+    assert isinstance(get_storage(), LocalStorage)
+    assert get_storage("local") is get_storage()
+    with pytest.raises(ValueError):
+        get_storage("ftp")
+
+
+def test_lokaal_dubbele_bestandsnaam_overschrijft_niet(tmp_dir):
+    storage = LocalStorage(tmp_dir / "lokaal-test")
+
+    eerste = storage.save(io.BytesIO(b"eerste"), "rapport.txt")
+    tweede = storage.save(io.BytesIO(b"tweede"), "rapport.txt")
+
+    assert eerste.opslag_pad != tweede.opslag_pad
+    assert b"".join(storage.open(eerste.opslag_pad)) == b"eerste"
+    assert b"".join(storage.open(tweede.opslag_pad, start=1, einde=3)) == b"wee"
+    assert tweede.content_hash == hashlib.sha256(b"tweede").hexdigest()
+
+    storage.delete(eerste.opslag_pad)
+    assert not storage.exists(eerste.opslag_pad)
+
+
+# ============================================================================
+# S3
+# ============================================================================
+
+BUCKET = "test-documenten"
+
+
+@pytest.fixture
+def s3():
+    pytest.importorskip("boto3")
+    moto = pytest.importorskip("moto")
+    with moto.mock_aws():
+        storage = S3Storage(
+            bucket=BUCKET, prefix="documenten/", region="us-east-1",
+            access_key="test", secret_key="test",
+        )
+        storage.client.create_bucket(Bucket=BUCKET)
+        yield storage
+
+
+def test_s3_save_geeft_hash_en_grootte(s3):
+    data = b"offerte " * 1000
+
+    opgeslagen = s3.save(io.BytesIO(data), "offerte.pdf")
+
+    assert opgeslagen.opslag_pad.startswith("documenten/")
+    assert opgeslagen.opslag_pad.endswith("_offerte.pdf")
+    assert opgeslagen.content_hash == hashlib.sha256(data).hexdigest()
+    assert opgeslagen.bestandsgrootte == len(data)
+    assert s3.size(opgeslagen.opslag_pad) == len(data)
+
+
+def test_s3_open_volledig_en_range(s3):
+    data = bytes(range(256)) * 10
+    pad = s3.save(io.BytesIO(data), "blob.bin").opslag_pad
+
+    assert b"".join(s3.open(pad)) == data
+    assert b"".join(s3.open(pad, start=10, einde=19)) == data[10:20]
+    assert b"".join(s3.open(pad, start=2500)) == data[2500:]
+
+
+def test_s3_multipart_upload(s3):
+    # Groter dan de multipart drempel van upload_fileobj (8MB)
+    data = b"x" * (9 * 1024 * 1024)
+
+    opgeslagen = s3.save(io.BytesIO(data), "groot.bin")
+
+    assert opgeslagen.bestandsgrootte == len(data)
+    assert opgeslagen.content_hash == hashlib.sha256(data).hexdigest()
+    assert s3.size(opgeslagen.opslag_pad) == len(data)
+
+
+def test_s3_exists_en_delete(s3):
+    pad = s3.save(io.BytesIO(b"weg"), "weg.txt").opslag_pad
+    assert s3.exists(pad)
+
+    s3.delete(pad)
+
+    assert not s3.exists(pad)
+    assert not s3.exists("documenten/bestaat-niet.txt")
+
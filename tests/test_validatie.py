@@ -0,0 +1,75 @@
+"""
+Request validatie via de pydantic request modellen
+"""
+import pytest
+
+from app.models.contract import Contract
+
+
+@pytest.mark.parametrize("velden", [
+    {"contract_bedrag": "0"},
+    {"contract_bedrag": "12.345"},
+    {"naam": ""},
+    {"type": "huurcontract_xl"},
+    {"start_datum": "31-02-2024"},
+    {"verantwoordelijke_id": None},
+])
+def test_ongeldig_contract_geeft_422(client, beheerder, db, velden):
+    aantal = db.query(Contract).count()
+    data = {
+        "contract_nummer": "CTR-ONGELDIG",
+        "naam": "Ongeldig",
+        "type": "onderhoudscontract",
+        "leverancier_id": "lev_x",
+        "contract_bedrag": "10.00",
+        "verantwoordelijke_id": "usr_x",
+        **velden,
+    }
+
+    response = client.post("/api/v1/contracts", headers=beheerder, json=data)
+
+    assert response.status_code == 422
+    assert db.query(Contract).count() == aantal
+
+
+def test_update_raakt_alleen_gedeclareerde_velden(client, beheerder, nieuw_contract, db):
+    contract_id = nieuw_contract()
+
+    response = client.patch(f"/api/v1/contracts/{contract_id}", headers=beheerder, json={
+        "naam": "Hernoemd",
+        "beschrijving": None,
+        "id": "ctr_anders",
+        "gefactureerd_bedrag": "999.00",
+        "versie_nummer": 42,
+    })
+
+    assert response.status_code == 200, response.text
+    contract = db.get(Contract, contract_id)
+    assert contract.naam == "Hernoemd"
+    assert contract.gefactureerd_bedrag == 0
+    assert contract.versie_nummer == 2
+    assert db.get(Contract, "ctr_anders") is None
+
+
+def test_update_met_ongeldige_datum_wijzigt_niets(client, beheerder, nieuw_contract, db):
+    contract_id = nieuw_contract(eind_datum="2030-01-01")
+
+    response = client.patch(f"/api/v1/contracts/{contract_id}", headers=beheerder, json={
+        "naam": "Niet opgeslagen", "eind_datum": "morgen",
+    })
+
+    assert response.status_code == 422
+    contract = db.get(Contract, contract_id)
+    assert contract.naam == "Testcontract"
+    assert str(contract.eind_datum) == "2030-01-01"
+
+
+@pytest.mark.parametrize("pad, data", [
+    ("/api/v1/leveranciers", {"naam": "Zonder type"}),
+    ("/api/v1/leveranciers", {"naam": "", "type": "BOUW"}),
+    ("/api/v1/projects", {"project_nummer": "PRJ-X", "naam": "Project", "budget_totaal": 0}),
+])
+def test_ongeldige_invoer_andere_resources(client, beheerder, pad, data):
+    response = client.post(pad, headers=beheerder, json=data)
+
+    assert response.status_code == 422
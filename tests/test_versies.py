@@ -0,0 +1,165 @@
+"""
+Optimistic concurrency: If-Match / ?versie= en gelijktijdige wijzigingen (409)
+"""
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from app.api.endpoints import contracts as contract_endpoints
+from app.db.session import engine
+from app.models.contract import Contract
+from app.models.leverancier import Leverancier
+from app.services import bulk
+
+
+def _patch(client, headers, contract_id, json=None, **params):
+    return client.patch(f"/api/v1/contracts/{contract_id}", headers=headers, json=json or {"naam": "Gewijzigd"}, params=params)
+
+
+def _contract_versie(db, contract_id):
+    db.expire_all()
+    return db.get(Contract, contract_id).versie_nummer
+
+
+def _ander_proces_wijzigt(model, record_id):
+    with engine.begin() as conn:
+        conn.execute(update(model).where(model.id == record_id).values(versie_nummer=model.versie_nummer + 1))
+
+
+# ============================================================================
+# IF-MATCH / ?versie=
+# ============================================================================
+
+@pytest.mark.parametrize("if_match", ['"1"', 'W/"1"', '"7", "1"', "*"])
+def test_if_match_met_actuele_versie(client, beheerder, nieuw_contract, db, if_match):
+    contract_id = nieuw_contract()
+
+    response = _patch(client, {**beheerder, "If-Match": if_match}, contract_id)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["versie"] == 2
+    assert _contract_versie(db, contract_id) == 2
+
+
+def test_if_match_met_oude_versie_geeft_409(client, beheerder, nieuw_contract, db):
+    contract_id = nieuw_contract()
+    assert _patch(client, beheerder, contract_id, json={"naam": "Eerste"}).status_code == 200
+
+    response = _patch(client, {**beheerder, "If-Match": '"1"'}, contract_id, json={"naam": "Tweede"})
+
+    assert response.status_code == 409
+    assert "huidige versie 2" in response.json()["detail"]
+    db.expire_all()
+    assert db.get(Contract, contract_id).naam == "Eerste"
+
+
+def test_versie_parameter(client, beheerder, nieuw_contract, db):
+    contract_id = nieuw_contract()
+
+    assert _patch(client, beheerder, contract_id, versie=5).status_code == 409
+    assert _patch(client, beheerder, contract_id, versie=1).status_code == 200
+    assert _contract_versie(db, contract_id) == 2
+
+
+def test_ongeldige_if_match(client, beheerder, nieuw_contract):
+    contract_id = nieuw_contract()
+
+    assert _patch(client, {**beheerder, "If-Match": "abc"}, contract_id).status_code == 400
+
+
+def test_detail_geeft_versie(client, beheerder, nieuw_contract):
+    contract_id = nieuw_contract()
+    _patch(client, beheerder, contract_id)
+
+    assert client.get(f"/api/v1/contracts/{contract_id}", headers=beheerder).json()["data"]["versie"] == 2
+
+
+def test_wijziging_tussen_controle_en_schrijven_geeft_409(client, beheerder, nieuw_contract, db, monkeypatch):
+    contract_id = nieuw_contract()
+    origineel = contract_endpoints.controleer_versie
+
+    def met_tussentijdse_wijziging(obj, verwacht):
+        origineel(obj, verwacht)
+        _ander_proces_wijzigt(Contract, obj.id)
+
+    monkeypatch.setattr(contract_endpoints, "controleer_versie", met_tussentijdse_wijziging)
+
+    response = _patch(client, {**beheerder, "If-Match": '"1"'}, contract_id, json={"naam": "Race"})
+
+    assert response.status_code == 409
+    db.expire_all()
+    assert db.get(Contract, contract_id).naam != "Race"
+    assert _contract_versie(db, contract_id) == 2
+
+
+def test_vestiging_versie_gaat_een_omhoog(client, beheerder, db):
+    from app.models.vestiging import Vestiging
+    vestiging = db.query(Vestiging).first()
+    versie = vestiging.versie_nummer
+
+    response = client.put(
+        f"/api/v1/vestigingen/{vestiging.id}", headers={**beheerder, "If-Match": f'"{versie}"'},
+        json={"telefoon": uuid.uuid4().hex[:10]},
+    )
+
+    assert response.status_code == 200, response.text
+    db.expire_all()
+    assert db.get(Vestiging, vestiging.id).versie_nummer == versie + 1
+
+
+# ============================================================================
+# BULK
+# ============================================================================
+
+def _nieuwe_leveranciers(client, headers, aantal=2):
+    items = [
+        {"naam": f"Versie leverancier {i}", "type": "bouw", "kvk_nummer": uuid.uuid4().hex[:8]}
+        for i in range(aantal)
+    ]
+    response = client.post("/api/v1/leveranciers/bulk", headers=headers, json={"items": items})
+    assert response.status_code == 200, response.text
+    return [resultaat["id"] for resultaat in response.json()["resultaten"]]
+
+
+def _versie(db, leverancier_id):
+    db.expire_all()
+    return db.get(Leverancier, leverancier_id).versie_nummer
+
+
+def test_bijwerken_met_verouderde_versie(client, beheerder, db):
+    goed, verouderd = _nieuwe_leveranciers(client, beheerder)
+    versie = _versie(db, verouderd)
+    items = [
+        {"id": goed, "naam": "Bijgewerkt", "versie": _versie(db, goed)},
+        {"id": verouderd, "naam": "Niet bijgewerkt", "versie": versie - 1},
+    ]
+
+    response = client.patch("/api/v1/leveranciers/bulk", headers=beheerder, json={"items": items})
+
+    resultaten = response.json()["resultaten"]
+    assert [r["status"] for r in resultaten] == ["bijgewerkt", "fout"]
+    assert "niet meer actueel" in resultaten[1]["fouten"][0]
+    assert _versie(db, goed) == 2
+    assert _versie(db, verouderd) == versie
+
+
+def test_gelijktijdige_wijziging_geeft_409(client, beheerder, db, monkeypatch):
+    (leverancier_id,) = _nieuwe_leveranciers(client, beheerder, aantal=1)
+    origineel = bulk._bestaande_versies
+
+    def met_tussentijdse_wijziging(db_sessie, config, items):
+        origineel(db_sessie, config, items)
+        # Een ander proces wijzigt het record tussen controle en schrijven
+        _ander_proces_wijzigt(Leverancier, leverancier_id)
+
+    monkeypatch.setattr(bulk, "_bestaande_versies", met_tussentijdse_wijziging)
+
+    response = client.patch(
+        "/api/v1/leveranciers/bulk", headers=beheerder,
+        json={"items": [{"id": leverancier_id, "naam": "Race"}]},
+    )
+
+    assert response.status_code == 409
+    db.expire_all()
+    assert db.get(Leverancier, leverancier_id).naam != "Race"
@@ -0,0 +1,65 @@
+"""
+ZIP export van fase- en projectdocumenten
+"""
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from app.models.projectfase import ProjectFase, ProjectFaseDocument
+from app.services.zip_export import ONTBREKEND_BESTAND
+
+
+def _zip(client, url, headers) -> zipfile.ZipFile:
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/zip"
+    return zipfile.ZipFile(io.BytesIO(response.content))
+
+
+@pytest.fixture
+def fase(db, fase_id):
+    return db.get(ProjectFase, fase_id)
+
+
+def test_fase_zip_met_inhoud_en_compressie(client, beheerder, upload, fase):
+    tekst = b"verslag " * 1000
+    upload("bouwverslag.txt", tekst, fase=fase.id)
+    upload("bouwverslag.txt", b"tweede", fase=fase.id)
+    upload("foto.jpg", b"\xff\xd8" + b"x" * 500, fase=fase.id)
+
+    archief = _zip(client, f"/api/v1/fases/{fase.id}/documenten/zip", beheerder)
+
+    assert archief.testzip() is None
+    map_naam = f"{fase.fase_nummer:02d} - {fase.naam}"
+    namen = set(archief.namelist())
+    assert {f"{map_naam}/bouwverslag.txt", f"{map_naam}/bouwverslag (2).txt", f"{map_naam}/foto.jpg"} <= namen
+    assert archief.read(f"{map_naam}/bouwverslag.txt") == tekst
+    assert archief.getinfo(f"{map_naam}/bouwverslag.txt").compress_type == zipfile.ZIP_DEFLATED
+    assert archief.getinfo(f"{map_naam}/foto.jpg").compress_type == zipfile.ZIP_STORED
+
+
+def test_ontbrekend_bestand_staat_in_het_archief(client, beheerder, upload, db, fase):
+    document_id = upload("kwijt.txt", b"weg", fase=fase.id)
+    Path(db.get(ProjectFaseDocument, document_id).opslag_pad).unlink()
+
+    archief = _zip(client, f"/api/v1/fases/{fase.id}/documenten/zip", beheerder)
+
+    pad = f"{fase.fase_nummer:02d} - {fase.naam}/kwijt.txt"
+    assert pad not in archief.namelist()
+    assert pad in archief.read(ONTBREKEND_BESTAND).decode()
+
+
+def test_project_zip_voor_leverancier(client, beheerder, leverancier, upload, db, leverancier_fases):
+    eigen, andere = leverancier_fases
+    upload("zichtbaar.txt", b"ja", fase=eigen, zichtbaar_voor_leverancier="true")
+    upload("intern.txt", b"nee", fase=eigen, zichtbaar_voor_leverancier="false")
+    upload("andere leverancier.txt", b"nee", fase=andere, zichtbaar_voor_leverancier="true")
+    project_id = db.get(ProjectFase, eigen).project_id
+
+    namen = _zip(client, f"/api/v1/projects/{project_id}/documenten/zip", leverancier).namelist()
+
+    assert any(naam.endswith("/zichtbaar.txt") for naam in namen)
+    assert not any(naam.endswith(("/intern.txt", "/andere leverancier.txt")) for naam in namen)
+    assert client.get(f"/api/v1/fases/{andere}/documenten/zip", headers=leverancier).status_code == 403
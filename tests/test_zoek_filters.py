@@ -0,0 +1,69 @@
+"""
+Trigram zoekfilters van de lijst endpoints
+"""
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, text, update
+
+from app.models.leverancier import Leverancier
+from app.services.zoek_filters import _ilike_filter, tekst_filter, ZOEK_KOLOMMEN
+
+
+@pytest.fixture
+def leverancier_id(db):
+    """Leverancier direct via Core (dus alleen via de triggers geïndexeerd)"""
+    leverancier_id = f"lev_{uuid.uuid4().hex[:8]}"
+    db.execute(insert(Leverancier).values(
+        id=leverancier_id, naam="Glaszetterij Van Reeuwijk", type="BOUW", status="ACTIEF",
+        kvk_nummer=leverancier_id[4:],
+        contactpersoon="Ellen de Vries", email="ellen@vanreeuwijk.nl", versie_nummer=1,
+    ))
+    db.commit()
+    return leverancier_id
+
+
+def _gevonden(db, term):
+    return {rij.id for rij in db.query(Leverancier.id).filter(tekst_filter(Leverancier, term))}
+
+
+@pytest.mark.parametrize("term", ["reeuw", "GLASZET", "de vries", "vanreeuwijk.nl", "zetterij van"])
+def test_zelfde_resultaat_als_ilike(db, leverancier_id, term):
+    verwacht = {
+        rij.id for rij in db.query(Leverancier.id).filter(_ilike_filter(Leverancier, ZOEK_KOLOMMEN[Leverancier], term))
+    }
+
+    assert leverancier_id in verwacht
+    assert _gevonden(db, term) == verwacht
+
+
+def test_korte_term_en_bijzondere_tekens(db, leverancier_id):
+    assert leverancier_id in _gevonden(db, "ee")
+    assert _gevonden(db, 'glas"zet') == set()
+
+
+def test_triggers_volgen_wijzigingen(db, leverancier_id):
+    db.execute(update(Leverancier).where(Leverancier.id == leverancier_id).values(naam="Kozijnen Oostpolder"))
+    db.commit()
+    assert leverancier_id not in _gevonden(db, "glaszet")
+    assert leverancier_id in _gevonden(db, "oostpol")
+
+    db.execute(delete(Leverancier).where(Leverancier.id == leverancier_id))
+    db.commit()
+    assert leverancier_id not in _gevonden(db, "oostpol")
+
+
+def test_index_overleeft_hernummeren_van_rowids(db, leverancier_id):
+    # VACUUM mag de impliciete rowid van een tabel met een string primary key hernummeren
+    db.execute(text("UPDATE leveranciers SET rowid = rowid + 100000 WHERE id = :id"), {"id": leverancier_id})
+    db.commit()
+
+    assert leverancier_id in _gevonden(db, "reeuwijk")
+    assert _gevonden(db, leverancier_id[4:]) == {leverancier_id}
+
+
+def test_lijst_endpoint(client, beheerder, leverancier_id):
+    response = client.get("/api/v1/leveranciers", headers=beheerder, params={"search": "Reeuwijk", "limit": 100})
+
+    assert response.status_code == 200
+    assert leverancier_id in [l["id"] for l in response.json()["data"]]
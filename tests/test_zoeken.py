@@ -0,0 +1,99 @@
+"""
+Full-text zoeken: index bijhouden via de flush, ranking en rechten
+"""
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app.models.leverancier import Leverancier, LeverancierType
+from app.services import zoeken
+
+
+def _zoek(client, headers, q, **params):
+    response = client.get("/api/v1/search", headers=headers, params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def _ids(resultaten):
+    return [r["id"] for r in resultaten]
+
+
+@pytest.fixture
+def woord():
+    """Een zoekterm die verder nergens voorkomt"""
+    return "zk" + uuid.uuid4().hex[:8]
+
+
+def _nieuwe_leverancier(client, headers, **velden) -> str:
+    response = client.post("/api/v1/leveranciers", headers=headers, json={"type": "bouw", **velden})
+    assert response.status_code == 200, response.text
+    return response.json()["data"]["id"]
+
+
+def test_aanmaken_wijzigen_en_verwijderen_worden_geindexeerd(client, beheerder, woord):
+    leverancier_id = _nieuwe_leverancier(client, beheerder, naam=f"Dakdekkers {woord}")
+
+    assert _ids(_zoek(client, beheerder, woord)) == [leverancier_id]
+    assert _ids(_zoek(client, beheerder, f"dakdekkers {woord[:5]}")) == [leverancier_id]  # prefix
+
+    client.patch(f"/api/v1/leveranciers/{leverancier_id}", headers=beheerder, json={"naam": "Dakdekkers"})
+    assert _zoek(client, beheerder, woord) == []
+
+    client.patch(f"/api/v1/leveranciers/{leverancier_id}", headers=beheerder, json={"notities": woord})
+    assert _ids(_zoek(client, beheerder, woord, type="leverancier")) == [leverancier_id]
+    assert _zoek(client, beheerder, woord, type="project") == []
+
+    client.delete(f"/api/v1/leveranciers/{leverancier_id}", headers=beheerder)
+    assert _zoek(client, beheerder, woord) == []
+
+
+def test_titel_weegt_zwaarder_dan_inhoud(client, beheerder, woord):
+    in_inhoud = _nieuwe_leverancier(client, beheerder, naam="Schilders", notities=f"specialist {woord}")
+    in_titel = _nieuwe_leverancier(client, beheerder, naam=f"{woord} Schilders")
+
+    resultaten = _zoek(client, beheerder, woord)
+
+    assert _ids(resultaten) == [in_titel, in_inhoud]
+    assert "<b>" in resultaten[1]["fragment"]
+
+
+def test_rollback_draait_de_index_terug(client, beheerder, db, woord):
+    db.add(Leverancier(id=f"lev_{uuid.uuid4().hex[:8]}", naam=woord, type=LeverancierType.BOUW))
+    db.flush()
+    assert db.execute(text("SELECT count(*) FROM zoek_index WHERE zoek_index MATCH :q"), {"q": woord}).scalar() == 1
+
+    db.rollback()
+
+    assert _zoek(client, beheerder, woord) == []
+
+
+def test_mislukte_index_update_laat_de_wijziging_door(client, beheerder, db, woord, monkeypatch):
+    def kapot(conn, gewijzigd, verwijderd=()):
+        conn.execute(text("INSERT INTO bestaat_niet VALUES (1)"))
+
+    monkeypatch.setattr(zoeken, "indexeer_objecten", kapot)
+    leverancier_id = f"lev_{uuid.uuid4().hex[:8]}"
+    db.add(Leverancier(id=leverancier_id, naam=woord, type=LeverancierType.BOUW))
+    db.commit()
+
+    db.expire_all()
+    assert db.get(Leverancier, leverancier_id) is not None
+    monkeypatch.undo()
+    assert _zoek(client, beheerder, woord) == []
+
+
+def test_documenten_en_rechten_van_leveranciers(client, beheerder, leverancier, upload, leverancier_fases, woord):
+    eigen, andere = leverancier_fases
+    zichtbaar = upload("rapport.txt", b"x", fase=eigen, beschrijving=woord, zichtbaar_voor_leverancier="true")
+    upload("intern.txt", b"x", fase=eigen, beschrijving=woord, zichtbaar_voor_leverancier="false")
+    upload("ander.txt", b"x", fase=andere, beschrijving=woord, zichtbaar_voor_leverancier="true")
+
+    assert len(_zoek(client, beheerder, woord, type="document")) == 3
+    assert _ids(_zoek(client, leverancier, woord)) == [zichtbaar]
+
+
+def test_onbekend_type(client, beheerder):
+    response = client.get("/api/v1/search", headers=beheerder, params={"q": "x", "type": "factuur"})
+    assert response.status_code == 400